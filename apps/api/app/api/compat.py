@@ -1,86 +1,117 @@
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from typing import Any
 
-from fastapi import APIRouter, Request
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, StreamingResponse
 
+from app.api.sse import format_sse_event, sse_response
+from app.core.json_codec import FastJSONResponse
 from app.services.compat.generation_service import (
     AssessmentAnalyzeRequest,
     AssessmentQuestionsRequest,
     CurriculumGenerateRequest,
     CurriculumRefineRequest,
     GenerateRequest,
+    LessonRequest,
     ReasoningRequest,
     RecommendRequest,
     SearchRequest,
     SectionsRequest,
     ValidateRequest,
-    compat_assessment_analyze as service_assessment_analyze,
-    compat_assessment_questions as service_assessment_questions,
+    compat_assessment_analyze_async as service_assessment_analyze,
+    compat_assessment_questions_async as service_assessment_questions,
     compat_auth_callback as service_auth_callback,
-    compat_curriculum_generate as service_curriculum_generate,
-    compat_curriculum_reasoning as service_curriculum_reasoning,
-    compat_curriculum_refine as service_curriculum_refine,
-    compat_curriculum_sections as service_curriculum_sections,
-    compat_generate as service_generate,
+    compat_curriculum_generate_async as service_curriculum_generate,
+    compat_curriculum_lesson_async as service_curriculum_lesson,
+    compat_curriculum_lesson_events as service_curriculum_lesson_events,
+    compat_curriculum_reasoning_async as service_curriculum_reasoning,
+    compat_curriculum_refine_async as service_curriculum_refine,
+    compat_curriculum_sections_async as service_curriculum_sections,
+    compat_generate_async as service_generate,
     compat_recommendations as service_recommendations,
     compat_search as service_search,
     compat_validate as service_validate,
 )
 
 
-router = APIRouter(prefix="/api", tags=["public"])
+# 서비스가 만든 dict는 이미 JSON 기본형이라 FastAPI 재인코딩(jsonable_encoder) 없이 코덱으로 한 번만 바이트로 만든다.
+router = APIRouter(prefix="/api", tags=["public"], default_response_class=FastJSONResponse)
 
 
 @router.post("/generate")
-def compat_generate(payload: GenerateRequest) -> dict[str, Any]:
-    return service_generate(payload)
+async def compat_generate(payload: GenerateRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_generate(payload))
 
 
 @router.post("/search")
-def compat_search(payload: SearchRequest) -> dict[str, Any]:
-    return service_search(payload)
+async def compat_search(payload: SearchRequest) -> FastJSONResponse:
+    return FastJSONResponse(service_search(payload))
 
 
 @router.post("/validate")
-def compat_validate(payload: ValidateRequest) -> dict[str, Any]:
-    return service_validate(payload)
+async def compat_validate(payload: ValidateRequest) -> FastJSONResponse:
+    return FastJSONResponse(service_validate(payload))
 
 
 @router.post("/recommendations")
-def compat_recommendations(payload: RecommendRequest) -> dict[str, Any]:
-    return service_recommendations(payload)
+async def compat_recommendations(payload: RecommendRequest) -> FastJSONResponse:
+    return FastJSONResponse(service_recommendations(payload))
 
 
 @router.post("/assessment/questions")
-def compat_assessment_questions(payload: AssessmentQuestionsRequest) -> dict[str, Any]:
-    return service_assessment_questions(payload)
+async def compat_assessment_questions(payload: AssessmentQuestionsRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_assessment_questions(payload))
 
 
 @router.post("/assessment/analyze")
-def compat_assessment_analyze(payload: AssessmentAnalyzeRequest) -> dict[str, Any]:
-    return service_assessment_analyze(payload)
+async def compat_assessment_analyze(payload: AssessmentAnalyzeRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_assessment_analyze(payload))
 
 
 @router.post("/curriculum/generate")
-def compat_curriculum_generate(payload: CurriculumGenerateRequest) -> dict[str, Any]:
-    return service_curriculum_generate(payload)
+async def compat_curriculum_generate(payload: CurriculumGenerateRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_curriculum_generate(payload))
 
 
 @router.post("/curriculum/refine")
-def compat_curriculum_refine(payload: CurriculumRefineRequest) -> dict[str, Any]:
-    return service_curriculum_refine(payload)
+async def compat_curriculum_refine(payload: CurriculumRefineRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_curriculum_refine(payload))
 
 
 @router.post("/curriculum/reasoning")
-def compat_curriculum_reasoning(payload: ReasoningRequest) -> dict[str, Any]:
-    return service_curriculum_reasoning(payload)
+async def compat_curriculum_reasoning(payload: ReasoningRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_curriculum_reasoning(payload))
 
 
 @router.post("/curriculum/sections")
-def compat_curriculum_sections(payload: SectionsRequest) -> dict[str, Any]:
-    return service_curriculum_sections(payload)
+async def compat_curriculum_sections(payload: SectionsRequest) -> FastJSONResponse:
+    return FastJSONResponse(await service_curriculum_sections(payload))
+
+
+@router.post("/curriculum/lesson", response_model=None)
+async def compat_curriculum_lesson(payload: LessonRequest) -> FastJSONResponse | StreamingResponse:
+    if not payload.stream:
+        return FastJSONResponse(await service_curriculum_lesson(payload))
+    events = service_curriculum_lesson_events(payload)
+    # 추론 결과까지는 응답 헤더 전이므로 추론 실패는 다른 엔드포인트와 같은 HTTP 오류로 돌려준다.
+    first = await anext(events)
+    return sse_response(_lesson_event_stream(first, events))
+
+
+async def _lesson_event_stream(
+    first: tuple[str, dict[str, Any]],
+    events: AsyncIterator[tuple[str, dict[str, Any]]],
+) -> AsyncIterator[bytes]:
+    async with aclosing(events):
+        yield format_sse_event(*first)
+        try:
+            async for event, data in events:
+                yield format_sse_event(event, data)
+        except HTTPException as exc:
+            yield format_sse_event("error", exc.detail)
 
 
 @router.get("/auth/callback")
-def compat_auth_callback(request: Request, code: str | None = None, next: str = "/dashboard") -> RedirectResponse:
+async def compat_auth_callback(request: Request, code: str | None = None, next: str = "/dashboard") -> RedirectResponse:
     return service_auth_callback(request=request, code=code, next=next)
@@ -1,17 +1,30 @@
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
 from functools import lru_cache
+import hashlib
 import json
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from app.api.sse import format_sse_event, sse_response
 from app.core.config import get_settings
-from app.domain.ai import build_ai_service
+from app.domain.ai import build_async_ai_service
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk
+from app.domain.ai.providers.streaming import JSONStringFieldExtractor
+from app.domain.ai.scheduler import retry_after_hint
+from app.domain.ai.similarity_cache import SimilarityCache, get_shared_chat_similarity_cache
+from app.domain.ai.token_estimator import fit_prompt
 from app.services.compat.error_policy import build_structured_error_detail
+from app.services.compat.normalizer_validator import extract_semantic_tokens
 from app.services.compat.pipeline_runtime import (
     ai_error_detail,
     classify_ai_failure,
     format_pipeline_error_detail,
+    serialize_ai_response_meta,
 )
 
 
@@ -24,11 +37,23 @@ class ChatRequest(BaseModel):
     chatType: str = "manager"
     contextId: str | None = None
     context: dict[str, Any] = Field(default_factory=dict)
+    stream: bool = False
 
 
 @lru_cache(maxsize=1)
 def _get_ai_service():
-    return build_ai_service(settings)
+    return build_async_ai_service(settings)
+
+
+@lru_cache(maxsize=1)
+def _get_similarity_cache() -> SimilarityCache | None:
+    if not settings.ai_chat_similarity_cache_enabled:
+        return None
+    return get_shared_chat_similarity_cache(
+        threshold=settings.ai_chat_similarity_threshold,
+        ttl_sec=settings.ai_chat_similarity_ttl_sec,
+        max_entries=settings.ai_chat_similarity_max_entries,
+    )
 
 
 def _require_ai_service():
@@ -93,11 +118,18 @@ def _compact_text(value: Any, max_chars: int) -> str:
     return text[: max_chars - 3].rstrip() + "..."
 
 
-def _compact_context(raw_context: dict[str, Any]) -> dict[str, Any]:
+# 입력 토큰 예산을 넘으면 단계마다 (최근 메시지 수, contentBody, codeExamples) 순으로 줄인다.
+_CHAT_SHRINK_STEPS = ((6, 1800, 900), (4, 1200, 600), (2, 800, 300), (0, 500, 160))
+# 유사 질문 캐시 키에 넣는 이전 턴 수. 프롬프트의 최근 메시지에서 현재 질문을 뺀 만큼이다.
+_SIMILARITY_HISTORY_TURNS = _CHAT_SHRINK_STEPS[0][0] - 1
+
+
+def _compact_context(raw_context: dict[str, Any], shrink: int = 0) -> dict[str, Any]:
     compact: dict[str, Any] = {}
+    _, body_limit, code_limit = _CHAT_SHRINK_STEPS[shrink]
     key_limits = {
-        "contentBody": 1800,
-        "codeExamples": 900,
+        "contentBody": body_limit,
+        "codeExamples": code_limit,
         "curriculumGoal": 280,
         "contentTitle": 220,
     }
@@ -120,7 +152,7 @@ def _compact_context(raw_context: dict[str, Any]) -> dict[str, Any]:
 
 def _serialize_recent_messages(messages: list[dict[str, Any]], limit: int = 6) -> str:
     rows: list[str] = []
-    for msg in messages[-limit:]:
+    for msg in messages[-limit:] if limit > 0 else ():
         role = msg.get("role")
         if role not in {"user", "assistant"}:
             continue
@@ -143,8 +175,16 @@ def _serialize_recent_messages(messages: list[dict[str, Any]], limit: int = 6) -
 
 
 def _build_chat_prompts(payload: ChatRequest, last_user: str) -> tuple[str, str]:
+    return fit_prompt(
+        lambda shrink: _chat_prompts(payload, last_user, shrink),
+        pipeline="chat_generate",
+        levels=len(_CHAT_SHRINK_STEPS) - 1,
+    )
+
+
+def _chat_prompts(payload: ChatRequest, last_user: str, shrink: int) -> tuple[str, str]:
     chat_type = _normalize_chat_type(payload.chatType)
-    compact_context = _compact_context(payload.context)
+    compact_context = _compact_context(payload.context, shrink)
     assistant_persona = _normalize_assistant_persona(compact_context.get("assistantPersona"))
     persona_rules = {
         "coach": "말투는 명확하고 목표지향적입니다. 칭찬은 구체적으로, 행동 제안은 분명하게 제시합니다.",
@@ -173,7 +213,7 @@ def _build_chat_prompts(payload: ChatRequest, last_user: str) -> tuple[str, str]
         "반드시 JSON 객체 하나만 반환하세요."
     )
     context_json = json.dumps(compact_context, ensure_ascii=False)
-    history_text = _serialize_recent_messages(payload.messages)
+    history_text = _serialize_recent_messages(payload.messages, _CHAT_SHRINK_STEPS[shrink][0])
     user_prompt = (
         f"chatType={chat_type}\n"
         f"contextId={payload.contextId or 'none'}\n"
@@ -184,39 +224,179 @@ def _build_chat_prompts(payload: ChatRequest, last_user: str) -> tuple[str, str]
     return system_prompt, user_prompt
 
 
-@router.post("/chat")
-def compat_chat(payload: ChatRequest) -> dict[str, Any]:
+def _messages_before_last_user(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].get("role") == "user":
+            return messages[:index]
+    return messages
+
+
+def _similarity_key(payload: ChatRequest, last_user: str) -> tuple[str, set[str]] | None:
+    # 매니저 모드의 반복 질문만 대상으로 한다. 튜터 답변은 질문의 세부 내용에 따라 달라진다.
+    if _normalize_chat_type(payload.chatType) != "manager" or not last_user:
+        return None
+    tokens = extract_semantic_tokens(last_user)
+    if not tokens:
+        return None
+    compact_context = _compact_context(payload.context)
+    persona = _normalize_assistant_persona(compact_context.get("assistantPersona"))
+    # "그건요?"처럼 앞 대화를 가리키는 질문은 답이 이전 턴에 달려 있으므로 프롬프트에 실리는 이전 턴도 같아야 한다.
+    history = _serialize_recent_messages(_messages_before_last_user(payload.messages), _SIMILARITY_HISTORY_TURNS)
+    # 진도/일정 같은 답은 학습자 컨텍스트에 달려 있으므로 컨텍스트가 같은 요청끼리만 재사용한다.
+    fingerprint = hashlib.sha256(
+        json.dumps(
+            {"contextId": payload.contextId, "context": compact_context, "history": history},
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"manager:{persona}:{fingerprint}", tokens
+
+
+def _chat_failure(exc: Exception) -> tuple[int, dict[str, Any]]:
+    reason = ai_error_detail(exc)
+    code, status_code, retryable = classify_ai_failure(exc)
+    return status_code, build_structured_error_detail(
+        error_code=code,
+        message=reason,
+        retryable=retryable,
+        detail=format_pipeline_error_detail("chat_generate", code, reason),
+        retry_after_sec=retry_after_hint(exc),
+    )
+
+
+def _empty_assistant_detail() -> dict[str, Any]:
+    return build_structured_error_detail(
+        error_code="empty_output",
+        message="chat_empty_assistant",
+        retryable=False,
+        detail="chat_empty_assistant",
+    )
+
+
+async def _next_chat_chunk(chunks: AsyncIterator[AIStreamChunk]) -> AIStreamChunk | None:
+    # 비동기 제너레이터 본문은 꺼내는 쪽 컨텍스트에서 돈다. 청크마다 파이프라인을 걸어야
+    # 중간/마지막 청크의 사용량(프롬프트 캐시 통계, 쿼터 정산)도 chat_generate로 잡힌다.
+    with ai_call_context(pipeline="chat_generate"):
+        return await anext(chunks, None)
+
+
+async def _chat_event_stream(
+    payload: ChatRequest,
+    chunks: AsyncIterator[AIStreamChunk],
+    first: AIStreamChunk,
+    on_answer: Callable[[str], None] | None = None,
+) -> AsyncIterator[bytes]:
+    extractor = JSONStringFieldExtractor("assistant")
+    streamed: list[str] = []
+    response_meta: AIResponseMeta | None = None
+    async with aclosing(chunks):
+        chunk: AIStreamChunk | None = first
+        try:
+            while chunk is not None:
+                if chunk.meta is not None:
+                    response_meta = chunk.meta
+                delta = extractor.feed(chunk.text) if chunk.text else ""
+                if delta:
+                    streamed.append(delta)
+                    yield format_sse_event("delta", {"text": delta})
+                chunk = await _next_chat_chunk(chunks)
+        except Exception as exc:
+            # 헤더가 이미 나간 뒤라 상태 코드 대신 구조화된 error 이벤트로 실패를 알린다.
+            _, detail = _chat_failure(exc)
+            yield format_sse_event("error", detail)
+            return
+
+    answer = "".join(streamed).strip()
+    if not answer:
+        yield format_sse_event("error", _empty_assistant_detail())
+        return
+    if on_answer is not None:
+        on_answer(answer)
+    yield format_sse_event("done", {
+        "chatType": payload.chatType,
+        "contextId": payload.contextId,
+        "assistant": answer,
+        "streaming": True,
+        "meta": serialize_ai_response_meta(response_meta),
+    })
+
+
+async def _cached_chat_event_stream(payload: ChatRequest, answer: str, meta: dict[str, Any]) -> AsyncIterator[bytes]:
+    yield format_sse_event("delta", {"text": answer})
+    yield format_sse_event("done", {
+        "chatType": payload.chatType,
+        "contextId": payload.contextId,
+        "assistant": answer,
+        "streaming": True,
+        "meta": meta,
+    })
+
+
+async def _open_chat_stream(
+    payload: ChatRequest,
+    ai_service: Any,
+    system_prompt: str,
+    user_prompt: str,
+    on_answer: Callable[[str], None] | None = None,
+) -> StreamingResponse:
+    chunks = ai_service.stream_json_text(system_prompt=system_prompt, user_prompt=user_prompt)
+    # 첫 청크까지는 응답 헤더 전이므로 백프레셔/공급자 오류를 기존과 같은 HTTP 오류로 돌려준다.
+    try:
+        first = await _next_chat_chunk(chunks)
+    except Exception as exc:
+        await chunks.aclose()
+        status_code, detail = _chat_failure(exc)
+        raise HTTPException(status_code=status_code, detail=detail) from exc
+    if first is None:
+        raise HTTPException(status_code=502, detail=_empty_assistant_detail())
+
+    return sse_response(_chat_event_stream(payload, chunks, first, on_answer))
+
+
+@router.post("/chat", response_model=None)
+async def compat_chat(payload: ChatRequest) -> dict[str, Any] | StreamingResponse:
     last_user = _extract_last_user_text(payload.messages)
 
+    similarity_cache = _get_similarity_cache()
+    similarity_key = _similarity_key(payload, last_user) if similarity_cache is not None else None
+    if similarity_key is not None:
+        hit = similarity_cache.get(*similarity_key)
+        if hit is not None:
+            answer, similarity = hit
+            meta = {"cache_hit": True, "similarity": similarity}
+            if payload.stream:
+                return sse_response(_cached_chat_event_stream(payload, answer, meta))
+            return {
+                "chatType": payload.chatType,
+                "contextId": payload.contextId,
+                "assistant": answer,
+                "streaming": False,
+                "meta": meta,
+            }
+
+    def remember(answer: str) -> None:
+        if similarity_key is not None:
+            similarity_cache.put(*similarity_key, answer)
+
     system_prompt, user_prompt = _build_chat_prompts(payload, last_user)
     ai_service = _require_ai_service()
 
+    if payload.stream:
+        return await _open_chat_stream(payload, ai_service, system_prompt, user_prompt, remember)
+
     try:
-        raw = ai_service.generate_json(system_prompt=system_prompt, user_prompt=user_prompt)
+        with ai_call_context(pipeline="chat_generate"):
+            raw = await ai_service.generate_json(system_prompt=system_prompt, user_prompt=user_prompt)
     except Exception as exc:
-        reason = ai_error_detail(exc)
-        code, status_code, retryable = classify_ai_failure(reason)
-        raise HTTPException(
-            status_code=status_code,
-            detail=build_structured_error_detail(
-                error_code=code,
-                message=reason,
-                retryable=retryable,
-                detail=format_pipeline_error_detail("chat_generate", code, reason),
-            ),
-        ) from exc
+        status_code, detail = _chat_failure(exc)
+        raise HTTPException(status_code=status_code, detail=detail) from exc
 
     answer = _as_non_empty_str(raw.get("assistant"), "")
     if not answer:
-        raise HTTPException(
-            status_code=502,
-            detail=build_structured_error_detail(
-                error_code="empty_output",
-                message="chat_empty_assistant",
-                retryable=False,
-                detail="chat_empty_assistant",
-            ),
-        )
+        raise HTTPException(status_code=502, detail=_empty_assistant_detail())
+    remember(answer)
 
     return {
         "chatType": payload.chatType,
@@ -0,0 +1,18 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from app.core import json_codec
+
+
+def format_sse_event(event: str, data: dict[str, Any]) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + json_codec.dumps(data) + b"\n\n"
+
+
+def sse_response(events: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
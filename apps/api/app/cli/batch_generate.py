@@ -0,0 +1,48 @@
+"""Offline bulk generation through provider batch APIs.
+
+    python -m app.cli.batch_generate input.jsonl --passed out.jsonl --resubmit retry.jsonl
+
+Each input line is ``{"id", "kind": "generate"|"lesson", "payload": {...}}``. The resubmission
+file uses the same format and can be fed back in as input.
+"""
+
+import argparse
+import json
+import sys
+
+from app.core.config import get_settings
+from app.domain.ai import build_batch_client
+from app.services.compat.batch_generation import read_batch_items, run_batch_generation, write_jsonl
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.batch_generate", description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="GenerateRequest/ReasoningRequest JSONL 파일")
+    parser.add_argument("--passed", default="batch_passed.jsonl", help="품질 검사를 통과한 결과 JSONL")
+    parser.add_argument("--resubmit", default="batch_resubmit.jsonl", help="실패 항목(재입력 가능) JSONL")
+    parser.add_argument("--provider", default=None, help="gemini | openai | openai@<base_url> (기본: AI_PROVIDER)")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="작업 상태 조회 간격(초)")
+    parser.add_argument("--timeout", type=float, default=24 * 3600.0, help="작업 완료 대기 한도(초)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    with open(args.input, encoding="utf-8") as handle:
+        items, rejected = read_batch_items(handle)
+
+    client = build_batch_client(get_settings(), args.provider)
+    report = run_batch_generation(
+        items,
+        client,
+        poll_interval_sec=args.poll_interval,
+        timeout_sec=args.timeout,
+    )
+    passed = write_jsonl(args.passed, report.passed)
+    resubmit = write_jsonl(args.resubmit, [*rejected, *report.resubmit])
+    print(json.dumps({"items": len(items) + len(rejected), "passed": passed, "resubmit": resubmit}))
+    return 0 if resubmit == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Standalone fake LLM server for load and latency testing.
+
+    python -m app.cli.fake_llm --port 8900
+
+Speaks the OpenAI chat-completions and Gemini generateContent wire formats and returns payloads
+that pass each pipeline's quality gate. Behaviour comes from the ``AI_FAKE_*`` settings; flags
+override them. Point the API at it with ``AI_PROVIDER=fake`` and ``AI_FAKE_BASE_URL``.
+"""
+
+import argparse
+from dataclasses import replace
+import sys
+
+from app.core.config import get_settings
+from app.domain.ai.factory import build_fake_llm_config
+from app.domain.ai.providers.fake_llm import FakeLLMServer
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.fake_llm", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--p50-ms", type=float, default=None, help="지연 중앙값(ms)")
+    parser.add_argument("--p95-ms", type=float, default=None, help="지연 95백분위(ms)")
+    parser.add_argument("--rate-limit-rate", type=float, default=None, help="429 응답 비율(0~1)")
+    parser.add_argument("--timeout-rate", type=float, default=None, help="응답 없이 붙잡는 비율(0~1)")
+    parser.add_argument("--malformed-rate", type=float, default=None, help="잘린 JSON 응답 비율(0~1)")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    config = build_fake_llm_config(get_settings())
+    overrides = {
+        "latency_p50_ms": args.p50_ms,
+        "latency_p95_ms": args.p95_ms,
+        "rate_limit_rate": args.rate_limit_rate,
+        "timeout_rate": args.timeout_rate,
+        "malformed_rate": args.malformed_rate,
+        "seed": args.seed,
+    }
+    config = replace(config, **{key: value for key, value in overrides.items() if value is not None})
+    server = FakeLLMServer(config, host=args.host, port=args.port)
+    print(f"fake llm listening on {server.base_url} (openai: {server.base_url}/v1)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
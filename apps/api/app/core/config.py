@@ -11,10 +11,141 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     cors_origins: list[str] = ["http://localhost:3000"]
-    ai_provider: Literal["gemini", "openai"] = "gemini"
+    ai_provider: Literal["gemini", "openai", "fake"] = "gemini"
     ai_request_timeout_sec: int = 30
-    ai_max_concurrency: int = 4
+    # 적응형 동시성 한도의 상한
+    ai_max_concurrency: int = 16
     ai_backpressure_acquire_timeout_ms: int = 200
+    # 적응형 동시성 한도(AIMD): 지연이 안정적이고 429가 없으면 한도를 올리고, 429/타임아웃이면 backoff_ratio만큼 줄인다
+    ai_adaptive_concurrency_enabled: bool = True
+    ai_concurrency_initial_limit: int = 4
+    ai_concurrency_min_limit: int = 1
+    ai_concurrency_backoff_ratio: float = 0.5
+    ai_concurrency_latency_tolerance: float = 2.0
+    # 슬롯 대기열: 우선순위 클래스(chat > sections > generation > batch)별 가중 공정 배분 가중치와 대기 기한(ms)
+    # 기한이 없는 클래스는 ai_backpressure_acquire_timeout_ms를 쓴다
+    ai_priority_weights: dict[str, float] = {"chat": 8.0, "sections": 4.0, "generation": 2.0, "batch": 1.0}
+    ai_queue_deadlines_ms: dict[str, int] = {"chat": 2000, "sections": 5000, "generation": 10000, "batch": 30000}
+    # 학습자/테넌트별 LLM 토큰 버킷(분당 충전량/최대 적립량, 0이면 해당 범위 미적용). 식별 헤더가 없는 요청은 차감하지 않는다
+    ai_quota_enabled: bool = True
+    ai_quota_user_header: str = "x-user-id"
+    ai_quota_tenant_header: str = "x-tenant-id"
+    ai_quota_user_tokens_per_min: int = 30000
+    ai_quota_user_burst_tokens: int = 60000
+    ai_quota_tenant_tokens_per_min: int = 300000
+    ai_quota_tenant_burst_tokens: int = 600000
+    # 호출 전 차감할 출력 토큰 추정치(호출 뒤 실제 usage로 정산)
+    ai_quota_output_token_estimate: int = 1024
+    # 비우면 프로세스 메모리, 경로를 주면 워커끼리 공유하는 SQLite 파일
+    ai_quota_shared_path: str = ""
+    # 요청 마감(ms): x-request-deadline 헤더(남은 ms 또는 epoch ms)와 경로별 기본값 중 이른 쪽. 대기열/재시도/공급자 읽기를 모두 이 안에서 끝낸다
+    # 경로에 없으면 ai_request_deadline_ms를 쓰고, 0이면 마감 없이 동작한다
+    ai_request_deadline_header: str = "x-request-deadline"
+    ai_request_deadline_ms: int = 65000
+    # 레슨은 추론과 섹션 두 단계를 한 요청에서 끝내므로 단일 생성 기본값의 두 배 가까이 준다(웹 FASTAPI_LESSON_TIMEOUT_MS와 맞춘다)
+    ai_route_deadlines_ms: dict[str, int] = {"/api/chat": 30000, "/api/curriculum/lesson": 120000}
+    # 파이프라인 재시도 정책: rate_limited/timeout은 decorrelated jitter 백오프(기본~상한 ms) 후 재시도하고,
+    # 공급자 Retry-After/x-ratelimit-reset-*가 상한보다 길면 요청 안에서 기다리지 않고 클라이언트에 넘긴다
+    ai_retry_base_delay_ms: int = 200
+    ai_retry_max_delay_ms: int = 4000
+    ai_retry_max_retry_after_ms: int = 10000
+    # 파이프라인별 덮어쓰기(예: {"content_generate": {"max_delay_ms": 2000, "max_attempts": 1, "rejected_repairs": ["truncated"]}}).
+    # 재시도 루프를 타는 파이프라인(curriculum_generate/curriculum_sections/content_generate/assessment_questions)에만 적용된다.
+    # 한 번만 부르는 chat_generate/curriculum_reasoning/curriculum_refine/assessment_analyze는 수선한 응답을 항상 받아들인다
+    ai_retry_policies: dict[str, dict[str, float | list[str]]] = {}
+    # 모델 출력 JSON 수선 중 받아들이지 않고 다시 생성할 종류(surrounding_text/trailing_comma/control_char/truncated)
+    ai_json_repair_rejected: list[str] = []
+    # 프로세스 재시도 예산: 파이프라인 실행마다 ratio만큼 적립하고 재시도마다 1을 쓴다(초당 min_per_sec은 항상 허용)
+    ai_retry_budget_ratio: float = 0.2
+    ai_retry_budget_min_per_sec: float = 1.0
+    # 품질 실패가 잦은 파이프라인(섹션/콘텐츠 생성)은 첫 시도를 후보 여러 개로 동시에 보내 먼저 통과한 것을 쓴다.
+    # 후보 수는 최근 첫 시도 통과율로 정하며 이 값이 상한이다(1이면 끈다. 파이프라인별로는 AI_RETRY_POLICIES의 speculative_candidates)
+    ai_speculative_candidates: int = 1
+    ai_speculative_target_pass_rate: float = 0.9
+    # 품질게이트 실패가 몇 개 항목(check/quiz/토픽)에 국한되면 그 항목만 다시 생성해 끼워 넣는다. 이보다 많으면 문서 전체를 다시 생성(0이면 끔)
+    ai_item_repair_max_items: int = 3
+    # 파이프라인 응답 스키마를 OpenAI json_schema(strict)/Gemini responseSchema로 보낸다(끄면 json_object만 요청)
+    ai_structured_outputs: bool = True
+    # 파이프라인별 출력 토큰 상한(OpenAI max_completion_tokens / Gemini maxOutputTokens). 없는 파이프라인은 상한 없음
+    ai_max_output_tokens: dict[str, int] = {
+        "chat_generate": 1200,
+        "content_generate": 5000,
+        "assessment_questions": 2500,
+        "assessment_analyze": 1200,
+        "curriculum_generate": 3500,
+        "curriculum_refine": 3500,
+        "curriculum_reasoning": 1500,
+        "curriculum_sections": 6000,
+    }
+    # 파이프라인별 입력 토큰 예산(로컬 추정 기준). 넘으면 이력/피드백/토픽 설명부터 줄인다. 없는 파이프라인은 줄이지 않음
+    ai_input_token_budgets: dict[str, int] = {
+        "chat_generate": 2500,
+        "curriculum_refine": 3000,
+        "curriculum_reasoning": 1800,
+        "curriculum_sections": 2200,
+    }
+    # 공급자 HTTP keep-alive 연결 풀 (호스트별 유휴 연결 수 / 유휴 만료 / 기동 시 예열 수)
+    ai_http_pool_max_per_host: int = 8
+    ai_http_pool_idle_timeout_sec: float = 60.0
+    ai_http_prewarm_connections: int = 2
+    # 구조화 생성 응답을 스트리밍으로 받아 sections/quiz/topics 항목을 도착 즉시 정규화
+    ai_stream_structured_output: bool = True
+    # 헤지 요청: 파이프라인별 최근 지연 분포의 백분위를 넘기면 같은 요청을 한 번 더 보낸다(기본 꺼짐)
+    ai_hedge_enabled: bool = False
+    ai_hedge_percentile: float = 0.95
+    ai_hedge_min_samples: int = 20
+    ai_hedge_window: int = 200
+    # 다중 공급자 라우팅: "gemini" | "openai" | "openai@<base_url>" | "fake" 목록(비우면 AI_PROVIDER 하나만 사용)
+    ai_router_targets: list[str] = []
+    ai_router_ewma_alpha: float = 0.2
+    ai_router_max_error_rate: float = 0.5
+    # 동시성 한도가 찼을 때 넘길 보조 모델(AI_PROVIDER와 같은 공급자, 비우면 ai_backpressure_busy 반환)
+    ai_spillover_model: str = ""
+    ai_spillover_max_concurrency: int = 2
+    # 같은 (공급자, 모델, 시스템/사용자 프롬프트)로 동시에 들어온 호출을 업스트림 요청 하나로 합친다
+    ai_single_flight_enabled: bool = True
+    # 응답 캐시: 품질게이트를 통과한 응답을 (공급자, 모델, 프롬프트 버전, 프롬프트) 키로 재사용(TTL 0/미지정 파이프라인은 캐시 안 함)
+    ai_response_cache_enabled: bool = True
+    ai_response_cache_max_bytes: int = 32 * 1024 * 1024
+    ai_response_cache_ttls: dict[str, int] = {
+        "assessment_questions": 86400,
+        "content_generate": 86400,
+        "curriculum_generate": 21600,
+        "curriculum_sections": 21600,
+    }
+    # 프롬프트/정규화 규칙을 바꾸면 올려서 이전 캐시를 무효화한다
+    ai_response_cache_prompt_version: str = "v1"
+    # SQLite 디스크 계층 경로(비우면 메모리만). 같은 파일을 uvicorn 워커끼리 공유하고 재시작 뒤에도 유지
+    ai_response_cache_path: str = ""
+    ai_response_cache_disk_max_bytes: int = 256 * 1024 * 1024
+    # 매니저 채팅 유사 질문 캐시: 같은 페르소나/컨텍스트에서 마지막 질문 토큰의 자카드 유사도가 임계값 이상이면 이전 답을 재사용
+    ai_chat_similarity_cache_enabled: bool = True
+    ai_chat_similarity_threshold: float = 0.8
+    ai_chat_similarity_ttl_sec: int = 600
+    ai_chat_similarity_max_entries: int = 2048
+    # 공급자별 회로 차단기: 최근 창의 실패율 또는 연속 타임아웃으로 열고, open_sec 뒤 프로브로 닫는다
+    ai_circuit_breaker_enabled: bool = True
+    ai_circuit_failure_rate: float = 0.5
+    ai_circuit_window: int = 20
+    ai_circuit_min_calls: int = 10
+    ai_circuit_consecutive_timeouts: int = 3
+    ai_circuit_open_sec: float = 30.0
+    ai_circuit_half_open_probes: int = 2
+    # Gemini 명시적 컨텍스트 캐시: 긴 시스템 프롬프트를 cachedContent 핸들로 만들어 재사용(기본 꺼짐, 짧은 프롬프트는 인라인)
+    ai_gemini_cache_enabled: bool = False
+    ai_gemini_cache_ttl_sec: int = 3600
+    ai_gemini_cache_min_chars: int = 4000
+    # 부하/지연 테스트용 가짜 공급자(AI_PROVIDER=fake): base_url이 비면 프로세스 안에서 로컬 서버를 띄운다
+    ai_fake_base_url: str = ""
+    ai_fake_wire: Literal["openai", "gemini"] = "openai"
+    ai_fake_latency_p50_ms: float = 400.0
+    ai_fake_latency_p95_ms: float = 1500.0
+    ai_fake_rate_limit_rate: float = 0.0
+    ai_fake_timeout_rate: float = 0.0
+    ai_fake_malformed_rate: float = 0.0
+    ai_fake_chars_per_token: float = 2.0
+    ai_fake_cached_input_ratio: float = 0.0
+    ai_fake_seed: int = 0
     assessment_analysis_mode: Literal["rule", "llm"] = "rule"
 
     # 키 이름 하위호환: GEMINI_API_KEY 또는 GOOGLE_GENERATIVE_AI_API_KEY 둘 다 허용
@@ -0,0 +1,52 @@
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# orjson이 설치돼 있으면 쓰고, 없으면 표준 라이브러리로 같은 결과(UTF-8, 공백 없는 구분자)를 낸다.
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes ``value`` as compact UTF-8 JSON bytes (non-ASCII kept as is)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # 64비트를 넘는 정수처럼 orjson이 거절하는 값만 표준 라이브러리로 넘긴다.
+            pass
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_str(value: Any) -> str:
+    return dumps(value).decode("utf-8")
+
+
+def loads(data: bytes | bytearray | str) -> Any:
+    if orjson is None:
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError as exc:
+        # 실패 분류가 메시지 문구("json"/"expecting value")를 보므로 표준 라이브러리 예외로 맞춘다.
+        raise json.JSONDecodeError(f"Invalid JSON ({exc.msg})", exc.doc, exc.pos) from None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by the codec. Routes that build it themselves skip FastAPI's re-encoding."""
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return dumps(content)
+        except TypeError:
+            # 모델/날짜처럼 JSON 기본형이 아닌 값이 섞였을 때만 FastAPI 인코더를 거친다.
+            return dumps(jsonable_encoder(content))
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from app.domain.ai.service import AIService
+from app.domain.ai.service import AIService, AsyncAIService
 
 
 def build_ai_service(*args: Any, **kwargs: Any):
@@ -11,4 +11,16 @@ def build_ai_service(*args: Any, **kwargs: Any):
     return _build_ai_service(*args, **kwargs)
 
 
-__all__ = ["AIService", "build_ai_service"]
+def build_async_ai_service(*args: Any, **kwargs: Any):
+    from app.domain.ai.factory import build_async_ai_service as _build_async_ai_service
+
+    return _build_async_ai_service(*args, **kwargs)
+
+
+def build_batch_client(*args: Any, **kwargs: Any):
+    from app.domain.ai.factory import build_batch_client as _build_batch_client
+
+    return _build_batch_client(*args, **kwargs)
+
+
+__all__ = ["AIService", "AsyncAIService", "build_ai_service", "build_async_ai_service", "build_batch_client"]
@@ -0,0 +1,91 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+import time
+from typing import Any
+
+
+@dataclass(frozen=True)
+class AICallContext:
+    """Per-request facts the AI service needs but the provider call signature does not carry."""
+
+    pipeline: str = "default"
+    # 대기열 우선순위 클래스를 파이프라인 기본값 대신 직접 지정할 때(예: 야간 일괄 작업은 "batch")
+    priority: str | None = None
+    # 토큰 쿼터를 차감할 학습자/테넌트(요청 헤더에서 채운다. 없으면 차감하지 않는다)
+    user_id: str | None = None
+    tenant_id: str | None = None
+    # 요청 전체의 마감 시각(time.monotonic 기준). 대기열/재시도/공급자 읽기가 모두 남은 시간 안에서 끝나야 한다
+    deadline: float | None = None
+    # 품질게이트를 통과해야 실행되는 응답 캐시 쓰기(게이트 밖이면 None이라 쓰지 않는다). 같은 키는 나중 쓰기가 앞 쓰기를 대신한다
+    cache_writes: dict[Any, Callable[[], None]] | None = None
+    # 추측 실행 후보마다 다른 샘플링 온도(None이면 공급자 기본값)
+    temperature: float | None = None
+
+
+_current_context: ContextVar[AICallContext] = ContextVar("ai_call_context", default=AICallContext())
+
+
+class DeadlineExceededError(RuntimeError):
+    """The request deadline passed before the AI call could finish."""
+
+    def __init__(self) -> None:
+        # "timeout" 토큰이 없어 차단기/AIMD가 공급자 지연으로 세지 않는다. classify_ai_failure는 timeout(504)으로 본다.
+        super().__init__("ai_deadline_exceeded")
+
+
+def current_ai_call_context() -> AICallContext:
+    return _current_context.get()
+
+
+def remaining_budget_sec() -> float | None:
+    deadline = _current_context.get().deadline
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    remaining = remaining_budget_sec()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError()
+
+
+def bounded_wait_sec(wait_sec: float) -> float:
+    """Caps a wait or timeout by the remaining request budget; raises once the deadline has passed."""
+    remaining = remaining_budget_sec()
+    if remaining is None:
+        return wait_sec
+    if remaining <= 0:
+        raise DeadlineExceededError()
+    return min(wait_sec, remaining)
+
+
+@contextmanager
+def ai_call_context(**overrides: Any) -> Iterator[AICallContext]:
+    # contextvars라 asyncio 태스크에는 자동 전파되고, 스레드로 넘길 때는 copy_context()로 넘긴다.
+    context = replace(_current_context.get(), **overrides)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
+
+
+def defer_until_quality_gate(write: Callable[[], None], *, key: Any = None) -> None:
+    writes = _current_context.get().cache_writes
+    if writes is not None:
+        key = object() if key is None else key
+        writes.pop(key, None)
+        writes[key] = write
+
+
+@contextmanager
+def ai_quality_gate() -> Iterator[None]:
+    """Runs the writes deferred inside the block only if the block exits without an exception."""
+    writes: dict[Any, Callable[[], None]] = {}
+    with ai_call_context(cache_writes=writes):
+        yield
+    for write in writes.values():
+        write()
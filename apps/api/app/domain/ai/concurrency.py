@@ -0,0 +1,319 @@
+import asyncio
+from collections import deque
+from collections.abc import Callable
+import math
+from threading import Condition, Lock
+import time
+from typing import Any
+
+from app.domain.ai.providers.common import is_rate_limited_error, is_timeout_error
+from app.domain.ai.scheduler import (
+    DEFAULT_PRIORITY,
+    PRIORITY_CLASSES,
+    ServiceTimeEstimator,
+    WeightedFairQueue,
+)
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    A successful call while the limit is at least half used adds ``1 / limit`` (about +1 per
+    round of calls). A 429 or timeout multiplies the limit by ``backoff_ratio``, at most once per
+    ``cooldown_sec`` so one burst of failures counts as one signal. A success slower than
+    ``latency_tolerance`` times its pipeline's baseline latency trims the limit slightly instead
+    of growing it. The limit stays within ``[min_limit, max_limit]``.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_backoff_ratio: float = 0.9,
+        cooldown_sec: float = 1.0,
+        baseline_alpha: float = 0.05,
+        min_baseline_samples: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = min(self.max_limit, max(1, int(min_limit)))
+        self.backoff_ratio = min(0.99, max(0.1, float(backoff_ratio)))
+        self.latency_tolerance = max(1.0, float(latency_tolerance))
+        self.latency_backoff_ratio = min(1.0, max(0.1, float(latency_backoff_ratio)))
+        self.cooldown_sec = max(0.0, float(cooldown_sec))
+        self.baseline_alpha = min(1.0, max(0.001, float(baseline_alpha)))
+        self.min_baseline_samples = max(1, int(min_baseline_samples))
+        self._clock = clock
+        self._limit = float(min(self.max_limit, max(self.min_limit, int(initial_limit))))
+        # 파이프라인마다 정상 지연이 크게 다르므로(채팅 vs 커리큘럼) 기준 지연을 따로 둔다.
+        self._baselines: dict[str, tuple[float, int]] = {}
+        self._last_backoff = -math.inf
+        self._counters = {"increases": 0, "decreases": 0, "drops": 0, "latency_backoffs": 0}
+        self._lock = Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_success(self, pipeline: str, latency_sec: float, in_flight: int) -> None:
+        latency = max(0.0, float(latency_sec))
+        with self._lock:
+            baseline, samples = self._baselines.get(pipeline, (latency, 0))
+            inflated = samples >= self.min_baseline_samples and latency > baseline * self.latency_tolerance
+            self._baselines[pipeline] = (baseline + self.baseline_alpha * (latency - baseline), samples + 1)
+            before = self.limit
+            if inflated:
+                self._limit = max(float(self.min_limit), self._limit * self.latency_backoff_ratio)
+                self._counters["latency_backoffs"] += 1
+            elif in_flight * 2 >= self._limit:
+                # 한도를 절반도 안 쓰는 동안에는 여유가 있는지 알 수 없으므로 올리지 않는다.
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            if self.limit > before:
+                self._counters["increases"] += 1
+            elif self.limit < before:
+                self._counters["decreases"] += 1
+
+    def on_drop(self) -> None:
+        now = self._clock()
+        with self._lock:
+            self._counters["drops"] += 1
+            if now - self._last_backoff < self.cooldown_sec:
+                return
+            self._last_backoff = now
+            before = self.limit
+            self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+            if self.limit < before:
+                self._counters["decreases"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                **self._counters,
+                "baseline_latency_ms": {
+                    pipeline: round(baseline * 1000, 2) for pipeline, (baseline, _samples) in self._baselines.items()
+                },
+            }
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """429s and timeouts are the signals that the provider is past its capacity."""
+    return is_rate_limited_error(exc) or is_timeout_error(exc)
+
+
+class _WaitStats:
+    def __init__(self, window: int = 256) -> None:
+        self._waits: deque[float] = deque(maxlen=max(1, int(window)))
+        self.abandoned = 0
+
+    def record(self, wait_sec: float) -> None:
+        self._waits.append(max(0.0, wait_sec))
+
+    def stats(self) -> dict[str, Any]:
+        ordered = sorted(self._waits)
+        if not ordered:
+            return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "abandoned": self.abandoned}
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            "abandoned": self.abandoned,
+        }
+
+
+class _ClassCounters:
+    def __init__(self) -> None:
+        self.served = 0
+        self.shed = 0
+
+
+class AdaptiveLimiter:
+    """Thread-based concurrency gate whose size follows an AIMDLimit.
+
+    Drop-in for the ``BoundedSemaphore`` the service used: ``acquire(blocking, timeout)`` and
+    ``release()``. Callers that have to wait queue by priority class and are let in by weighted
+    fair order. Call outcomes are fed back with ``record_success`` / ``record_failure``.
+    """
+
+    def __init__(self, limit: AIMDLimit, weights: dict[str, float] | None = None) -> None:
+        self.aimd = limit
+        self._cond = Condition()
+        self._in_flight = 0
+        self._queue: WeightedFairQueue[list[bool]] = WeightedFairQueue(weights)
+        self._classes = {name: _ClassCounters() for name in PRIORITY_CLASSES}
+        self._waits = _WaitStats()
+        self._service_time = ServiceTimeEstimator()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def available(self) -> int:
+        return max(0, self.aimd.limit - self._in_flight)
+
+    def acquire(
+        self,
+        blocking: bool = True,
+        timeout: float | None = None,
+        *,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> bool:
+        started = time.perf_counter()
+        with self._cond:
+            # 대기열이 있으면 빈 슬롯이 생겨도 새 호출이 앞지르지 않는다.
+            if not self._queue and self._in_flight < self.aimd.limit:
+                self._in_flight += 1
+            elif not blocking:
+                return False
+            else:
+                ticket = [False]
+                self._queue.push(priority, ticket)
+                if not self._cond.wait_for(lambda: ticket[0], timeout):
+                    self._queue.remove(priority, ticket)
+                    self._waits.abandoned += 1
+                    self._classes[priority].shed += 1
+                    return False
+            self._classes[priority].served += 1
+            self._waits.record(time.perf_counter() - started)
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._grant_locked()
+
+    def _grant_locked(self) -> None:
+        while self._queue and self._in_flight < self.aimd.limit:
+            self._queue.pop()[0] = True
+            self._in_flight += 1
+        self._cond.notify_all()
+
+    def retry_after_sec(self, priority: str = DEFAULT_PRIORITY) -> int:
+        with self._cond:
+            return self._service_time.retry_after(ahead=self._queue.ahead_of(priority), limit=self.aimd.limit)
+
+    def record_success(self, pipeline: str, latency_sec: float) -> None:
+        self.aimd.on_success(pipeline, latency_sec, self._in_flight)
+        with self._cond:
+            self._service_time.observe(latency_sec)
+            self._grant_locked()
+
+    def record_failure(self, exc: BaseException) -> None:
+        if is_overload_error(exc):
+            self.aimd.on_drop()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            live = {
+                "in_flight": self._in_flight,
+                "waiting": len(self._queue),
+                "queue_wait": self._waits.stats(),
+                **self._service_time.stats(),
+                "classes": _class_stats(self._queue, self._classes),
+            }
+        return {**self.aimd.stats(), **live}
+
+
+class AsyncAdaptiveLimiter:
+    """asyncio counterpart of AdaptiveLimiter; drop-in for ``asyncio.Semaphore``.
+
+    Waiters are served in weighted fair order across priority classes and FIFO within a class.
+    A waiter cancelled after it was handed a slot (e.g. by ``asyncio.wait_for`` timing out at
+    the same moment) gives the slot back.
+    """
+
+    def __init__(self, limit: AIMDLimit, weights: dict[str, float] | None = None) -> None:
+        self.aimd = limit
+        self._in_flight = 0
+        self._queue: WeightedFairQueue[asyncio.Future] = WeightedFairQueue(weights)
+        self._classes = {name: _ClassCounters() for name in PRIORITY_CLASSES}
+        self._waits = _WaitStats()
+        self._service_time = ServiceTimeEstimator()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def available(self) -> int:
+        return max(0, self.aimd.limit - self._in_flight)
+
+    def locked(self) -> bool:
+        return self._in_flight >= self.aimd.limit or any(not waiter.done() for waiter in self._queue)
+
+    async def acquire(self, *, priority: str = DEFAULT_PRIORITY) -> bool:
+        started = time.perf_counter()
+        if not self.locked():
+            self._in_flight += 1
+            self._classes[priority].served += 1
+            self._waits.record(0.0)
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.push(priority, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._queue.remove(priority, waiter)
+            self._waits.abandoned += 1
+            self._classes[priority].shed += 1
+            raise
+        self._classes[priority].served += 1
+        self._waits.record(time.perf_counter() - started)
+        return True
+
+    def release(self) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._queue and self._in_flight < self.aimd.limit:
+            waiter = self._queue.pop()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def retry_after_sec(self, priority: str = DEFAULT_PRIORITY) -> int:
+        return self._service_time.retry_after(ahead=self._queue.ahead_of(priority), limit=self.aimd.limit)
+
+    def record_success(self, pipeline: str, latency_sec: float) -> None:
+        self.aimd.on_success(pipeline, latency_sec, self._in_flight)
+        self._service_time.observe(latency_sec)
+        self._wake()
+
+    def record_failure(self, exc: BaseException) -> None:
+        if is_overload_error(exc):
+            self.aimd.on_drop()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.aimd.stats(),
+            "in_flight": self._in_flight,
+            "waiting": sum(1 for waiter in self._queue if not waiter.done()),
+            "queue_wait": self._waits.stats(),
+            **self._service_time.stats(),
+            "classes": _class_stats(self._queue, self._classes),
+        }
+
+
+def _class_stats(queue: WeightedFairQueue, counters: dict[str, _ClassCounters]) -> dict[str, Any]:
+    return {
+        name: {
+            "weight": queue.weights[name],
+            "queued": queue.depth(name),
+            "served": counters[name].served,
+            "shed": counters[name].shed,
+        }
+        for name in PRIORITY_CLASSES
+    }
@@ -1,7 +1,24 @@
 from app.core.config import Settings
-from app.domain.ai.providers.gemini import GeminiProvider
-from app.domain.ai.providers.openai import OpenAIProvider
-from app.domain.ai.service import AIService
+from app.domain.ai.concurrency import AIMDLimit
+from app.domain.ai.hedging import HedgePolicy
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport, get_shared_async_transport
+from app.domain.ai.providers.base import AsyncStructuredAIProvider, StructuredAIProvider
+from app.domain.ai.providers.batch import BatchClient, GeminiBatchClient, OpenAIBatchClient
+from app.domain.ai.providers.circuit_breaker import (
+    AsyncCircuitBreakerProvider,
+    CircuitBreakerConfig,
+    CircuitBreakerProvider,
+    get_circuit_breaker,
+)
+from app.domain.ai.providers.fake_llm import FakeLLMConfig, get_shared_fake_llm_server
+from app.domain.ai.providers.gemini import AsyncGeminiProvider, GeminiProvider
+from app.domain.ai.providers.gemini_cache import GeminiContextCache, get_shared_gemini_context_cache
+from app.domain.ai.providers.openai import AsyncOpenAIProvider, OpenAIProvider
+from app.domain.ai.providers.transport import PooledHTTPTransport, get_shared_transport
+from app.domain.ai.quota import BucketSpec, TokenQuota, get_shared_token_quota
+from app.domain.ai.response_cache import ResponseCache, get_shared_response_cache
+from app.domain.ai.router import AsyncProviderRouter, ProviderRouter
+from app.domain.ai.service import AIService, AsyncAIService
 
 
 def build_ai_service(settings: Settings) -> AIService:
@@ -10,23 +27,301 @@ def build_ai_service(settings: Settings) -> AIService:
         primary=primary,
         max_concurrency=settings.ai_max_concurrency,
         acquire_timeout_ms=settings.ai_backpressure_acquire_timeout_ms,
+        hedge_policy=_build_hedge_policy(settings),
+        spillover=_build_spillover_provider(settings),
+        spillover_max_concurrency=settings.ai_spillover_max_concurrency,
+        single_flight=settings.ai_single_flight_enabled,
+        response_cache=_build_response_cache(settings),
+        prompt_version=settings.ai_response_cache_prompt_version,
+        concurrency_limit=_build_concurrency_limit(settings),
+        priority_weights=settings.ai_priority_weights,
+        queue_deadlines_ms=settings.ai_queue_deadlines_ms,
+        quota=_build_token_quota(settings),
+        quota_output_tokens=settings.ai_quota_output_token_estimate,
     )
 
 
-def _build_primary_provider(settings: Settings) -> GeminiProvider | OpenAIProvider:
-    if settings.ai_provider == "gemini":
+def build_async_ai_service(settings: Settings) -> AsyncAIService:
+    primary = _build_async_primary_provider(settings)
+    return AsyncAIService(
+        primary=primary,
+        max_concurrency=settings.ai_max_concurrency,
+        acquire_timeout_ms=settings.ai_backpressure_acquire_timeout_ms,
+        hedge_policy=_build_hedge_policy(settings),
+        spillover=_build_async_spillover_provider(settings),
+        spillover_max_concurrency=settings.ai_spillover_max_concurrency,
+        single_flight=settings.ai_single_flight_enabled,
+        response_cache=_build_response_cache(settings),
+        prompt_version=settings.ai_response_cache_prompt_version,
+        concurrency_limit=_build_concurrency_limit(settings),
+        priority_weights=settings.ai_priority_weights,
+        queue_deadlines_ms=settings.ai_queue_deadlines_ms,
+        quota=_build_token_quota(settings),
+        quota_output_tokens=settings.ai_quota_output_token_estimate,
+    )
+
+
+def build_batch_client(settings: Settings, provider: str | None = None) -> BatchClient:
+    # 배치는 회로 차단기/라우터 없이 공급자 하나에 작업 단위로 맡긴다.
+    built = _build_provider(settings, provider or settings.ai_provider)
+    if isinstance(built, GeminiProvider):
+        return GeminiBatchClient(built)
+    return OpenAIBatchClient(built)
+
+
+def _router_target_specs(settings: Settings) -> list[str]:
+    specs = [str(item).strip() for item in settings.ai_router_targets if str(item).strip()]
+    return list(dict.fromkeys(specs)) or [settings.ai_provider]
+
+
+def _parse_target_spec(spec: str) -> tuple[str, str | None]:
+    # "openai@https://host/v1" 처럼 OpenAI 호환 엔드포인트를 base_url로 구분한다.
+    kind, _, base_url = spec.partition("@")
+    return kind.strip(), base_url.strip() or None
+
+
+def _build_primary_provider(settings: Settings) -> StructuredAIProvider:
+    specs = _router_target_specs(settings)
+    if len(specs) == 1:
+        return _with_circuit_breaker(settings, specs[0], _build_provider(settings, specs[0]))
+    return ProviderRouter(
+        {spec: _with_circuit_breaker(settings, spec, _build_provider(settings, spec)) for spec in specs},
+        ewma_alpha=settings.ai_router_ewma_alpha,
+        max_error_rate=settings.ai_router_max_error_rate,
+    )
+
+
+def _build_async_primary_provider(settings: Settings) -> AsyncStructuredAIProvider:
+    specs = _router_target_specs(settings)
+    if len(specs) == 1:
+        return _with_async_circuit_breaker(settings, specs[0], _build_async_provider(settings, specs[0]))
+    return AsyncProviderRouter(
+        {
+            spec: _with_async_circuit_breaker(settings, spec, _build_async_provider(settings, spec))
+            for spec in specs
+        },
+        ewma_alpha=settings.ai_router_ewma_alpha,
+        max_error_rate=settings.ai_router_max_error_rate,
+    )
+
+
+def _build_spillover_provider(settings: Settings) -> StructuredAIProvider | None:
+    if not settings.ai_spillover_model:
+        return None
+    provider = _build_provider(settings, settings.ai_provider, model=settings.ai_spillover_model)
+    return _with_circuit_breaker(settings, _spillover_breaker_name(settings), provider)
+
+
+def _build_async_spillover_provider(settings: Settings) -> AsyncStructuredAIProvider | None:
+    if not settings.ai_spillover_model:
+        return None
+    provider = _build_async_provider(settings, settings.ai_provider, model=settings.ai_spillover_model)
+    return _with_async_circuit_breaker(settings, _spillover_breaker_name(settings), provider)
+
+
+def _spillover_breaker_name(settings: Settings) -> str:
+    return f"{settings.ai_provider}#{settings.ai_spillover_model}"
+
+
+def _circuit_breaker_config(settings: Settings) -> CircuitBreakerConfig:
+    return CircuitBreakerConfig(
+        failure_rate_threshold=settings.ai_circuit_failure_rate,
+        window=settings.ai_circuit_window,
+        min_calls=settings.ai_circuit_min_calls,
+        consecutive_timeouts=settings.ai_circuit_consecutive_timeouts,
+        open_sec=settings.ai_circuit_open_sec,
+        half_open_probes=settings.ai_circuit_half_open_probes,
+    )
+
+
+def _with_circuit_breaker(settings: Settings, name: str, provider: StructuredAIProvider) -> StructuredAIProvider:
+    if not settings.ai_circuit_breaker_enabled:
+        return provider
+    return CircuitBreakerProvider(provider, get_circuit_breaker(name, _circuit_breaker_config(settings)))
+
+
+def _with_async_circuit_breaker(
+    settings: Settings,
+    name: str,
+    provider: AsyncStructuredAIProvider,
+) -> AsyncStructuredAIProvider:
+    if not settings.ai_circuit_breaker_enabled:
+        return provider
+    return AsyncCircuitBreakerProvider(provider, get_circuit_breaker(name, _circuit_breaker_config(settings)))
+
+
+def _build_provider(settings: Settings, spec: str, *, model: str | None = None) -> GeminiProvider | OpenAIProvider:
+    kind, base_url = _parse_target_spec(spec)
+    if kind == "gemini" and base_url is None:
         return GeminiProvider(
             api_key=settings.gemini_api_key,
-            model=settings.gemini_model,
+            model=model or settings.gemini_model,
             timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_transport(settings),
+            context_cache=_build_gemini_context_cache(settings),
         )
 
-    if settings.ai_provider == "openai":
+    if kind == "openai":
         return OpenAIProvider(
             api_key=settings.openai_api_key,
-            model=settings.openai_model,
-            base_url=settings.openai_base_url,
+            model=model or settings.openai_model,
+            base_url=base_url or settings.openai_base_url,
             timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_transport(settings),
         )
 
-    raise ValueError(f"unsupported_ai_provider:{settings.ai_provider}")
+    if kind == "fake":
+        fake_url = _fake_base_url(settings, base_url)
+        if settings.ai_fake_wire == "gemini":
+            return GeminiProvider(
+                api_key="fake",
+                model=model or "fake-gemini",
+                timeout_sec=settings.ai_request_timeout_sec,
+                transport=_build_transport(settings),
+                base_url=fake_url,
+            )
+        return OpenAIProvider(
+            api_key="fake",
+            model=model or "fake-openai",
+            base_url=f"{fake_url}/v1",
+            timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_transport(settings),
+        )
+
+    raise ValueError(f"unsupported_ai_provider:{spec}")
+
+
+def _build_async_provider(
+    settings: Settings,
+    spec: str,
+    *,
+    model: str | None = None,
+) -> AsyncGeminiProvider | AsyncOpenAIProvider:
+    kind, base_url = _parse_target_spec(spec)
+    if kind == "gemini" and base_url is None:
+        return AsyncGeminiProvider(
+            api_key=settings.gemini_api_key,
+            model=model or settings.gemini_model,
+            timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_async_transport(settings),
+            context_cache=_build_gemini_context_cache(settings),
+        )
+
+    if kind == "openai":
+        return AsyncOpenAIProvider(
+            api_key=settings.openai_api_key,
+            model=model or settings.openai_model,
+            base_url=base_url or settings.openai_base_url,
+            timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_async_transport(settings),
+        )
+
+    if kind == "fake":
+        fake_url = _fake_base_url(settings, base_url)
+        if settings.ai_fake_wire == "gemini":
+            return AsyncGeminiProvider(
+                api_key="fake",
+                model=model or "fake-gemini",
+                timeout_sec=settings.ai_request_timeout_sec,
+                transport=_build_async_transport(settings),
+                base_url=fake_url,
+            )
+        return AsyncOpenAIProvider(
+            api_key="fake",
+            model=model or "fake-openai",
+            base_url=f"{fake_url}/v1",
+            timeout_sec=settings.ai_request_timeout_sec,
+            transport=_build_async_transport(settings),
+        )
+
+    raise ValueError(f"unsupported_ai_provider:{spec}")
+
+
+def build_fake_llm_config(settings: Settings) -> FakeLLMConfig:
+    return FakeLLMConfig(
+        latency_p50_ms=settings.ai_fake_latency_p50_ms,
+        latency_p95_ms=settings.ai_fake_latency_p95_ms,
+        rate_limit_rate=settings.ai_fake_rate_limit_rate,
+        timeout_rate=settings.ai_fake_timeout_rate,
+        malformed_rate=settings.ai_fake_malformed_rate,
+        hang_sec=settings.ai_request_timeout_sec + 5.0,
+        chars_per_token=settings.ai_fake_chars_per_token,
+        cached_input_ratio=settings.ai_fake_cached_input_ratio,
+        seed=settings.ai_fake_seed,
+    )
+
+
+def _fake_base_url(settings: Settings, base_url: str | None) -> str:
+    # "fake@http://host:port" > AI_FAKE_BASE_URL > 프로세스 안 로컬 서버 순으로 고른다.
+    explicit = base_url or settings.ai_fake_base_url
+    if explicit:
+        return explicit.rstrip("/")
+    return get_shared_fake_llm_server(build_fake_llm_config(settings)).base_url
+
+
+def _build_gemini_context_cache(settings: Settings) -> GeminiContextCache | None:
+    if not settings.ai_gemini_cache_enabled:
+        return None
+    return get_shared_gemini_context_cache(
+        ttl_sec=settings.ai_gemini_cache_ttl_sec,
+        min_chars=settings.ai_gemini_cache_min_chars,
+    )
+
+
+def _build_concurrency_limit(settings: Settings) -> AIMDLimit:
+    ceiling = max(1, settings.ai_max_concurrency)
+    if not settings.ai_adaptive_concurrency_enabled:
+        # 끄면 상한에 고정된 한도(이전의 고정 세마포어와 같은 동작)
+        return AIMDLimit(initial_limit=ceiling, min_limit=ceiling, max_limit=ceiling)
+    return AIMDLimit(
+        initial_limit=settings.ai_concurrency_initial_limit,
+        min_limit=settings.ai_concurrency_min_limit,
+        max_limit=ceiling,
+        backoff_ratio=settings.ai_concurrency_backoff_ratio,
+        latency_tolerance=settings.ai_concurrency_latency_tolerance,
+    )
+
+
+def _build_token_quota(settings: Settings) -> TokenQuota | None:
+    if not settings.ai_quota_enabled:
+        return None
+    user = BucketSpec.per_minute(settings.ai_quota_user_tokens_per_min, settings.ai_quota_user_burst_tokens)
+    tenant = BucketSpec.per_minute(settings.ai_quota_tenant_tokens_per_min, settings.ai_quota_tenant_burst_tokens)
+    if user is None and tenant is None:
+        return None
+    return get_shared_token_quota(user=user, tenant=tenant, path=settings.ai_quota_shared_path)
+
+
+def _build_response_cache(settings: Settings) -> ResponseCache | None:
+    if not settings.ai_response_cache_enabled:
+        return None
+    return get_shared_response_cache(
+        max_bytes=settings.ai_response_cache_max_bytes,
+        ttls=settings.ai_response_cache_ttls,
+        path=settings.ai_response_cache_path,
+        disk_max_bytes=settings.ai_response_cache_disk_max_bytes,
+    )
+
+
+def _build_hedge_policy(settings: Settings) -> HedgePolicy | None:
+    if not settings.ai_hedge_enabled:
+        return None
+    return HedgePolicy(
+        percentile=settings.ai_hedge_percentile,
+        min_samples=settings.ai_hedge_min_samples,
+        window=settings.ai_hedge_window,
+    )
+
+
+def _build_transport(settings: Settings) -> PooledHTTPTransport:
+    return get_shared_transport(
+        max_connections_per_host=settings.ai_http_pool_max_per_host,
+        idle_timeout_sec=settings.ai_http_pool_idle_timeout_sec,
+    )
+
+
+def _build_async_transport(settings: Settings) -> AsyncPooledHTTPTransport:
+    return get_shared_async_transport(
+        max_connections_per_host=settings.ai_http_pool_max_per_host,
+        idle_timeout_sec=settings.ai_http_pool_idle_timeout_sec,
+    )
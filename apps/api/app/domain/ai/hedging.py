@@ -0,0 +1,94 @@
+from collections import deque
+from dataclasses import dataclass
+import math
+from threading import Lock
+from typing import Any
+
+
+@dataclass
+class _PipelineHedgeStats:
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    extra_tokens: int = 0
+
+
+class HedgePolicy:
+    """Decides when to fire a duplicate provider call and keeps the numbers behind that decision.
+
+    Successful call latencies are kept per pipeline in a rolling window. Once a pipeline has
+    ``min_samples`` observations, a call still running after the ``percentile`` latency gets a
+    hedge. Below that sample count no hedge is sent.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay_ms: float = 50.0,
+    ) -> None:
+        self.percentile = min(0.999, max(0.5, float(percentile)))
+        self.min_samples = max(1, int(min_samples))
+        self.window = max(self.min_samples, int(window))
+        self.min_delay_sec = max(0.0, float(min_delay_ms) / 1000)
+        self._latencies: dict[str, deque[float]] = {}
+        self._stats: dict[str, _PipelineHedgeStats] = {}
+        self._lock = Lock()
+
+    def hedge_delay(self, pipeline: str) -> float | None:
+        with self._lock:
+            samples = self._latencies.get(pipeline)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        rank = max(0, math.ceil(self.percentile * len(ordered)) - 1)
+        return max(self.min_delay_sec, ordered[rank])
+
+    def observe_latency(self, pipeline: str, latency_sec: float) -> None:
+        with self._lock:
+            samples = self._latencies.setdefault(pipeline, deque(maxlen=self.window))
+            samples.append(max(0.0, float(latency_sec)))
+
+    def record_call(
+        self,
+        pipeline: str,
+        *,
+        hedged: bool,
+        hedge_won: bool = False,
+        extra_tokens: int | None = None,
+    ) -> tuple[float, float | None]:
+        """Counts one finished service call and returns the pipeline's (hedge_rate, win_rate)."""
+        with self._lock:
+            stats = self._stats.setdefault(pipeline, _PipelineHedgeStats())
+            stats.calls += 1
+            if hedged:
+                stats.hedged += 1
+                if hedge_won:
+                    stats.hedge_wins += 1
+                stats.extra_tokens += max(0, int(extra_tokens or 0))
+            return self._rates(stats)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot: dict[str, Any] = {}
+            for pipeline, stats in self._stats.items():
+                hedge_rate, win_rate = self._rates(stats)
+                samples = self._latencies.get(pipeline, ())
+                snapshot[pipeline] = {
+                    "calls": stats.calls,
+                    "hedged": stats.hedged,
+                    "hedge_wins": stats.hedge_wins,
+                    "extra_tokens": stats.extra_tokens,
+                    "hedge_rate": hedge_rate,
+                    "win_rate": win_rate,
+                    "latency_samples": len(samples),
+                }
+            return snapshot
+
+    @staticmethod
+    def _rates(stats: _PipelineHedgeStats) -> tuple[float, float | None]:
+        hedge_rate = round(stats.hedged / stats.calls, 4) if stats.calls else 0.0
+        win_rate = round(stats.hedge_wins / stats.hedged, 4) if stats.hedged else None
+        return hedge_rate, win_rate
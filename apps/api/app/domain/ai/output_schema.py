@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.domain.ai.call_context import current_ai_call_context
+
+
+@dataclass(frozen=True)
+class OutputSpec:
+    """What a pipeline's response must look like, sent with every provider call of that pipeline.
+
+    ``schema`` is a strict JSON Schema (every property required, no extra properties) used as the
+    OpenAI ``json_schema`` response format; ``gemini_schema`` is the same shape in Gemini's
+    ``responseSchema`` dialect. Either may be None when the pipeline only caps its output length.
+    """
+
+    name: str
+    schema: dict[str, Any] | None = None
+    gemini_schema: dict[str, Any] | None = None
+    max_output_tokens: int | None = None
+
+    @classmethod
+    def from_model(cls, name: str, model: type[BaseModel] | None, *, max_output_tokens: int | None = None) -> OutputSpec:
+        schema = strict_json_schema(model) if model is not None else None
+        return cls(
+            name=name,
+            schema=schema,
+            gemini_schema=gemini_response_schema(schema) if schema is not None else None,
+            max_output_tokens=max_output_tokens if max_output_tokens and max_output_tokens > 0 else None,
+        )
+
+
+def strict_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """JSON Schema of ``model`` with references inlined, in the subset strict structured outputs accept."""
+    raw = model.model_json_schema()
+    definitions = raw.get("$defs", {})
+
+    def convert(node: dict[str, Any]) -> dict[str, Any]:
+        if "$ref" in node:
+            return convert(definitions[node["$ref"].rsplit("/", 1)[-1]])
+        kind = node.get("type")
+        if kind == "object":
+            properties = {name: convert(value) for name, value in node.get("properties", {}).items()}
+            # strict 모드는 모든 속성을 required로 요구한다. 기본값이 있는 필드도 모델이 채워서 보낸다.
+            converted: dict[str, Any] = {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            }
+        elif kind == "array":
+            converted = {"type": "array", "items": convert(node.get("items", {}))}
+        elif kind in {"string", "integer", "number", "boolean"}:
+            converted = {"type": kind}
+            if "enum" in node:
+                converted["enum"] = list(node["enum"])
+        else:
+            raise ValueError(f"output_schema_unsupported:{model.__name__}:{kind or sorted(node)}")
+        if node.get("description"):
+            converted["description"] = node["description"]
+        return converted
+
+    return convert(raw)
+
+
+def gemini_response_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    # Gemini Schema는 OpenAPI 부분집합이라 additionalProperties가 없고, 속성 순서는 propertyOrdering으로 고정한다.
+    converted: dict[str, Any] = {"type": schema["type"].upper()}
+    if "enum" in schema:
+        converted["enum"] = list(schema["enum"])
+    if "description" in schema:
+        converted["description"] = schema["description"]
+    if schema["type"] == "object":
+        converted["properties"] = {name: gemini_response_schema(value) for name, value in schema["properties"].items()}
+        converted["required"] = list(schema.get("required", ()))
+        converted["propertyOrdering"] = list(schema["properties"])
+    elif schema["type"] == "array":
+        converted["items"] = gemini_response_schema(schema["items"])
+    return converted
+
+
+_output_specs: dict[str, OutputSpec] = {}
+
+
+def configure_output_specs(specs: dict[str, OutputSpec]) -> None:
+    global _output_specs
+    _output_specs = dict(specs)
+
+
+def output_spec_for(pipeline: str | None) -> OutputSpec | None:
+    return _output_specs.get(pipeline or "")
+
+
+def current_output_spec() -> OutputSpec | None:
+    return output_spec_for(current_ai_call_context().pipeline)
+
+
+def output_spec_stats() -> dict[str, Any]:
+    return {
+        pipeline: {
+            "schema": spec.name if spec.schema is not None else None,
+            "max_output_tokens": spec.max_output_tokens,
+        }
+        for pipeline, spec in sorted(_output_specs.items())
+    }
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+from app.domain.ai.providers.base import AIUsageMeta
+
+
+@dataclass
+class _PipelineCacheStats:
+    calls: int = 0
+    hit_calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+
+
+class PromptCacheStats:
+    """Per-pipeline prompt-prefix cache hit ratio, fed from ``usage.cached_input_tokens``.
+
+    ``token_hit_ratio`` is cached / total input tokens; ``call_hit_ratio`` is the share of
+    calls that read anything from the cache. Calls without usage numbers are not counted.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str, _PipelineCacheStats] = {}
+        self._lock = Lock()
+
+    def record(self, pipeline: str, usage: AIUsageMeta | None) -> None:
+        if usage is None or usage.input_tokens is None:
+            return
+        cached = max(0, int(usage.cached_input_tokens or 0))
+        with self._lock:
+            stats = self._stats.setdefault(pipeline, _PipelineCacheStats())
+            stats.calls += 1
+            stats.input_tokens += max(0, int(usage.input_tokens))
+            stats.cached_input_tokens += cached
+            if cached > 0:
+                stats.hit_calls += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                pipeline: {
+                    "calls": stats.calls,
+                    "hit_calls": stats.hit_calls,
+                    "input_tokens": stats.input_tokens,
+                    "cached_input_tokens": stats.cached_input_tokens,
+                    "token_hit_ratio": (
+                        round(stats.cached_input_tokens / stats.input_tokens, 4) if stats.input_tokens else 0.0
+                    ),
+                    "call_hit_ratio": round(stats.hit_calls / stats.calls, 4) if stats.calls else 0.0,
+                }
+                for pipeline, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# 채팅 라우트와 생성 서비스가 각자 서비스를 만들어도 적중률은 프로세스 하나로 모은다.
+_shared_stats = PromptCacheStats()
+
+
+def record_prompt_cache_usage(pipeline: str, usage: AIUsageMeta | None) -> None:
+    _shared_stats.record(pipeline, usage)
+
+
+def prompt_cache_stats() -> dict[str, Any]:
+    return _shared_stats.stats()
+
+
+def reset_prompt_cache_stats() -> None:
+    _shared_stats.reset()
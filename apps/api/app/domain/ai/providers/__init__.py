@@ -1,6 +1,6 @@
 """AI providers."""
 
-from app.domain.ai.providers.gemini import GeminiProvider
-from app.domain.ai.providers.openai import OpenAIProvider
+from app.domain.ai.providers.gemini import AsyncGeminiProvider, GeminiProvider
+from app.domain.ai.providers.openai import AsyncOpenAIProvider, OpenAIProvider
 
-__all__ = ["GeminiProvider", "OpenAIProvider"]
+__all__ = ["AsyncGeminiProvider", "AsyncOpenAIProvider", "GeminiProvider", "OpenAIProvider"]
@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import ssl
+from threading import Lock
+import time
+from typing import Any
+
+from app.domain.ai.providers.base import AITransportTiming
+from app.domain.ai.providers.transport import TransportHTTPError, TransportResponse, parse_transport_url
+
+
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+class _StaleConnectionError(ConnectionError):
+    pass
+
+
+def _read_timeout(timeout: float, deadline: float | None) -> float:
+    # 읽기마다의 timeout을 요청 전체 마감 시각(time.monotonic)으로 한 번 더 자른다.
+    if deadline is None:
+        return timeout
+    return max(0.0, min(timeout, deadline - time.monotonic()))
+
+
+@dataclass
+class _AsyncConnection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncStreamingResponse:
+    """Response whose body is read lazily. The connection returns to the pool once fully consumed."""
+
+    def __init__(
+        self,
+        *,
+        transport: AsyncPooledHTTPTransport,
+        key: tuple[str, str, int],
+        conn: _AsyncConnection,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        will_close: bool,
+        reused: bool,
+        started: float,
+        connected: float,
+        first_byte: float,
+        timeout: float,
+        deadline: float | None = None,
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._transport = transport
+        self._key = key
+        self._conn = conn
+        self._will_close = will_close
+        self._reused = reused
+        self._started = started
+        self._connected = connected
+        self._first_byte = first_byte
+        self._finished: float | None = None
+        self._timeout = timeout
+        self._deadline = deadline
+        self._consumed = False
+        self._closed = False
+
+    @property
+    def timing(self) -> AITransportTiming:
+        return AITransportTiming(
+            connect_ms=round((self._connected - self._started) * 1000, 2),
+            ttfb_ms=round((self._first_byte - self._connected) * 1000, 2),
+            read_ms=(
+                round((self._finished - self._first_byte) * 1000, 2)
+                if self._finished is not None
+                else None
+            ),
+            connection_reused=self._reused,
+        )
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        async for chunk in self._transport._iter_body(self._conn, self.headers, self._timeout, self._deadline):
+            yield chunk
+        self._consumed = True
+        self._finished = time.perf_counter()
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        buffer = b""
+        async for chunk in self.aiter_bytes():
+            buffer += chunk
+            while True:
+                newline = buffer.find(b"\n")
+                if newline < 0:
+                    break
+                line, buffer = buffer[:newline], buffer[newline + 1:]
+                yield line.rstrip(b"\r").decode("utf-8")
+        if buffer:
+            yield buffer.rstrip(b"\r").decode("utf-8")
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.aiter_bytes()])
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._consumed and not self._will_close:
+            self._conn.last_used = time.monotonic()
+            self._transport._checkin(self._key, self._conn)
+        else:
+            self._conn.close()
+
+
+class AsyncPooledHTTPTransport:
+    """asyncio counterpart of PooledHTTPTransport with the same pool semantics.
+
+    Pools are bound to the running event loop; if the loop changes (for example across
+    ``asyncio.run`` calls in tests) the previous loop's idle connections are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections_per_host: int = 8,
+        idle_timeout_sec: float = 60.0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.max_connections_per_host = max(1, int(max_connections_per_host))
+        self.idle_timeout_sec = max(0.0, float(idle_timeout_sec))
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._pools: dict[tuple[str, str, int], deque[_AsyncConnection]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._created = 0
+        self._reused = 0
+        self._evicted = 0
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = 30.0,
+    ) -> TransportResponse:
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.stream(method, url, body=body, headers=headers, timeout=timeout) as response:
+                    payload = await response.read()
+        except TimeoutError:
+            raise TimeoutError("request timed out") from None
+        return TransportResponse(
+            status=response.status,
+            reason=response.reason,
+            headers=response.headers,
+            body=payload,
+            timing=response.timing,
+        )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = 30.0,
+        deadline: float | None = None,
+    ) -> AsyncIterator[AsyncStreamingResponse]:
+        """``timeout`` bounds each read; ``deadline`` (time.monotonic) bounds the whole exchange."""
+        scheme, host, port, path = parse_transport_url(url)
+        key = (scheme, host, port)
+        default_port = 443 if scheme == "https" else 80
+        host_header = host if port == default_port else f"{host}:{port}"
+        head = self._encode_head(method, host_header, path, headers or {}, body)
+
+        conn = self._checkout(key)
+        try:
+            response = await self._open(key, conn, head, body, timeout, deadline)
+        except _StaleConnectionError:
+            # 풀에서 꺼낸 연결이 끊겨 있었던 경우에만 새 연결로 한 번 더 보낸다.
+            response = await self._open(key, None, head, body, timeout, deadline)
+
+        try:
+            if response.status >= 400:
+                payload = await response.read()
+                raise TransportHTTPError(
+                    status=response.status,
+                    reason=response.reason,
+                    headers=response.headers,
+                    body=payload,
+                    timing=response.timing,
+                )
+            yield response
+        finally:
+            response.close()
+
+    async def prewarm(self, url: str, *, connections: int = 1, timeout: float = 10.0) -> int:
+        scheme, host, port, _ = parse_transport_url(url)
+        key = (scheme, host, port)
+        self._bind_loop()
+        room = self.max_connections_per_host - len(self._pools.get(key, ()))
+        count = max(0, min(int(connections), room))
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._connect(key), timeout) for _ in range(count)),
+            return_exceptions=True,
+        )
+        opened = 0
+        for result in results:
+            if isinstance(result, _AsyncConnection):
+                self._checkin(key, result)
+                opened += 1
+        return opened
+
+    def close(self) -> None:
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        idle = {f"{scheme}://{host}:{port}": len(pool) for (scheme, host, port), pool in self._pools.items()}
+        return {
+            "idle_connections": idle,
+            "created": self._created,
+            "reused": self._reused,
+            "evicted": self._evicted,
+        }
+
+    async def _open(
+        self,
+        key: tuple[str, str, int],
+        conn: _AsyncConnection | None,
+        head: bytes,
+        body: bytes | None,
+        timeout: float,
+        deadline: float | None = None,
+    ) -> AsyncStreamingResponse:
+        started = time.perf_counter()
+        reused = conn is not None
+        connected = started
+        if conn is None:
+            try:
+                conn = await asyncio.wait_for(self._connect(key), _read_timeout(timeout, deadline))
+            except TimeoutError:
+                raise TimeoutError("connect timed out") from None
+            connected = time.perf_counter()
+
+        try:
+            conn.writer.write(head)
+            if body:
+                conn.writer.write(body)
+            await asyncio.wait_for(conn.writer.drain(), _read_timeout(timeout, deadline))
+            status, reason, response_headers, will_close = await asyncio.wait_for(
+                self._read_head(conn.reader),
+                _read_timeout(timeout, deadline),
+            )
+        except TimeoutError:
+            conn.close()
+            raise TimeoutError("read operation timed out") from None
+        except (_StaleConnectionError, ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            conn.close()
+            if reused:
+                raise _StaleConnectionError("pooled connection closed") from None
+            raise ConnectionResetError("connection closed before response") from None
+        except BaseException:
+            conn.close()
+            raise
+
+        return AsyncStreamingResponse(
+            transport=self,
+            key=key,
+            conn=conn,
+            status=status,
+            reason=reason,
+            headers=response_headers,
+            will_close=will_close,
+            reused=reused,
+            started=started,
+            connected=connected,
+            first_byte=time.perf_counter(),
+            timeout=timeout,
+            deadline=deadline,
+        )
+
+    async def _connect(self, key: tuple[str, str, int]) -> _AsyncConnection:
+        scheme, host, port = key
+        self._created += 1
+        if scheme == "https":
+            reader, writer = await asyncio.open_connection(
+                host,
+                port,
+                ssl=self._ssl_context,
+                server_hostname=host,
+            )
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _AsyncConnection(reader=reader, writer=writer)
+
+    @staticmethod
+    def _encode_head(
+        method: str,
+        host_header: str,
+        path: str,
+        headers: dict[str, str],
+        body: bytes | None,
+    ) -> bytes:
+        merged = {
+            "Host": host_header,
+            "Connection": "keep-alive",
+            "Accept-Encoding": "identity",
+            **headers,
+        }
+        if body is not None:
+            merged["Content-Length"] = str(len(body))
+        lines = [f"{method} {path} HTTP/1.1", *(f"{name}: {value}" for name, value in merged.items())]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> tuple[int, str, dict[str, str], bool]:
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise _StaleConnectionError("empty status line")
+            parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+                raise ConnectionResetError(f"bad status line:{status_line[:40]!r}")
+            version = parts[0]
+            try:
+                status = int(parts[1])
+            except ValueError:
+                raise ConnectionResetError(f"bad status line:{status_line[:40]!r}") from None
+            reason = parts[2] if len(parts) > 2 else ""
+
+            headers: dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in {b"\r\n", b"\n", b""}:
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                name = name.strip().lower()
+                value = value.strip()
+                headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+            if status != 100:
+                break
+
+        connection = headers.get("connection", "").lower()
+        has_length = "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower()
+        will_close = (
+            connection == "close"
+            or (version == "HTTP/1.0" and connection != "keep-alive")
+            or not has_length
+        )
+        return status, reason, headers, will_close
+
+    async def _iter_body(
+        self,
+        conn: _AsyncConnection,
+        headers: dict[str, str],
+        timeout: float,
+        deadline: float | None = None,
+    ) -> AsyncIterator[bytes]:
+        reader = conn.reader
+
+        def budget() -> float:
+            return _read_timeout(timeout, deadline)
+
+        try:
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                while True:
+                    size_line = await asyncio.wait_for(reader.readline(), budget())
+                    size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                    if size == 0:
+                        while (await asyncio.wait_for(reader.readline(), budget())) not in {b"\r\n", b"\n", b""}:
+                            pass
+                        return
+                    chunk = await asyncio.wait_for(reader.readexactly(size), budget())
+                    await asyncio.wait_for(reader.readexactly(2), budget())
+                    yield chunk
+            elif "content-length" in headers:
+                remaining = int(headers["content-length"])
+                while remaining > 0:
+                    chunk = await asyncio.wait_for(reader.read(min(_READ_CHUNK_BYTES, remaining)), budget())
+                    if not chunk:
+                        raise ConnectionResetError("connection closed mid-body")
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                while True:
+                    chunk = await asyncio.wait_for(reader.read(_READ_CHUNK_BYTES), budget())
+                    if not chunk:
+                        return
+                    yield chunk
+        except TimeoutError:
+            conn.close()
+            raise TimeoutError("read operation timed out") from None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._pools.clear()
+            self._loop = loop
+
+    def _checkout(self, key: tuple[str, str, int]) -> _AsyncConnection | None:
+        self._bind_loop()
+        now = time.monotonic()
+        pool = self._pools.get(key)
+        found: _AsyncConnection | None = None
+        while pool:
+            candidate = pool.pop()
+            if now - candidate.last_used > self.idle_timeout_sec or not candidate.is_usable():
+                candidate.close()
+                self._evicted += 1
+                continue
+            found = candidate
+            self._reused += 1
+            break
+        while pool and now - pool[0].last_used > self.idle_timeout_sec:
+            pool.popleft().close()
+            self._evicted += 1
+        return found
+
+    def _checkin(self, key: tuple[str, str, int], conn: _AsyncConnection) -> None:
+        pool = self._pools.setdefault(key, deque())
+        if len(pool) < self.max_connections_per_host and conn.is_usable():
+            pool.append(conn)
+            return
+        conn.close()
+
+
+_shared_async_transports: dict[tuple[int, float], AsyncPooledHTTPTransport] = {}
+_shared_async_transports_lock = Lock()
+
+
+def get_shared_async_transport(
+    *,
+    max_connections_per_host: int = 8,
+    idle_timeout_sec: float = 60.0,
+) -> AsyncPooledHTTPTransport:
+    key = (max(1, int(max_connections_per_host)), max(0.0, float(idle_timeout_sec)))
+    with _shared_async_transports_lock:
+        transport = _shared_async_transports.get(key)
+        if transport is None:
+            transport = AsyncPooledHTTPTransport(
+                max_connections_per_host=key[0],
+                idle_timeout_sec=key[1],
+            )
+            _shared_async_transports[key] = transport
+        return transport
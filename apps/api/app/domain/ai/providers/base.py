@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any, Protocol
 
@@ -10,11 +11,55 @@ class AIUsageMeta:
     cached_input_tokens: int | None = None
 
 
+@dataclass(frozen=True)
+class AITransportTiming:
+    connect_ms: float | None = None
+    ttfb_ms: float | None = None
+    read_ms: float | None = None
+    connection_reused: bool = False
+
+
+@dataclass(frozen=True)
+class AIHedgeMeta:
+    hedged: bool = False
+    winner: str = "primary"
+    delay_ms: float | None = None
+    extra_tokens: int | None = None
+    hedge_rate: float | None = None
+    win_rate: float | None = None
+
+
+@dataclass(frozen=True)
+class AIRouteMeta:
+    target: str
+    failovers: tuple[str, ...] = ()
+    spillover: bool = False
+
+
+@dataclass(frozen=True)
+class AISpeculationMeta:
+    # 첫 시도로 동시에 띄운 후보 수와 통과해 쓰인 후보 번호(1부터)
+    candidates: int
+    winner: int
+
+
 @dataclass(frozen=True)
 class AIResponseMeta:
     provider: str
     model: str
     usage: AIUsageMeta | None = None
+    timing: AITransportTiming | None = None
+    hedge: AIHedgeMeta | None = None
+    route: AIRouteMeta | None = None
+    # 같은 프롬프트의 진행 중 호출 결과를 나눠 받은 응답(공급자 호출 없음)
+    coalesced: bool = False
+    # 응답 캐시에서 꺼낸 응답(공급자 호출 없음, usage는 0)
+    cache_hit: bool = False
+    # 모델 출력을 JSON으로 읽으려고 적용한 수선(json_repair.JSON_REPAIR_KINDS). 비어 있으면 그대로 읽혔다
+    repairs: tuple[str, ...] = ()
+    # 호출 전에 로컬에서 추정한 입력 토큰(token_estimator). usage.input_tokens와 비교해 오차를 본다
+    estimated_input_tokens: int | None = None
+    speculation: AISpeculationMeta | None = None
 
 
 @dataclass(frozen=True)
@@ -23,12 +68,25 @@ class StructuredAIResponse:
     meta: AIResponseMeta
 
 
+@dataclass(frozen=True)
+class AIStreamChunk:
+    """Raw model text as it streams in. Only the final chunk carries ``meta``."""
+
+    text: str = ""
+    meta: AIResponseMeta | None = None
+
+
 class AIAttemptError(RuntimeError):
     def __init__(self, message: str, *, meta: AIResponseMeta | None = None) -> None:
         self.meta = meta
         super().__init__(message)
 
 
+def _sum_estimates(metas: list[AIResponseMeta]) -> int | None:
+    estimates = [item.estimated_input_tokens for item in metas if item.estimated_input_tokens is not None]
+    return sum(estimates) if estimates else None
+
+
 def merge_ai_response_metas(metas: list[AIResponseMeta]) -> AIResponseMeta | None:
     if not metas:
         return None
@@ -64,6 +122,14 @@ def merge_ai_response_metas(metas: list[AIResponseMeta]) -> AIResponseMeta | Non
         provider=latest.provider,
         model=latest.model,
         usage=usage,
+        timing=latest.timing,
+        hedge=latest.hedge,
+        route=latest.route,
+        coalesced=latest.coalesced,
+        cache_hit=latest.cache_hit,
+        repairs=latest.repairs,
+        estimated_input_tokens=_sum_estimates(metas),
+        speculation=latest.speculation,
     )
 
 
@@ -85,3 +151,35 @@ class StructuredAIProvider(Protocol):
         user_prompt: str,
     ) -> dict[str, Any]:
         ...
+
+
+class AsyncStructuredAIProvider(Protocol):
+    """Native asyncio variant of StructuredAIProvider for the async request path."""
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        ...
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        ...
+
+
+class AsyncStreamingAIProvider(AsyncStructuredAIProvider, Protocol):
+    """Async provider that can also stream the raw JSON text of a response."""
+
+    def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        ...
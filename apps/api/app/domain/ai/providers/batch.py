@@ -0,0 +1,319 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import json
+import time
+from typing import Any, Protocol
+from urllib import parse
+import uuid
+
+from app.domain.ai.output_schema import output_spec_for
+from app.domain.ai.providers.base import StructuredAIResponse
+from app.domain.ai.providers.gemini import GeminiProvider
+from app.domain.ai.providers.openai import OpenAIProvider
+
+
+BATCH_RUNNING = "running"
+BATCH_SUCCEEDED = "succeeded"
+BATCH_FAILED = "failed"
+
+_OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+_OPENAI_TERMINAL_STATES = {
+    "completed": BATCH_SUCCEEDED,
+    "failed": BATCH_FAILED,
+    "expired": BATCH_FAILED,
+    "cancelled": BATCH_FAILED,
+}
+_GEMINI_TERMINAL_STATES = {
+    "BATCH_STATE_SUCCEEDED": BATCH_SUCCEEDED,
+    "JOB_STATE_SUCCEEDED": BATCH_SUCCEEDED,
+    "BATCH_STATE_FAILED": BATCH_FAILED,
+    "BATCH_STATE_CANCELLED": BATCH_FAILED,
+    "BATCH_STATE_EXPIRED": BATCH_FAILED,
+    "JOB_STATE_FAILED": BATCH_FAILED,
+    "JOB_STATE_CANCELLED": BATCH_FAILED,
+    "JOB_STATE_EXPIRED": BATCH_FAILED,
+}
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    custom_id: str
+    system_prompt: str
+    user_prompt: str
+    # 응답 스키마/출력 토큰 상한을 고를 파이프라인(온라인 경로와 같은 OutputSpec을 쓴다)
+    pipeline: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    custom_id: str
+    response: StructuredAIResponse | None = None
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchStatus:
+    job_id: str
+    state: str
+    provider_state: str
+
+
+class BatchClient(Protocol):
+    def submit(self, requests: list[BatchRequest]) -> str:
+        ...
+
+    def status(self, job_id: str) -> BatchStatus:
+        ...
+
+    def results(self, job_id: str, requests: list[BatchRequest]) -> list[BatchResult]:
+        ...
+
+
+def _decode_json(body: bytes) -> dict[str, Any]:
+    decoded = json.loads(body.decode("utf-8"))
+    if not isinstance(decoded, dict):
+        raise RuntimeError("batch_response_not_object")
+    return decoded
+
+
+def _parse_item(parse_response: Callable[[dict[str, Any]], StructuredAIResponse], custom_id: str, body: Any) -> BatchResult:
+    if not isinstance(body, dict):
+        return BatchResult(custom_id=custom_id, error="batch_result_missing")
+    try:
+        return BatchResult(custom_id=custom_id, response=parse_response(body))
+    except Exception as exc:
+        return BatchResult(custom_id=custom_id, error=str(exc))
+
+
+def _in_request_order(requests: list[BatchRequest], found: dict[str, BatchResult]) -> list[BatchResult]:
+    return [
+        found.get(request.custom_id) or BatchResult(custom_id=request.custom_id, error="batch_result_missing")
+        for request in requests
+    ]
+
+
+class OpenAIBatchClient:
+    """OpenAI Batch API (``/files`` + ``/batches``) using the provider's payload and response format."""
+
+    def __init__(self, provider: OpenAIProvider, *, completion_window: str = "24h") -> None:
+        self.provider = provider
+        self.completion_window = completion_window
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": _OPENAI_BATCH_ENDPOINT,
+                    "body": self.provider._build_payload(
+                        system_prompt=request.system_prompt,
+                        user_prompt=request.user_prompt,
+                        output=output_spec_for(request.pipeline),
+                    ),
+                },
+                ensure_ascii=False,
+            )
+            for request in requests
+        ]
+        file_id = self._upload("\n".join(lines).encode("utf-8"))
+        created = self._request(
+            "POST",
+            "/batches",
+            {
+                "input_file_id": file_id,
+                "endpoint": _OPENAI_BATCH_ENDPOINT,
+                "completion_window": self.completion_window,
+            },
+        )
+        return str(created["id"])
+
+    def status(self, job_id: str) -> BatchStatus:
+        batch = self._request("GET", f"/batches/{parse.quote(job_id)}")
+        provider_state = str(batch.get("status") or "")
+        return BatchStatus(
+            job_id=job_id,
+            state=_OPENAI_TERMINAL_STATES.get(provider_state, BATCH_RUNNING),
+            provider_state=provider_state,
+        )
+
+    def results(self, job_id: str, requests: list[BatchRequest]) -> list[BatchResult]:
+        batch = self._request("GET", f"/batches/{parse.quote(job_id)}")
+        found: dict[str, BatchResult] = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            for line in self._file_content(str(file_id)).splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                custom_id = str(item.get("custom_id") or "")
+                response = item.get("response") if isinstance(item.get("response"), dict) else {}
+                error = item.get("error")
+                status_code = int(response.get("status_code") or 0)
+                if error or status_code >= 400:
+                    message = error.get("message") if isinstance(error, dict) else None
+                    found[custom_id] = BatchResult(
+                        custom_id=custom_id,
+                        error=f"openai_batch_item_failed:{status_code}:{message or 'unknown'}",
+                    )
+                    continue
+                found[custom_id] = _parse_item(self.provider._response_from_json, custom_id, response.get("body"))
+        return _in_request_order(requests, found)
+
+    def _upload(self, content: bytes) -> str:
+        boundary = f"aiplus-{uuid.uuid4().hex}"
+        body = b"".join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="purpose"\r\n\r\nbatch\r\n'.encode("utf-8"),
+            (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="batch.jsonl"\r\n'
+                "Content-Type: application/jsonl\r\n\r\n"
+            ).encode("utf-8"),
+            content,
+            f"\r\n--{boundary}--\r\n".encode("utf-8"),
+        ])
+        headers = {**self.provider._headers(), "Content-Type": f"multipart/form-data; boundary={boundary}"}
+        response = self.provider.transport.request(
+            "POST",
+            f"{self.provider.base_url}/files",
+            body=body,
+            headers=headers,
+            timeout=self.provider.timeout_sec,
+        )
+        return str(_decode_json(response.body)["id"])
+
+    def _file_content(self, file_id: str) -> str:
+        response = self.provider.transport.request(
+            "GET",
+            f"{self.provider.base_url}/files/{parse.quote(file_id)}/content",
+            headers=self.provider._headers(),
+            timeout=self.provider.timeout_sec,
+        )
+        return response.text()
+
+    def _request(self, method: str, path: str, payload: dict[str, Any] | None = None) -> dict[str, Any]:
+        response = self.provider.transport.request(
+            method,
+            f"{self.provider.base_url}{path}",
+            body=json.dumps(payload).encode("utf-8") if payload is not None else None,
+            headers=self.provider._headers(),
+            timeout=self.provider.timeout_sec,
+        )
+        return _decode_json(response.body)
+
+
+class GeminiBatchClient:
+    """Gemini batch mode (``models/*:batchGenerateContent``) with inlined requests and responses."""
+
+    def __init__(self, provider: GeminiProvider, *, display_name: str = "aiplus-batch") -> None:
+        self.provider = provider
+        self.display_name = display_name
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        payload = {
+            "batch": {
+                "display_name": self.display_name,
+                "input_config": {
+                    "requests": {
+                        "requests": [
+                            {
+                                "request": self.provider._build_payload(
+                                    system_prompt=request.system_prompt,
+                                    user_prompt=request.user_prompt,
+                                    output=output_spec_for(request.pipeline),
+                                ),
+                                "metadata": {"key": request.custom_id},
+                            }
+                            for request in requests
+                        ]
+                    }
+                },
+            }
+        }
+        created = self._request("POST", self.provider._endpoint("batchGenerateContent"), payload)
+        return str(created["name"])
+
+    def status(self, job_id: str) -> BatchStatus:
+        operation = self._get(job_id)
+        provider_state = self._state_of(operation)
+        state = _GEMINI_TERMINAL_STATES.get(provider_state, BATCH_RUNNING)
+        if state == BATCH_RUNNING and operation.get("done"):
+            state = BATCH_FAILED if operation.get("error") else BATCH_SUCCEEDED
+        return BatchStatus(job_id=job_id, state=state, provider_state=provider_state)
+
+    def results(self, job_id: str, requests: list[BatchRequest]) -> list[BatchResult]:
+        operation = self._get(job_id)
+        found: dict[str, BatchResult] = {}
+        for idx, item in enumerate(self._inlined_responses(operation)):
+            if not isinstance(item, dict):
+                continue
+            metadata = item.get("metadata") if isinstance(item.get("metadata"), dict) else {}
+            # 응답 순서는 요청 순서와 같으므로 key가 없으면 위치로 맞춘다.
+            custom_id = str(metadata.get("key") or (requests[idx].custom_id if idx < len(requests) else idx))
+            error = item.get("error")
+            if error:
+                message = error.get("message") if isinstance(error, dict) else str(error)
+                found[custom_id] = BatchResult(custom_id=custom_id, error=f"gemini_batch_item_failed:{message}")
+                continue
+            found[custom_id] = _parse_item(self.provider._response_from_json, custom_id, item.get("response"))
+        return _in_request_order(requests, found)
+
+    @staticmethod
+    def _state_of(operation: dict[str, Any]) -> str:
+        metadata = operation.get("metadata")
+        if isinstance(metadata, dict) and metadata.get("state"):
+            return str(metadata["state"])
+        return str(operation.get("state") or "")
+
+    @staticmethod
+    def _inlined_responses(operation: dict[str, Any]) -> list[Any]:
+        for container_key in ("response", "dest", "output"):
+            container = operation.get(container_key)
+            if not isinstance(container, dict):
+                continue
+            inlined = container.get("inlinedResponses")
+            if isinstance(inlined, dict):
+                inlined = inlined.get("inlinedResponses")
+            if isinstance(inlined, list):
+                return inlined
+        return []
+
+    def _get(self, job_id: str) -> dict[str, Any]:
+        query = f"key={parse.quote(self.provider.api_key)}"
+        return self._request("GET", f"{self.provider.base_url}/v1beta/{job_id}?{query}")
+
+    def _request(self, method: str, url: str, payload: dict[str, Any] | None = None) -> dict[str, Any]:
+        response = self.provider.transport.request(
+            method,
+            url,
+            body=json.dumps(payload).encode("utf-8") if payload is not None else None,
+            headers={"Content-Type": "application/json"},
+            timeout=self.provider.timeout_sec,
+        )
+        return _decode_json(response.body)
+
+
+def run_batch(
+    client: BatchClient,
+    requests: list[BatchRequest],
+    *,
+    poll_interval_sec: float = 30.0,
+    timeout_sec: float = 24 * 3600.0,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[BatchResult]:
+    """Submits ``requests`` as one batch job, polls until it finishes and returns results in request order."""
+    if not requests:
+        return []
+    job_id = client.submit(requests)
+    deadline = clock() + max(0.0, float(timeout_sec))
+    while True:
+        status = client.status(job_id)
+        if status.state == BATCH_SUCCEEDED:
+            return client.results(job_id, requests)
+        if status.state == BATCH_FAILED:
+            raise RuntimeError(f"ai_batch_failed:{job_id}:{status.provider_state}")
+        if clock() >= deadline:
+            raise RuntimeError(f"ai_batch_poll_timeout:{job_id}:{status.provider_state}")
+        sleep(max(0.0, float(poll_interval_sec)))
@@ -0,0 +1,291 @@
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Any
+
+from app.domain.ai.providers.base import (
+    AIStreamChunk,
+    AsyncStructuredAIProvider,
+    StructuredAIProvider,
+    StructuredAIResponse,
+)
+from app.domain.ai.providers.common import CircuitOpenError, is_outage_error, is_timeout_error
+from app.domain.ai.providers.streaming import open_provider_stream
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    failure_rate_threshold: float = 0.5
+    window: int = 20
+    min_calls: int = 10
+    consecutive_timeouts: int = 3
+    open_sec: float = 30.0
+    half_open_probes: int = 2
+
+
+class CircuitBreaker:
+    """Per-target breaker: closed -> open on failures, open -> half_open after ``open_sec``.
+
+    Only outage-type failures (provider errors, timeouts) count. Half-open lets at most
+    ``half_open_probes`` calls through; that many successes close the circuit and any
+    probe failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfig | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=max(1, self.config.window))
+        self._consecutive_timeouts = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._transitions: dict[str, int] = {}
+        self._rejected = 0
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance_from_open()
+            return self._state
+
+    def acquire(self) -> bool:
+        """Admits a call and returns whether it is a half-open probe; raises when the circuit is open."""
+        with self._lock:
+            self._advance_from_open()
+            if self._state == CLOSED:
+                return False
+            if self._state == HALF_OPEN and self._probes_in_flight < self.config.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._rejected += 1
+        raise CircuitOpenError(self.name)
+
+    def record_success(self, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if self._state == HALF_OPEN:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.config.half_open_probes:
+                        self._transition(CLOSED)
+                return
+            if self._state == CLOSED:
+                self._outcomes.append(True)
+                self._consecutive_timeouts = 0
+
+    def record_failure(self, probe: bool, exc: BaseException) -> None:
+        if not is_outage_error(exc):
+            # 스키마/한도 오류는 공급자가 응답한 것이므로 성공과 같게 취급한다.
+            self.record_success(probe)
+            return
+        with self._lock:
+            if probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if self._state == HALF_OPEN:
+                    self._transition(OPEN)
+                return
+            if self._state != CLOSED:
+                return
+            self._outcomes.append(False)
+            self._consecutive_timeouts = self._consecutive_timeouts + 1 if is_timeout_error(exc) else 0
+            if self._consecutive_timeouts >= self.config.consecutive_timeouts or self._failure_rate_tripped():
+                self._transition(OPEN)
+
+    def release_probe(self, probe: bool) -> None:
+        # 결과 없이 끝난 프로브(취소 등)는 자리만 돌려준다.
+        if not probe:
+            return
+        with self._lock:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._advance_from_open()
+            failures = sum(1 for ok in self._outcomes if not ok)
+            return {
+                "state": self._state,
+                "failure_rate": round(failures / len(self._outcomes), 4) if self._outcomes else 0.0,
+                "window_calls": len(self._outcomes),
+                "consecutive_timeouts": self._consecutive_timeouts,
+                "probes_in_flight": self._probes_in_flight,
+                "rejected": self._rejected,
+                "transitions": dict(self._transitions),
+            }
+
+    def _failure_rate_tripped(self) -> bool:
+        if len(self._outcomes) < max(1, self.config.min_calls):
+            return False
+        failures = sum(1 for ok in self._outcomes if not ok)
+        return failures / len(self._outcomes) >= self.config.failure_rate_threshold
+
+    def _advance_from_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.config.open_sec:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        key = f"{self._state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state == HALF_OPEN:
+            self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._consecutive_timeouts = 0
+
+
+_shared_breakers: dict[str, CircuitBreaker] = {}
+_shared_breakers_lock = Lock()
+
+
+def get_circuit_breaker(name: str, config: CircuitBreakerConfig | None = None) -> CircuitBreaker:
+    # 동기/비동기 서비스와 채팅 라우트가 같은 대상에 대해 하나의 차단기를 공유한다.
+    with _shared_breakers_lock:
+        breaker = _shared_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, config)
+            _shared_breakers[name] = breaker
+        return breaker
+
+
+def circuit_breaker_stats() -> dict[str, Any]:
+    with _shared_breakers_lock:
+        breakers = list(_shared_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+class CircuitBreakerProvider:
+    """Wraps a structured provider so calls fail fast with ``ai_circuit_open`` while its circuit is open."""
+
+    def __init__(self, provider: StructuredAIProvider, breaker: CircuitBreaker) -> None:
+        self.provider = provider
+        self.breaker = breaker
+
+    def prewarm(self, *, connections: int = 1) -> int:
+        prewarm = getattr(self.provider, "prewarm", None)
+        if not callable(prewarm):
+            return 0
+        return int(prewarm(connections=connections))
+
+    def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        probe = self.breaker.acquire()
+        try:
+            response = self.provider.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        except Exception as exc:
+            self.breaker.record_failure(probe, exc)
+            raise
+        except BaseException:
+            self.breaker.release_probe(probe)
+            raise
+        self.breaker.record_success(probe)
+        return response
+
+    def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return self.generate_json_with_meta(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        ).data
+
+
+class AsyncCircuitBreakerProvider:
+    """asyncio counterpart of CircuitBreakerProvider, including streamed calls."""
+
+    def __init__(self, provider: AsyncStructuredAIProvider, breaker: CircuitBreaker) -> None:
+        self.provider = provider
+        self.breaker = breaker
+
+    async def prewarm(self, *, connections: int = 1) -> int:
+        prewarm = getattr(self.provider, "prewarm", None)
+        if not callable(prewarm):
+            return 0
+        return int(await prewarm(connections=connections))
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        probe = self.breaker.acquire()
+        try:
+            response = await self.provider.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        except Exception as exc:
+            self.breaker.record_failure(probe, exc)
+            raise
+        except BaseException:
+            self.breaker.release_probe(probe)
+            raise
+        self.breaker.record_success(probe)
+        return response
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return (
+            await self.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        ).data
+
+    async def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        probe = self.breaker.acquire()
+        stream = open_provider_stream(self.provider, system_prompt=system_prompt, user_prompt=user_prompt)
+        outcome: BaseException | bool | None = None
+        try:
+            async for chunk in stream:
+                yield chunk
+            outcome = True
+        except Exception as exc:
+            outcome = exc
+            raise
+        finally:
+            await stream.aclose()
+            if outcome is True:
+                self.breaker.record_success(probe)
+            elif outcome is not None:
+                self.breaker.record_failure(probe, outcome)
+            else:
+                # 소비자가 중간에 닫은 스트림은 성공/실패로 세지 않는다.
+                self.breaker.release_probe(probe)
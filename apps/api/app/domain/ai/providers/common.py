@@ -1,4 +1,194 @@
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import json
+import re
+
+from app.core import json_codec
+from app.domain.ai.call_context import DeadlineExceededError, current_ai_call_context, remaining_budget_sec
+from app.domain.ai.providers.base import AIAttemptError
+from app.domain.ai.providers.json_repair import JSONRepairError, record_json_parse, repair_json_text
+from app.domain.ai.providers.transport import TransportHTTPError
+from app.domain.ai.quota import QuotaExceededError
+from app.domain.ai.scheduler import QueueShedError
+
+
+# 호출 문맥에 온도가 없을 때(추측 실행 후보가 아닐 때) 공급자에 보내는 샘플링 온도
+DEFAULT_TEMPERATURE = 0.3
+# 스키마/설정/요청 한도 오류는 엔드포인트 장애가 아니다(다른 대상으로 넘기거나 차단기에 세지 않는다).
+# 타입으로 가를 수 없는 예외에만 쓰는 마지막 판별이다.
+_NOT_OUTAGE_TOKENS = (
+    "429",
+    "too many requests",
+    "rate limit",
+    "rate_limit",
+    "resource exhausted",
+    "quota",
+    "expecting value",
+    "ai_response_not_object",
+    "api_key_missing",
+    "openai_base_url_missing",
+    "unsupported_ai_provider",
+    "config_error",
+    # 요청 예산이 바닥난 것은 공급자 탓이 아니다.
+    "ai_deadline_exceeded",
+)
+_TIMEOUT_TOKENS = ("timed out", "timeout")
+_RATE_LIMIT_TOKENS = ("429", "too many requests", "rate limit", "rate_limit", "resource exhausted", "quota")
+# 요청 한도/인증 거절은 공급자가 살아서 답한 것이다.
+_NOT_OUTAGE_STATUSES = frozenset({401, 403, 429})
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    text = str(exc).lower()
+    return any(token in text for token in _TIMEOUT_TOKENS)
+
+
+def is_rate_limited_error(exc: BaseException) -> bool:
+    text = str(exc).lower()
+    return any(token in text for token in _RATE_LIMIT_TOKENS)
+
+
+def is_outage_error(exc: BaseException) -> bool:
+    """True for provider_error/timeout failures, the kinds another endpoint may not repeat."""
+    for item in exception_chain(exc):
+        # 예외 타입과 HTTP 상태로 먼저 가르고, 문구는 타입으로 알 수 없을 때만 본다.
+        if isinstance(item, (DeadlineExceededError, QuotaExceededError, QueueShedError, AIAttemptError)):
+            return False
+        if isinstance(item, (json.JSONDecodeError, JSONRepairError)):
+            return False
+        if isinstance(item, (CircuitOpenError, TimeoutError)):
+            return True
+        if isinstance(item, ProviderHTTPError):
+            return item.status not in _NOT_OUTAGE_STATUSES
+    if is_timeout_error(exc):
+        return True
+    text = str(exc).lower()
+    return not any(token in text for token in _NOT_OUTAGE_TOKENS)
+
+
+def exception_chain(exc: BaseException | None) -> Iterator[BaseException]:
+    """Yields ``exc`` and the errors it wraps, outermost first."""
+    seen: set[int] = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class ProviderHTTPError(RuntimeError):
+    """Non-2xx provider response with its status, headers and retry hint kept structured.
+
+    The message keeps the ``<provider>_request_failed:HTTP Error <status>`` wording so that
+    text-based classification (circuit breaker, AIMD, router) keeps working unchanged.
+    """
+
+    def __init__(self, provider: str, error: TransportHTTPError) -> None:
+        super().__init__(f"{provider}_request_failed:{error}")
+        self.provider = provider
+        self.status = error.status
+        self.headers = error.headers
+        # 공급자가 알려 준 재시도 가능 시각까지의 초. 우리 쪽 거절의 retry_after_sec와 구분하려고 이름을 달리 둔다.
+        self.retry_delay_sec = provider_retry_delay(error.headers, error.body)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"ai_circuit_open:{name}")
+        self.name = name
+
+
+def _parse_duration(value: str) -> float | None:
+    # OpenAI x-ratelimit-reset-*("6m0s", "250ms")와 Gemini retryDelay("30s", "1.5s") 형식.
+    parts = _DURATION_PART.findall(value.strip().lower())
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _parse_retry_after(value: str) -> float | None:
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _body_retry_delay(body: bytes) -> float | None:
+    # Gemini 429 본문: {"error": {"details": [{"@type": ".../google.rpc.RetryInfo", "retryDelay": "30s"}]}}
+    try:
+        details = json_codec.loads(body).get("error", {}).get("details") or []
+    except (AttributeError, ValueError):
+        return None
+    for detail in details:
+        if isinstance(detail, dict) and isinstance(detail.get("retryDelay"), str):
+            return _parse_duration(detail["retryDelay"])
+    return None
+
+
+def provider_retry_delay(headers: dict[str, str], body: bytes = b"") -> float | None:
+    """Seconds the provider asked us to wait, from Retry-After(-ms), RetryInfo or x-ratelimit-reset-*."""
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        delay = _parse_retry_after(headers["retry-after"])
+        if delay is not None:
+            return delay
+    delay = _body_retry_delay(body)
+    if delay is not None:
+        return delay
+    # 잔량이 0인 한도(요청 수/토큰)가 풀리는 시각을 기다린다. 어느 쪽인지 모르면 먼저 풀리는 쪽을 본다.
+    resets: dict[str, float] = {}
+    for scope in ("requests", "tokens"):
+        reset = _parse_duration(headers.get(f"x-ratelimit-reset-{scope}", ""))
+        if reset is not None:
+            resets[scope] = reset
+    exhausted = [reset for scope, reset in resets.items() if headers.get(f"x-ratelimit-remaining-{scope}") == "0"]
+    if exhausted:
+        return max(exhausted)
+    return min(resets.values()) if resets else None
+
+
+def provider_http_error(exc: BaseException | None) -> ProviderHTTPError | None:
+    # 서비스/라우터가 예외를 감싸도 원인 쪽의 공급자 HTTP 오류를 찾는다.
+    for item in exception_chain(exc):
+        if isinstance(item, ProviderHTTPError):
+            return item
+    return None
+
+
+def provider_request_error(provider: str, exc: Exception) -> Exception:
+    """Wraps a transport failure; timeouts cut short by the request deadline stay DeadlineExceededError."""
+    if isinstance(exc, DeadlineExceededError):
+        return exc
+    if isinstance(exc, TransportHTTPError):
+        return ProviderHTTPError(provider, exc)
+    remaining = remaining_budget_sec()
+    if is_timeout_error(exc) and remaining is not None and remaining <= 0:
+        # 공급자가 느린 게 아니라 요청 예산이 바닥난 것이므로 차단기/AIMD에 타임아웃으로 세지 않는다.
+        return DeadlineExceededError()
+    return RuntimeError(f"{provider}_request_failed:{exc}")
+
+
+def sampling_temperature() -> float:
+    temperature = current_ai_call_context().temperature
+    return DEFAULT_TEMPERATURE if temperature is None else temperature
 
 
 def strip_code_fence(text: str) -> str:
@@ -10,9 +200,28 @@ def strip_code_fence(text: str) -> str:
     return raw
 
 
-def parse_json_text(text: str) -> dict:
+def parse_json_text(text: str, *, repairs: list[str] | None = None) -> dict:
+    """Parses the model's JSON object, repairing it when strict parsing fails.
+
+    Repairs applied are appended to ``repairs`` so the caller can report them in the response meta.
+    When the text cannot be repaired the original decode error is raised.
+    """
     cleaned = strip_code_fence(text)
-    parsed = json.loads(cleaned)
+    applied: tuple[str, ...] = ()
+    try:
+        parsed = json_codec.loads(cleaned)
+    except ValueError as exc:
+        try:
+            repaired, applied = repair_json_text(cleaned)
+            parsed = json_codec.loads(repaired)
+        except ValueError:
+            record_json_parse(failed=True)
+            # 분류는 원래 디코딩 오류 문구(schema_mismatch)를 그대로 본다.
+            raise exc from None
     if not isinstance(parsed, dict):
+        record_json_parse(failed=True)
         raise ValueError("ai_response_not_object")
+    record_json_parse(applied)
+    if repairs is not None:
+        repairs.extend(applied)
     return parsed
@@ -0,0 +1,547 @@
+from dataclasses import dataclass
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any
+
+
+@dataclass(frozen=True)
+class FakeLLMConfig:
+    """Behaviour knobs of the local stand-in LLM server.
+
+    Latency is log-normal with the given median/p95. Fault rates are per request and drawn from a
+    generator seeded by ``seed`` + request body + how many times that body was seen, so the same
+    request sequence always gets the same latencies and faults.
+    """
+
+    latency_p50_ms: float = 400.0
+    latency_p95_ms: float = 1500.0
+    rate_limit_rate: float = 0.0
+    timeout_rate: float = 0.0
+    malformed_rate: float = 0.0
+    retry_after_sec: int = 1
+    hang_sec: float = 120.0
+    chars_per_token: float = 2.0
+    cached_input_ratio: float = 0.0
+    stream_chunk_chars: int = 32
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class _Outcome:
+    latency_sec: float
+    fault: str | None
+
+
+_PIPELINE_MARKERS = (
+    ("AI+ 학습 어시스턴트", "chat"),
+    ("교육 진단 전문가", "assessment_questions"),
+    ("진단 분석 전문가", "assessment_analyze"),
+    ("커리큘럼 설계 전문가", "curriculum_generate"),
+    ("커리큘럼 리라이팅 전문가", "curriculum_refine"),
+    ("학습 설계 전문가", "curriculum_reasoning"),
+    ("학습 콘텐츠 작성자", "curriculum_sections"),
+    ("문제 출제 전문가", "content_generate_quiz"),
+    ("개인화 학습 콘텐츠 생성기", "content_generate"),
+)
+
+
+def detect_pipeline(system_prompt: str) -> str:
+    for marker, pipeline in _PIPELINE_MARKERS:
+        if marker in system_prompt:
+            return pipeline
+    return "unknown"
+
+
+def _prompt_value(user_prompt: str, label: str, default: str) -> str:
+    match = re.search(rf"^-?\s*{re.escape(label)}\s*[:=]\s*(.+)$", user_prompt, re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def _prompt_int(user_prompt: str, pattern: str, default: int) -> int:
+    match = re.search(pattern, user_prompt)
+    return int(match.group(1)) if match else default
+
+
+def _quiz_item(topic: str, idx: int) -> dict[str, Any]:
+    return {
+        "question": f"{topic} 코드에서 누적 변수 total을 반복문 밖에서 초기화해야 하는 이유는? ({idx + 1})",
+        "options": [
+            "반복마다 total이 0으로 되돌아가지 않게 하려고",
+            "반복문 속도를 높이려고",
+            "출력 형식을 바꾸려고",
+            "예외를 무시하려고",
+        ],
+        "correct_answer": 0,
+        "explanation": (
+            f"{topic} 예제에서 total을 반복문 안에서 초기화하면 매 반복마다 누적값이 사라지므로, "
+            "반복문 밖에서 한 번만 초기화해야 합니다."
+        ),
+    }
+
+
+def _code_lines(topic: str) -> str:
+    return "\n".join([
+        "def summarize(scores):",
+        "    total = 0",
+        "    for score in scores:",
+        "        if score < 0:",
+        "            continue",
+        "        total += score",
+        "    average = total / len(scores) if scores else 0",
+        f"    return {{'topic': {topic!r}, 'total': total, 'average': average}}",
+    ])
+
+
+def fake_payload(system_prompt: str, user_prompt: str) -> dict[str, Any]:
+    """Builds a payload that passes the normalize/quality checks of the pipeline behind the prompt."""
+    pipeline = detect_pipeline(system_prompt)
+    if pipeline == "chat":
+        message = _prompt_value(user_prompt, "user_message", "질문")
+        return {"assistant": f"'{message[:40]}'에 대해 답변드립니다. 오늘은 핵심 개념 하나를 예제로 확인해 보세요."}
+
+    if pipeline == "assessment_questions":
+        goal = _prompt_value(user_prompt, "학습 목표", "프로그래밍")
+        difficulties = ["easy", "easy", "medium", "medium", "hard"]
+        return {
+            "questions": [
+                {
+                    "id": idx + 1,
+                    "question": f"{goal} 목표를 위해 {idx + 1}번째로 확인할 개념으로 알맞은 것은?",
+                    "options": ["변수와 자료형", "반복문과 조건문", "함수 분리", "예외 처리"],
+                    "correct_answer": idx % 4,
+                    "difficulty": difficulty,
+                    "topic_area": ["기초 문법", "제어 흐름", "함수 설계", "오류 처리", "자료 구조"][idx],
+                }
+                for idx, difficulty in enumerate(difficulties)
+            ]
+        }
+
+    if pipeline == "assessment_analyze":
+        return {
+            "level": "intermediate",
+            "summary": "기초 문법은 안정적이지만 응용 문제에서 제어 흐름 판단이 흔들립니다.",
+            "strengths": ["기초 문법"],
+            "weaknesses": ["제어 흐름", "오류 처리"],
+        }
+
+    if pipeline in {"curriculum_generate", "curriculum_refine"}:
+        if pipeline == "curriculum_generate":
+            goal = _prompt_value(user_prompt, "학습 목표", "프로그래밍")
+            count = _prompt_int(user_prompt, r"목표\s*(\d+)개", 12)
+        else:
+            goal = _prompt_value(user_prompt, "현재 커리큘럼 제목", "프로그래밍")
+            count = 12
+        steps = ["환경 구성", "자료형 다루기", "조건 분기", "반복 처리", "함수 설계", "모듈 분리",
+                 "파일 입출력", "예외 처리", "테스트 작성", "데이터 가공", "API 호출", "미니 프로젝트"]
+        return {
+            "title": f"{goal} 단계별 커리큘럼",
+            "topics": [
+                {
+                    "title": f"{goal} {steps[idx % len(steps)]} 실습 {idx + 1}",
+                    "description": (
+                        f"{goal} 목표에 맞춰 {steps[idx % len(steps)]}을 작은 예제로 구현하고, "
+                        "실행 결과를 기록한 실습 노트를 산출물로 남깁니다."
+                    ),
+                    "estimated_minutes": 45 + (idx % 4) * 10,
+                }
+                for idx in range(max(1, count))
+            ],
+            "total_estimated_hours": round(max(1, count) * 0.9, 1),
+            "summary": (
+                f"{goal} 목표를 위해 기초 문법에서 시작해 함수, 예외 처리, 테스트를 거쳐 "
+                "미니 프로젝트까지 단계적으로 실습하는 경로입니다."
+            ),
+        }
+
+    if pipeline == "curriculum_reasoning":
+        topic = _prompt_value(user_prompt, "현재 토픽", "프로그래밍")
+        return {
+            "learning_objectives": [f"{topic}의 동작 원리를 설명한다", f"{topic}를 코드에 적용한다"],
+            "prerequisite_concepts": ["변수", "반복문"],
+            "why_this_topic": f"{topic}는 데이터를 누적 처리하는 기본 도구이기 때문입니다.",
+            "teaching_strategy": "짧은 개념 설명 뒤 누적 예제와 확인 문제로 이어갑니다.",
+            "difficulty_calibration": "초기화 위치 같은 실수 포인트를 먼저 짚습니다.",
+            "connection_to_goal": f"{topic}를 익히면 다음 실습 과제를 바로 시작할 수 있습니다.",
+        }
+
+    if pipeline == "curriculum_sections":
+        topic = _prompt_value(user_prompt, "토픽", "프로그래밍")
+        check = {
+            "type": "check",
+            "body": "",
+            "code": "",
+            "next_preview": "",
+        }
+        return {
+            "title": f"{topic} 누적 처리 익히기",
+            "sections": [
+                {
+                    "type": "concept",
+                    "title": f"{topic} 누적 변수 개념",
+                    "body": (
+                        f"{topic}에서 누적 변수 total은 반복문이 돌 때마다 값을 더해 가는 저장소입니다. "
+                        "total을 반복문 안에서 초기화하면 매 반복마다 값이 사라지므로 반드시 반복문 밖에서 한 번만 "
+                        "0으로 초기화합니다. 음수처럼 제외할 값은 continue로 건너뛰고, 평균은 목록이 비었는지 먼저 "
+                        "확인한 뒤 계산해야 0으로 나누는 오류를 피할 수 있습니다."
+                    ),
+                    "code": "",
+                    "explanation": "",
+                    "question": "",
+                    "options": [],
+                    "correct_answer": 0,
+                    "next_preview": "",
+                },
+                {
+                    "type": "example",
+                    "title": f"{topic} 점수 합계 예제",
+                    "body": "점수 목록에서 음수를 제외하고 합계와 평균을 구합니다.",
+                    "code": _code_lines(topic),
+                    "explanation": (
+                        "total을 반복문 밖에서 초기화하고, continue로 음수를 건너뛴 뒤 누적합니다. "
+                        "마지막에 scores가 비었는지 확인하고 평균을 계산해 0으로 나누는 오류를 막습니다."
+                    ),
+                    "question": "",
+                    "options": [],
+                    "correct_answer": 0,
+                    "next_preview": "",
+                },
+                {
+                    **check,
+                    "title": "초기화 위치 확인",
+                    "question": "예제에서 total을 반복문 밖에서 초기화하는 이유로 알맞은 것은?",
+                    "options": ["누적값이 반복마다 사라지지 않게", "반복 속도를 높이려고", "음수를 제외하려고", "평균을 반올림하려고"],
+                    "correct_answer": 0,
+                    "explanation": "total을 반복문 안에서 초기화하면 매 반복마다 0이 되어 누적값이 사라지므로 밖에서 한 번만 초기화합니다.",
+                },
+                {
+                    **check,
+                    "title": "continue 역할 확인",
+                    "question": "예제에서 score가 음수일 때 continue가 하는 일로 알맞은 것은?",
+                    "options": ["해당 점수를 건너뛰고 다음 반복으로 이동", "반복문 전체를 종료", "total을 0으로 초기화", "평균을 먼저 계산"],
+                    "correct_answer": 0,
+                    "explanation": "continue는 남은 누적 코드를 실행하지 않고 다음 반복으로 넘어가므로 음수 점수는 total에 더해지지 않습니다.",
+                },
+                {
+                    "type": "summary",
+                    "title": f"{topic} 정리",
+                    "body": "누적 변수는 반복문 밖에서 초기화하고, 제외할 값은 continue로 건너뜁니다.",
+                    "code": "",
+                    "explanation": "",
+                    "question": "",
+                    "options": [],
+                    "correct_answer": 0,
+                    "next_preview": "다음에는 누적 결과를 딕셔너리로 묶어 반환하는 방법을 다룹니다.",
+                },
+            ],
+        }
+
+    if pipeline == "content_generate_quiz":
+        topic = _prompt_value(user_prompt, "주제", "프로그래밍")
+        count = _prompt_int(user_prompt, r"문항 수:\s*(\d+)", 8)
+        return {
+            "title": f"{topic} 문제 훈련",
+            "content": f"{topic} 누적 처리 핵심을 점검하는 문제 세트입니다. 개념 확인과 응용 판단을 함께 연습합니다.",
+            "code_examples": [],
+            "quiz": [_quiz_item(topic, idx) for idx in range(max(1, count))],
+        }
+
+    if pipeline == "content_generate":
+        topic = _prompt_value(user_prompt, "주제", "프로그래밍")
+        language = _prompt_value(user_prompt, "언어", "python")
+        return {
+            "title": f"{topic} 누적 처리 실습",
+            "content": (
+                f"{topic}에서 반복문과 누적 변수를 함께 쓰는 방법을 다룹니다. 누적 변수는 반복문 밖에서 한 번만 "
+                "초기화해야 하며, 제외할 값은 continue로 건너뜁니다. 평균처럼 나눗셈이 필요한 계산은 목록이 "
+                "비었는지 먼저 확인해야 0으로 나누는 오류를 피할 수 있습니다. 아래 예제는 점수 목록에서 음수를 "
+                "제외하고 합계와 평균을 구하는 함수를 단계별로 보여 주며, 이어지는 문제로 초기화 위치와 "
+                "continue의 역할을 다시 확인합니다."
+            ),
+            "code_examples": [
+                {
+                    "title": f"{topic} 점수 합계",
+                    "code": _code_lines(topic),
+                    "explanation": "total을 반복문 밖에서 초기화하고 음수는 continue로 건너뛴 뒤, 빈 목록이면 평균을 0으로 둡니다.",
+                    "language": language,
+                }
+            ],
+            "quiz": [_quiz_item(topic, idx) for idx in range(3)],
+        }
+
+    return {"ok": True}
+
+
+class FakeLLMServer:
+    """In-process HTTP server speaking the OpenAI chat-completions and Gemini generateContent formats.
+
+    Serves ``POST /v1/chat/completions`` (``stream: true`` → SSE) and
+    ``POST /v1beta/models/{model}:generateContent`` / ``:streamGenerateContent?alt=sse``.
+    Point an OpenAI-compatible provider at ``{base_url}/v1`` or a Gemini provider at ``base_url``.
+    """
+
+    def __init__(self, config: FakeLLMConfig | None = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or FakeLLMConfig()
+        self._lock = threading.Lock()
+        self._seen: dict[str, int] = {}
+        self._stats: dict[str, Any] = {
+            "requests": 0,
+            "rate_limited": 0,
+            "timeouts": 0,
+            "malformed": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "pipelines": {},
+        }
+        self._server = ThreadingHTTPServer((host, port), _FakeLLMHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "pipelines": dict(self._stats["pipelines"])}
+
+    def _outcome(self, body: bytes) -> _Outcome:
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+        # 같은 본문의 재시도는 occurrence로 구분해 매번 같은 고장을 반복하지 않게 한다.
+        rng = random.Random(f"{self.config.seed}:{digest}:{occurrence}")
+        latency = self._sample_latency(rng)
+        draw = rng.random()
+        fault: str | None = None
+        if draw < self.config.rate_limit_rate:
+            fault = "rate_limited"
+        elif draw < self.config.rate_limit_rate + self.config.timeout_rate:
+            fault = "timeout"
+        elif rng.random() < self.config.malformed_rate:
+            fault = "malformed"
+        return _Outcome(latency_sec=latency, fault=fault)
+
+    def _sample_latency(self, rng: random.Random) -> float:
+        p50 = max(0.0, self.config.latency_p50_ms) / 1000.0
+        if p50 <= 0:
+            return 0.0
+        p95 = max(p50, self.config.latency_p95_ms / 1000.0)
+        # 로그정규분포: 중앙값 p50, 95백분위 p95 (z=1.645)
+        sigma = math.log(p95 / p50) / 1.645
+        return math.exp(math.log(p50) + sigma * rng.gauss(0.0, 1.0))
+
+    def _tokens(self, text: str) -> int:
+        return max(1, math.ceil(len(text) / max(0.1, self.config.chars_per_token)))
+
+    def _usage(self, system_prompt: str, user_prompt: str, output_text: str) -> tuple[int, int, int]:
+        input_tokens = self._tokens(system_prompt + user_prompt)
+        cached = min(input_tokens, int(self._tokens(system_prompt) * max(0.0, min(1.0, self.config.cached_input_ratio))))
+        return input_tokens, self._tokens(output_text), cached
+
+    def _record(self, pipeline: str, fault: str | None, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["pipelines"][pipeline] = self._stats["pipelines"].get(pipeline, 0) + 1
+            if fault == "rate_limited":
+                self._stats["rate_limited"] += 1
+            elif fault == "timeout":
+                self._stats["timeouts"] += 1
+            elif fault == "malformed":
+                self._stats["malformed"] += 1
+            self._stats["input_tokens"] += input_tokens
+            self._stats["output_tokens"] += output_tokens
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ThreadingHTTPServer
+
+    @property
+    def fake(self) -> FakeLLMServer:
+        return self.server.fake  # type: ignore[attr-defined]
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        path = self.path.split("?", 1)[0]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            self._reply_json(400, {"error": {"message": "invalid json body"}})
+            return
+
+        if path.endswith("/chat/completions"):
+            wire = "openai"
+            messages = request.get("messages") if isinstance(request.get("messages"), list) else []
+            system_prompt = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+            user_prompt = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+            stream = bool(request.get("stream"))
+            model = str(request.get("model") or "fake-model")
+        elif ":generateContent" in path or ":streamGenerateContent" in path:
+            wire = "gemini"
+            system_prompt = _gemini_text(request.get("systemInstruction"))
+            contents = request.get("contents") if isinstance(request.get("contents"), list) else []
+            user_prompt = _gemini_text(contents[0]) if contents else ""
+            stream = ":streamGenerateContent" in path
+            model = path.rsplit("/", 1)[-1].split(":", 1)[0]
+        else:
+            self._reply_json(404, {"error": {"message": f"not found: {path}"}})
+            return
+
+        fake = self.fake
+        pipeline = detect_pipeline(system_prompt)
+        outcome = fake._outcome(body)
+        if outcome.fault == "rate_limited":
+            fake._record(pipeline, outcome.fault)
+            self._reply_rate_limited(wire)
+            return
+        if outcome.fault == "timeout":
+            fake._record(pipeline, outcome.fault)
+            # 응답 없이 붙잡아 두어 클라이언트 읽기 타임아웃을 유발한다.
+            time.sleep(fake.config.hang_sec)
+            self.close_connection = True
+            return
+
+        text = json.dumps(fake_payload(system_prompt, user_prompt), ensure_ascii=False)
+        if outcome.fault == "malformed":
+            text = text[: max(1, len(text) // 2)]
+        input_tokens, output_tokens, cached_tokens = fake._usage(system_prompt, user_prompt, text)
+        fake._record(pipeline, outcome.fault, input_tokens, output_tokens)
+        usage = (input_tokens, output_tokens, cached_tokens)
+
+        if stream:
+            self._stream(wire, model, text, usage, outcome.latency_sec)
+            return
+        time.sleep(outcome.latency_sec)
+        if wire == "openai":
+            self._reply_json(200, _openai_completion(model, text, usage))
+        else:
+            self._reply_json(200, _gemini_response(text, usage))
+
+    def _reply_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        encoded = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _reply_rate_limited(self, wire: str) -> None:
+        retry_after = str(max(0, self.fake.config.retry_after_sec))
+        if wire == "openai":
+            payload = {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+        else:
+            payload = {"error": {"code": 429, "message": "Resource has been exhausted (fake)", "status": "RESOURCE_EXHAUSTED"}}
+        self._reply_json(429, payload, {"Retry-After": retry_after})
+
+    def _stream(self, wire: str, model: str, text: str, usage: tuple[int, int, int], latency_sec: float) -> None:
+        size = max(1, self.fake.config.stream_chunk_chars)
+        pieces = [text[idx: idx + size] for idx in range(0, len(text), size)] or [""]
+        # 첫 청크까지 지연의 30%, 나머지는 청크 사이에 고르게 나눈다.
+        first_delay = latency_sec * 0.3
+        gap = (latency_sec - first_delay) / max(1, len(pieces))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(first_delay)
+        for idx, piece in enumerate(pieces):
+            last = idx == len(pieces) - 1
+            if wire == "openai":
+                event = {"model": model, "choices": [{"index": 0, "delta": {"content": piece}}]}
+            else:
+                event = _gemini_response(piece, usage) if last else _gemini_response(piece, None)
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+            if not last:
+                time.sleep(gap)
+        if wire == "openai":
+            usage_event = {"model": model, "choices": [], "usage": _openai_usage(usage)}
+            self._write_chunk(f"data: {json.dumps(usage_event)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, data: str) -> None:
+        encoded = data.encode("utf-8")
+        self.wfile.write(f"{len(encoded):x}\r\n".encode("ascii") + encoded + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *_args: Any) -> None:
+        return
+
+
+def _gemini_text(content: Any) -> str:
+    parts = content.get("parts") if isinstance(content, dict) else None
+    if not isinstance(parts, list):
+        return ""
+    return "".join(str(part.get("text") or "") for part in parts if isinstance(part, dict))
+
+
+def _openai_usage(usage: tuple[int, int, int]) -> dict[str, Any]:
+    input_tokens, output_tokens, cached_tokens = usage
+    return {
+        "prompt_tokens": input_tokens,
+        "completion_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached_tokens},
+    }
+
+
+def _openai_completion(model: str, text: str, usage: tuple[int, int, int]) -> dict[str, Any]:
+    return {
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": _openai_usage(usage),
+    }
+
+
+def _gemini_response(text: str, usage: tuple[int, int, int] | None) -> dict[str, Any]:
+    response: dict[str, Any] = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+    if usage is not None:
+        input_tokens, output_tokens, cached_tokens = usage
+        response["usageMetadata"] = {
+            "promptTokenCount": input_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": input_tokens + output_tokens,
+            "cachedContentTokenCount": cached_tokens,
+        }
+    return response
+
+
+_shared_server: FakeLLMServer | None = None
+_shared_server_lock = threading.Lock()
+
+
+def get_shared_fake_llm_server(config: FakeLLMConfig | None = None) -> FakeLLMServer:
+    """Starts the in-process fake server on first use; later calls reuse it (the first config wins)."""
+    global _shared_server
+    with _shared_server_lock:
+        if _shared_server is None:
+            _shared_server = FakeLLMServer(config).start()
+        return _shared_server
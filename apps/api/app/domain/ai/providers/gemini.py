@@ -1,95 +1,167 @@
-import json
+from collections.abc import AsyncIterator
+from dataclasses import replace
 from typing import Any
-from urllib import parse, request
+from urllib import parse
 
-from app.domain.ai.providers.common import parse_json_text
+from app.core import json_codec
+from app.domain.ai.call_context import bounded_wait_sec, current_ai_call_context
+from app.domain.ai.output_schema import OutputSpec, current_output_spec
+from app.domain.ai.providers.common import parse_json_text, provider_request_error, sampling_temperature
 from app.domain.ai.providers.base import (
     AIAttemptError,
     AIResponseMeta,
+    AIStreamChunk,
+    AITransportTiming,
     AIUsageMeta,
     StructuredAIResponse,
 )
+from app.domain.ai.providers.gemini_cache import CREATE, REFRESH, CachePlan, GeminiContextCache
+from app.domain.ai.providers.streaming import iter_sse_data
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport, get_shared_async_transport
+from app.domain.ai.providers.transport import (
+    PooledHTTPTransport,
+    TransportHTTPError,
+    TransportResponse,
+    get_shared_transport,
+)
+
+
+GEMINI_API_BASE_URL = "https://generativelanguage.googleapis.com"
+
 
+class _GeminiProviderBase:
+    """Request/response wire format shared by the sync and async Gemini providers."""
 
-class GeminiProvider:
     def __init__(
         self,
         *,
         api_key: str,
         model: str,
         timeout_sec: int = 30,
+        base_url: str = GEMINI_API_BASE_URL,
+        context_cache: GeminiContextCache | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("gemini_api_key_missing")
         self.api_key = api_key
         self.model = model
         self.timeout_sec = timeout_sec
+        self.base_url = base_url.rstrip("/")
+        self.context_cache = context_cache
 
-    def generate_json_with_meta(
-        self,
+    def _endpoint(self, method: str = "generateContent") -> str:
+        query = f"key={parse.quote(self.api_key)}"
+        if method == "streamGenerateContent":
+            query = f"alt=sse&{query}"
+        return f"{self.base_url}/v1beta/models/{parse.quote(self.model)}:{method}?{query}"
+
+    def _cache_endpoint(self, name: str | None = None) -> str:
+        query = f"key={parse.quote(self.api_key)}"
+        if name is None:
+            return f"{self.base_url}/v1beta/cachedContents?{query}"
+        return f"{self.base_url}/v1beta/{name}?updateMask=ttl&{query}"
+
+    @staticmethod
+    def _encode_payload(*, system_prompt: str, user_prompt: str, cached_content: str | None = None) -> bytes:
+        return json_codec.dumps(_GeminiProviderBase._build_payload(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            cached_content=cached_content,
+            output=current_output_spec(),
+        ))
+
+    @staticmethod
+    def _build_payload(
         *,
         system_prompt: str,
         user_prompt: str,
-    ) -> StructuredAIResponse:
-        endpoint = (
-            "https://generativelanguage.googleapis.com/v1beta/models/"
-            f"{parse.quote(self.model)}:generateContent?key={parse.quote(self.api_key)}"
-        )
-        payload = {
+        cached_content: str | None = None,
+        output: OutputSpec | None = None,
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {
             "contents": [
                 {
                     "role": "user",
                     "parts": [
                         {
-                            "text": f"{system_prompt}\n\n{user_prompt}",
+                            "text": user_prompt,
                         }
                     ],
                 }
             ],
             "generationConfig": {
                 "responseMimeType": "application/json",
-                "temperature": 0.3,
+                "temperature": sampling_temperature(),
             },
         }
+        if output is not None and output.gemini_schema is not None:
+            payload["generationConfig"]["responseSchema"] = output.gemini_schema
+        if output is not None and output.max_output_tokens is not None:
+            payload["generationConfig"]["maxOutputTokens"] = output.max_output_tokens
+        # 시스템 프롬프트를 앞 접두부로 고정해 암묵적 캐시가 맞도록 한다.
+        # 명시적 캐시 핸들이 있으면 시스템 프롬프트는 핸들에 들어 있으므로 보내지 않는다.
+        if cached_content:
+            payload["cachedContent"] = cached_content
+        else:
+            payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
+        return payload
 
-        req = request.Request(
-            endpoint,
-            data=json.dumps(payload).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+    def _encode_cache_payload(self, system_prompt: str) -> bytes:
+        assert self.context_cache is not None
+        payload = {
+            "model": f"models/{self.model}",
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
+            "ttl": self.context_cache.ttl,
+        }
+        return json_codec.dumps(payload)
 
-        try:
-            with request.urlopen(req, timeout=self.timeout_sec) as response:
-                body = response.read().decode("utf-8")
-        except Exception as exc:  # pragma: no cover - network boundary
-            raise RuntimeError(f"gemini_request_failed:{exc}") from exc
+    def _encode_cache_ttl_payload(self) -> bytes:
+        assert self.context_cache is not None
+        return json_codec.dumps({"ttl": self.context_cache.ttl})
 
-        decoded = json.loads(body)
+    @staticmethod
+    def _extract_cache_name(response: TransportResponse) -> str:
+        name = json_codec.loads(response.body).get("name")
+        if not isinstance(name, str) or not name:
+            raise RuntimeError("gemini_cache_name_missing")
+        return name
+
+    def _should_retry_inline(self, plan: CachePlan | None, cached_content: str | None, exc: Exception) -> bool:
+        # 핸들이 만료/삭제되어 4xx가 나면 핸들을 버리고 시스템 프롬프트를 직접 실어 한 번 더 보낸다.
+        if plan is None or cached_content is None or not isinstance(exc, TransportHTTPError):
+            return False
+        if exc.status == 429 or not 400 <= exc.status < 500:
+            return False
+        assert self.context_cache is not None
+        self.context_cache.invalidate(plan.key)
+        return True
+
+    def _build_response(self, response: TransportResponse) -> StructuredAIResponse:
+        return self._response_from_json(json_codec.loads(response.body), timing=response.timing)
+
+    def _response_from_json(
+        self,
+        decoded: dict[str, Any],
+        *,
+        timing: AITransportTiming | None = None,
+    ) -> StructuredAIResponse:
         meta = AIResponseMeta(
             provider="gemini",
             model=self.model,
             usage=self._extract_usage(decoded),
+            timing=timing,
         )
+        repairs: list[str] = []
         try:
             text = self._extract_text(decoded)
-            data = parse_json_text(text)
+            data = parse_json_text(text, repairs=repairs)
         except Exception as exc:
             raise AIAttemptError(str(exc), meta=meta) from exc
+        if repairs:
+            meta = replace(meta, repairs=tuple(repairs))
 
         return StructuredAIResponse(data=data, meta=meta)
 
-    def generate_json(
-        self,
-        *,
-        system_prompt: str,
-        user_prompt: str,
-    ) -> dict[str, Any]:
-        return self.generate_json_with_meta(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-        ).data
-
     @staticmethod
     def _extract_text(response_json: dict[str, Any]) -> str:
         candidates = response_json.get("candidates")
@@ -109,6 +181,21 @@ class GeminiProvider:
 
         raise RuntimeError("gemini_text_missing")
 
+    @staticmethod
+    def _extract_delta_text(event: dict[str, Any]) -> str:
+        candidates = event.get("candidates")
+        if not isinstance(candidates, list) or not candidates or not isinstance(candidates[0], dict):
+            return ""
+        content = candidates[0].get("content")
+        parts = content.get("parts") if isinstance(content, dict) else None
+        if not isinstance(parts, list):
+            return ""
+        return "".join(
+            part["text"]
+            for part in parts
+            if isinstance(part, dict) and isinstance(part.get("text"), str)
+        )
+
     @staticmethod
     def _extract_usage(response_json: dict[str, Any]) -> AIUsageMeta | None:
         usage = response_json.get("usageMetadata")
@@ -116,10 +203,10 @@ class GeminiProvider:
             return None
 
         extracted = AIUsageMeta(
-            input_tokens=GeminiProvider._safe_int(usage.get("promptTokenCount")),
-            output_tokens=GeminiProvider._safe_int(usage.get("candidatesTokenCount")),
-            total_tokens=GeminiProvider._safe_int(usage.get("totalTokenCount")),
-            cached_input_tokens=GeminiProvider._safe_int(usage.get("cachedContentTokenCount")),
+            input_tokens=_GeminiProviderBase._safe_int(usage.get("promptTokenCount")),
+            output_tokens=_GeminiProviderBase._safe_int(usage.get("candidatesTokenCount")),
+            total_tokens=_GeminiProviderBase._safe_int(usage.get("totalTokenCount")),
+            cached_input_tokens=_GeminiProviderBase._safe_int(usage.get("cachedContentTokenCount")),
         )
         if all(value is None for value in (
             extracted.input_tokens,
@@ -137,3 +224,249 @@ class GeminiProvider:
         except (TypeError, ValueError):
             return None
         return candidate if candidate >= 0 else None
+
+
+class GeminiProvider(_GeminiProviderBase):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        timeout_sec: int = 30,
+        transport: PooledHTTPTransport | None = None,
+        base_url: str = GEMINI_API_BASE_URL,
+        context_cache: GeminiContextCache | None = None,
+    ) -> None:
+        super().__init__(
+            api_key=api_key,
+            model=model,
+            timeout_sec=timeout_sec,
+            base_url=base_url,
+            context_cache=context_cache,
+        )
+        self.transport = transport or get_shared_transport()
+
+    def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        plan, cached_content = self._resolve_cached_content(system_prompt)
+        try:
+            try:
+                response = self._post_generate(system_prompt, user_prompt, cached_content)
+            except Exception as exc:
+                if not self._should_retry_inline(plan, cached_content, exc):
+                    raise
+                response = self._post_generate(system_prompt, user_prompt, None)
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("gemini", exc) from exc
+
+        return self._build_response(response)
+
+    def _post_generate(self, system_prompt: str, user_prompt: str, cached_content: str | None) -> TransportResponse:
+        return self.transport.request(
+            "POST",
+            self._endpoint(),
+            body=self._encode_payload(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                cached_content=cached_content,
+            ),
+            headers={"Content-Type": "application/json"},
+            timeout=bounded_wait_sec(self.timeout_sec),
+        )
+
+    def _resolve_cached_content(self, system_prompt: str) -> tuple[CachePlan | None, str | None]:
+        if self.context_cache is None:
+            return None, None
+        plan = self.context_cache.plan(self.model, system_prompt)
+        # 요청 마감이 이미 지났으면 캐시 실패로 기록하지 않고 여기서 끝낸다.
+        timeout = bounded_wait_sec(self.timeout_sec)
+        if plan.action == CREATE:
+            try:
+                response = self.transport.request(
+                    "POST",
+                    self._cache_endpoint(),
+                    body=self._encode_cache_payload(system_prompt),
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+                name = self._extract_cache_name(response)
+            except Exception:
+                # 캐시 생성 실패는 요청을 막지 않는다. 한동안 인라인으로 보낸다.
+                self.context_cache.mark_failed(plan.key)
+                return plan, None
+            self.context_cache.store(plan.key, name)
+            return plan, name
+        if plan.action == REFRESH:
+            assert plan.name is not None
+            try:
+                self.transport.request(
+                    "PATCH",
+                    self._cache_endpoint(plan.name),
+                    body=self._encode_cache_ttl_payload(),
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+            except Exception:
+                self.context_cache.invalidate(plan.key)
+                return plan, None
+            self.context_cache.store(plan.key, plan.name, refreshed=True)
+        return plan, plan.name
+
+    def prewarm(self, *, connections: int = 1) -> int:
+        return self.transport.prewarm(self.base_url, connections=connections)
+
+    def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return self.generate_json_with_meta(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        ).data
+
+
+class AsyncGeminiProvider(_GeminiProviderBase):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        timeout_sec: int = 30,
+        transport: AsyncPooledHTTPTransport | None = None,
+        base_url: str = GEMINI_API_BASE_URL,
+        context_cache: GeminiContextCache | None = None,
+    ) -> None:
+        super().__init__(
+            api_key=api_key,
+            model=model,
+            timeout_sec=timeout_sec,
+            base_url=base_url,
+            context_cache=context_cache,
+        )
+        self.transport = transport or get_shared_async_transport()
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        plan, cached_content = await self._resolve_cached_content(system_prompt)
+        try:
+            try:
+                response = await self._post_generate(system_prompt, user_prompt, cached_content)
+            except Exception as exc:
+                if not self._should_retry_inline(plan, cached_content, exc):
+                    raise
+                response = await self._post_generate(system_prompt, user_prompt, None)
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("gemini", exc) from exc
+
+        return self._build_response(response)
+
+    async def _post_generate(self, system_prompt: str, user_prompt: str, cached_content: str | None) -> TransportResponse:
+        return await self.transport.request(
+            "POST",
+            self._endpoint(),
+            body=self._encode_payload(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                cached_content=cached_content,
+            ),
+            headers={"Content-Type": "application/json"},
+            timeout=bounded_wait_sec(self.timeout_sec),
+        )
+
+    async def _resolve_cached_content(self, system_prompt: str) -> tuple[CachePlan | None, str | None]:
+        if self.context_cache is None:
+            return None, None
+        plan = self.context_cache.plan(self.model, system_prompt)
+        # 요청 마감이 이미 지났으면 캐시 실패로 기록하지 않고 여기서 끝낸다.
+        timeout = bounded_wait_sec(self.timeout_sec)
+        if plan.action == CREATE:
+            try:
+                response = await self.transport.request(
+                    "POST",
+                    self._cache_endpoint(),
+                    body=self._encode_cache_payload(system_prompt),
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+                name = self._extract_cache_name(response)
+            except Exception:
+                self.context_cache.mark_failed(plan.key)
+                return plan, None
+            self.context_cache.store(plan.key, name)
+            return plan, name
+        if plan.action == REFRESH:
+            assert plan.name is not None
+            try:
+                await self.transport.request(
+                    "PATCH",
+                    self._cache_endpoint(plan.name),
+                    body=self._encode_cache_ttl_payload(),
+                    headers={"Content-Type": "application/json"},
+                    timeout=timeout,
+                )
+            except Exception:
+                self.context_cache.invalidate(plan.key)
+                return plan, None
+            self.context_cache.store(plan.key, plan.name, refreshed=True)
+        return plan, plan.name
+
+    async def prewarm(self, *, connections: int = 1) -> int:
+        return await self.transport.prewarm(self.base_url, connections=connections)
+
+    async def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        usage: AIUsageMeta | None = None
+        # 스트림은 첫 청크 이후 재시도할 수 없으므로 핸들 오류 시 인라인 재시도는 하지 않는다.
+        _plan, cached_content = await self._resolve_cached_content(system_prompt)
+        try:
+            async with self.transport.stream(
+                "POST",
+                self._endpoint("streamGenerateContent"),
+                body=self._encode_payload(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    cached_content=cached_content,
+                ),
+                headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+                timeout=self.timeout_sec,
+                deadline=current_ai_call_context().deadline,
+            ) as response:
+                async for data in iter_sse_data(response.aiter_lines()):
+                    event = json_codec.loads(data)
+                    # usageMetadata는 청크마다 누적값으로 오므로 마지막 값을 쓴다.
+                    usage = self._extract_usage(event) or usage
+                    text = self._extract_delta_text(event)
+                    if text:
+                        yield AIStreamChunk(text=text)
+                timing = response.timing
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("gemini", exc) from exc
+
+        yield AIStreamChunk(meta=AIResponseMeta(provider="gemini", model=self.model, usage=usage, timing=timing))
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return (
+            await self.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        ).data
@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import hashlib
+from threading import Lock
+import time
+from typing import Any
+
+
+INLINE = "inline"
+USE = "use"
+CREATE = "create"
+REFRESH = "refresh"
+
+
+@dataclass
+class _Handle:
+    name: str | None = None
+    expires_at: float = 0.0
+    creating: bool = False
+    failed_until: float = 0.0
+
+
+@dataclass(frozen=True)
+class CachePlan:
+    action: str
+    key: str
+    name: str | None = None
+
+
+class GeminiContextCache:
+    """Book-keeping for explicit Gemini ``cachedContent`` handles, one per (model, system prompt).
+
+    The cache only decides what a request should do; the provider performs the HTTP calls and
+    reports back. Only one request creates a handle at a time, others go inline meanwhile.
+    Prompts shorter than ``min_chars`` are never cached (Gemini rejects small caches), and
+    a failed create is not retried for ``retry_after_sec``.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: int = 3600,
+        min_chars: int = 4000,
+        refresh_margin_sec: float = 300.0,
+        retry_after_sec: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_sec = max(60, int(ttl_sec))
+        self.min_chars = max(0, int(min_chars))
+        self.refresh_margin_sec = min(float(refresh_margin_sec), self.ttl_sec / 2)
+        self.retry_after_sec = max(0.0, float(retry_after_sec))
+        self._clock = clock
+        self._handles: dict[str, _Handle] = {}
+        self._counters = {"creates": 0, "refreshes": 0, "create_failures": 0, "invalidations": 0}
+        self._lock = Lock()
+
+    @staticmethod
+    def cache_key(model: str, system_prompt: str) -> str:
+        digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:32]
+        return f"{model}:{digest}"
+
+    def plan(self, model: str, system_prompt: str) -> CachePlan:
+        key = self.cache_key(model, system_prompt)
+        if len(system_prompt) < self.min_chars:
+            return CachePlan(INLINE, key)
+        now = self._clock()
+        with self._lock:
+            handle = self._handles.setdefault(key, _Handle())
+            if handle.creating or now < handle.failed_until:
+                return CachePlan(INLINE, key, handle.name if handle.name and now < handle.expires_at else None)
+            if handle.name is None or now >= handle.expires_at:
+                handle.name = None
+                handle.creating = True
+                return CachePlan(CREATE, key)
+            if handle.expires_at - now <= self.refresh_margin_sec:
+                # 만료 직전이면 한 요청이 TTL을 연장하고, 그동안 다른 요청은 기존 핸들을 쓴다.
+                handle.creating = True
+                return CachePlan(REFRESH, key, handle.name)
+            return CachePlan(USE, key, handle.name)
+
+    def store(self, key: str, name: str, *, refreshed: bool = False) -> None:
+        with self._lock:
+            handle = self._handles.setdefault(key, _Handle())
+            handle.name = name
+            handle.expires_at = self._clock() + self.ttl_sec
+            handle.creating = False
+            self._counters["refreshes" if refreshed else "creates"] += 1
+
+    def mark_failed(self, key: str) -> None:
+        with self._lock:
+            handle = self._handles.setdefault(key, _Handle())
+            handle.name = None
+            handle.creating = False
+            handle.failed_until = self._clock() + self.retry_after_sec
+            self._counters["create_failures"] += 1
+
+    def invalidate(self, key: str) -> None:
+        # 서버에서 핸들이 사라진 경우(404 등): 다음 요청이 새로 만든다.
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                handle.name = None
+                handle.creating = False
+                self._counters["invalidations"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            active = sum(1 for handle in self._handles.values() if handle.name and now < handle.expires_at)
+            return {"active_handles": active, **self._counters}
+
+    @property
+    def ttl(self) -> str:
+        return f"{self.ttl_sec}s"
+
+
+_shared_caches: dict[tuple[int, int], GeminiContextCache] = {}
+_shared_caches_lock = Lock()
+
+
+def get_shared_gemini_context_cache(*, ttl_sec: int = 3600, min_chars: int = 4000) -> GeminiContextCache:
+    key = (max(60, int(ttl_sec)), max(0, int(min_chars)))
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = GeminiContextCache(ttl_sec=key[0], min_chars=key[1])
+            _shared_caches[key] = cache
+        return cache
+
+
+def gemini_context_cache_stats() -> dict[str, Any]:
+    with _shared_caches_lock:
+        caches = list(_shared_caches.values())
+    merged: dict[str, Any] = {}
+    for cache in caches:
+        for name, value in cache.stats().items():
+            merged[name] = merged.get(name, 0) + value
+    return merged
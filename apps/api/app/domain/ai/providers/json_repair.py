@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+
+# 보고하는 수선 종류. 파이프라인은 RetryPolicy.rejected_repairs로 받아들이지 않을 종류를 고른다.
+JSON_REPAIR_KINDS = ("surrounding_text", "trailing_comma", "control_char", "truncated")
+
+_CLOSERS = {"{": "}", "[": "]"}
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+class JSONRepairError(ValueError):
+    """The text holds no object that a repair can recover."""
+
+
+def repair_json_text(text: str) -> tuple[str, tuple[str, ...]]:
+    """Rewrites model output into parseable JSON text and names every repair it applied.
+
+    Takes the outermost object out of surrounding prose, drops trailing commas, escapes raw
+    control characters inside strings and closes an object cut off mid-stream at its last
+    complete element. Raises JSONRepairError when nothing of the object can be kept.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise JSONRepairError("json_repair_no_object")
+
+    repairs: set[str] = set()
+    if text[:start].strip():
+        repairs.add("surrounding_text")
+
+    out: list[str] = []
+    stack: list[str] = []
+    # 잘렸을 때 되돌아갈 지점: (out 길이, 그 시점의 닫는 괄호 스택)
+    cut: tuple[int, tuple[str, ...]] = (0, ())
+    in_string = False
+    escaped = False
+    end: int | None = None
+
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char < " ":
+                out.append(_CONTROL_ESCAPES.get(char, f"\\u{ord(char):04x}"))
+                repairs.add("control_char")
+                continue
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            # 빈 배열은 완성된 값이지만 빈 객체는 아니다. 최상위 "{"는 살릴 멤버가 없다는 표시로만 쓴다.
+            whole = not stack or (char == "[" and _keeps_whole_values(stack))
+            out.append(char)
+            stack.append(_CLOSERS[char])
+            if whole:
+                cut = (len(out), tuple(stack))
+            continue
+        elif char in "}]":
+            if not stack or stack[-1] != char:
+                raise JSONRepairError("json_repair_unbalanced")
+            if _drop_trailing_comma(out):
+                repairs.add("trailing_comma")
+            out.append(char)
+            stack.pop()
+            if not stack:
+                end = index + 1
+                break
+            if _keeps_whole_values(stack):
+                cut = (len(out), tuple(stack))
+            continue
+        elif char == "," and _keeps_whole_values(stack):
+            cut = (len(out), tuple(stack))
+        out.append(char)
+
+    if end is None:
+        length, closers = cut
+        if length <= 1:
+            # 첫 멤버도 끝나지 않았으면 살릴 것이 없다.
+            raise JSONRepairError("json_repair_nothing_complete")
+        del out[length:]
+        _drop_trailing_comma(out)
+        out.extend(reversed(closers))
+        repairs.add("truncated")
+    elif text[end:].strip():
+        repairs.add("surrounding_text")
+
+    return "".join(out), tuple(kind for kind in JSON_REPAIR_KINDS if kind in repairs)
+
+
+def _keeps_whole_values(stack: list[str]) -> bool:
+    # 최상위 객체 말고 다른 객체 안에서는 자르지 않는다. 항목 객체 안에서 자르면 필드가 빠진 항목이 정상처럼 남는다.
+    return "}" not in stack[1:]
+
+
+def _drop_trailing_comma(out: list[str]) -> bool:
+    position = len(out) - 1
+    while position >= 0 and out[position].isspace():
+        position -= 1
+    if position >= 0 and out[position] == ",":
+        del out[position]
+        return True
+    return False
+
+
+class JSONRepairStats:
+    """Counts how often model output needed repair and how many regenerations that saved."""
+
+    def __init__(self) -> None:
+        self._counters = {"parsed": 0, "repaired": 0, "unrecoverable": 0, "retries_saved": 0, "rejected": 0}
+        self._kinds = {kind: 0 for kind in JSON_REPAIR_KINDS}
+        self._lock = Lock()
+
+    def record_parse(self, repairs: tuple[str, ...] = (), *, failed: bool = False) -> None:
+        with self._lock:
+            self._counters["parsed"] += 1
+            if failed:
+                self._counters["unrecoverable"] += 1
+                return
+            if repairs:
+                self._counters["repaired"] += 1
+                for kind in repairs:
+                    self._kinds[kind] = self._kinds.get(kind, 0) + 1
+
+    def record_outcome(self, *, accepted: bool) -> None:
+        # 수선한 응답이 품질게이트를 통과하면 그 시도는 schema_mismatch 재생성 한 번을 아낀 것이다.
+        with self._lock:
+            self._counters["retries_saved" if accepted else "rejected"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            parsed = self._counters["parsed"]
+            return {
+                **self._counters,
+                "kinds": dict(self._kinds),
+                "repair_rate": round(self._counters["repaired"] / parsed, 4) if parsed else 0.0,
+            }
+
+
+_repair_stats = JSONRepairStats()
+
+
+def record_json_parse(repairs: tuple[str, ...] = (), *, failed: bool = False) -> None:
+    _repair_stats.record_parse(repairs, failed=failed)
+
+
+def record_json_repair_outcome(*, accepted: bool) -> None:
+    _repair_stats.record_outcome(accepted=accepted)
+
+
+def json_repair_stats() -> dict[str, Any]:
+    return _repair_stats.stats()
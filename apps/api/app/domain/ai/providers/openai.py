@@ -1,17 +1,27 @@
-import json
+from collections.abc import AsyncIterator
+from dataclasses import replace
 from typing import Any
-from urllib import request
 
-from app.domain.ai.providers.common import parse_json_text
+from app.core import json_codec
+from app.domain.ai.call_context import bounded_wait_sec, current_ai_call_context
+from app.domain.ai.output_schema import OutputSpec, current_output_spec
+from app.domain.ai.providers.common import parse_json_text, provider_request_error, sampling_temperature
 from app.domain.ai.providers.base import (
     AIAttemptError,
     AIResponseMeta,
+    AIStreamChunk,
+    AITransportTiming,
     AIUsageMeta,
     StructuredAIResponse,
 )
+from app.domain.ai.providers.streaming import iter_sse_data
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport, get_shared_async_transport
+from app.domain.ai.providers.transport import PooledHTTPTransport, TransportResponse, get_shared_transport
 
 
-class OpenAIProvider:
+class _OpenAIProviderBase:
+    """Request/response wire format shared by the sync and async OpenAI-compatible providers."""
+
     def __init__(
         self,
         *,
@@ -30,64 +40,81 @@ class OpenAIProvider:
         self.base_url = base_url.rstrip("/")
         self.timeout_sec = timeout_sec
 
-    def generate_json_with_meta(
+    def _endpoint(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    def _encode_payload(self, *, system_prompt: str, user_prompt: str, stream: bool = False) -> bytes:
+        return json_codec.dumps(
+            self._build_payload(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                stream=stream,
+                output=current_output_spec(),
+            )
+        )
+
+    def _build_payload(
         self,
         *,
         system_prompt: str,
         user_prompt: str,
-    ) -> StructuredAIResponse:
-        endpoint = f"{self.base_url}/chat/completions"
-        payload = {
+        stream: bool = False,
+        output: OutputSpec | None = None,
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            "temperature": 0.3,
+            "temperature": sampling_temperature(),
             "response_format": {"type": "json_object"},
         }
+        if output is not None and output.schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": output.name, "strict": True, "schema": output.schema},
+            }
+        if output is not None and output.max_output_tokens is not None:
+            payload["max_completion_tokens"] = output.max_output_tokens
+        if stream:
+            # 스트리밍 응답은 마지막 청크에만 usage가 실린다.
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
 
-        req = request.Request(
-            endpoint,
-            data=json.dumps(payload).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
-
-        try:
-            with request.urlopen(req, timeout=self.timeout_sec) as response:
-                body = response.read().decode("utf-8")
-        except Exception as exc:  # pragma: no cover - network boundary
-            raise RuntimeError(f"openai_request_failed:{exc}") from exc
+    def _build_response(self, response: TransportResponse) -> StructuredAIResponse:
+        return self._response_from_json(json_codec.loads(response.body), timing=response.timing)
 
-        decoded = json.loads(body)
+    def _response_from_json(
+        self,
+        decoded: dict[str, Any],
+        *,
+        timing: AITransportTiming | None = None,
+    ) -> StructuredAIResponse:
         meta = AIResponseMeta(
             provider="openai",
             model=str(decoded.get("model") or self.model),
             usage=self._extract_usage(decoded),
+            timing=timing,
         )
+        repairs: list[str] = []
         try:
             text = self._extract_text(decoded)
-            data = parse_json_text(text)
+            data = parse_json_text(text, repairs=repairs)
         except Exception as exc:
             raise AIAttemptError(str(exc), meta=meta) from exc
+        if repairs:
+            meta = replace(meta, repairs=tuple(repairs))
 
         return StructuredAIResponse(data=data, meta=meta)
 
-    def generate_json(
-        self,
-        *,
-        system_prompt: str,
-        user_prompt: str,
-    ) -> dict[str, Any]:
-        return self.generate_json_with_meta(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-        ).data
-
     @staticmethod
     def _extract_text(response_json: dict[str, Any]) -> str:
         choices = response_json.get("choices")
@@ -113,6 +140,15 @@ class OpenAIProvider:
 
         raise RuntimeError("openai_content_missing")
 
+    @staticmethod
+    def _extract_delta_text(event: dict[str, Any]) -> str:
+        choices = event.get("choices")
+        if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+            return ""
+        delta = choices[0].get("delta")
+        content = delta.get("content") if isinstance(delta, dict) else None
+        return content if isinstance(content, str) else ""
+
     @staticmethod
     def _extract_usage(response_json: dict[str, Any]) -> AIUsageMeta | None:
         usage = response_json.get("usage")
@@ -121,10 +157,10 @@ class OpenAIProvider:
 
         prompt_details = usage.get("prompt_tokens_details")
         extracted = AIUsageMeta(
-            input_tokens=OpenAIProvider._safe_int(usage.get("prompt_tokens")),
-            output_tokens=OpenAIProvider._safe_int(usage.get("completion_tokens")),
-            total_tokens=OpenAIProvider._safe_int(usage.get("total_tokens")),
-            cached_input_tokens=OpenAIProvider._safe_int(
+            input_tokens=_OpenAIProviderBase._safe_int(usage.get("prompt_tokens")),
+            output_tokens=_OpenAIProviderBase._safe_int(usage.get("completion_tokens")),
+            total_tokens=_OpenAIProviderBase._safe_int(usage.get("total_tokens")),
+            cached_input_tokens=_OpenAIProviderBase._safe_int(
                 prompt_details.get("cached_tokens") if isinstance(prompt_details, dict) else None
             ),
         )
@@ -144,3 +180,131 @@ class OpenAIProvider:
         except (TypeError, ValueError):
             return None
         return candidate if candidate >= 0 else None
+
+
+class OpenAIProvider(_OpenAIProviderBase):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        base_url: str,
+        timeout_sec: int = 30,
+        transport: PooledHTTPTransport | None = None,
+    ) -> None:
+        super().__init__(api_key=api_key, model=model, base_url=base_url, timeout_sec=timeout_sec)
+        self.transport = transport or get_shared_transport()
+
+    def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        try:
+            response = self.transport.request(
+                "POST",
+                self._endpoint(),
+                body=self._encode_payload(system_prompt=system_prompt, user_prompt=user_prompt),
+                headers=self._headers(),
+                timeout=bounded_wait_sec(self.timeout_sec),
+            )
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("openai", exc) from exc
+
+        return self._build_response(response)
+
+    def prewarm(self, *, connections: int = 1) -> int:
+        return self.transport.prewarm(self.base_url, connections=connections)
+
+    def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return self.generate_json_with_meta(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        ).data
+
+
+class AsyncOpenAIProvider(_OpenAIProviderBase):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        base_url: str,
+        timeout_sec: int = 30,
+        transport: AsyncPooledHTTPTransport | None = None,
+    ) -> None:
+        super().__init__(api_key=api_key, model=model, base_url=base_url, timeout_sec=timeout_sec)
+        self.transport = transport or get_shared_async_transport()
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        try:
+            response = await self.transport.request(
+                "POST",
+                self._endpoint(),
+                body=self._encode_payload(system_prompt=system_prompt, user_prompt=user_prompt),
+                headers=self._headers(),
+                timeout=bounded_wait_sec(self.timeout_sec),
+            )
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("openai", exc) from exc
+
+        return self._build_response(response)
+
+    async def prewarm(self, *, connections: int = 1) -> int:
+        return await self.transport.prewarm(self.base_url, connections=connections)
+
+    async def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        model = self.model
+        usage: AIUsageMeta | None = None
+        try:
+            async with self.transport.stream(
+                "POST",
+                self._endpoint(),
+                body=self._encode_payload(system_prompt=system_prompt, user_prompt=user_prompt, stream=True),
+                headers={**self._headers(), "Accept": "text/event-stream"},
+                timeout=self.timeout_sec,
+                deadline=current_ai_call_context().deadline,
+            ) as response:
+                async for data in iter_sse_data(response.aiter_lines()):
+                    if data.strip() == "[DONE]":
+                        continue
+                    event = json_codec.loads(data)
+                    model = str(event.get("model") or model)
+                    usage = self._extract_usage(event) or usage
+                    text = self._extract_delta_text(event)
+                    if text:
+                        yield AIStreamChunk(text=text)
+                timing = response.timing
+        except Exception as exc:  # pragma: no cover - network boundary
+            raise provider_request_error("openai", exc) from exc
+
+        yield AIStreamChunk(meta=AIResponseMeta(provider="openai", model=model, usage=usage, timing=timing))
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return (
+            await self.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        ).data
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core import json_codec
+from app.domain.ai.providers.base import AIStreamChunk, AsyncStructuredAIProvider
+from app.domain.ai.providers.json_repair import JSON_REPAIR_KINDS, repair_json_text
+
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield the ``data`` payload of each server-sent event, joining multi-line data fields."""
+    data_lines: list[str] = []
+    async for line in lines:
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(":")
+        if name != "data":
+            continue
+        data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def open_provider_stream(
+    provider: AsyncStructuredAIProvider,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+) -> AsyncIterator[AIStreamChunk]:
+    """Open the provider's native stream, or replay a buffered response as a two-chunk stream."""
+    stream = getattr(provider, "stream_json_text", None)
+    if callable(stream):
+        return stream(system_prompt=system_prompt, user_prompt=user_prompt)
+    return _buffered_stream(provider, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+async def _buffered_stream(
+    provider: AsyncStructuredAIProvider,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+) -> AsyncIterator[AIStreamChunk]:
+    # 스트리밍을 지원하지 않는 공급자는 완성된 응답을 한 청크로 흘려보낸다.
+    response = await provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    yield AIStreamChunk(text=json_codec.dumps_str(response.data))
+    yield AIStreamChunk(meta=response.meta)
+
+
+class JSONStringFieldExtractor:
+    """Incrementally pull one top-level string field out of a JSON object that is still arriving.
+
+    ``feed`` accepts raw model output in arbitrary chunk boundaries and returns only the newly
+    decoded characters of the target field's value, so a chat reply can be forwarded as soon as
+    the model writes it rather than after the closing brace.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.complete = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._string_is_key = False
+        self._capturing = False
+        self._expect_key = False
+        self._key_buffer: list[str] = []
+        self._last_key: str | None = None
+        self._awaiting_value = False
+        self._escape: str | None = None
+        self._high_surrogate: int | None = None
+
+    def feed(self, chunk: str) -> str:
+        emitted: list[str] = []
+        for char in chunk:
+            if not self._started:
+                # 코드펜스 등 JSON 앞의 잡음은 첫 '{' 전까지 무시한다.
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+            if self._in_string:
+                self._consume_string_char(char, emitted)
+                continue
+            self._consume_structural_char(char)
+        return "".join(emitted)
+
+    def _consume_structural_char(self, char: str) -> None:
+        if char == '"':
+            self._in_string = True
+            self._string_is_key = self._depth == 1 and self._expect_key
+            self._capturing = (
+                self._depth == 1
+                and self._awaiting_value
+                and self._last_key == self.field
+                and not self.complete
+            )
+            self._awaiting_value = False
+            if self._string_is_key:
+                self._key_buffer = []
+            return
+        if char in "{[":
+            self._depth += 1
+            self._awaiting_value = False
+        elif char in "}]":
+            self._depth -= 1
+        elif char == ":" and self._depth == 1:
+            self._awaiting_value = True
+            self._expect_key = False
+        elif char == "," and self._depth == 1:
+            self._expect_key = True
+            self._awaiting_value = False
+        elif not char.isspace():
+            self._awaiting_value = False
+
+    def _consume_string_char(self, char: str, emitted: list[str]) -> None:
+        if self._escape is not None:
+            self._consume_escape_char(char, emitted)
+            return
+        if char == "\\":
+            self._escape = ""
+            return
+        if char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._key_buffer)
+            if self._capturing:
+                self._capturing = False
+                self.complete = True
+            return
+        self._append(char, emitted)
+
+    def _consume_escape_char(self, char: str, emitted: list[str]) -> None:
+        pending = self._escape or ""
+        if not pending:
+            if char == "u":
+                self._escape = "u"
+                return
+            self._escape = None
+            self._append(_SIMPLE_ESCAPES.get(char, char), emitted)
+            return
+        pending += char
+        if len(pending) < 5:
+            self._escape = pending
+            return
+        self._escape = None
+        try:
+            code = int(pending[1:], 16)
+        except ValueError:
+            return
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._append(chr(code), emitted)
+
+    def _append(self, char: str, emitted: list[str]) -> None:
+        if self._string_is_key:
+            self._key_buffer.append(char)
+        elif self._capturing:
+            emitted.append(char)
+
+
+@dataclass(frozen=True)
+class JSONItemEvent:
+    field: str
+    index: int
+    value: Any
+
+
+class StreamingJSONItemParser:
+    """Incremental parser that emits each finished element of selected top-level arrays.
+
+    Only the element currently being generated is buffered; once it closes it is decoded, handed
+    out as a ``JSONItemEvent`` and its text dropped. Everything outside the selected arrays is kept
+    as a small skeleton that ``close`` decodes, with the selected arrays left empty.
+
+    Text that strict decoding rejects goes through ``repair_json_text``: an item with a trailing
+    comma or raw control character is repaired on its own, and a stream cut off mid-document keeps
+    the items already emitted while the unfinished item is dropped and the skeleton closed.
+    The repairs applied are listed in ``repairs``.
+    """
+
+    def __init__(self, item_fields: Iterable[str], *, max_item_chars: int = 64_000) -> None:
+        self.item_fields = frozenset(item_fields)
+        self.max_item_chars = max(1, int(max_item_chars))
+        self.seen_item_fields: set[str] = set()
+        self._skeleton: list[str] = []
+        self._item: list[str] = []
+        self._item_open = False
+        self._item_field: str | None = None
+        self._item_index = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_chars: list[str] | None = None
+        self._last_key: str | None = None
+        self._awaiting_value = False
+        # 값까지 다 도착한 최상위 키(도착 순서)와 그 끝 위치의 skeleton 길이
+        self.completed_keys: list[str] = []
+        self._completed_end = 0
+        self._member_open = False
+        self._repairs: set[str] = set()
+
+    @property
+    def repairs(self) -> tuple[str, ...]:
+        return tuple(kind for kind in JSON_REPAIR_KINDS if kind in self._repairs)
+
+    def feed(self, chunk: str) -> list[JSONItemEvent]:
+        events: list[JSONItemEvent] = []
+        for char in chunk:
+            if self._done:
+                # 닫는 '}' 뒤의 코드펜스/공백은 버린다.
+                break
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._expect_key = True
+                    self._skeleton.append(char)
+                continue
+            if self._in_string:
+                self._consume_string_char(char, events)
+            else:
+                self._consume_structural_char(char, events)
+        return events
+
+    def close(self) -> dict[str, Any]:
+        if not self._started:
+            raise ValueError("streaming_json_incomplete")
+        skeleton = "".join(self._skeleton)
+        if not self._done:
+            # 잘린 스트림: 이미 내보낸 항목은 두고, 끝나지 않은 항목은 버린 뒤 skeleton을 닫는다.
+            self._item = []
+            self._item_open = False
+            parsed = self._repaired(skeleton, "streaming_json_incomplete")
+        else:
+            try:
+                parsed = json_codec.loads(skeleton)
+            except ValueError as exc:
+                parsed = self._repaired(skeleton, str(exc))
+        if not isinstance(parsed, dict):
+            raise ValueError("ai_response_not_object")
+        return parsed
+
+    def completed(self) -> dict[str, Any]:
+        """Decodes the top-level members in ``completed_keys`` while the object is still streaming."""
+        if self._done:
+            return self.close()
+        if not self.completed_keys:
+            return {}
+        return json_codec.loads("".join(self._skeleton[: self._completed_end]) + "}")
+
+    def _complete_member(self) -> None:
+        # 문자열/배열/객체 값은 닫히는 즉시, 숫자와 리터럴은 뒤따르는 ','나 '}'에서 끝난 것으로 본다.
+        if self._member_open and self._last_key is not None:
+            self._member_open = False
+            self.completed_keys.append(self._last_key)
+            self._completed_end = len(self._skeleton)
+
+    def _consume_string_char(self, char: str, events: list[JSONItemEvent]) -> None:
+        self._write(char)
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._key_chars is not None:
+                self._last_key = json_codec.loads('"' + "".join(self._key_chars) + '"')
+                self._key_chars = None
+            elif self._item_open and self._depth == 2:
+                self._flush_item(events)
+            elif self._depth == 1:
+                self._complete_member()
+            return
+        if self._key_chars is not None:
+            self._key_chars.append(char)
+
+    def _consume_structural_char(self, char: str, events: list[JSONItemEvent]) -> None:
+        in_item_array = self._item_field is not None and self._depth == 2
+        if char.isspace():
+            self._write(char)
+            return
+        if char == "," and in_item_array:
+            if self._item_open:
+                self._flush_item(events)
+            return
+        if char == "]" and in_item_array:
+            if self._item_open:
+                self._flush_item(events)
+            self._skeleton.append(char)
+            self._item_field = None
+            self._depth = 1
+            self._complete_member()
+            return
+        if (
+            char == "["
+            and self._depth == 1
+            and self._awaiting_value
+            and self._last_key in self.item_fields
+        ):
+            self._item_field = self._last_key
+            self._item_index = 0
+            self.seen_item_fields.add(self._last_key)
+            self._skeleton.append(char)
+            self._depth = 2
+            self._awaiting_value = False
+            return
+
+        if in_item_array and not self._item_open:
+            self._item_open = True
+        if char in ",}" and self._depth == 1:
+            self._complete_member()
+        self._write(char)
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect_key:
+                self._key_chars = []
+            self._awaiting_value = False
+        elif char in "{[":
+            self._depth += 1
+            self._awaiting_value = False
+        elif char in "}]":
+            self._depth -= 1
+            if self._item_open and self._depth == 2:
+                self._flush_item(events)
+            elif self._depth == 1:
+                self._complete_member()
+            elif self._depth == 0:
+                self._done = True
+        elif char == ":" and self._depth == 1:
+            self._awaiting_value = True
+            self._expect_key = False
+            self._member_open = True
+        elif char == "," and self._depth == 1:
+            self._expect_key = True
+        else:
+            self._awaiting_value = False
+
+    def _repaired(self, text: str, error: str) -> Any:
+        # 수선해도 못 읽으면 원래 오류 문구로 실패해 schema_mismatch 재생성으로 간다.
+        try:
+            repaired, applied = repair_json_text(text)
+            value = json_codec.loads(repaired)
+        except ValueError:
+            raise ValueError(error) from None
+        self._repairs.update(applied)
+        return value
+
+    def _write(self, char: str) -> None:
+        if self._item_open:
+            self._item.append(char)
+            if len(self._item) > self.max_item_chars:
+                raise ValueError(f"streaming_json_item_too_large:{self._item_field}")
+        elif self._item_field is None:
+            self._skeleton.append(char)
+
+    def _flush_item(self, events: list[JSONItemEvent]) -> None:
+        field = self._item_field or ""
+        text = "".join(self._item)
+        self._item = []
+        self._item_open = False
+        try:
+            value = json_codec.loads(text)
+        except ValueError as exc:
+            error = f"streaming_json_item_invalid:{field}[{self._item_index}]:{exc}"
+            if not text.lstrip().startswith("{"):
+                raise ValueError(error) from exc
+            value = self._repaired(text, error)
+        events.append(JSONItemEvent(field=field, index=self._item_index, value=value))
+        self._item_index += 1
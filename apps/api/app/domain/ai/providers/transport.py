@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import http.client
+import ssl
+from threading import Lock
+import time
+from typing import Any
+from urllib import parse
+
+from app.domain.ai.providers.base import AITransportTiming
+
+
+_READ_CHUNK_BYTES = 64 * 1024
+
+# 재사용한 keep-alive 연결이 서버 측에서 이미 닫혀 있을 때 나타나는 예외들.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+@dataclass(frozen=True)
+class TransportResponse:
+    status: int
+    reason: str
+    headers: dict[str, str]
+    body: bytes
+    timing: AITransportTiming
+
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+
+class TransportHTTPError(RuntimeError):
+    """Non-2xx provider response. The message keeps the urllib wording for failure classification."""
+
+    def __init__(
+        self,
+        *,
+        status: int,
+        reason: str,
+        headers: dict[str, str],
+        body: bytes,
+        timing: AITransportTiming | None = None,
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.timing = timing
+        super().__init__(f"HTTP Error {status}: {reason}")
+
+
+@dataclass
+class _PooledConnection:
+    conn: http.client.HTTPConnection
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def parse_transport_url(url: str) -> tuple[str, str, int, str]:
+    parsed = parse.urlsplit(url)
+    scheme = (parsed.scheme or "https").lower()
+    if scheme not in {"http", "https"}:
+        raise ValueError(f"unsupported_transport_scheme:{scheme}")
+    host = parsed.hostname or ""
+    if not host:
+        raise ValueError("transport_host_missing")
+    port = parsed.port or (443 if scheme == "https" else 80)
+    path = parsed.path or "/"
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+    return scheme, host, port, path
+
+
+def _arm_socket(sock: Any, deadline: float) -> None:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("request timed out")
+    if sock is not None:
+        sock.settimeout(remaining)
+
+
+def _read_body(response: http.client.HTTPResponse, sock: Any, deadline: float) -> bytes:
+    # 조금씩 흘려보내는 서버가 청크마다 timeout을 새로 얻지 못하도록 남은 시간으로 매번 다시 건다.
+    chunks: list[bytes] = []
+    while True:
+        _arm_socket(sock, deadline)
+        chunk = response.read1(_READ_CHUNK_BYTES)
+        if not chunk:
+            # read1()은 길이만큼 다 읽어도 응답을 닫지 않으므로 read()로 마무리해야 연결을 다시 쓸 수 있다.
+            response.read()
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class PooledHTTPTransport:
+    """Thread-safe keep-alive connection pool shared by the HTTP providers.
+
+    Idle connections are kept per (scheme, host, port) up to ``max_connections_per_host``
+    and evicted once they sit unused for ``idle_timeout_sec``. Callers beyond the pool size
+    still get a fresh connection; it is simply closed instead of returned. ``timeout`` on a
+    request bounds the whole exchange, not each socket operation.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections_per_host: int = 8,
+        idle_timeout_sec: float = 60.0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.max_connections_per_host = max(1, int(max_connections_per_host))
+        self.idle_timeout_sec = max(0.0, float(idle_timeout_sec))
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._pools: dict[tuple[str, str, int], deque[_PooledConnection]] = {}
+        self._lock = Lock()
+        self._created = 0
+        self._reused = 0
+        self._evicted = 0
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = 30.0,
+    ) -> TransportResponse:
+        scheme, host, port, path = parse_transport_url(url)
+        key = (scheme, host, port)
+        request_headers = {"Connection": "keep-alive", **(headers or {})}
+
+        pooled = self._checkout(key)
+        try:
+            return self._send(key, pooled, method, path, body, request_headers, timeout)
+        except _STALE_CONNECTION_ERRORS:
+            if pooled is None:
+                raise
+            # 풀에서 꺼낸 연결이 끊겨 있었던 경우에만 새 연결로 한 번 더 보낸다.
+            return self._send(key, None, method, path, body, request_headers, timeout)
+
+    def prewarm(self, url: str, *, connections: int = 1, timeout: float = 10.0) -> int:
+        scheme, host, port, _ = parse_transport_url(url)
+        key = (scheme, host, port)
+        opened = 0
+        for _ in range(max(0, int(connections))):
+            with self._lock:
+                if len(self._pools.get(key, ())) >= self.max_connections_per_host:
+                    break
+            conn = self._new_connection(key, timeout)
+            try:
+                conn.connect()
+            except OSError:
+                conn.close()
+                break
+            self._checkin(key, _PooledConnection(conn=conn))
+            opened += 1
+        return opened
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            for pooled in pool:
+                pooled.conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            idle = {f"{scheme}://{host}:{port}": len(pool) for (scheme, host, port), pool in self._pools.items()}
+            return {
+                "idle_connections": idle,
+                "created": self._created,
+                "reused": self._reused,
+                "evicted": self._evicted,
+            }
+
+    def _send(
+        self,
+        key: tuple[str, str, int],
+        pooled: _PooledConnection | None,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> TransportResponse:
+        started = time.perf_counter()
+        # 소켓 timeout은 연산마다 다시 시작하므로, 연결부터 본문 끝까지의 전체 마감을 따로 둔다.
+        deadline = time.monotonic() + timeout
+        reused = pooled is not None
+        if pooled is None:
+            conn = self._new_connection(key, timeout)
+            try:
+                conn.connect()
+            except Exception:
+                conn.close()
+                raise
+            pooled = _PooledConnection(conn=conn)
+            connected = time.perf_counter()
+        else:
+            pooled.conn.timeout = timeout
+            connected = started
+
+        conn = pooled.conn
+        # 응답이 Connection: close면 getresponse()가 conn.sock을 비우므로 미리 잡아 둔다.
+        sock = conn.sock
+        try:
+            _arm_socket(sock, deadline)
+            conn.request(method, path, body=body, headers=headers)
+            _arm_socket(sock, deadline)
+            response = conn.getresponse()
+            first_byte = time.perf_counter()
+            payload = _read_body(response, sock, deadline)
+        except Exception:
+            conn.close()
+            raise
+        finished = time.perf_counter()
+
+        timing = AITransportTiming(
+            connect_ms=round((connected - started) * 1000, 2),
+            ttfb_ms=round((first_byte - connected) * 1000, 2),
+            read_ms=round((finished - first_byte) * 1000, 2),
+            connection_reused=reused,
+        )
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+
+        if response.will_close:
+            conn.close()
+        else:
+            pooled.last_used = time.monotonic()
+            self._checkin(key, pooled)
+
+        if response.status >= 400:
+            raise TransportHTTPError(
+                status=response.status,
+                reason=response.reason,
+                headers=response_headers,
+                body=payload,
+                timing=timing,
+            )
+        return TransportResponse(
+            status=response.status,
+            reason=response.reason,
+            headers=response_headers,
+            body=payload,
+            timing=timing,
+        )
+
+    def _new_connection(self, key: tuple[str, str, int], timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._lock:
+            self._created += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: tuple[str, str, int]) -> _PooledConnection | None:
+        expired: list[_PooledConnection] = []
+        found: _PooledConnection | None = None
+        now = time.monotonic()
+        with self._lock:
+            pool = self._pools.get(key)
+            while pool:
+                candidate = pool.pop()
+                if now - candidate.last_used > self.idle_timeout_sec:
+                    expired.append(candidate)
+                    continue
+                found = candidate
+                self._reused += 1
+                break
+            # 가장 오래 쉰 연결부터 왼쪽에 쌓이므로 남은 만료 연결도 함께 정리한다.
+            while pool and now - pool[0].last_used > self.idle_timeout_sec:
+                expired.append(pool.popleft())
+            self._evicted += len(expired)
+        for item in expired:
+            item.conn.close()
+        return found
+
+    def _checkin(self, key: tuple[str, str, int], pooled: _PooledConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) < self.max_connections_per_host:
+                pool.append(pooled)
+                return
+        pooled.conn.close()
+
+
+_shared_transports: dict[tuple[int, float], PooledHTTPTransport] = {}
+_shared_transports_lock = Lock()
+
+
+def get_shared_transport(
+    *,
+    max_connections_per_host: int = 8,
+    idle_timeout_sec: float = 60.0,
+) -> PooledHTTPTransport:
+    key = (max(1, int(max_connections_per_host)), max(0.0, float(idle_timeout_sec)))
+    with _shared_transports_lock:
+        transport = _shared_transports.get(key)
+        if transport is None:
+            transport = PooledHTTPTransport(
+                max_connections_per_host=key[0],
+                idle_timeout_sec=key[1],
+            )
+            _shared_transports[key] = transport
+        return transport
@@ -0,0 +1,292 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import math
+from pathlib import Path
+import sqlite3
+from threading import Lock
+import time
+from typing import Any
+
+from app.domain.ai.providers.base import AIUsageMeta
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    capacity: float
+    refill_per_sec: float
+
+    @classmethod
+    def per_minute(cls, tokens_per_min: int, burst_tokens: int) -> "BucketSpec | None":
+        if tokens_per_min <= 0:
+            return None
+        return cls(capacity=float(max(tokens_per_min, burst_tokens)), refill_per_sec=tokens_per_min / 60.0)
+
+
+@dataclass(frozen=True)
+class QuotaReservation:
+    keys: tuple[tuple[str, BucketSpec], ...]
+    tokens: int
+
+
+class QuotaExceededError(RuntimeError):
+    """A learner or tenant bucket cannot cover the estimated tokens of the call yet."""
+
+    def __init__(self, scope: str, retry_after_ms: int) -> None:
+        # classify_ai_failure는 타입으로 rate_limited(429)로 분류한다. 문구의 "quota"는 감싼 예외 문자열만 남을 때를 위한 것이다.
+        super().__init__(f"ai_quota_exceeded:{scope}")
+        self.scope = scope
+        self.retry_after_ms = retry_after_ms
+        self.retry_after_sec = max(1, math.ceil(retry_after_ms / 1000))
+
+
+def usage_tokens(usage: AIUsageMeta | None) -> int | None:
+    if usage is None:
+        return None
+    if usage.total_tokens is not None:
+        return usage.total_tokens
+    if usage.input_tokens is None and usage.output_tokens is None:
+        return None
+    return (usage.input_tokens or 0) + (usage.output_tokens or 0)
+
+
+def _refilled(level: float, updated_at: float, spec: BucketSpec, now: float) -> float:
+    return min(spec.capacity, level + max(0.0, now - updated_at) * spec.refill_per_sec)
+
+
+def _wait_ms(level: float, needed: float, spec: BucketSpec) -> int:
+    return math.ceil((needed - level) / spec.refill_per_sec * 1000)
+
+
+class _MemoryBuckets:
+    def __init__(self) -> None:
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = Lock()
+
+    def take(self, charges: list[tuple[str, BucketSpec]], tokens: int, now: float) -> tuple[str, int] | None:
+        """Takes ``tokens`` from every bucket, or none of them; returns the blocking key and wait."""
+        with self._lock:
+            levels = {
+                key: _refilled(*self._buckets.get(key, (spec.capacity, now)), spec, now)
+                for key, spec in charges
+            }
+            blocked = _first_blocked(charges, levels, tokens)
+            if blocked is not None:
+                return blocked
+            for key, _spec in charges:
+                self._buckets[key] = (levels[key] - tokens, now)
+            return None
+
+    def adjust(self, charges: tuple[tuple[str, BucketSpec], ...], delta: int, now: float) -> None:
+        with self._lock:
+            for key, spec in charges:
+                level = _refilled(*self._buckets.get(key, (spec.capacity, now)), spec, now)
+                self._buckets[key] = (min(spec.capacity, level + delta), now)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class _SharedBuckets:
+    """Buckets in a SQLite file so every worker process charges the same learner/tenant.
+
+    Each take runs in one ``BEGIN IMMEDIATE`` transaction, which serializes concurrent
+    writers across processes. Levels use wall-clock time so that all workers agree.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_quota_buckets (key TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _levels(self, charges: list[tuple[str, BucketSpec]] | tuple[tuple[str, BucketSpec], ...], now: float) -> dict[str, float]:
+        levels: dict[str, float] = {}
+        for key, spec in charges:
+            row = self._conn.execute("SELECT level, updated_at FROM ai_quota_buckets WHERE key = ?", (key,)).fetchone()
+            levels[key] = _refilled(*(row or (spec.capacity, now)), spec, now)
+        return levels
+
+    def _write(self, levels: dict[str, float], now: float) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO ai_quota_buckets (key, level, updated_at) VALUES (?, ?, ?)",
+            [(key, level, now) for key, level in levels.items()],
+        )
+
+    def take(self, charges: list[tuple[str, BucketSpec]], tokens: int, now: float) -> tuple[str, int] | None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._levels(charges, now)
+                blocked = _first_blocked(charges, levels, tokens)
+                if blocked is None:
+                    self._write({key: level - tokens for key, level in levels.items()}, now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return blocked
+
+    def adjust(self, charges: tuple[tuple[str, BucketSpec], ...], delta: int, now: float) -> None:
+        specs = dict(charges)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._levels(charges, now)
+                self._write({key: min(specs[key].capacity, level + delta) for key, level in levels.items()}, now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def size(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM ai_quota_buckets").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _first_blocked(
+    charges: list[tuple[str, BucketSpec]],
+    levels: dict[str, float],
+    tokens: int,
+) -> tuple[str, int] | None:
+    worst: tuple[str, int] | None = None
+    for key, spec in charges:
+        # 버킷 용량보다 큰 호출도 가득 찬 버킷이면 통과시키고, 초과분은 빚으로 남겨 다음 호출을 늦춘다.
+        needed = min(float(tokens), spec.capacity)
+        if levels[key] < needed:
+            wait = _wait_ms(levels[key], needed, spec)
+            if worst is None or wait > worst[1]:
+                worst = (key, wait)
+    return worst
+
+
+class TokenQuota:
+    """Token buckets per learner and per tenant, charged in LLM tokens.
+
+    ``reserve`` takes an up-front estimate from every bucket that applies (all or nothing) and
+    raises QuotaExceededError with the exact time until the emptiest bucket refills enough.
+    ``settle`` replaces the estimate with the provider-reported usage, or refunds it when the
+    call failed before any usage came back. Calls without a learner or tenant id are not metered.
+    """
+
+    def __init__(
+        self,
+        *,
+        user: BucketSpec | None = None,
+        tenant: BucketSpec | None = None,
+        path: str = "",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.user = user
+        self.tenant = tenant
+        self._clock = clock
+        self._buckets: _MemoryBuckets | _SharedBuckets = _SharedBuckets(path) if path else _MemoryBuckets()
+        self._counters = {
+            "reserved": 0,
+            "rejected": 0,
+            "settled": 0,
+            "refunded": 0,
+            "estimated_tokens": 0,
+            "actual_tokens": 0,
+            "backend_errors": 0,
+        }
+        self._lock = Lock()
+
+    def _charges(self, user_id: str | None, tenant_id: str | None) -> list[tuple[str, BucketSpec]]:
+        charges: list[tuple[str, BucketSpec]] = []
+        if user_id and self.user is not None:
+            charges.append((f"user:{user_id}", self.user))
+        if tenant_id and self.tenant is not None:
+            charges.append((f"tenant:{tenant_id}", self.tenant))
+        return charges
+
+    def reserve(self, *, user_id: str | None, tenant_id: str | None, tokens: int) -> QuotaReservation | None:
+        charges = self._charges(user_id, tenant_id)
+        if not charges:
+            return None
+        tokens = max(1, int(tokens))
+        try:
+            blocked = self._buckets.take(charges, tokens, self._clock())
+        except sqlite3.Error:
+            # 공유 저장소 장애로 요청을 막지는 않는다.
+            self._count("backend_errors")
+            return None
+        if blocked is not None:
+            self._count("rejected")
+            key, wait_ms = blocked
+            raise QuotaExceededError(key.split(":", 1)[0], wait_ms)
+        with self._lock:
+            self._counters["reserved"] += 1
+            self._counters["estimated_tokens"] += tokens
+        return QuotaReservation(keys=tuple(charges), tokens=tokens)
+
+    def settle(self, reservation: QuotaReservation | None, usage: AIUsageMeta | None, *, failed: bool = False) -> None:
+        if reservation is None:
+            return
+        actual = usage_tokens(usage)
+        if actual is None and not failed:
+            # 사용량을 모르면 추정치를 그대로 확정한다.
+            actual = reservation.tokens
+        refund = reservation.tokens - (actual or 0)
+        try:
+            if refund:
+                self._buckets.adjust(reservation.keys, refund, self._clock())
+        except sqlite3.Error:
+            self._count("backend_errors")
+        with self._lock:
+            self._counters["refunded" if actual is None else "settled"] += 1
+            self._counters["actual_tokens"] += actual or 0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict[str, Any]:
+        try:
+            buckets = self._buckets.size()
+        except sqlite3.Error:
+            buckets = -1
+        with self._lock:
+            estimated = self._counters["estimated_tokens"]
+            return {
+                "backend": "shared" if isinstance(self._buckets, _SharedBuckets) else "memory",
+                "buckets": buckets,
+                **self._counters,
+                # 1보다 크면 추정이 실제보다 작다는 뜻이다.
+                "actual_to_estimate": round(self._counters["actual_tokens"] / estimated, 4) if estimated else 0.0,
+            }
+
+    def close(self) -> None:
+        if isinstance(self._buckets, _SharedBuckets):
+            self._buckets.close()
+
+
+_shared_quota: TokenQuota | None = None
+_shared_config: tuple[Any, ...] | None = None
+_shared_lock = Lock()
+
+
+def get_shared_token_quota(*, user: BucketSpec | None, tenant: BucketSpec | None, path: str = "") -> TokenQuota:
+    # 동기/비동기 서비스가 같은 버킷을 차감하도록 프로세스에 하나만 둔다.
+    global _shared_quota, _shared_config
+    config = (user, tenant, path)
+    with _shared_lock:
+        if _shared_quota is None or _shared_config != config:
+            if _shared_quota is not None:
+                _shared_quota.close()
+            _shared_quota = TokenQuota(user=user, tenant=tenant, path=path)
+            _shared_config = config
+        return _shared_quota
+
+
+def token_quota_stats() -> dict[str, Any]:
+    with _shared_lock:
+        quota = _shared_quota
+    return quota.stats() if quota is not None else {}
@@ -0,0 +1,275 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+import hashlib
+from pathlib import Path
+import sqlite3
+from threading import Lock
+import time
+from typing import Any
+
+
+def response_cache_key(provider: str, model: str, prompt_version: str, system_prompt: str, user_prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (provider, model, prompt_version, system_prompt, user_prompt):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    payload: bytes
+    pipeline: str
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        # 키(64자 hex)와 객체 오버헤드를 대략 더해 예산을 잡는다.
+        return len(self.payload) + 128
+
+
+@dataclass
+class _PipelineCounters:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+
+class _DiskTier:
+    """SQLite file shared by every worker process; survives restarts.
+
+    Expiry uses wall-clock time so that all processes agree on it. Pruning runs every
+    ``prune_every`` writes and drops expired rows first, then least recently read ones.
+    """
+
+    def __init__(self, path: str, *, max_bytes: int, prune_every: int = 64) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max(0, int(max_bytes))
+        self._prune_every = max(1, int(prune_every))
+        self._writes = 0
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+            "key TEXT PRIMARY KEY, pipeline TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ai_response_cache_accessed ON ai_response_cache (accessed_at)")
+
+    def get(self, key: str, now: float) -> tuple[bytes, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM ai_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE ai_response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(row[0]), float(row[1])
+
+    def put(self, key: str, pipeline: str, payload: bytes, expires_at: float, now: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_response_cache (key, pipeline, expires_at, accessed_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, pipeline, expires_at, now, payload),
+            )
+            self._writes += 1
+            if self._writes % self._prune_every == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (now,))
+        while True:
+            total = self._conn.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM ai_response_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            self._conn.execute(
+                "DELETE FROM ai_response_cache WHERE key IN "
+                "(SELECT key FROM ai_response_cache ORDER BY accessed_at LIMIT 32)"
+            )
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM ai_response_cache"
+            ).fetchone()
+        return {"entries": int(entries), "bytes": int(size), "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_response_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Byte-budgeted LRU of serialized AI responses with per-pipeline TTLs.
+
+    Pipelines without a positive TTL are never cached. With ``path`` set, entries are also
+    written to a SQLite file so that other workers and later restarts can reuse them; disk
+    errors only disable that tier for the call, they never fail the request.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: dict[str, int] | None = None,
+        path: str = "",
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttls = {name: int(value) for name, value in (ttls or {}).items()}
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._pipelines: dict[str, _PipelineCounters] = {}
+        self._counters = {"evictions": 0, "expirations": 0, "disk_hits": 0, "disk_errors": 0}
+        self._lock = Lock()
+        self._disk = _DiskTier(path, max_bytes=disk_max_bytes) if path else None
+
+    def ttl_for(self, pipeline: str) -> int:
+        return max(0, self.ttls.get(pipeline, 0))
+
+    def get(self, key: str, pipeline: str) -> bytes | None:
+        now = self._clock()
+        with self._lock:
+            counters = self._pipelines.setdefault(pipeline, _PipelineCounters())
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._drop(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                counters.hits += 1
+                return entry.payload
+        found = self._disk_get(key, now)
+        with self._lock:
+            if found is None:
+                counters.misses += 1
+                return None
+            payload, expires_at = found
+            counters.hits += 1
+            self._counters["disk_hits"] += 1
+            self._insert(key, _Entry(payload=payload, pipeline=pipeline, expires_at=expires_at))
+            return payload
+
+    def put(self, key: str, pipeline: str, payload: bytes) -> None:
+        ttl = self.ttl_for(pipeline)
+        if ttl <= 0:
+            return
+        now = self._clock()
+        expires_at = now + ttl
+        with self._lock:
+            self._pipelines.setdefault(pipeline, _PipelineCounters()).stores += 1
+            self._insert(key, _Entry(payload=payload, pipeline=pipeline, expires_at=expires_at))
+        if self._disk is not None:
+            try:
+                self._disk.put(key, pipeline, payload, expires_at, now)
+            except sqlite3.Error:
+                with self._lock:
+                    self._counters["disk_errors"] += 1
+
+    def _disk_get(self, key: str, now: float) -> tuple[bytes, float] | None:
+        if self._disk is None:
+            return None
+        try:
+            return self._disk.get(key, now)
+        except sqlite3.Error:
+            with self._lock:
+                self._counters["disk_errors"] += 1
+            return None
+
+    def _insert(self, key: str, entry: _Entry) -> None:
+        self._drop(key)
+        if entry.size > self.max_bytes:
+            # 예산보다 큰 응답은 메모리에 두지 않는다(디스크 계층에는 남는다).
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits = sum(counters.hits for counters in self._pipelines.values())
+            lookups = hits + sum(counters.misses for counters in self._pipelines.values())
+            stats: dict[str, Any] = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                **self._counters,
+                "pipelines": {
+                    pipeline: {
+                        "hits": counters.hits,
+                        "misses": counters.misses,
+                        "stores": counters.stores,
+                        "ttl_sec": self.ttl_for(pipeline),
+                    }
+                    for pipeline, counters in self._pipelines.items()
+                },
+            }
+        if self._disk is not None:
+            try:
+                stats["disk"] = self._disk.stats()
+            except sqlite3.Error:
+                stats["disk"] = {}
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+
+_shared_cache: ResponseCache | None = None
+_shared_config: tuple[Any, ...] | None = None
+_shared_lock = Lock()
+
+
+def get_shared_response_cache(
+    *,
+    max_bytes: int,
+    ttls: dict[str, int],
+    path: str = "",
+    disk_max_bytes: int = 256 * 1024 * 1024,
+) -> ResponseCache:
+    # 동기/비동기 서비스와 채팅 라우트가 같은 캐시를 쓰도록 프로세스에 하나만 둔다.
+    global _shared_cache, _shared_config
+    config = (int(max_bytes), tuple(sorted(ttls.items())), path, int(disk_max_bytes))
+    with _shared_lock:
+        if _shared_cache is None or _shared_config != config:
+            if _shared_cache is not None:
+                _shared_cache.close()
+            _shared_cache = ResponseCache(max_bytes=max_bytes, ttls=ttls, path=path, disk_max_bytes=disk_max_bytes)
+            _shared_config = config
+        return _shared_cache
+
+
+def response_cache_stats() -> dict[str, Any]:
+    with _shared_lock:
+        cache = _shared_cache
+    return cache.stats() if cache is not None else {}
@@ -0,0 +1,319 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+from threading import Lock
+import time
+from typing import Any
+
+from app.domain.ai.providers.base import (
+    AIResponseMeta,
+    AIRouteMeta,
+    AIStreamChunk,
+    AsyncStructuredAIProvider,
+    StructuredAIProvider,
+    StructuredAIResponse,
+)
+from app.domain.ai.providers.common import is_outage_error
+from app.domain.ai.providers.streaming import open_provider_stream
+
+
+@dataclass
+class _TargetHealth:
+    latency_sec: float | None = None
+    error_rate: float = 0.0
+    last_observed_at: float = 0.0
+    calls: int = 0
+    failures: int = 0
+
+
+class RouteHealth:
+    """EWMA latency / error-rate book-keeping shared by the sync and async routers.
+
+    Targets are ranked by ``ewma_latency + error_rate * failure_penalty_sec``, so a failure
+    costs about as much as the failover it forces. The error rate decays toward zero while a
+    target is idle (``recovery_half_life_sec``), so a demoted target gets tried again once
+    it has had time to recover.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        *,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        failure_penalty_sec: float = 5.0,
+        recovery_half_life_sec: float = 30.0,
+    ) -> None:
+        self.names = list(names)
+        self.alpha = min(1.0, max(0.01, float(alpha)))
+        self.max_error_rate = min(1.0, max(0.0, float(max_error_rate)))
+        self.failure_penalty_sec = max(0.0, float(failure_penalty_sec))
+        self.recovery_half_life_sec = max(0.001, float(recovery_half_life_sec))
+        self._health = {name: _TargetHealth() for name in self.names}
+        self._lock = Lock()
+
+    def order(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            ranked = []
+            for position, name in enumerate(self.names):
+                health = self._health[name]
+                error_rate = self._decayed_error_rate(health, now)
+                # 아직 지연 표본이 없는 대상은 0초로 보고 먼저 한 번 써 본다.
+                cost = (health.latency_sec or 0.0) + error_rate * self.failure_penalty_sec
+                ranked.append((error_rate >= self.max_error_rate, cost, position, name))
+        return [name for *_, name in sorted(ranked)]
+
+    def observe_success(self, name: str, latency_sec: float) -> None:
+        with self._lock:
+            health = self._health[name]
+            latency = max(0.0, float(latency_sec))
+            if health.latency_sec is None:
+                health.latency_sec = latency
+            else:
+                health.latency_sec += self.alpha * (latency - health.latency_sec)
+            self._observe(health, failed=False)
+
+    def observe_failure(self, name: str) -> None:
+        with self._lock:
+            health = self._health[name]
+            health.failures += 1
+            self._observe(health, failed=True)
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            snapshot: dict[str, Any] = {}
+            for name in self.names:
+                health = self._health[name]
+                error_rate = self._decayed_error_rate(health, now)
+                snapshot[name] = {
+                    "ewma_latency_ms": None if health.latency_sec is None else round(health.latency_sec * 1000, 2),
+                    "error_rate": round(error_rate, 4),
+                    "healthy": error_rate < self.max_error_rate,
+                    "calls": health.calls,
+                    "failures": health.failures,
+                }
+            return snapshot
+
+    def _observe(self, health: _TargetHealth, *, failed: bool) -> None:
+        now = time.monotonic()
+        current = self._decayed_error_rate(health, now)
+        health.error_rate = current + self.alpha * ((1.0 if failed else 0.0) - current)
+        health.last_observed_at = now
+        health.calls += 1
+
+    def _decayed_error_rate(self, health: _TargetHealth, now: float) -> float:
+        if health.calls == 0:
+            return 0.0
+        idle = max(0.0, now - health.last_observed_at)
+        return health.error_rate * 0.5 ** (idle / self.recovery_half_life_sec)
+
+
+def _with_route(response: StructuredAIResponse, target: str, failovers: list[str]) -> StructuredAIResponse:
+    route = AIRouteMeta(target=target, failovers=tuple(failovers))
+    return StructuredAIResponse(data=response.data, meta=replace(response.meta, route=route))
+
+
+def _route_exhausted(last_exc: BaseException) -> RuntimeError:
+    return RuntimeError(f"ai_route_exhausted:{last_exc}")
+
+
+class ProviderRouter:
+    """Structured provider that spreads calls over several configured targets.
+
+    Each call goes to the healthiest, fastest target first and fails over to the next one
+    on provider errors and timeouts. The target that answered is recorded in ``meta.route``.
+    """
+
+    def __init__(
+        self,
+        targets: dict[str, StructuredAIProvider],
+        *,
+        ewma_alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        recovery_half_life_sec: float = 30.0,
+    ) -> None:
+        if not targets:
+            raise ValueError("ai_router_targets_empty")
+        self.targets = dict(targets)
+        self.health = RouteHealth(
+            list(self.targets),
+            alpha=ewma_alpha,
+            max_error_rate=max_error_rate,
+            recovery_half_life_sec=recovery_half_life_sec,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return self.health.stats()
+
+    def prewarm(self, *, connections: int = 1) -> int:
+        warmed = 0
+        for provider in self.targets.values():
+            prewarm = getattr(provider, "prewarm", None)
+            if callable(prewarm):
+                warmed += int(prewarm(connections=connections))
+        return warmed
+
+    def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        failovers: list[str] = []
+        last_exc: BaseException | None = None
+        for name in self.health.order():
+            started = time.perf_counter()
+            try:
+                response = self.targets[name].generate_json_with_meta(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                )
+            except Exception as exc:
+                if not is_outage_error(exc):
+                    raise
+                self.health.observe_failure(name)
+                failovers.append(name)
+                last_exc = exc
+                continue
+            self.health.observe_success(name, time.perf_counter() - started)
+            return _with_route(response, name, failovers)
+        assert last_exc is not None
+        raise _route_exhausted(last_exc) from last_exc
+
+    def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return self.generate_json_with_meta(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        ).data
+
+
+class AsyncProviderRouter:
+    """asyncio counterpart of ProviderRouter; streams fail over only before their first chunk."""
+
+    def __init__(
+        self,
+        targets: dict[str, AsyncStructuredAIProvider],
+        *,
+        ewma_alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        recovery_half_life_sec: float = 30.0,
+    ) -> None:
+        if not targets:
+            raise ValueError("ai_router_targets_empty")
+        self.targets = dict(targets)
+        self.health = RouteHealth(
+            list(self.targets),
+            alpha=ewma_alpha,
+            max_error_rate=max_error_rate,
+            recovery_half_life_sec=recovery_half_life_sec,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return self.health.stats()
+
+    async def prewarm(self, *, connections: int = 1) -> int:
+        warmed = 0
+        for provider in self.targets.values():
+            prewarm = getattr(provider, "prewarm", None)
+            if callable(prewarm):
+                warmed += int(await prewarm(connections=connections))
+        return warmed
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        failovers: list[str] = []
+        last_exc: BaseException | None = None
+        for name in self.health.order():
+            started = time.perf_counter()
+            try:
+                response = await self.targets[name].generate_json_with_meta(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                )
+            except Exception as exc:
+                if not is_outage_error(exc):
+                    raise
+                self.health.observe_failure(name)
+                failovers.append(name)
+                last_exc = exc
+                continue
+            self.health.observe_success(name, time.perf_counter() - started)
+            return _with_route(response, name, failovers)
+        assert last_exc is not None
+        raise _route_exhausted(last_exc) from last_exc
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return (
+            await self.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        ).data
+
+    async def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        failovers: list[str] = []
+        last_exc: BaseException | None = None
+        for name in self.health.order():
+            started = time.perf_counter()
+            stream = open_provider_stream(
+                self.targets[name],
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+            try:
+                first = await anext(stream)
+            except Exception as exc:
+                await stream.aclose()
+                if not is_outage_error(exc):
+                    raise
+                self.health.observe_failure(name)
+                failovers.append(name)
+                last_exc = exc
+                continue
+
+            # 첫 청크 이후 실패는 이미 일부를 흘려보냈으므로 다른 대상으로 넘기지 않는다.
+            try:
+                chunk: AIStreamChunk | None = first
+                while chunk is not None:
+                    if chunk.meta is not None:
+                        chunk = AIStreamChunk(
+                            text=chunk.text,
+                            meta=replace(chunk.meta, route=AIRouteMeta(target=name, failovers=tuple(failovers))),
+                        )
+                    yield chunk
+                    chunk = await anext(stream, None)
+            except Exception as exc:
+                if is_outage_error(exc):
+                    self.health.observe_failure(name)
+                raise
+            finally:
+                await stream.aclose()
+            self.health.observe_success(name, time.perf_counter() - started)
+            return
+        assert last_exc is not None
+        raise _route_exhausted(last_exc) from last_exc
+
+
+def mark_spillover(meta: AIResponseMeta) -> AIResponseMeta:
+    route = meta.route or AIRouteMeta(target="spillover")
+    return replace(meta, route=replace(route, spillover=True))
@@ -0,0 +1,139 @@
+from collections import deque
+from collections.abc import Iterator
+import math
+from typing import Any, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+# 우선순위가 높은 순서. 대화형 채팅 > 섹션/추론 단계 > 일반 생성 > 배치.
+PRIORITY_CLASSES = ("chat", "sections", "generation", "batch")
+DEFAULT_PRIORITY = "generation"
+DEFAULT_CLASS_WEIGHTS = {"chat": 8.0, "sections": 4.0, "generation": 2.0, "batch": 1.0}
+
+_PIPELINE_CLASSES = {
+    "chat_generate": "chat",
+    "curriculum_sections": "sections",
+    "curriculum_reasoning": "sections",
+    "curriculum_refine": "sections",
+    "assessment_analyze": "sections",
+    "content_generate": "generation",
+    "curriculum_generate": "generation",
+    "assessment_questions": "generation",
+}
+
+_MIN_RETRY_AFTER_SEC = 1
+_MAX_RETRY_AFTER_SEC = 120
+
+
+def priority_class_for(pipeline: str, override: str | None = None) -> str:
+    """Maps a pipeline (or an explicit ``ai_call_context(priority=...)``) to its queue class."""
+    if override in PRIORITY_CLASSES:
+        return override
+    # 헤지 키(<pipeline>:first_chunk)처럼 접미사가 붙어도 같은 파이프라인으로 본다.
+    return _PIPELINE_CLASSES.get(pipeline.split(":", 1)[0], DEFAULT_PRIORITY)
+
+
+class QueueShedError(RuntimeError):
+    """Raised when a call could not get a slot before its queue deadline."""
+
+    def __init__(self, retry_after_sec: int) -> None:
+        super().__init__("ai_backpressure_busy")
+        self.retry_after_sec = retry_after_sec
+
+
+def retry_after_hint(exc: BaseException | None) -> int | None:
+    # 라우터/파이프라인이 예외를 감싸도 원인 쪽에 붙은 재시도 시각을 찾는다.
+    seen: set[int] = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        retry_after = getattr(exc, "retry_after_sec", None)
+        if retry_after is not None:
+            return int(retry_after)
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class WeightedFairQueue(Generic[T]):
+    """Per-class FIFO queues served by stride scheduling.
+
+    Each class advances a virtual ``pass`` by ``1 / weight`` when it is served and the
+    non-empty class with the smallest pass goes next, so under contention class shares follow
+    the weights while no class starves. A class that was idle rejoins at the current virtual
+    time instead of spending credit it saved while idle.
+    """
+
+    def __init__(self, weights: dict[str, float] | None = None) -> None:
+        merged = {**DEFAULT_CLASS_WEIGHTS, **(weights or {})}
+        self.weights = {name: max(0.01, float(merged[name])) for name in PRIORITY_CLASSES}
+        self._queues: dict[str, deque[T]] = {name: deque() for name in PRIORITY_CLASSES}
+        self._pass = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def __iter__(self) -> Iterator[T]:
+        for queue in self._queues.values():
+            yield from queue
+
+    def push(self, priority: str, item: T) -> None:
+        queue = self._queues[priority]
+        if not queue:
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+        queue.append(item)
+
+    def pop(self) -> T:
+        # 같은 pass면 PRIORITY_CLASSES 순서(높은 우선순위)가 먼저다.
+        name = min((name for name in PRIORITY_CLASSES if self._queues[name]), key=self._pass.__getitem__)
+        self._virtual_time = self._pass[name]
+        self._pass[name] += 1.0 / self.weights[name]
+        return self._queues[name].popleft()
+
+    def remove(self, priority: str, item: T) -> bool:
+        try:
+            self._queues[priority].remove(item)
+        except ValueError:
+            return False
+        return True
+
+    def depth(self, priority: str) -> int:
+        return len(self._queues[priority])
+
+    def ahead_of(self, priority: str) -> float:
+        """Expected number of queued items served before a new item of ``priority``."""
+        own = self.depth(priority) + 1
+        weight = self.weights[priority]
+        # 다른 클래스는 가중치 비율만큼만 끼어든다(그보다 적게 쌓였으면 그 수만큼).
+        others = sum(
+            min(len(queue), own * self.weights[name] / weight)
+            for name, queue in self._queues.items()
+            if name != priority
+        )
+        return own - 1 + others
+
+
+class ServiceTimeEstimator:
+    """EWMA of how long a call holds a slot; used to turn queue depth into a Retry-After."""
+
+    def __init__(self, alpha: float = 0.1, initial_sec: float = 1.0) -> None:
+        self.alpha = min(1.0, max(0.001, float(alpha)))
+        self.value_sec = max(0.001, float(initial_sec))
+        self.samples = 0
+
+    def observe(self, seconds: float) -> None:
+        seconds = max(0.0, float(seconds))
+        if self.samples == 0:
+            self.value_sec = seconds
+        else:
+            self.value_sec += self.alpha * (seconds - self.value_sec)
+        self.samples += 1
+
+    def retry_after(self, *, ahead: float, limit: int) -> int:
+        # 앞선 대기열이 한도만큼씩 병렬로 빠진다고 보고, 자기 차례가 돌아올 때까지의 시간을 잡는다.
+        waves = (ahead + 1) / max(1, limit)
+        seconds = math.ceil(waves * self.value_sec)
+        return min(_MAX_RETRY_AFTER_SEC, max(_MIN_RETRY_AFTER_SEC, seconds))
+
+    def stats(self) -> dict[str, Any]:
+        return {"service_time_ms": round(self.value_sec * 1000, 2), "samples": self.samples}
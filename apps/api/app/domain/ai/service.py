@@ -1,20 +1,286 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import contextvars
+import copy
+from dataclasses import replace
+import time
 from typing import Any
-from threading import BoundedSemaphore
+from threading import BoundedSemaphore, Lock
 
-from app.domain.ai.providers.base import StructuredAIProvider, StructuredAIResponse
+from app.core import json_codec
+from app.domain.ai.call_context import (
+    bounded_wait_sec,
+    check_deadline,
+    current_ai_call_context,
+    defer_until_quality_gate,
+)
+from app.domain.ai.concurrency import AIMDLimit, AdaptiveLimiter, AsyncAdaptiveLimiter
+from app.domain.ai.hedging import HedgePolicy
+from app.domain.ai.prompt_cache import record_prompt_cache_usage
+from app.domain.ai.providers.base import (
+    AIHedgeMeta,
+    AIResponseMeta,
+    AIStreamChunk,
+    AIUsageMeta,
+    AsyncStructuredAIProvider,
+    StructuredAIProvider,
+    StructuredAIResponse,
+)
+from app.domain.ai.providers.streaming import open_provider_stream
+from app.domain.ai.quota import QuotaReservation, TokenQuota
+from app.domain.ai.response_cache import ResponseCache, response_cache_key
+from app.domain.ai.router import mark_spillover
+from app.domain.ai.scheduler import QueueShedError, priority_class_for
+from app.domain.ai.single_flight import AsyncSingleFlight, SingleFlight, single_flight_key
+from app.domain.ai.token_estimator import PromptEstimate, get_shared_token_estimator
 
 
-class AIService:
+def _hedge_extra_tokens(winner: StructuredAIResponse, loser: StructuredAIResponse | None) -> int | None:
+    if loser is not None and loser.meta.usage is not None and loser.meta.usage.total_tokens is not None:
+        return loser.meta.usage.total_tokens
+    # 취소/미완료된 쪽도 프롬프트는 이미 보냈으므로 입력 토큰만큼은 추가 지출로 본다.
+    if winner.meta.usage is not None:
+        return winner.meta.usage.input_tokens
+    return None
+
+
+def _first_successful_future(futures: dict[Future, str]) -> tuple[Future | None, BaseException | None]:
+    pending = set(futures)
+    first_error: BaseException | None = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda item: futures[item] != "primary"):
+            error = future.exception()
+            if error is None:
+                return future, None
+            first_error = first_error or error
+    return None, first_error
+
+
+class _AIServiceCore:
+    """State and helpers shared by the sync and async services.
+
+    Hedging, single-flight, the response cache, priority queue deadlines and the token quota live
+    here; the subclasses only differ in how they wait.
+    """
+
+    hedge_policy: HedgePolicy | None
+    primary: Any
+    _spillover_count: int
+    _single_flight: SingleFlight | AsyncSingleFlight | None
+    _response_cache: ResponseCache | None
+    _prompt_version: str
+    _semaphore: AdaptiveLimiter | AsyncAdaptiveLimiter
+    _acquire_timeout_sec: float
+    _queue_deadlines_sec: dict[str, float]
+    _quota: TokenQuota | None
+    _quota_output_tokens: int
+
+    def hedge_stats(self) -> dict[str, Any]:
+        if self.hedge_policy is None:
+            return {}
+        return self.hedge_policy.stats()
+
+    def route_stats(self) -> dict[str, Any]:
+        router_stats = getattr(self.primary, "stats", None)
+        return {
+            "targets": router_stats() if callable(router_stats) else {},
+            "spillovers": self._spillover_count,
+        }
+
+    def concurrency_stats(self) -> dict[str, Any]:
+        return self._semaphore.stats()
+
+    def _priority(self) -> str:
+        context = current_ai_call_context()
+        return priority_class_for(context.pipeline, context.priority)
+
+    def _queue_deadline_sec(self, priority: str) -> float:
+        # 클래스 대기 기한과 요청의 남은 시간 중 짧은 쪽까지만 기다린다.
+        return bounded_wait_sec(self._queue_deadlines_sec.get(priority, self._acquire_timeout_sec))
+
+    def _shed(self, priority: str) -> QueueShedError:
+        return QueueShedError(self._semaphore.retry_after_sec(priority))
+
+    def _reserve_quota(self, estimate: PromptEstimate) -> QuotaReservation | None:
+        if self._quota is None:
+            return None
+        context = current_ai_call_context()
+        # 출력 토큰은 호출 전에 알 수 없으므로 고정 추정치를 더하고, 끝난 뒤 실제 usage로 맞춘다.
+        tokens = estimate.tokens + self._quota_output_tokens
+        return self._quota.reserve(user_id=context.user_id, tenant_id=context.tenant_id, tokens=tokens)
+
+    @staticmethod
+    def _with_token_estimate(estimate: PromptEstimate, meta: AIResponseMeta) -> AIResponseMeta:
+        if meta.usage is not None and not meta.cache_hit:
+            get_shared_token_estimator().observe(meta.provider, estimate, meta.usage.input_tokens)
+        return replace(meta, estimated_input_tokens=estimate.tokens)
+
+    def _settle_quota(self, reservation: QuotaReservation | None, meta: AIResponseMeta | None) -> None:
+        if self._quota is not None:
+            self._quota.settle(reservation, meta.usage if meta is not None else None, failed=meta is None)
+
+    def single_flight_stats(self) -> dict[str, Any]:
+        if self._single_flight is None:
+            return {}
+        return self._single_flight.stats()
+
+    def _primary_identity(self) -> tuple[str, str]:
+        return (
+            str(getattr(self.primary, "name", type(self.primary).__name__)),
+            str(getattr(self.primary, "model", "")),
+        )
+
+    def _flight_key(self, system_prompt: str, user_prompt: str, *variant: str) -> str:
+        # 온도를 바꾼 추측 후보는 같은 프롬프트라도 다른 응답을 받아야 하므로 합치지 않는다.
+        temperature = current_ai_call_context().temperature
+        if temperature is not None:
+            variant = (*variant, f"temperature={temperature}")
+        return single_flight_key(*self._primary_identity(), system_prompt, user_prompt, *variant)
+
+    def _response_cache_key(self, system_prompt: str, user_prompt: str) -> str:
+        return response_cache_key(*self._primary_identity(), self._prompt_version, system_prompt, user_prompt)
+
+    def cached_response(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse | None:
+        """Returns a cached response for the current pipeline, marked ``cache_hit`` with zero usage."""
+        cache = self._response_cache
+        pipeline = current_ai_call_context().pipeline
+        if cache is None or cache.ttl_for(pipeline) <= 0:
+            return None
+        payload = cache.get(self._response_cache_key(system_prompt, user_prompt), pipeline)
+        if payload is None:
+            return None
+        record = json_codec.loads(payload)
+        return StructuredAIResponse(
+            data=record["data"],
+            meta=AIResponseMeta(
+                provider=record["provider"],
+                model=record["model"],
+                usage=AIUsageMeta(input_tokens=0, output_tokens=0, total_tokens=0),
+                cache_hit=True,
+            ),
+        )
+
+    def remember_response(self, *, system_prompt: str, user_prompt: str, response: StructuredAIResponse) -> None:
+        """Queues the response for the cache; it is stored only once the pipeline quality gate passes.
+
+        A later response remembered for the same prompts inside the same gate replaces this one.
+        """
+        cache = self._response_cache
+        pipeline = current_ai_call_context().pipeline
+        if cache is None or cache.ttl_for(pipeline) <= 0 or response.meta.cache_hit:
+            return
+        key = self._response_cache_key(system_prompt, user_prompt)
+        # 정규화 단계가 data를 고치기 전에 직렬화해 둔다.
+        payload = json_codec.dumps(
+            {"provider": response.meta.provider, "model": response.meta.model, "data": response.data}
+        )
+        defer_until_quality_gate(lambda: cache.put(key, pipeline, payload), key=key)
+
+    @staticmethod
+    def _coalesced(response: StructuredAIResponse) -> StructuredAIResponse:
+        # 대기자마다 정규화 단계가 dict를 고칠 수 있으므로 데이터는 복사해서 나눠 준다.
+        return StructuredAIResponse(data=copy.deepcopy(response.data), meta=replace(response.meta, coalesced=True))
+
+    @staticmethod
+    def _record_prompt_cache(meta: AIResponseMeta | None) -> None:
+        if meta is not None:
+            record_prompt_cache_usage(current_ai_call_context().pipeline, meta.usage)
+
+    def _hedge_delay(self, pipeline: str) -> float | None:
+        if self.hedge_policy is None:
+            return None
+        return self.hedge_policy.hedge_delay(pipeline)
+
+    def _finish_unhedged(self, pipeline: str, response: StructuredAIResponse, elapsed: float) -> StructuredAIResponse:
+        if self.hedge_policy is None:
+            return response
+        self.hedge_policy.observe_latency(pipeline, elapsed)
+        hedge_rate, win_rate = self.hedge_policy.record_call(pipeline, hedged=False)
+        hedge_meta = AIHedgeMeta(hedged=False, hedge_rate=hedge_rate, win_rate=win_rate)
+        return StructuredAIResponse(data=response.data, meta=replace(response.meta, hedge=hedge_meta))
+
+    def _finish_hedged(
+        self,
+        pipeline: str,
+        *,
+        delay: float,
+        winner: str,
+        response: StructuredAIResponse,
+        elapsed: float,
+        loser: StructuredAIResponse | None,
+    ) -> StructuredAIResponse:
+        assert self.hedge_policy is not None
+        extra_tokens = _hedge_extra_tokens(response, loser)
+        self.hedge_policy.observe_latency(pipeline, elapsed)
+        hedge_rate, win_rate = self.hedge_policy.record_call(
+            pipeline,
+            hedged=True,
+            hedge_won=winner == "hedge",
+            extra_tokens=extra_tokens,
+        )
+        hedge_meta = AIHedgeMeta(
+            hedged=True,
+            winner=winner,
+            delay_ms=round(delay * 1000, 2),
+            extra_tokens=extra_tokens,
+            hedge_rate=hedge_rate,
+            win_rate=win_rate,
+        )
+        return StructuredAIResponse(data=response.data, meta=replace(response.meta, hedge=hedge_meta))
+
+
+class AIService(_AIServiceCore):
     def __init__(
         self,
         *,
         primary: StructuredAIProvider,
         max_concurrency: int = 4,
         acquire_timeout_ms: int = 200,
+        hedge_policy: HedgePolicy | None = None,
+        spillover: StructuredAIProvider | None = None,
+        spillover_max_concurrency: int = 2,
+        single_flight: bool = True,
+        response_cache: ResponseCache | None = None,
+        prompt_version: str = "v1",
+        concurrency_limit: AIMDLimit | None = None,
+        priority_weights: dict[str, float] | None = None,
+        queue_deadlines_ms: dict[str, int] | None = None,
+        quota: TokenQuota | None = None,
+        quota_output_tokens: int = 1024,
     ) -> None:
         self.primary = primary
-        self._semaphore = BoundedSemaphore(value=max(1, int(max_concurrency)))
+        self.hedge_policy = hedge_policy
+        self.spillover = spillover
+        self._max_concurrency = max(1, int(max_concurrency))
+        # max_concurrency는 상한이고, 실제 한도는 AIMD로 429/타임아웃/지연에 맞춰 움직인다.
+        self._semaphore = AdaptiveLimiter(
+            concurrency_limit or _fixed_start_limit(self._max_concurrency),
+            weights=priority_weights,
+        )
+        # 본 한도가 꽉 찼을 때만 쓰는 보조 모델 슬롯(본 한도와 별도로 센다)
+        self._spillover_semaphore = BoundedSemaphore(value=max(1, int(spillover_max_concurrency)))
+        self._spillover_count = 0
+        self._spillover_lock = Lock()
         self._acquire_timeout_sec = max(0.01, int(acquire_timeout_ms) / 1000)
+        # 클래스별 대기 기한(없는 클래스는 acquire_timeout_ms). 기한을 넘기면 보조 모델로 넘기거나 거절한다.
+        self._queue_deadlines_sec = _queue_deadlines_sec(queue_deadlines_ms)
+        self._quota = quota
+        self._quota_output_tokens = max(0, int(quota_output_tokens))
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = Lock()
+        # 같은 (공급자, 모델, 프롬프트)로 동시에 들어온 호출은 업스트림 요청 하나로 합친다.
+        self._single_flight: SingleFlight[StructuredAIResponse] | None = SingleFlight() if single_flight else None
+        self._response_cache = response_cache
+        self._prompt_version = prompt_version
+
+    def prewarm(self, connections: int) -> int:
+        prewarm = getattr(self.primary, "prewarm", None)
+        if not callable(prewarm):
+            return 0
+        return int(prewarm(connections=connections))
 
     def generate_json(
         self,
@@ -33,15 +299,535 @@ class AIService:
         system_prompt: str,
         user_prompt: str,
     ) -> StructuredAIResponse:
-        acquired = self._semaphore.acquire(timeout=self._acquire_timeout_sec)
+        cached = self.cached_response(system_prompt=system_prompt, user_prompt=user_prompt)
+        if cached is not None:
+            return cached
+        if self._single_flight is None:
+            response = self._generate_with_meta(system_prompt, user_prompt)
+        else:
+            response, leader = self._single_flight.do(
+                self._flight_key(system_prompt, user_prompt),
+                lambda: self._generate_with_meta(system_prompt, user_prompt),
+                label=current_ai_call_context().pipeline,
+            )
+            if not leader:
+                return self._coalesced(response)
+        self._record_prompt_cache(response.meta)
+        self.remember_response(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+        return response
+
+    def _generate_with_meta(self, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        estimate = get_shared_token_estimator().estimate_prompt(system_prompt, user_prompt)
+        reservation = self._reserve_quota(estimate)
+        try:
+            response = self._generate_unmetered(system_prompt, user_prompt)
+        except Exception:
+            self._settle_quota(reservation, None)
+            raise
+        self._settle_quota(reservation, response.meta)
+        return StructuredAIResponse(data=response.data, meta=self._with_token_estimate(estimate, response.meta))
+
+    def _generate_unmetered(self, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        priority = self._priority()
+        acquired = self._semaphore.acquire(timeout=self._queue_deadline_sec(priority), priority=priority)
         if not acquired:
-            raise RuntimeError("ai_backpressure_busy")
+            # 요청 마감으로 대기가 끝났으면 보조 대상으로 넘기지 않고 바로 실패시킨다.
+            check_deadline()
+            return self._generate_spillover(priority, system_prompt, user_prompt)
+        pipeline = current_ai_call_context().pipeline
+        delay = self._hedge_delay(pipeline)
+        if delay is None:
+            try:
+                response, elapsed = self._call_primary(system_prompt, user_prompt)
+            finally:
+                self._semaphore.release()
+            return self._finish_unhedged(pipeline, response, elapsed)
+        return self._generate_hedged(pipeline, delay, system_prompt, user_prompt)
+
+    def _generate_spillover(self, priority: str, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        if self.spillover is None or not self._spillover_semaphore.acquire(blocking=False):
+            raise self._shed(priority)
+        with self._spillover_lock:
+            self._spillover_count += 1
+        try:
+            response = self.spillover.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        except Exception as spillover_exc:
+            raise RuntimeError(f"ai_spillover_failed:{spillover_exc}") from spillover_exc
+        finally:
+            self._spillover_semaphore.release()
+        return StructuredAIResponse(data=response.data, meta=mark_spillover(response.meta))
+
+    def _call_primary(self, system_prompt: str, user_prompt: str) -> tuple[StructuredAIResponse, float]:
+        started = time.perf_counter()
+        try:
+            response = self.primary.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        except Exception as primary_exc:
+            self._semaphore.record_failure(primary_exc)
+            raise RuntimeError(f"ai_primary_failed:{primary_exc}") from primary_exc
+        elapsed = time.perf_counter() - started
+        self._semaphore.record_success(current_ai_call_context().pipeline, elapsed)
+        return response, elapsed
+
+    def _submit_with_slot(self, system_prompt: str, user_prompt: str) -> Future:
+        # 이미 확보한 슬롯 하나를 넘겨받아 호출이 실제로 끝날 때 반납한다(진 쪽 스레드 포함).
+        future = self._get_executor().submit(
+            contextvars.copy_context().run,
+            self._call_primary,
+            system_prompt,
+            user_prompt,
+        )
+        future.add_done_callback(lambda _future: self._semaphore.release())
+        return future
+
+    def _generate_hedged(
+        self,
+        pipeline: str,
+        delay: float,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        futures = {self._submit_with_slot(system_prompt, user_prompt): "primary"}
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._semaphore.acquire(blocking=False, priority=self._priority()):
+            futures[self._submit_with_slot(system_prompt, user_prompt)] = "hedge"
+
+        winner, first_error = _first_successful_future(futures)
+        for future in futures:
+            if future is not winner:
+                # 실행 중인 스레드는 멈출 수 없으므로 결과만 버린다.
+                future.cancel()
+        if winner is None:
+            assert first_error is not None
+            raise first_error
+
+        response, elapsed = winner.result()
+        if len(futures) == 1:
+            return self._finish_unhedged(pipeline, response, elapsed)
+        loser = next(future for future in futures if future is not winner)
+        loser_response = (
+            loser.result()[0]
+            if loser.done() and not loser.cancelled() and loser.exception() is None
+            else None
+        )
+        return self._finish_hedged(
+            pipeline,
+            delay=delay,
+            winner=futures[winner],
+            response=response,
+            elapsed=elapsed,
+            loser=loser_response,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_concurrency,
+                    thread_name_prefix="ai-hedge",
+                )
+            return self._executor
+
+
+class AsyncAIService(_AIServiceCore):
+    """asyncio counterpart of AIService.
+
+    In-flight provider calls only hold an ``asyncio.Semaphore`` slot, not a worker thread,
+    so a single worker can keep many slow provider calls open at once.
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: AsyncStructuredAIProvider,
+        max_concurrency: int = 4,
+        acquire_timeout_ms: int = 200,
+        hedge_policy: HedgePolicy | None = None,
+        spillover: AsyncStructuredAIProvider | None = None,
+        spillover_max_concurrency: int = 2,
+        single_flight: bool = True,
+        response_cache: ResponseCache | None = None,
+        prompt_version: str = "v1",
+        concurrency_limit: AIMDLimit | None = None,
+        priority_weights: dict[str, float] | None = None,
+        queue_deadlines_ms: dict[str, int] | None = None,
+        quota: TokenQuota | None = None,
+        quota_output_tokens: int = 1024,
+    ) -> None:
+        self.primary = primary
+        self.hedge_policy = hedge_policy
+        self.spillover = spillover
+        self._semaphore = AsyncAdaptiveLimiter(
+            concurrency_limit or _fixed_start_limit(max(1, int(max_concurrency))),
+            weights=priority_weights,
+        )
+        self._spillover_semaphore = asyncio.Semaphore(value=max(1, int(spillover_max_concurrency)))
+        self._spillover_count = 0
+        self._acquire_timeout_sec = max(0.01, int(acquire_timeout_ms) / 1000)
+        # 클래스별 대기 기한(없는 클래스는 acquire_timeout_ms). 기한을 넘기면 보조 모델로 넘기거나 거절한다.
+        self._queue_deadlines_sec = _queue_deadlines_sec(queue_deadlines_ms)
+        self._quota = quota
+        self._quota_output_tokens = max(0, int(quota_output_tokens))
+        self._single_flight: AsyncSingleFlight[StructuredAIResponse] | None = (
+            AsyncSingleFlight() if single_flight else None
+        )
+        self._response_cache = response_cache
+        self._prompt_version = prompt_version
+
+    async def prewarm(self, connections: int) -> int:
+        prewarm = getattr(self.primary, "prewarm", None)
+        if not callable(prewarm):
+            return 0
+        return int(await prewarm(connections=connections))
+
+    async def generate_json(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> dict[str, Any]:
+        return (
+            await self.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        ).data
+
+    async def generate_json_with_meta(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        cached = self.cached_response(system_prompt=system_prompt, user_prompt=user_prompt)
+        if cached is not None:
+            return cached
+        if self._single_flight is None:
+            response = await self._generate_with_meta(system_prompt, user_prompt)
+        else:
+            response, leader = await self._single_flight.do(
+                self._flight_key(system_prompt, user_prompt),
+                lambda: self._generate_with_meta(system_prompt, user_prompt),
+                label=current_ai_call_context().pipeline,
+            )
+            if not leader:
+                return self._coalesced(response)
+        self._record_prompt_cache(response.meta)
+        self.remember_response(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+        return response
+
+    async def coalesce_streamed(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        call: Callable[[], Awaitable[StructuredAIResponse]],
+    ) -> StructuredAIResponse:
+        """Runs a whole streamed call once per flight key; identical concurrent callers share it.
+
+        Followers get a deep copy of the leader's finished response marked ``coalesced``. The key
+        is kept apart from the buffered call's, whose data is not item-normalized.
+        """
+        if self._single_flight is None:
+            return await call()
+        response, leader = await self._single_flight.do(
+            self._flight_key(system_prompt, user_prompt, "streamed_items"),
+            call,
+            label=current_ai_call_context().pipeline,
+        )
+        return response if leader else self._coalesced(response)
+
+    async def _generate_with_meta(self, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        estimate = get_shared_token_estimator().estimate_prompt(system_prompt, user_prompt)
+        reservation = self._reserve_quota(estimate)
         try:
-            return self.primary.generate_json_with_meta(
+            response = await self._generate_unmetered(system_prompt, user_prompt)
+        except BaseException:
+            self._settle_quota(reservation, None)
+            raise
+        self._settle_quota(reservation, response.meta)
+        return StructuredAIResponse(data=response.data, meta=self._with_token_estimate(estimate, response.meta))
+
+    async def _generate_unmetered(self, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        priority = self._priority()
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(priority=priority),
+                timeout=self._queue_deadline_sec(priority),
+            )
+        except TimeoutError:
+            check_deadline()
+            return await self._generate_spillover(priority, system_prompt, user_prompt)
+        pipeline = current_ai_call_context().pipeline
+        delay = self._hedge_delay(pipeline)
+        if delay is None:
+            try:
+                response, elapsed = await self._call_primary(system_prompt, user_prompt)
+            finally:
+                self._semaphore.release()
+            return self._finish_unhedged(pipeline, response, elapsed)
+        return await self._generate_hedged(pipeline, delay, system_prompt, user_prompt)
+
+    async def _claim_spillover_slot(self) -> bool:
+        # 본 한도를 이미 기다렸으므로 보조 슬롯은 기다리지 않고 빈 자리가 있을 때만 쓴다.
+        if self.spillover is None or self._spillover_semaphore.locked():
+            return False
+        await self._spillover_semaphore.acquire()
+        self._spillover_count += 1
+        return True
+
+    async def _generate_spillover(self, priority: str, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        if not await self._claim_spillover_slot():
+            raise self._shed(priority)
+        try:
+            response = await self.spillover.generate_json_with_meta(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        except Exception as spillover_exc:
+            raise RuntimeError(f"ai_spillover_failed:{spillover_exc}") from spillover_exc
+        finally:
+            self._spillover_semaphore.release()
+        return StructuredAIResponse(data=response.data, meta=mark_spillover(response.meta))
+
+    async def _call_primary(self, system_prompt: str, user_prompt: str) -> tuple[StructuredAIResponse, float]:
+        started = time.perf_counter()
+        try:
+            response = await self.primary.generate_json_with_meta(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
             )
         except Exception as primary_exc:
+            self._semaphore.record_failure(primary_exc)
             raise RuntimeError(f"ai_primary_failed:{primary_exc}") from primary_exc
+        elapsed = time.perf_counter() - started
+        self._semaphore.record_success(current_ai_call_context().pipeline, elapsed)
+        return response, elapsed
+
+    async def _call_with_slot(self, system_prompt: str, user_prompt: str) -> tuple[StructuredAIResponse, float]:
+        try:
+            return await self._call_primary(system_prompt, user_prompt)
         finally:
             self._semaphore.release()
+
+    async def _generate_hedged(
+        self,
+        pipeline: str,
+        delay: float,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> StructuredAIResponse:
+        tasks = {asyncio.create_task(self._call_with_slot(system_prompt, user_prompt)): "primary"}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and not self._semaphore.locked():
+                await self._semaphore.acquire(priority=self._priority())
+                tasks[asyncio.create_task(self._call_with_slot(system_prompt, user_prompt))] = "hedge"
+            winner, first_error = await _first_successful_task(tasks)
+        finally:
+            # 진 쪽은 취소하고, 슬롯은 각 태스크의 finally에서 반납된다.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if winner is None:
+            assert first_error is not None
+            raise first_error
+
+        response, elapsed = winner.result()
+        if len(tasks) == 1:
+            return self._finish_unhedged(pipeline, response, elapsed)
+        loser = next(task for task in tasks if task is not winner)
+        loser_response = (
+            loser.result()[0]
+            if loser.done() and not loser.cancelled() and loser.exception() is None
+            else None
+        )
+        return self._finish_hedged(
+            pipeline,
+            delay=delay,
+            winner=tasks[winner],
+            response=response,
+            elapsed=elapsed,
+            loser=loser_response,
+        )
+
+    async def stream_json_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        """Stream raw JSON text while holding one concurrency slot for the whole stream.
+
+        With hedging on, a late first chunk opens a second stream; whichever stream yields
+        its first chunk first is kept and the other one is closed.
+        """
+        estimate = get_shared_token_estimator().estimate_prompt(system_prompt, user_prompt)
+        reservation = self._reserve_quota(estimate)
+        meta: AIResponseMeta | None = None
+        started = False
+        try:
+            async with aclosing(self._stream_unmetered(system_prompt, user_prompt)) as chunks:
+                async for chunk in chunks:
+                    started = True
+                    if chunk.meta is not None:
+                        meta = chunk.meta
+                        chunk = replace(chunk, meta=self._with_token_estimate(estimate, meta))
+                    yield chunk
+        finally:
+            if meta is None and started:
+                # 도중에 끊긴 스트림은 usage를 못 받았어도 생성은 됐으므로 추정치로 확정한다.
+                meta = AIResponseMeta(provider="unknown", model="unknown")
+            self._settle_quota(reservation, meta)
+
+    async def _stream_unmetered(self, system_prompt: str, user_prompt: str) -> AsyncIterator[AIStreamChunk]:
+        priority = self._priority()
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(priority=priority),
+                timeout=self._queue_deadline_sec(priority),
+            )
+        except TimeoutError:
+            check_deadline()
+            async for chunk in self._stream_spillover(priority, system_prompt, user_prompt):
+                self._record_prompt_cache(chunk.meta)
+                yield chunk
+            return
+        held = 1
+        # 스트림은 전체 소요 시간 대신 첫 청크까지의 지연으로 헤지 시점을 잡는다.
+        hedge_key = f"{current_ai_call_context().pipeline}:first_chunk"
+        delay = self._hedge_delay(hedge_key)
+        primary = self._open_stream(system_prompt, user_prompt)
+        tasks = {asyncio.create_task(_timed_anext(primary)): "primary"}
+        streams = {"primary": primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and not self._semaphore.locked():
+                    await self._semaphore.acquire(priority=self._priority())
+                    held += 1
+                    streams["hedge"] = self._open_stream(system_prompt, user_prompt)
+                    tasks[asyncio.create_task(_timed_anext(streams["hedge"]))] = "hedge"
+            winner, first_error = await _first_successful_task(tasks)
+            for task, label in tasks.items():
+                if task is not winner:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    await streams[label].aclose()
+            if len(tasks) > 1:
+                self._semaphore.release()
+                held -= 1
+            if winner is None:
+                if isinstance(first_error, StopAsyncIteration):
+                    raise RuntimeError("ai_stream_empty")
+                assert first_error is not None
+                raise first_error
+
+            label = tasks[winner]
+            first, first_chunk_sec = winner.result()
+            self._semaphore.record_success(hedge_key, first_chunk_sec)
+            stream = streams[label]
+            chunk: AIStreamChunk | None = first
+            while chunk is not None:
+                if chunk.meta is not None and self.hedge_policy is not None:
+                    chunk = self._annotate_stream_chunk(
+                        hedge_key,
+                        chunk,
+                        delay=delay,
+                        winner=label,
+                        hedged=len(tasks) > 1,
+                        first_chunk_sec=first_chunk_sec,
+                    )
+                self._record_prompt_cache(chunk.meta)
+                yield chunk
+                chunk = await anext(stream, None)
+        except Exception as primary_exc:
+            self._semaphore.record_failure(primary_exc)
+            raise RuntimeError(f"ai_primary_failed:{primary_exc}") from primary_exc
+        finally:
+            for stream in streams.values():
+                await stream.aclose()
+            for _ in range(held):
+                self._semaphore.release()
+
+    def _open_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[AIStreamChunk]:
+        return open_provider_stream(self.primary, system_prompt=system_prompt, user_prompt=user_prompt)
+
+    async def _stream_spillover(
+        self,
+        priority: str,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> AsyncIterator[AIStreamChunk]:
+        if not await self._claim_spillover_slot():
+            raise self._shed(priority)
+        assert self.spillover is not None
+        stream = open_provider_stream(self.spillover, system_prompt=system_prompt, user_prompt=user_prompt)
+        try:
+            async for chunk in stream:
+                if chunk.meta is not None:
+                    chunk = AIStreamChunk(text=chunk.text, meta=mark_spillover(chunk.meta))
+                yield chunk
+        except Exception as spillover_exc:
+            raise RuntimeError(f"ai_spillover_failed:{spillover_exc}") from spillover_exc
+        finally:
+            await stream.aclose()
+            self._spillover_semaphore.release()
+
+    def _annotate_stream_chunk(
+        self,
+        hedge_key: str,
+        chunk: AIStreamChunk,
+        *,
+        delay: float | None,
+        winner: str,
+        hedged: bool,
+        first_chunk_sec: float,
+    ) -> AIStreamChunk:
+        assert chunk.meta is not None
+        response = StructuredAIResponse(data={}, meta=chunk.meta)
+        if hedged and delay is not None:
+            response = self._finish_hedged(
+                hedge_key,
+                delay=delay,
+                winner=winner,
+                response=response,
+                elapsed=first_chunk_sec,
+                loser=None,
+            )
+        else:
+            response = self._finish_unhedged(hedge_key, response, first_chunk_sec)
+        return AIStreamChunk(text=chunk.text, meta=response.meta)
+
+
+def _queue_deadlines_sec(deadlines_ms: dict[str, int] | None) -> dict[str, float]:
+    return {name: max(0.01, int(value) / 1000) for name, value in (deadlines_ms or {}).items()}
+
+
+def _fixed_start_limit(max_concurrency: int) -> AIMDLimit:
+    return AIMDLimit(initial_limit=max_concurrency, max_limit=max_concurrency)
+
+
+async def _timed_anext(stream: AsyncIterator[AIStreamChunk]) -> tuple[AIStreamChunk, float]:
+    started = time.perf_counter()
+    chunk = await anext(stream)
+    return chunk, time.perf_counter() - started
+
+
+async def _first_successful_task(tasks: dict[asyncio.Task, str]) -> tuple[asyncio.Task | None, BaseException | None]:
+    """Waits until one task succeeds (primary preferred on ties) or all of them have failed."""
+    pending = set(tasks)
+    first_error: BaseException | None = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=lambda item: tasks[item] != "primary"):
+            error = task.exception()
+            if error is None:
+                return task, None
+            first_error = first_error or error
+    return None, first_error
@@ -0,0 +1,228 @@
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import hashlib
+import random
+from threading import Lock
+import time
+from typing import Any
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingle_tokens(tokens: Iterable[str]) -> frozenset[str]:
+    """Character bigrams of each token.
+
+    Korean questions differ mostly in particles and endings ("진도" / "진도는"), which whole-word
+    sets count as entirely different words; bigrams keep the shared stem.
+    """
+    return frozenset(
+        token[idx:idx + 2]
+        for token in tokens
+        for idx in range(max(1, len(token) - 1))
+    )
+
+
+def jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = max(1, int(num_perm))
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(self.num_perm)
+        ]
+
+    def signature(self, features: frozenset[str]) -> tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "big")
+            for feature in features
+        ]
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in self._params
+        )
+
+
+@dataclass
+class _Entry:
+    bucket: str
+    features: frozenset[str]
+    signature: tuple[int, ...]
+    value: Any
+    created_at: float
+    expires_at: float
+    hits: int = 0
+
+
+class SimilarityCache:
+    """Near-duplicate lookup over token sets with MinHash + LSH banding.
+
+    Entries live in separate ``bucket``s (e.g. chat type + persona + context fingerprint) and
+    only match inside their own bucket. LSH finds candidates; a candidate is served only when
+    the exact Jaccard similarity of the feature sets reaches ``threshold``.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.8,
+        ttl_sec: float = 600.0,
+        max_entries: int = 2048,
+        num_perm: int = 64,
+        bands: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = min(1.0, max(0.0, float(threshold)))
+        self.ttl_sec = max(1.0, float(ttl_sec))
+        self.max_entries = max(1, int(max_entries))
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._bands = max(1, min(int(bands), self._hasher.num_perm))
+        self._rows = self._hasher.num_perm // self._bands
+        self._clock = clock
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._index: dict[tuple[str, int, tuple[int, ...]], set[int]] = {}
+        self._next_id = 0
+        self._counters = {"lookups": 0, "hits": 0, "stores": 0, "evictions": 0, "expirations": 0}
+        self._lock = Lock()
+
+    def _band_keys(self, bucket: str, signature: tuple[int, ...]) -> list[tuple[str, int, tuple[int, ...]]]:
+        return [
+            (bucket, band, signature[band * self._rows:(band + 1) * self._rows])
+            for band in range(self._bands)
+        ]
+
+    def get(self, bucket: str, tokens: Iterable[str]) -> tuple[Any, float] | None:
+        """Returns ``(value, similarity)`` of the most similar live entry, or None."""
+        features = shingle_tokens(tokens)
+        if not features:
+            return None
+        signature = self._hasher.signature(features)
+        now = self._clock()
+        with self._lock:
+            self._counters["lookups"] += 1
+            candidates: set[int] = set()
+            for band_key in self._band_keys(bucket, signature):
+                candidates.update(self._index.get(band_key, ()))
+            best: tuple[float, int] | None = None
+            for entry_id in candidates:
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                if entry.expires_at <= now:
+                    self._remove(entry_id)
+                    self._counters["expirations"] += 1
+                    continue
+                similarity = jaccard(features, entry.features)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, entry_id)
+            if best is None:
+                return None
+            similarity, entry_id = best
+            entry = self._entries[entry_id]
+            entry.hits += 1
+            self._entries.move_to_end(entry_id)
+            self._counters["hits"] += 1
+            return entry.value, round(similarity, 4)
+
+    def put(self, bucket: str, tokens: Iterable[str], value: Any) -> None:
+        features = shingle_tokens(tokens)
+        if not features:
+            return
+        signature = self._hasher.signature(features)
+        now = self._clock()
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(
+                bucket=bucket,
+                features=features,
+                signature=signature,
+                value=value,
+                created_at=now,
+                expires_at=now + self.ttl_sec,
+            )
+            for band_key in self._band_keys(bucket, signature):
+                self._index.setdefault(band_key, set()).add(entry_id)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry.bucket, entry.signature):
+            ids = self._index.get(band_key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[band_key]
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        with self._lock:
+            expired = [entry_id for entry_id, entry in self._entries.items() if entry.expires_at <= now]
+            for entry_id in expired:
+                self._remove(entry_id)
+            self._counters["expirations"] += len(expired)
+            return len(expired)
+
+    def stats(self, top: int = 10) -> dict[str, Any]:
+        self.purge_expired()
+        now = self._clock()
+        with self._lock:
+            lookups = self._counters["lookups"]
+            ranked = sorted(self._entries.items(), key=lambda item: item[1].hits, reverse=True)[:top]
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "ttl_sec": self.ttl_sec,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                # 질문 원문은 노출하지 않고 항목별 적중 수와 나이만 보여준다.
+                "top_entries": [
+                    {
+                        "id": entry_id,
+                        "bucket": ":".join(entry.bucket.split(":")[:2]),
+                        "hits": entry.hits,
+                        "age_sec": round(now - entry.created_at, 1),
+                        "ttl_left_sec": round(entry.expires_at - now, 1),
+                    }
+                    for entry_id, entry in ranked
+                ],
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+
+_shared_cache: SimilarityCache | None = None
+_shared_config: tuple[Any, ...] | None = None
+_shared_lock = Lock()
+
+
+def get_shared_chat_similarity_cache(*, threshold: float, ttl_sec: float, max_entries: int) -> SimilarityCache:
+    global _shared_cache, _shared_config
+    config = (float(threshold), float(ttl_sec), int(max_entries))
+    with _shared_lock:
+        if _shared_cache is None or _shared_config != config:
+            _shared_cache = SimilarityCache(threshold=threshold, ttl_sec=ttl_sec, max_entries=max_entries)
+            _shared_config = config
+        return _shared_cache
+
+
+def chat_similarity_cache_stats() -> dict[str, Any]:
+    with _shared_lock:
+        cache = _shared_cache
+    return cache.stats() if cache is not None else {}
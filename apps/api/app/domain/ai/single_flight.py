@@ -0,0 +1,146 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+import hashlib
+from threading import Lock
+from typing import Any, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+def single_flight_key(provider: str, model: str, system_prompt: str, user_prompt: str, *variant: str) -> str:
+    digest = hashlib.sha256()
+    for part in (provider, model, system_prompt, user_prompt, *variant):
+        encoded = part.encode("utf-8")
+        # 길이를 앞에 붙여 경계가 다른 조합이 같은 키가 되지 않게 한다.
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class _FlightCounters:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._waiters: dict[str, int] = {}
+        self._labels: dict[str, str] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key: str, label: str, *, leader: bool) -> None:
+        with self._lock:
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            self._labels.setdefault(key, label)
+            if leader:
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+    def finish(self, key: str) -> None:
+        with self._lock:
+            self._waiters.pop(key, None)
+            self._labels.pop(key, None)
+
+    def waiters(self, key: str) -> int:
+        with self._lock:
+            return self._waiters.get(key, 0)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._waiters),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesce_rate": round(self.coalesced / total, 4) if total else 0.0,
+                "waiters": {
+                    f"{self._labels.get(key) or 'default'}:{key[:12]}": count
+                    for key, count in self._waiters.items()
+                },
+            }
+
+
+class SingleFlight(Generic[T]):
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome.
+
+    The first caller (leader) runs ``fn`` in its own thread. Callers arriving while it runs block
+    on the same result, or the same exception. The key is released before waiters wake, so a
+    caller arriving after completion starts a fresh call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._flights: dict[str, Future] = {}
+        self._counters = _FlightCounters()
+
+    def do(self, key: str, fn: Callable[[], T], *, label: str = "") -> tuple[T, bool]:
+        """Returns ``(result, leader)``; ``leader`` is False when the result came from another caller."""
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._flights[key] = future
+            self._counters.join(key, label, leader=leader)
+
+        if not leader:
+            return future.result(), False
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._release(key)
+            future.set_exception(exc)
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result, True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+            self._counters.finish(key)
+
+    def waiters(self, key: str) -> int:
+        return self._counters.waiters(key)
+
+    def stats(self) -> dict[str, Any]:
+        return self._counters.stats()
+
+
+class AsyncSingleFlight(Generic[T]):
+    """asyncio counterpart of SingleFlight.
+
+    The shared call runs as its own task, so cancelling one waiter (including the leader)
+    does not cancel the upstream request for the others.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, asyncio.Task] = {}
+        self._counters = _FlightCounters()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], *, label: str = "") -> tuple[T, bool]:
+        task = self._flights.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            # 닫힌 다른 이벤트 루프에 남은 호출은 기다릴 수 없으므로 새로 시작한다.
+            task = None
+        leader = task is None
+        if task is None:
+            task = asyncio.create_task(self._run(key, fn))
+            self._flights[key] = task
+        self._counters.join(key, label, leader=leader)
+        return await asyncio.shield(task), leader
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await fn()
+        finally:
+            if self._flights.get(key) is asyncio.current_task():
+                del self._flights[key]
+                self._counters.finish(key)
+
+    def waiters(self, key: str) -> int:
+        return self._counters.waiters(key)
+
+    def stats(self) -> dict[str, Any]:
+        return self._counters.stats()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import math
+import re
+from threading import Lock
+from typing import Any
+
+
+_WORD = re.compile(r"[A-Za-z]+")
+_DIGITS = re.compile(r"[0-9]+")
+_PUNCT = re.compile(r"[!-/:-@\[-`{-~]")
+_NEWLINES = re.compile(r"\n+")
+# 메시지마다 붙는 역할/구분 토큰
+_MESSAGE_OVERHEAD = 4
+
+
+def token_features(text: str) -> tuple[int, int]:
+    """(ASCII pieces, non-ASCII characters) of ``text``; the two inputs of the estimate.
+
+    English words, digit groups, punctuation and line breaks each cost about one token; a
+    Hangul syllable costs a provider-specific fraction, which is what calibration learns.
+    """
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    words = sum(1 + len(word) // 6 for word in _WORD.findall(text))
+    digits = sum((len(group) + 2) // 3 for group in _DIGITS.findall(text))
+    return words + digits + len(_PUNCT.findall(text)) + len(_NEWLINES.findall(text)), non_ascii
+
+
+@dataclass(frozen=True)
+class PromptEstimate:
+    provider: str
+    features: tuple[int, int]
+    tokens: int
+
+
+class _Calibration:
+    """Per-provider token weights fitted online (ridge toward the defaults, older samples decayed)."""
+
+    def __init__(self, prior: tuple[float, float], *, decay: float, prior_weight: float) -> None:
+        self.prior = prior
+        self.decay = decay
+        self.prior_weight = prior_weight
+        self.weights = prior
+        self._xx = [0.0, 0.0, 0.0]
+        self._xy = [0.0, 0.0]
+        self.samples = 0
+        self.abs_error = None  # type: float | None
+
+    def observe(self, features: tuple[int, int], actual: int) -> None:
+        total = features[0] + features[1]
+        if total <= 0 or actual <= 0:
+            return
+        # 프롬프트 길이에 따라 한 표본이 식을 좌우하지 않도록 글자 비율 단위로 맞춘다.
+        x1, x2, y = features[0] / total, features[1] / total, actual / total
+        error = abs(self.predict(features) - actual) / actual
+        self.abs_error = error if self.abs_error is None else self.abs_error * 0.9 + error * 0.1
+        self._xx = [value * self.decay for value in self._xx]
+        self._xy = [value * self.decay for value in self._xy]
+        self._xx[0] += x1 * x1
+        self._xx[1] += x1 * x2
+        self._xx[2] += x2 * x2
+        self._xy[0] += x1 * y
+        self._xy[1] += x2 * y
+        self.samples += 1
+        self._solve()
+
+    def _solve(self) -> None:
+        weight = self.prior_weight
+        a, b, d = self._xx[0] + weight, self._xx[1], self._xx[2] + weight
+        r1 = self._xy[0] + weight * self.prior[0]
+        r2 = self._xy[1] + weight * self.prior[1]
+        det = a * d - b * b
+        if det <= 1e-12:
+            return
+        self.weights = (
+            min(3.0, max(0.1, (r1 * d - b * r2) / det)),
+            min(3.0, max(0.1, (a * r2 - b * r1) / det)),
+        )
+
+    def predict(self, features: tuple[int, int]) -> int:
+        return math.ceil(features[0] * self.weights[0] + features[1] * self.weights[1])
+
+
+class TokenEstimator:
+    """Local prompt token counts per provider, calibrated on the ``input_tokens`` providers report."""
+
+    def __init__(
+        self,
+        *,
+        default_provider: str = "default",
+        prior: tuple[float, float] = (1.0, 1.0),
+        decay: float = 0.97,
+        prior_weight: float = 1.0,
+    ) -> None:
+        self.default_provider = default_provider
+        self._prior = prior
+        self._decay = decay
+        self._prior_weight = prior_weight
+        self._calibrations: dict[str, _Calibration] = {}
+        self._lock = Lock()
+
+    def _calibration(self, provider: str) -> _Calibration:
+        calibration = self._calibrations.get(provider)
+        if calibration is None:
+            calibration = _Calibration(self._prior, decay=self._decay, prior_weight=self._prior_weight)
+            self._calibrations[provider] = calibration
+        return calibration
+
+    def estimate(self, text: str, provider: str | None = None) -> int:
+        features = token_features(text)
+        with self._lock:
+            return self._calibration(provider or self.default_provider).predict(features)
+
+    def estimate_prompt(self, system_prompt: str, user_prompt: str, provider: str | None = None) -> PromptEstimate:
+        system_features = token_features(system_prompt)
+        user_features = token_features(user_prompt)
+        features = (
+            system_features[0] + user_features[0] + 2 * _MESSAGE_OVERHEAD,
+            system_features[1] + user_features[1],
+        )
+        provider = provider or self.default_provider
+        with self._lock:
+            tokens = self._calibration(provider).predict(features)
+        return PromptEstimate(provider=provider, features=features, tokens=tokens)
+
+    def observe(self, provider: str, estimate: PromptEstimate, actual_input_tokens: int | None) -> None:
+        # 추정은 호출 전 기본 공급자 기준이지만, 보정은 실제로 응답한 공급자 쪽에 쌓는다.
+        if actual_input_tokens is None or actual_input_tokens <= 0:
+            return
+        with self._lock:
+            self._calibration(provider).observe(estimate.features, actual_input_tokens)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                provider: {
+                    "samples": calibration.samples,
+                    "ascii_weight": round(calibration.weights[0], 4),
+                    "non_ascii_weight": round(calibration.weights[1], 4),
+                    "mean_abs_error_pct": (
+                        round(calibration.abs_error * 100, 2) if calibration.abs_error is not None else None
+                    ),
+                }
+                for provider, calibration in sorted(self._calibrations.items())
+            }
+
+
+class PromptBudgets:
+    """Per-pipeline input token budgets and how often prompts had to shrink to meet them."""
+
+    def __init__(self, budgets: dict[str, int] | None = None) -> None:
+        self.budgets = {pipeline: int(value) for pipeline, value in (budgets or {}).items() if int(value) > 0}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._lock = Lock()
+
+    def record(self, pipeline: str, level: int, fits: bool) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(pipeline, {"prompts": 0, "shrunk": 0, "over_budget": 0})
+            counters["prompts"] += 1
+            if level > 0:
+                counters["shrunk"] += 1
+            if not fits:
+                counters["over_budget"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                pipeline: {"budget": self.budgets.get(pipeline), **self._counters.get(pipeline, {})}
+                for pipeline in sorted(set(self.budgets) | set(self._counters))
+            }
+
+
+_shared_estimator = TokenEstimator()
+_prompt_budgets = PromptBudgets()
+
+
+def configure_token_estimator(*, default_provider: str, budgets: dict[str, int]) -> None:
+    global _prompt_budgets
+    _shared_estimator.default_provider = default_provider
+    _prompt_budgets = PromptBudgets(budgets)
+
+
+def get_shared_token_estimator() -> TokenEstimator:
+    return _shared_estimator
+
+
+def fit_prompt(build: Callable[[int], tuple[str, str]], *, pipeline: str, levels: int) -> tuple[str, str]:
+    """Builds the prompt at shrink level 0, 1, ... until its estimate fits the pipeline budget.
+
+    ``build(level)`` drops more of its lowest-priority fields at each level; past ``levels`` the
+    most compact prompt is sent as is and counted as over budget.
+    """
+    budget = _prompt_budgets.budgets.get(pipeline)
+    prompts = build(0)
+    if budget is None:
+        return prompts
+    for level in range(levels + 1):
+        if level:
+            prompts = build(level)
+        if _shared_estimator.estimate_prompt(*prompts).tokens <= budget:
+            _prompt_budgets.record(pipeline, level, True)
+            return prompts
+    _prompt_budgets.record(pipeline, levels, False)
+    return prompts
+
+
+def token_estimator_stats() -> dict[str, Any]:
+    return {"providers": _shared_estimator.stats(), "budgets": _prompt_budgets.stats()}
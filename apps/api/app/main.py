@@ -1,21 +1,45 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+import math
+import time
+from typing import Any
 from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 from app.api.compat import router as compat_router
 from app.api.public.chat import router as public_chat_router
 from app.core.config import get_settings
-from app.services.compat.error_policy import build_http_error_payload, build_unexpected_error_payload
+from app.core.json_codec import FastJSONResponse
+from app.domain.ai.call_context import ai_call_context
+from app.services.compat.error_policy import (
+    build_error_headers,
+    build_http_error_payload,
+    build_unexpected_error_payload,
+)
+from app.services.compat.generation_service import ai_runtime_stats, prewarm_ai_service
 
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 첫 요청이 TCP/TLS 핸드셰이크 비용을 내지 않도록 공급자 연결을 백그라운드에서 미리 연다.
+    prewarm_task = asyncio.create_task(prewarm_ai_service(settings.ai_http_prewarm_connections))
+    yield
+    prewarm_task.cancel()
+
+
 app = FastAPI(
     title="AI+ API",
     version="0.0.1",
     description="Personalized learning orchestration prototype API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -27,23 +51,69 @@ app.add_middleware(
 )
 
 
+def _caller_id(request: Request, header: str) -> str | None:
+    value = request.headers.get(header, "").strip()
+    return value[:128] or None
+
+
+# 이 값 이상이면 남은 ms가 아니라 epoch ms로 된 절대 마감 시각으로 본다(약 1973년 이후).
+_EPOCH_DEADLINE_MS = 100_000_000_000
+
+
+def _request_deadline(request: Request) -> float | None:
+    """Returns the request deadline on the time.monotonic clock, or None when there is none."""
+    budgets_ms: list[float] = []
+    route_ms = settings.ai_route_deadlines_ms.get(request.url.path, settings.ai_request_deadline_ms)
+    if route_ms > 0:
+        budgets_ms.append(route_ms)
+    raw = request.headers.get(settings.ai_request_deadline_header, "").strip()
+    try:
+        header_ms = float(raw) if raw else None
+    except ValueError:
+        header_ms = None
+    # "nan"/"inf"도 float()를 통과하므로 값이 아닌 헤더로 보고 무시한다.
+    if header_ms is not None and math.isfinite(header_ms):
+        if header_ms >= _EPOCH_DEADLINE_MS:
+            header_ms -= time.time() * 1000
+        budgets_ms.append(max(0.0, header_ms))
+    if not budgets_ms:
+        return None
+    return time.monotonic() + min(budgets_ms) / 1000
+
+
+@app.middleware("http")
+async def bind_ai_request_context(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    # 토큰 쿼터를 차감할 학습자/테넌트와 요청 마감을 AI 호출 컨텍스트에 싣는다(스트리밍 응답 본문까지 유지된다).
+    with ai_call_context(
+        user_id=_caller_id(request, settings.ai_quota_user_header),
+        tenant_id=_caller_id(request, settings.ai_quota_tenant_header),
+        deadline=_request_deadline(request),
+    ):
+        return await call_next(request)
+
+
 @app.get("/health")
-def health_check() -> dict[str, str]:
+async def health_check() -> dict[str, str]:
     return {"status": "ok", "env": settings.env}
 
 
+@app.get("/health/ai")
+async def ai_health_check() -> dict[str, Any]:
+    return ai_runtime_stats()
+
+
 @app.exception_handler(HTTPException)
-async def handle_http_exception(request: Request, exc: HTTPException) -> JSONResponse:
+async def handle_http_exception(request: Request, exc: HTTPException) -> FastJSONResponse:
     trace_id = request.headers.get("x-trace-id") or uuid4().hex
     payload = build_http_error_payload(exc, trace_id)
-    return JSONResponse(status_code=exc.status_code, content=payload)
+    return FastJSONResponse(status_code=exc.status_code, content=payload, headers=build_error_headers(payload))
 
 
 @app.exception_handler(Exception)
-async def handle_unexpected_exception(request: Request, _exc: Exception) -> JSONResponse:
+async def handle_unexpected_exception(request: Request, _exc: Exception) -> FastJSONResponse:
     trace_id = request.headers.get("x-trace-id") or uuid4().hex
     payload = build_unexpected_error_payload(trace_id)
-    return JSONResponse(status_code=500, content=payload)
+    return FastJSONResponse(status_code=500, content=payload)
 
 
 app.include_router(compat_router)
@@ -0,0 +1,221 @@
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+import json
+import time
+from typing import Any
+
+from app.domain.ai.providers.base import AIResponseMeta, merge_ai_response_metas
+from app.domain.ai.providers.batch import BatchClient, BatchRequest, BatchResult, run_batch
+from app.services.compat.generation_service import (
+    GenerateRequest,
+    ReasoningRequest,
+    _build_generate_prompts,
+    _build_reasoning_prompts,
+    _build_sections_prompts,
+    _generated_content_quality_issues,
+    _normalize_generated_content,
+    _normalize_reasoning,
+    _normalize_sections,
+    _sections_quality_issues,
+    _with_response_meta,
+)
+
+
+GENERATE_KIND = "generate"
+LESSON_KIND = "lesson"
+
+
+@dataclass
+class BatchJobItem:
+    """One line of the bulk input file.
+
+    ``generate`` items carry a GenerateRequest payload. ``lesson`` items carry a ReasoningRequest
+    and run reasoning then sections; a resubmitted lesson keeps the reasoning it already has.
+    """
+
+    id: str
+    kind: str
+    payload: GenerateRequest | ReasoningRequest
+    attempt: int = 1
+    reasoning: dict[str, Any] | None = None
+    metas: list[AIResponseMeta] = field(default_factory=list)
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any], *, index: int) -> "BatchJobItem":
+        raw_payload = record.get("payload") if isinstance(record.get("payload"), dict) else record
+        kind = str(record.get("kind") or (LESSON_KIND if "curriculumGoal" in raw_payload else GENERATE_KIND))
+        if kind == GENERATE_KIND:
+            payload: GenerateRequest | ReasoningRequest = GenerateRequest.model_validate(raw_payload)
+        elif kind == LESSON_KIND:
+            payload = ReasoningRequest.model_validate(raw_payload)
+        else:
+            raise ValueError(f"batch_kind_unsupported:{kind}")
+        reasoning = record.get("reasoning")
+        return cls(
+            id=str(record.get("id") or f"item-{index}"),
+            kind=kind,
+            payload=payload,
+            attempt=max(1, int(record.get("attempt") or 1)),
+            reasoning=reasoning if isinstance(reasoning, dict) and reasoning else None,
+        )
+
+    def resubmit_record(self, error: str) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": self.payload.model_dump(),
+            "attempt": self.attempt + 1,
+            "error": error,
+        }
+        if self.reasoning is not None:
+            record["reasoning"] = self.reasoning
+        return record
+
+
+@dataclass
+class BatchGenerationReport:
+    passed: list[dict[str, Any]] = field(default_factory=list)
+    resubmit: list[dict[str, Any]] = field(default_factory=list)
+
+
+def read_batch_items(lines: Iterable[str]) -> tuple[list[BatchJobItem], list[dict[str, Any]]]:
+    """Parses JSONL input; lines that do not validate go straight to the resubmission list."""
+    items: list[BatchJobItem] = []
+    rejected: list[dict[str, Any]] = []
+    for index, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("batch_line_not_object")
+            items.append(BatchJobItem.from_record(record, index=index))
+        except Exception as exc:
+            rejected.append({"line": index, "raw": line.rstrip("\n"), "error": f"batch_input_invalid:{exc}"})
+    return items, rejected
+
+
+def run_batch_generation(
+    items: list[BatchJobItem],
+    client: BatchClient,
+    *,
+    poll_interval_sec: float = 30.0,
+    timeout_sec: float = 24 * 3600.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BatchGenerationReport:
+    """Runs every item through the provider batch API and the online normalize/quality checks."""
+    report = BatchGenerationReport()
+
+    def submit(stage: list[tuple[BatchJobItem, BatchRequest]]) -> list[tuple[BatchJobItem, BatchResult]]:
+        requests = [request for _, request in stage]
+        try:
+            results = run_batch(
+                client,
+                requests,
+                poll_interval_sec=poll_interval_sec,
+                timeout_sec=timeout_sec,
+                sleep=sleep,
+            )
+        except Exception as exc:
+            # 작업 전체가 실패/만료되면 해당 단계 항목을 모두 재제출 대상으로 돌린다.
+            results = [BatchResult(custom_id=request.custom_id, error=str(exc)) for request in requests]
+        return [(item, result) for (item, _), result in zip(stage, results)]
+
+    # 1단계: 콘텐츠 생성과 추론이 필요한 레슨을 한 작업으로 보낸다.
+    first_stage: list[tuple[BatchJobItem, BatchRequest]] = []
+    sections_stage: list[BatchJobItem] = []
+    for item in items:
+        if item.kind == LESSON_KIND and item.reasoning is not None:
+            sections_stage.append(item)
+        else:
+            first_stage.append((item, _first_stage_request(item)))
+
+    for item, result in submit(first_stage):
+        if result.response is None:
+            report.resubmit.append(item.resubmit_record(result.error or "batch_result_missing"))
+            continue
+        item.metas.append(result.response.meta)
+        if item.kind == GENERATE_KIND:
+            _finish_generate(item, result.response.data, report)
+        else:
+            assert isinstance(item.payload, ReasoningRequest)
+            item.reasoning = _normalize_reasoning(result.response.data, item.payload)
+            sections_stage.append(item)
+
+    # 2단계: 추론 결과를 받은 레슨의 섹션을 한 작업으로 보낸다.
+    stage = [(item, _sections_request(item)) for item in sections_stage]
+    for item, result in submit(stage):
+        if result.response is None:
+            report.resubmit.append(item.resubmit_record(result.error or "batch_result_missing"))
+            continue
+        item.metas.append(result.response.meta)
+        _finish_lesson(item, result.response.data, report)
+    return report
+
+
+def _first_stage_request(item: BatchJobItem) -> BatchRequest:
+    if isinstance(item.payload, GenerateRequest):
+        pipeline = "content_generate"
+        system_prompt, user_prompt = _build_generate_prompts(item.payload, retry_mode=item.attempt > 1)
+    else:
+        pipeline = "curriculum_reasoning"
+        system_prompt, user_prompt = _build_reasoning_prompts(item.payload)
+    return BatchRequest(
+        custom_id=f"{item.id}:{item.kind}",
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        pipeline=pipeline,
+    )
+
+
+def _sections_request(item: BatchJobItem) -> BatchRequest:
+    assert isinstance(item.payload, ReasoningRequest) and item.reasoning is not None
+    system_prompt, user_prompt = _build_sections_prompts(item.payload, item.reasoning, retry_mode=item.attempt > 1)
+    return BatchRequest(
+        custom_id=f"{item.id}:sections",
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        pipeline="curriculum_sections",
+    )
+
+
+def _finish_generate(item: BatchJobItem, data: dict[str, Any], report: BatchGenerationReport) -> None:
+    assert isinstance(item.payload, GenerateRequest)
+    normalized = _normalize_generated_content(data, item.payload)
+    issues = _generated_content_quality_issues(normalized, item.payload)
+    _collect(item, normalized, issues, report)
+
+
+def _finish_lesson(item: BatchJobItem, data: dict[str, Any], report: BatchGenerationReport) -> None:
+    assert isinstance(item.payload, ReasoningRequest) and item.reasoning is not None
+    normalized = _normalize_sections(data, item.payload, item.reasoning)
+    issues = _sections_quality_issues(normalized, item.payload)
+    _collect(item, {"reasoning": item.reasoning, **normalized}, issues, report)
+
+
+def _collect(item: BatchJobItem, result: dict[str, Any], issues: list[str], report: BatchGenerationReport) -> None:
+    if issues:
+        report.resubmit.append(item.resubmit_record(f"quality_validation_failed:{'|'.join(issues[:8])}"))
+        return
+    report.passed.append({
+        "id": item.id,
+        "kind": item.kind,
+        "attempt": item.attempt,
+        "payload": item.payload.model_dump(),
+        "result": _with_response_meta(
+            result,
+            merge_ai_response_metas(item.metas),
+            attempt_count=item.attempt,
+            fallback_used=False,
+        ),
+    })
+
+
+def write_jsonl(path: str, records: Iterable[dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps(record, ensure_ascii=False))
+            handle.write("\n")
+            count += 1
+    return count
@@ -12,6 +12,7 @@ KNOWN_ERROR_CODES = {
     "config_error",
     "empty_output",
     "provider_error",
+    "circuit_open",
     "db_error",
     "unknown",
 }
@@ -21,6 +22,7 @@ RETRYABLE_ERROR_CODES = {
     "rate_limited",
     "timeout",
     "quality_failed",
+    "circuit_open",
 }
 
 _PIPELINE_FAILURE_PATTERN = re.compile(r"^[a-z0-9_]+_failed:([a-z_]+):(.*)$")
@@ -39,6 +41,7 @@ def build_structured_error_detail(
     message: str | None = None,
     retryable: bool | None = None,
     detail: Any = None,
+    retry_after_sec: int | None = None,
 ) -> dict[str, Any]:
     code = normalize_error_code(error_code)
     message_text = " ".join(str(message or "").split()).strip()
@@ -51,12 +54,15 @@ def build_structured_error_detail(
     if not legacy_detail:
         legacy_detail = message_text
 
-    return {
+    structured = {
         "error_code": code,
         "message": message_text[:260],
         "retryable": bool(retryable),
         "detail": legacy_detail,
     }
+    if retry_after_sec is not None:
+        structured["retry_after_sec"] = max(0, int(retry_after_sec))
+    return structured
 
 
 def _build_message(code: str, reason: str) -> str:
@@ -71,6 +77,7 @@ def _build_message(code: str, reason: str) -> str:
         "config_error": "AI service configuration error",
         "empty_output": "AI returned empty content",
         "provider_error": "AI provider request failed",
+        "circuit_open": "AI provider is temporarily unavailable",
         "db_error": "Failed to persist generated result",
         "unknown": "Request failed",
     }
@@ -135,7 +142,7 @@ def build_http_error_payload(exc: HTTPException, trace_id: str) -> dict[str, Any
         code, message, legacy_detail = parse_legacy_detail(detail)
         retryable = code in RETRYABLE_ERROR_CODES
 
-    return {
+    payload = {
         "error_code": code,
         "message": message,
         "retryable": retryable,
@@ -143,6 +150,16 @@ def build_http_error_payload(exc: HTTPException, trace_id: str) -> dict[str, Any
         # 클라이언트 전환 기간 동안 하위호환을 위해 기존 detail 필드를 유지한다.
         "detail": legacy_detail,
     }
+    if isinstance(detail, dict) and detail.get("retry_after_sec") is not None:
+        payload["retry_after_sec"] = int(detail["retry_after_sec"])
+    return payload
+
+
+def build_error_headers(payload: dict[str, Any]) -> dict[str, str] | None:
+    retry_after = payload.get("retry_after_sec")
+    if retry_after is None:
+        return None
+    return {"Retry-After": str(int(retry_after))}
 
 
 def build_unexpected_error_payload(trace_id: str) -> dict[str, Any]:
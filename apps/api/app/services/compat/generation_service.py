@@ -1,7 +1,11 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from functools import lru_cache
 import json
 import re
-from typing import Any
+import time
+from typing import Any, Callable, Literal
 from urllib.parse import urlencode
 
 from fastapi import HTTPException, Request
@@ -9,46 +13,147 @@ from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, Field
 
 from app.core.config import get_settings
-from app.domain.ai import build_ai_service
+from app.domain.ai import build_ai_service, build_async_ai_service
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.output_schema import OutputSpec, configure_output_specs, output_spec_stats
+from app.domain.ai.prompt_cache import prompt_cache_stats
 from app.domain.ai.providers.base import AIAttemptError, AIResponseMeta, StructuredAIResponse
+from app.domain.ai.providers.circuit_breaker import circuit_breaker_stats
+from app.domain.ai.providers.gemini_cache import gemini_context_cache_stats
+from app.domain.ai.providers.json_repair import json_repair_stats
+from app.domain.ai.quota import token_quota_stats
+from app.domain.ai.response_cache import response_cache_stats
+from app.domain.ai.scheduler import retry_after_hint
+from app.domain.ai.similarity_cache import chat_similarity_cache_stats
+from app.domain.ai.token_estimator import configure_token_estimator, fit_prompt, token_estimator_stats
 from app.services.compat.error_policy import build_structured_error_detail
 from app.services.compat.normalizer_validator import (
     extract_enumerated_options,
+    extract_semantic_tokens,
     is_placeholder_option,
     normalize_option_text,
 )
 from app.services.compat.pipeline_runtime import (
     DEFAULT_RETRYABLE_FAILURE_KINDS,
+    ItemRepairNeeded,
     PipelineFailure,
+    RepairTarget,
+    RetryBudget,
+    RetryPolicy,
     ai_error_detail,
+    attempt_latency_stats,
     classify_ai_failure,
+    configure_retry_policies,
     format_pipeline_error_detail,
+    generate_json_with_streamed_items,
+    item_repair_stats,
+    retry_budget_stats,
     run_ai_with_retry,
+    run_ai_with_retry_async,
+    run_item_repair,
+    run_item_repair_async,
+    serialize_ai_response_meta,
+    speculation_stats,
 )
 
 
 settings = get_settings()
 
 
+def _configure_retry_policies() -> None:
+    default = RetryPolicy(
+        base_delay_ms=settings.ai_retry_base_delay_ms,
+        max_delay_ms=settings.ai_retry_max_delay_ms,
+        max_retry_after_ms=settings.ai_retry_max_retry_after_ms,
+        rejected_repairs=frozenset(settings.ai_json_repair_rejected),
+        speculative_candidates=max(1, settings.ai_speculative_candidates),
+        speculative_target_pass_rate=settings.ai_speculative_target_pass_rate,
+    )
+    configure_retry_policies(
+        default=default,
+        overrides={pipeline: default.with_overrides(values) for pipeline, values in settings.ai_retry_policies.items()},
+        budget=RetryBudget(
+            ratio=settings.ai_retry_budget_ratio,
+            min_per_sec=settings.ai_retry_budget_min_per_sec,
+        ),
+    )
+
+
+_configure_retry_policies()
+
+
 @lru_cache(maxsize=1)
 def _get_ai_service():
     return build_ai_service(settings)
 
 
+@lru_cache(maxsize=1)
+def _get_async_ai_service():
+    return build_async_ai_service(settings)
+
+
+def _raise_ai_service_init_failed(exc: Exception) -> None:
+    reason = ai_error_detail(exc)
+    raise HTTPException(
+        status_code=503,
+        detail=build_structured_error_detail(
+            error_code="config_error",
+            message=reason,
+            retryable=False,
+            detail=f"ai_service_init_failed:config_error:{reason}",
+        ),
+    ) from exc
+
+
 def _require_ai_service():
     try:
         return _get_ai_service()
     except Exception as exc:
-        reason = ai_error_detail(exc)
-        raise HTTPException(
-            status_code=503,
-            detail=build_structured_error_detail(
-                error_code="config_error",
-                message=reason,
-                retryable=False,
-                detail=f"ai_service_init_failed:config_error:{reason}",
-            ),
-        ) from exc
+        _raise_ai_service_init_failed(exc)
+
+
+def _require_async_ai_service():
+    try:
+        return _get_async_ai_service()
+    except Exception as exc:
+        _raise_ai_service_init_failed(exc)
+
+
+async def prewarm_ai_service(connections: int) -> int:
+    if connections <= 0:
+        return 0
+    try:
+        return await _get_async_ai_service().prewarm(connections)
+    except Exception:
+        # 키 미설정/네트워크 오류는 첫 요청에서 구조화된 에러로 드러나므로 예열 단계에서는 무시한다.
+        return 0
+
+
+def ai_runtime_stats() -> dict[str, Any]:
+    stats: dict[str, Any] = {
+        "circuits": circuit_breaker_stats(),
+        "prompt_cache": {"pipelines": prompt_cache_stats(), "gemini_handles": gemini_context_cache_stats()},
+        "response_cache": response_cache_stats(),
+        "chat_similarity_cache": chat_similarity_cache_stats(),
+        "quota": token_quota_stats(),
+        "attempts": attempt_latency_stats(),
+        "retry_budget": retry_budget_stats(),
+        "json_repair": json_repair_stats(),
+        "output_specs": output_spec_stats(),
+        "token_estimator": token_estimator_stats(),
+        "speculation": speculation_stats(),
+        "item_repair": item_repair_stats(),
+    }
+    try:
+        ai_service = _get_async_ai_service()
+    except Exception:
+        # 설정 오류로 서비스가 없어도 차단기/캐시 상태는 보여준다.
+        return stats
+    stats["concurrency"] = ai_service.concurrency_stats()
+    stats["routes"] = ai_service.route_stats()
+    stats["hedge"] = ai_service.hedge_stats()
+    stats["single_flight"] = ai_service.single_flight_stats()
+    return stats
 
 
 def _raise_pipeline_http_exception(failure: PipelineFailure) -> None:
@@ -59,6 +164,7 @@ def _raise_pipeline_http_exception(failure: PipelineFailure) -> None:
             message=failure.reason,
             retryable=failure.retryable,
             detail=format_pipeline_error_detail(failure.pipeline, failure.kind, failure.reason),
+            retry_after_sec=failure.retry_after_sec,
         ),
     )
 
@@ -68,9 +174,24 @@ def _classify_ai_failure(detail: str) -> tuple[str, int, bool]:
     return classify_ai_failure(detail)
 
 
+def _is_circuit_open_failure(exc: Exception) -> bool:
+    return classify_ai_failure(exc)[0] == "circuit_open"
+
+
+def _circuit_fallback_response(fallback: dict[str, Any], failure: PipelineFailure) -> dict[str, Any]:
+    # 공급자 회로가 열려 있으면 타임아웃을 기다리지 않고 기존 폴백 콘텐츠로 바로 응답한다.
+    return _with_response_meta(
+        fallback,
+        failure.response_meta,
+        attempt_count=failure.attempt_count,
+        fallback_used=True,
+        failure_kind=failure.kind,
+    )
+
+
 def _raise_direct_provider_http_exception(pipeline: str, exc: Exception) -> None:
     reason = ai_error_detail(exc)
-    code, status_code, retryable = classify_ai_failure(reason)
+    code, status_code, retryable = classify_ai_failure(exc)
     raise HTTPException(
         status_code=status_code,
         detail=build_structured_error_detail(
@@ -78,44 +199,31 @@ def _raise_direct_provider_http_exception(pipeline: str, exc: Exception) -> None
             message=reason,
             retryable=retryable,
             detail=format_pipeline_error_detail(pipeline, code, reason),
+            retry_after_sec=retry_after_hint(exc),
         ),
     ) from exc
 
 
-def _serialize_ai_response_meta(
-    response_meta: AIResponseMeta | None,
+async def _request_structured_json_async(
+    ai_service: Any,
     *,
-    attempt_count: int | None = None,
-    fallback_used: bool | None = None,
-    failure_kind: str | None = None,
-) -> dict[str, Any]:
-    serialized: dict[str, Any] = {}
-
-    if response_meta is not None:
-        serialized["provider"] = response_meta.provider
-        serialized["model"] = response_meta.model
-        if response_meta.usage is not None:
-            usage_payload: dict[str, int] = {}
-            if response_meta.usage.input_tokens is not None:
-                usage_payload["input_tokens"] = response_meta.usage.input_tokens
-            if response_meta.usage.output_tokens is not None:
-                usage_payload["output_tokens"] = response_meta.usage.output_tokens
-            if response_meta.usage.total_tokens is not None:
-                usage_payload["total_tokens"] = response_meta.usage.total_tokens
-            if response_meta.usage.cached_input_tokens is not None:
-                usage_payload["cached_input_tokens"] = response_meta.usage.cached_input_tokens
-            if usage_payload:
-                serialized["usage"] = usage_payload
-
-    if attempt_count is not None:
-        serialized["attempt_count"] = attempt_count
-    if fallback_used is not None:
-        serialized["fallback_used"] = fallback_used
-        serialized["failure_kind"] = failure_kind
-    elif failure_kind is not None:
-        serialized["failure_kind"] = failure_kind
-
-    return serialized
+    system_prompt: str,
+    user_prompt: str,
+    item_normalizers: dict[str, Callable[[int, Any], Any]],
+    ready_fields: frozenset[str] = frozenset(),
+    on_ready: Callable[[dict[str, Any]], None] | None = None,
+) -> StructuredAIResponse:
+    # 스트리밍 중 완성된 배열 항목부터 정규화한다. 항목 정규화는 멱등이라 finalize에서 다시 돌려도 같다.
+    if not settings.ai_stream_structured_output:
+        return await ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    return await generate_json_with_streamed_items(
+        ai_service,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        item_normalizers=item_normalizers,
+        ready_fields=ready_fields,
+        on_ready=on_ready,
+    )
 
 
 def _with_response_meta(
@@ -130,7 +238,7 @@ def _with_response_meta(
     existing_meta = result.get("meta")
     merged_meta = {
         **(existing_meta if isinstance(existing_meta, dict) else {}),
-        **_serialize_ai_response_meta(
+        **serialize_ai_response_meta(
             response_meta,
             attempt_count=attempt_count,
             fallback_used=fallback_used,
@@ -250,6 +358,90 @@ class SectionsRequest(BaseModel):
     reasoning: dict[str, Any]
 
 
+class LessonRequest(ReasoningRequest):
+    # true면 추론이 준비되는 즉시 reasoning 이벤트를, 섹션까지 끝나면 done 이벤트를 SSE로 보낸다
+    stream: bool = False
+
+
+# 파이프라인 응답 형태. 프롬프트의 스키마 설명과 같고, 공급자에는 strict JSON Schema로 함께 보낸다.
+class ReasoningOutput(BaseModel):
+    learning_objectives: list[str]
+    prerequisite_concepts: list[str]
+    why_this_topic: str
+    teaching_strategy: str
+    difficulty_calibration: str
+    connection_to_goal: str
+
+
+class LessonSection(BaseModel):
+    type: Literal["concept", "example", "check", "summary"]
+    title: str
+    body: str
+    code: str
+    explanation: str
+    question: str
+    options: list[str]
+    correct_answer: int
+    next_preview: str
+
+
+class SectionsOutput(BaseModel):
+    title: str
+    sections: list[LessonSection]
+
+
+class CodeExample(BaseModel):
+    title: str
+    code: str
+    explanation: str
+    language: str
+
+
+class QuizItem(BaseModel):
+    question: str
+    options: list[str]
+    correct_answer: int
+    explanation: str
+
+
+class GeneratedContentOutput(BaseModel):
+    title: str
+    content: str
+    code_examples: list[CodeExample]
+    quiz: list[QuizItem]
+
+
+class AssessmentQuestionsOutput(BaseModel):
+    questions: list[AssessmentQuestion]
+
+
+_PIPELINE_OUTPUT_MODELS: dict[str, type[BaseModel]] = {
+    "content_generate": GeneratedContentOutput,
+    "assessment_questions": AssessmentQuestionsOutput,
+    "curriculum_generate": CurriculumOutput,
+    "curriculum_refine": CurriculumOutput,
+    "curriculum_reasoning": ReasoningOutput,
+    "curriculum_sections": SectionsOutput,
+}
+
+
+def _configure_output_specs() -> None:
+    pipelines = set(_PIPELINE_OUTPUT_MODELS) | set(settings.ai_max_output_tokens)
+    configure_output_specs({
+        pipeline: OutputSpec.from_model(
+            pipeline,
+            _PIPELINE_OUTPUT_MODELS.get(pipeline) if settings.ai_structured_outputs else None,
+            max_output_tokens=settings.ai_max_output_tokens.get(pipeline),
+        )
+        for pipeline in pipelines
+    })
+
+
+_configure_output_specs()
+# 호출 전 추정은 기본 공급자 보정치로 하고, 응답한 공급자의 input_tokens로 보정한다.
+configure_token_estimator(default_provider=settings.ai_provider, budgets=settings.ai_input_token_budgets)
+
+
 def _truncate_text(value: str, limit: int) -> str:
     if len(value) <= limit:
         return value
@@ -302,14 +494,21 @@ def _compact_reasoning_for_sections_prompt(reasoning: dict[str, Any]) -> dict[st
     }
 
 
-def _compact_personalization_for_prompt(payload: ReasoningRequest) -> dict[str, Any]:
+# 입력 토큰 예산을 넘으면 단계마다 (피드백 행, 개념 행, 이웃 토픽 수, 토픽 설명 글자 수)를 줄인다.
+_PROMPT_SHRINK_STEPS = ((4, 6, 6, 240), (2, 4, 3, 160), (1, 2, 1, 80))
+
+
+def _compact_personalization_for_prompt(payload: ReasoningRequest, shrink: int = 0) -> dict[str, Any]:
+    feedback_limit, concept_limit, _, _ = _PROMPT_SHRINK_STEPS[shrink]
     feedback_rows = payload.learnerFeedback if isinstance(payload.learnerFeedback, list) else []
     concept_rows = payload.learnerConceptFocus if isinstance(payload.learnerConceptFocus, list) else []
+    feedback_rows = feedback_rows[-feedback_limit:]
+    concept_rows = concept_rows[:concept_limit]
 
     recent_feedback: list[dict[str, Any]] = []
     difficult_concepts: list[str] = []
 
-    for row in feedback_rows[-4:]:
+    for row in feedback_rows:
         if not isinstance(row, dict):
             continue
         rating_raw = row.get("understanding_rating")
@@ -330,7 +529,7 @@ def _compact_personalization_for_prompt(payload: ReasoningRequest) -> dict[str,
         difficult_concepts.extend(concepts)
 
     risk_focus: list[dict[str, Any]] = []
-    for row in concept_rows[:6]:
+    for row in concept_rows:
         if not isinstance(row, dict):
             continue
         concept_tag = str(row.get("concept_tag") or "").strip()
@@ -373,54 +572,6 @@ def _extract_topic_keywords(topic: str) -> list[str]:
     return tokens[:5]
 
 
-def _extract_semantic_tokens(text: str) -> set[str]:
-    raw_tokens = re.findall(r"[A-Za-z가-힣0-9_#+.-]+", text.lower())
-    skip = {
-        "핵심",
-        "토픽",
-        "주제",
-        "학습",
-        "개념",
-        "문제",
-        "설명",
-        "예제",
-        "확인",
-        "요약",
-        "정리",
-        "섹션",
-        "정답",
-        "오답",
-        "선택지",
-        "코드",
-        "기본",
-        "단계",
-        "내용",
-        "방법",
-        "사용",
-        "구현",
-        "처리",
-        "결과",
-        "and",
-        "the",
-        "for",
-        "with",
-        "from",
-        "this",
-        "that",
-    }
-    tokens: set[str] = set()
-    for token in raw_tokens:
-        normalized = token.strip("._- ")
-        if len(normalized) < 2:
-            continue
-        if normalized.isdigit():
-            continue
-        if normalized in skip:
-            continue
-        tokens.add(normalized)
-    return tokens
-
-
 def _count_non_empty_lines(code: str) -> int:
     return len([line for line in code.splitlines() if line.strip()])
 
@@ -534,7 +685,7 @@ def _sections_quality_issues(result: dict[str, Any], payload: ReasoningRequest)
         for section in [*type_map["concept"][:1], *type_map["example"][:1]]
         if isinstance(section, dict)
     )
-    reference_tokens = _extract_semantic_tokens(reference_text)
+    reference_tokens = extract_semantic_tokens(reference_text)
     topic_tokens = set(_extract_topic_keywords(payload.topic))
 
     for index, check in enumerate(type_map["check"][:2], start=1):
@@ -555,7 +706,7 @@ def _sections_quality_issues(result: dict[str, Any], payload: ReasoningRequest)
             issues.append(f"check{index}_options_invalid")
         if reference_tokens:
             check_basis_text = " ".join([question, explanation, *meaningful_options])
-            check_tokens = _extract_semantic_tokens(check_basis_text)
+            check_tokens = extract_semantic_tokens(check_basis_text)
             overlap = (check_tokens & reference_tokens) - topic_tokens
             if check_tokens and len(overlap) < 1:
                 issues.append(f"check{index}_grounding_low")
@@ -580,6 +731,90 @@ def _assert_sections_quality(result: dict[str, Any], payload: ReasoningRequest)
         raise ValueError(f"quality_validation_failed:{'|'.join(issues[:6])}")
 
 
+# 항목 하나를 가리키는 품질 문제 코드(check2_options_invalid, quiz4_explanation_too_short, topic3_title_non_korean 등)
+_ITEM_ISSUE_PATTERN = re.compile(r"^(check|quiz|code_example|topic)(\d+)_([a-z_]+)$")
+# 첫 concept/example 섹션을 가리키는 섹션 문제 코드
+_SECTION_ISSUE_TYPES = {
+    "concept_body_too_short": "concept",
+    "concept_body_placeholder": "concept",
+    "example_code_too_short": "example",
+    "example_code_generic": "example",
+    "example_explanation_too_short": "example",
+}
+_ITEM_REPAIR_HINTS = {
+    "question_too_short": "질문에 상황과 조건을 넣어 더 구체적으로",
+    "explanation_too_short": "해설에 정답 근거와 오답이 틀린 이유까지 충분히",
+    "options_invalid": "서로 다르고 의미 있는 보기 4개(번호만 쓰지 말 것)",
+    "grounding_low": "앞선 개념/예제 섹션의 용어와 코드만으로 풀 수 있게",
+    "invalid": "스키마의 모든 키를 채운 객체로",
+    "body_too_short": "본문을 더 길고 구체적으로",
+    "body_placeholder": "자리표시 문구 대신 실제 설명으로",
+    "code_too_short": "6줄 이상의 실행 가능한 코드로",
+    "code_generic": "hello world 같은 일반 예제 대신 토픽에 맞는 코드로",
+    "title_too_short": "제목을 더 구체적으로",
+    "title_non_korean": "제목을 한국어로",
+    "description_too_short": "설명에 실행/산출물 기준을 넣어 더 길게",
+    "description_non_korean": "설명을 한국어로",
+    "generic_title": "'핵심 토픽' 같은 일반명 대신 구체적인 제목으로",
+}
+
+
+def _item_repair_targets(
+    issues: list[str],
+    locate: Callable[[str], list[tuple[str, int, str]] | None],
+) -> tuple[RepairTarget, ...] | None:
+    """Groups item-level issue codes by the item they point at.
+
+    Returns None when any issue is about the whole document (missing sections, topic keyword,
+    summary...) or too many items fail; those cases regenerate the document instead.
+    """
+    grouped: dict[tuple[str, int], list[str]] = {}
+    for issue in issues:
+        located = locate(issue)
+        if not located:
+            return None
+        for field, index, hint in located:
+            grouped.setdefault((field, index), []).append(hint)
+    if not grouped or len(grouped) > settings.ai_item_repair_max_items:
+        return None
+    return tuple(RepairTarget(field=field, index=index, issues=tuple(hints)) for (field, index), hints in grouped.items())
+
+
+def _item_label(item: Any) -> str:
+    if not isinstance(item, dict):
+        return ""
+    return _truncate_text(str(item.get("title") or item.get("question") or "").strip(), 60)
+
+
+def _item_repair_prompts(
+    system_prompt: str,
+    *,
+    document: dict[str, Any],
+    targets: tuple[RepairTarget, ...],
+    context: list[str],
+) -> tuple[str, str]:
+    # 시스템 프롬프트는 원래 파이프라인 것을 그대로 써서 스키마/규칙과 공급자 프롬프트 캐시를 함께 쓴다.
+    lines = [
+        "부분 수정 요청입니다. 품질 기준에 못 미친 아래 항목만 다시 작성하세요.",
+        "스키마는 그대로 따르되 배열 필드에는 다시 쓴 항목만 아래 번호 순서대로 넣고, 나머지 배열은 비우고 문자열은 빈 문자열, 숫자는 0으로 두세요.",
+        "항목 개수/구성 규칙은 이번 요청에 적용하지 않습니다. 항목의 종류와 원래 의도, 앞뒤 흐름은 유지하세요.",
+        *context,
+    ]
+    for order, target in enumerate(targets, start=1):
+        items = document.get(target.field) or []
+        hints = "; ".join(_ITEM_REPAIR_HINTS.get(issue, issue) for issue in target.issues)
+        lines.append(f"[{order}] {target.field}의 {target.index + 1}번째 항목. 고칠 점: {hints}")
+        neighbours = [
+            f"{label} {_item_label(items[index])}"
+            for label, index in (("앞 항목:", target.index - 1), ("뒤 항목:", target.index + 1))
+            if 0 <= index < len(items) and _item_label(items[index])
+        ]
+        if neighbours:
+            lines.append(" / ".join(neighbours))
+        lines.append(f"원본: {json.dumps(items[target.index], ensure_ascii=False)}")
+    return system_prompt, "\n".join(lines)
+
+
 def _safe_int(value: Any, fallback: int) -> int:
     try:
         parsed = int(value)
@@ -759,6 +994,25 @@ def _generate_assessment_questions_with_meta(
         system_prompt=system_prompt,
         user_prompt=user_prompt,
     )
+    return _finalize_assessment_questions(response, payload)
+
+
+async def _generate_assessment_questions_with_meta_async(
+    ai_service: Any,
+    payload: AssessmentQuestionsRequest,
+) -> StructuredAIResponse:
+    system_prompt, user_prompt = _build_assessment_questions_prompts(payload)
+    response = await ai_service.generate_json_with_meta(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+    )
+    return _finalize_assessment_questions(response, payload)
+
+
+def _finalize_assessment_questions(
+    response: StructuredAIResponse,
+    payload: AssessmentQuestionsRequest,
+) -> StructuredAIResponse:
     try:
         normalized = _normalize_assessment_questions(
             response.data,
@@ -913,6 +1167,36 @@ def _fallback_curriculum(payload: CurriculumGenerateRequest) -> dict[str, Any]:
     }
 
 
+def _normalize_curriculum_topic(
+    item: Any,
+    idx: int,
+    payload: CurriculumGenerateRequest,
+    *,
+    strict: bool = False,
+) -> dict[str, Any]:
+    if not isinstance(item, dict):
+        item = {}
+
+    title = _as_non_empty_str(item.get("title"), f"토픽 {idx + 1}" if strict else f"핵심 토픽 {idx + 1}")
+    if _looks_non_korean(title) and not strict:
+        title = f"핵심 토픽 {idx + 1}"
+
+    description = _as_non_empty_str(
+        item.get("description"),
+        f"{title} 학습 내용을 구체적으로 설명합니다." if strict else f"{title}의 핵심 개념을 학습하고 예제와 확인 문제로 이해를 검증합니다.",
+    )
+    if _looks_non_korean(description) and not strict:
+        description = f"{title}의 핵심을 학습하고 {payload.goal} 목표와 연결해 이해를 확인합니다."
+
+    estimated = _safe_int(item.get("estimated_minutes"), 50)
+    estimated = max(35, min(90, estimated))
+    return {
+        "title": title,
+        "description": description,
+        "estimated_minutes": estimated,
+    }
+
+
 def _normalize_curriculum(
     raw: dict[str, Any],
     payload: CurriculumGenerateRequest,
@@ -926,34 +1210,13 @@ def _normalize_curriculum(
     topics: list[dict[str, Any]] = []
     seen: set[str] = set()
     for idx, item in enumerate(raw_topics[:30]):
-        if not isinstance(item, dict):
-            item = {}
-
-        title = _as_non_empty_str(item.get("title"), f"토픽 {idx + 1}" if strict else f"핵심 토픽 {idx + 1}")
-        if _looks_non_korean(title) and not strict:
-            title = f"핵심 토픽 {idx + 1}"
-        key = "".join(title.lower().split())
+        topic = _normalize_curriculum_topic(item, idx, payload, strict=strict)
+        key = "".join(topic["title"].lower().split())
         # 동일 제목(공백/대소문자 차이 포함)은 한 번만 반영한다.
         if key in seen:
             continue
         seen.add(key)
-
-        description = _as_non_empty_str(
-            item.get("description"),
-            f"{title} 학습 내용을 구체적으로 설명합니다." if strict else f"{title}의 핵심 개념을 학습하고 예제와 확인 문제로 이해를 검증합니다.",
-        )
-        if _looks_non_korean(description) and not strict:
-            description = f"{title}의 핵심을 학습하고 {payload.goal} 목표와 연결해 이해를 확인합니다."
-
-        estimated = _safe_int(item.get("estimated_minutes"), 50)
-        estimated = max(35, min(90, estimated))
-        topics.append(
-            {
-                "title": title,
-                "description": description,
-                "estimated_minutes": estimated,
-            }
-        )
+        topics.append(topic)
 
     target, minimum = _topic_count_policy(payload)
     if not strict:
@@ -1067,13 +1330,9 @@ def _assert_curriculum_quality(result: dict[str, Any], payload: CurriculumGenera
         raise ValueError(f"quality_validation_failed:{'|'.join(issues[:8])}")
 
 
-def _build_curriculum_prompts(
-    payload: CurriculumGenerateRequest,
-    *,
-    retry_mode: bool = False,
-) -> tuple[str, str]:
-    topic_target, topic_minimum = _topic_count_policy(payload)
-    system_prompt = """당신은 프로그래밍 커리큘럼 설계 전문가입니다.
+# 시스템 프롬프트는 요청마다 바이트 단위로 같아야 공급자 프롬프트 캐시에 맞는다.
+# 요청별 값과 재시도 힌트는 사용자 프롬프트 뒤쪽에만 넣는다.
+_CURRICULUM_SYSTEM_PROMPT = """당신은 프로그래밍 커리큘럼 설계 전문가입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록은 금지합니다.
 스키마:
 {
@@ -1089,9 +1348,17 @@ def _build_curriculum_prompts(
 - 너무 넓은 토픽보다 작고 구체적인 학습 단위로 나눌 것
 - title은 '핵심 토픽', '보강 토픽' 같은 일반명 금지
 - 각 description은 최소 45자 이상, 실행/산출물 기준 포함"""
-    if retry_mode:
-        system_prompt += "\n- 이전 시도는 품질 기준 미달이었으므로 추상 표현 없이 구체적인 스택/개념/산출물 중심으로 작성"
+
+
+def _build_curriculum_prompts(
+    payload: CurriculumGenerateRequest,
+    *,
+    retry_mode: bool = False,
+) -> tuple[str, str]:
+    topic_target, topic_minimum = _topic_count_policy(payload)
+    system_prompt = _CURRICULUM_SYSTEM_PROMPT
     user_prompt = (
+        "응답 전체는 한국어로 작성하세요.\n"
         f"학습 목표: {payload.goal}\n"
         f"현재 수준: {payload.level}\n"
         f"강점: {', '.join(payload.strengths) if payload.strengths else '없음'}\n"
@@ -1101,9 +1368,10 @@ def _build_curriculum_prompts(
         f"목표 유형: {payload.goalType}\n"
         f"주당 학습 시간: {payload.weeklyStudyHours}\n"
         f"학습 스타일: {payload.learningStyle}\n"
-        f"토픽 수는 최소 {topic_minimum}개, 목표 {topic_target}개로 구성하세요.\n"
-        "응답 전체는 한국어로 작성하세요."
+        f"토픽 수는 최소 {topic_minimum}개, 목표 {topic_target}개로 구성하세요."
     )
+    if retry_mode:
+        user_prompt += "\n이전 시도는 품질 기준 미달이었으므로 추상 표현 없이 구체적인 스택/개념/산출물 중심으로 작성하세요."
     return system_prompt, user_prompt
 
 
@@ -1115,15 +1383,118 @@ def _generate_curriculum_with_quality(
 ) -> StructuredAIResponse:
     system_prompt, user_prompt = _build_curriculum_prompts(payload, retry_mode=retry_mode)
     response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    try:
+        return _finalize_curriculum(response, payload)
+    except ItemRepairNeeded as needed:
+        return run_item_repair(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+async def _generate_curriculum_with_quality_async(
+    *,
+    ai_service: Any,
+    payload: CurriculumGenerateRequest,
+    retry_mode: bool,
+) -> StructuredAIResponse:
+    system_prompt, user_prompt = _build_curriculum_prompts(payload, retry_mode=retry_mode)
+    response = await _request_structured_json_async(
+        ai_service,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        item_normalizers={
+            "topics": lambda idx, item: _normalize_curriculum_topic(item, idx, payload, strict=True),
+        },
+    )
+    try:
+        return _finalize_curriculum(response, payload)
+    except ItemRepairNeeded as needed:
+        return await run_item_repair_async(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+def _finalize_curriculum(
+    response: StructuredAIResponse,
+    payload: CurriculumGenerateRequest,
+) -> StructuredAIResponse:
+    normalized: dict[str, Any] | None = None
     try:
         normalized = _normalize_curriculum(response.data, payload, strict=True)
         _assert_curriculum_quality(normalized, payload)
     except Exception as exc:
-        raise AIAttemptError(str(exc), meta=response.meta) from exc
+        if normalized is None:
+            raise AIAttemptError(str(exc), meta=response.meta) from exc
+        raise _curriculum_quality_error(exc, response.meta, normalized, payload) from exc
     return StructuredAIResponse(data=normalized, meta=response.meta)
 
 
+def _locate_curriculum_issue(issue: str, topics: list[dict[str, Any]]) -> list[tuple[str, int, str]] | None:
+    if issue.startswith("generic_topic_titles:"):
+        return [
+            ("topics", idx, "generic_title")
+            for idx, topic in enumerate(topics[:24])
+            if _is_generic_curriculum_topic_title(str(topic.get("title") or ""))
+        ]
+    match = _ITEM_ISSUE_PATTERN.match(issue)
+    if match is None or match.group(1) != "topic":
+        return None
+    return [("topics", int(match.group(2)) - 1, match.group(3))]
+
+
+def _curriculum_quality_error(
+    exc: Exception,
+    meta: AIResponseMeta,
+    normalized: dict[str, Any],
+    payload: CurriculumGenerateRequest,
+) -> AIAttemptError:
+    topics = normalized["topics"]
+    targets = _item_repair_targets(
+        _curriculum_quality_issues(normalized, payload),
+        lambda issue: _locate_curriculum_issue(issue, topics),
+    )
+    if targets is None:
+        return AIAttemptError(str(exc), meta=meta)
+    # 다시 쓴 토픽이 다른 토픽과 겹치지 않고 순서에 맞도록 전체 토픽 제목을 함께 보낸다.
+    context = [
+        "응답 전체는 한국어로 작성하세요.",
+        f"학습 목표: {payload.goal}",
+        f"현재 수준: {payload.level}",
+        f"전체 토픽 순서: {' / '.join(str(topic.get('title') or '') for topic in topics)}",
+    ]
+    system_prompt, user_prompt = _item_repair_prompts(
+        _CURRICULUM_SYSTEM_PROMPT,
+        document=normalized,
+        targets=targets,
+        context=context,
+    )
+    return ItemRepairNeeded(
+        str(exc),
+        meta=meta,
+        pipeline="curriculum_generate",
+        document=normalized,
+        targets=targets,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        finalize=lambda document: _repaired_curriculum(document, payload),
+    )
+
+
+def _repaired_curriculum(document: dict[str, Any], payload: CurriculumGenerateRequest) -> dict[str, Any]:
+    normalized = _normalize_curriculum(document, payload, strict=True)
+    _assert_curriculum_quality(normalized, payload)
+    return normalized
+
+
 def _build_refine_prompts(payload: CurriculumRefineRequest) -> tuple[str, str]:
+    return fit_prompt(
+        lambda shrink: _refine_prompts(payload, shrink),
+        pipeline="curriculum_refine",
+        levels=len(_REFINE_HISTORY_STEPS) - 1,
+    )
+
+
+# 입력 토큰 예산을 넘으면 대화 이력부터 줄인다(사용자 요청과 현재 토픽은 그대로 둔다).
+_REFINE_HISTORY_STEPS = (6, 3, 1, 0)
+
+
+def _refine_prompts(payload: CurriculumRefineRequest, shrink: int) -> tuple[str, str]:
     system_prompt = """당신은 커리큘럼 리라이팅 전문가입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록은 금지합니다.
 스키마:
@@ -1137,7 +1508,10 @@ def _build_refine_prompts(payload: CurriculumRefineRequest) -> tuple[str, str]:
         f"{idx + 1}. {topic.title} ({topic.estimated_minutes}분) - {topic.description}"
         for idx, topic in enumerate(payload.currentCurriculum.topics)
     )
-    chat_log = "\n".join(f"{msg.role}: {msg.content}" for msg in payload.chatHistory[-6:])
+    history_limit = _REFINE_HISTORY_STEPS[shrink]
+    chat_log = "\n".join(
+        f"{msg.role}: {msg.content}" for msg in (payload.chatHistory[-history_limit:] if history_limit else ())
+    )
     user_prompt = (
         f"현재 커리큘럼 제목: {payload.currentCurriculum.title}\n"
         f"현재 토픽:\n{current_topics}\n"
@@ -1172,7 +1546,22 @@ def _normalize_reasoning(raw: dict[str, Any], payload: ReasoningRequest) -> dict
 
 
 def _build_reasoning_prompts(payload: ReasoningRequest) -> tuple[str, str]:
-    personalization = _compact_personalization_for_prompt(payload)
+    return fit_prompt(
+        lambda shrink: _reasoning_prompts(payload, shrink),
+        pipeline="curriculum_reasoning",
+        levels=len(_PROMPT_SHRINK_STEPS) - 1,
+    )
+
+
+def _reasoning_prompts(payload: ReasoningRequest, shrink: int) -> tuple[str, str]:
+    personalization = _compact_personalization_for_prompt(payload, shrink)
+    _, _, neighbor_limit, description_limit = _PROMPT_SHRINK_STEPS[shrink]
+    prev_topics, next_topics, topic_description = payload.prevTopics, payload.nextTopics, payload.topicDescription
+    if shrink:
+        # 바로 앞뒤 토픽이 가장 관련이 깊으므로 이전 토픽은 끝에서, 다음 토픽은 앞에서 남긴다.
+        prev_topics = prev_topics[-neighbor_limit:]
+        next_topics = next_topics[:neighbor_limit]
+        topic_description = _truncate_text(topic_description or "", description_limit)
     teaching_method = _teaching_method_label(payload.teachingMethod)
     system_prompt = """당신은 프로그래밍 학습 설계 전문가입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록은 금지합니다.
@@ -1192,13 +1581,13 @@ def _build_reasoning_prompts(payload: ReasoningRequest) -> tuple[str, str]:
     user_prompt = (
         f"커리큘럼 목표: {payload.curriculumGoal}\n"
         f"현재 토픽: {payload.topic}\n"
-        f"토픽 설명: {payload.topicDescription}\n"
+        f"토픽 설명: {topic_description}\n"
         f"수준: {payload.learnerLevel}, 언어: {payload.language}\n"
         f"설명 방식: {teaching_method}\n"
         f"학습 스타일(활동 리듬): {payload.learningStyle}\n"
         "해석 규칙: 설명 방식은 해설 톤/피드백 방식, 학습 스타일은 순차/반복/누적 학습 흐름을 의미합니다.\n"
-        f"이전 토픽: {', '.join(payload.prevTopics) if payload.prevTopics else '없음'}\n"
-        f"다음 토픽: {', '.join(payload.nextTopics) if payload.nextTopics else '없음'}\n"
+        f"이전 토픽: {', '.join(prev_topics) if prev_topics else '없음'}\n"
+        f"다음 토픽: {', '.join(next_topics) if next_topics else '없음'}\n"
         f"개인화 신호: {json.dumps(personalization, ensure_ascii=False)}\n"
         "학습 설계 관점에서 분석 결과를 생성하세요.\n"
         "특히 difficult_concepts, concept_focus의 위험 개념을 우선 반영하세요."
@@ -1355,17 +1744,7 @@ def _normalize_sections(raw: dict[str, Any], payload: ReasoningRequest, reasonin
     }
 
 
-def _build_sections_prompts(
-    payload: ReasoningRequest,
-    reasoning: dict[str, Any],
-    *,
-    retry_mode: bool = False,
-) -> tuple[str, str]:
-    compact_reasoning = _compact_reasoning_for_sections_prompt(reasoning)
-    personalization = _compact_personalization_for_prompt(payload)
-    topic_description = _truncate_text(payload.topicDescription or "", 160 if retry_mode else 240)
-    teaching_method = _teaching_method_label(payload.teachingMethod)
-    system_prompt = """당신은 프로그래밍 학습 콘텐츠 작성자입니다.
+_SECTIONS_SYSTEM_PROMPT = """당신은 프로그래밍 학습 콘텐츠 작성자입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록은 금지합니다.
 스키마:
 {
@@ -1392,21 +1771,51 @@ def _build_sections_prompts(
 - check 문항은 반드시 앞선 concept/example에서 제시한 개념·코드 정보만으로 풀이 가능하게 구성
 - next_preview는 summary 섹션에만 작성하고, 나머지는 빈 문자열
 - 토픽/개인화 신호와 직접 연결된 설명 작성"""
-    if retry_mode:
-        system_prompt += "\n- 이전 시도는 실패했으므로 불필요한 수식 없이 핵심만 간결하게 작성"
+
+
+def _build_sections_prompts(
+    payload: ReasoningRequest,
+    reasoning: dict[str, Any],
+    *,
+    retry_mode: bool = False,
+) -> tuple[str, str]:
+    return fit_prompt(
+        lambda shrink: _sections_prompts(payload, reasoning, retry_mode=retry_mode, shrink=shrink),
+        pipeline="curriculum_sections",
+        levels=len(_PROMPT_SHRINK_STEPS) - 1,
+    )
+
+
+def _sections_prompts(
+    payload: ReasoningRequest,
+    reasoning: dict[str, Any],
+    *,
+    retry_mode: bool,
+    shrink: int,
+) -> tuple[str, str]:
+    compact_reasoning = _compact_reasoning_for_sections_prompt(reasoning)
+    personalization = _compact_personalization_for_prompt(payload, shrink)
+    description_limit = _PROMPT_SHRINK_STEPS[shrink][3]
+    topic_description = _truncate_text(
+        payload.topicDescription or "", min(160, description_limit) if retry_mode else description_limit
+    )
+    teaching_method = _teaching_method_label(payload.teachingMethod)
+    system_prompt = _SECTIONS_SYSTEM_PROMPT
     user_prompt = (
+        "해석 규칙: 설명 방식은 해설 톤/질문 방식, 학습 스타일은 섹션 전개 리듬(순차/반복/누적)을 뜻합니다.\n"
+        "개념-예제-확인-요약 흐름으로 섹션을 구성하세요.\n"
+        "개인화 신호의 difficult_concepts 또는 concept_focus를 최소 1개 이상 각 섹션에 반영하세요.\n"
         f"목표: {payload.curriculumGoal}\n"
         f"토픽: {payload.topic}\n"
         f"토픽 설명: {topic_description}\n"
         f"수준: {payload.learnerLevel}, 언어: {payload.language}\n"
         f"설명 방식: {teaching_method}\n"
         f"학습 스타일(활동 리듬): {payload.learningStyle}\n"
-        "해석 규칙: 설명 방식은 해설 톤/질문 방식, 학습 스타일은 섹션 전개 리듬(순차/반복/누적)을 뜻합니다.\n"
         f"추론 결과(요약): {json.dumps(compact_reasoning, ensure_ascii=False)}\n"
-        f"개인화 신호(요약): {json.dumps(personalization, ensure_ascii=False)}\n"
-        "개념-예제-확인-요약 흐름으로 섹션을 구성하세요.\n"
-        "개인화 신호의 difficult_concepts 또는 concept_focus를 최소 1개 이상 각 섹션에 반영하세요."
+        f"개인화 신호(요약): {json.dumps(personalization, ensure_ascii=False)}"
     )
+    if retry_mode:
+        user_prompt += "\n이전 시도는 실패했으므로 불필요한 수식 없이 핵심만 간결하게 작성하세요."
     return system_prompt, user_prompt
 
 
@@ -1419,14 +1828,115 @@ def _generate_sections_with_quality(
 ) -> StructuredAIResponse:
     system_prompt, user_prompt = _build_sections_prompts(payload, reasoning, retry_mode=retry_mode)
     response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    try:
+        return _finalize_sections(response, payload, reasoning)
+    except ItemRepairNeeded as needed:
+        return run_item_repair(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+async def _generate_sections_with_quality_async(
+    *,
+    ai_service: Any,
+    payload: ReasoningRequest,
+    reasoning: dict[str, Any],
+    retry_mode: bool,
+) -> StructuredAIResponse:
+    system_prompt, user_prompt = _build_sections_prompts(payload, reasoning, retry_mode=retry_mode)
+    response = await _request_structured_json_async(
+        ai_service,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        item_normalizers={
+            "sections": lambda idx, item: _normalize_section(item, idx, payload.topic),
+        },
+    )
+    try:
+        return _finalize_sections(response, payload, reasoning)
+    except ItemRepairNeeded as needed:
+        return await run_item_repair_async(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+def _finalize_sections(
+    response: StructuredAIResponse,
+    payload: ReasoningRequest,
+    reasoning: dict[str, Any],
+) -> StructuredAIResponse:
+    normalized: dict[str, Any] | None = None
     try:
         normalized = _normalize_sections(response.data, payload, reasoning)
         _assert_sections_quality(normalized, payload)
     except Exception as exc:
-        raise AIAttemptError(str(exc), meta=response.meta) from exc
+        if normalized is None:
+            raise AIAttemptError(str(exc), meta=response.meta) from exc
+        raise _sections_quality_error(exc, response.meta, normalized, payload, reasoning) from exc
     return StructuredAIResponse(data=normalized, meta=response.meta)
 
 
+def _locate_section_issue(issue: str, sections: list[dict[str, Any]]) -> list[tuple[str, int, str]] | None:
+    section_type = _SECTION_ISSUE_TYPES.get(issue)
+    if section_type is not None:
+        ordinal, hint = 1, issue.split("_", 1)[1]
+    else:
+        match = _ITEM_ISSUE_PATTERN.match(issue)
+        if match is None or match.group(1) != "check":
+            return None
+        section_type, ordinal, hint = "check", int(match.group(2)), match.group(3)
+    positions = [idx for idx, section in enumerate(sections) if section.get("type") == section_type]
+    if ordinal > len(positions):
+        return None
+    return [("sections", positions[ordinal - 1], hint)]
+
+
+def _sections_quality_error(
+    exc: Exception,
+    meta: AIResponseMeta,
+    normalized: dict[str, Any],
+    payload: ReasoningRequest,
+    reasoning: dict[str, Any],
+) -> AIAttemptError:
+    sections = normalized["sections"]
+    targets = _item_repair_targets(
+        _sections_quality_issues(normalized, payload),
+        lambda issue: _locate_section_issue(issue, sections),
+    )
+    if targets is None:
+        return AIAttemptError(str(exc), meta=meta)
+    # check 문항은 앞선 concept/example을 근거로 풀 수 있어야 하므로 두 섹션을 맥락으로 싣는다.
+    reference = {
+        section["type"]: section
+        for section in reversed(sections)
+        if section.get("type") in {"concept", "example"}
+    }
+    context = [
+        f"토픽: {payload.topic}",
+        f"수준: {payload.learnerLevel}, 언어: {payload.language}",
+        f"개념 섹션 본문: {_truncate_text(str(reference.get('concept', {}).get('body') or ''), 500)}",
+        f"예제 섹션 코드: {_truncate_text(str(reference.get('example', {}).get('code') or ''), 600)}",
+    ]
+    system_prompt, user_prompt = _item_repair_prompts(
+        _SECTIONS_SYSTEM_PROMPT,
+        document=normalized,
+        targets=targets,
+        context=context,
+    )
+    return ItemRepairNeeded(
+        str(exc),
+        meta=meta,
+        pipeline="curriculum_sections",
+        document=normalized,
+        targets=targets,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        finalize=lambda document: _repaired_sections(document, payload, reasoning),
+    )
+
+
+def _repaired_sections(document: dict[str, Any], payload: ReasoningRequest, reasoning: dict[str, Any]) -> dict[str, Any]:
+    normalized = _normalize_sections(document, payload, reasoning)
+    _assert_sections_quality(normalized, payload)
+    return normalized
+
+
 def _as_non_empty_str(value: Any, fallback: str) -> str:
     if isinstance(value, str):
         stripped = value.strip()
@@ -1701,13 +2211,7 @@ def _assert_generated_content_quality(result: dict[str, Any], payload: GenerateR
         raise ValueError(f"quality_validation_failed:{'|'.join(issues[:8])}")
 
 
-def _build_generate_prompts(payload: GenerateRequest, *, retry_mode: bool = False) -> tuple[str, str]:
-    quiz_only = _is_quiz_only_mode(payload)
-    target_quiz_count = _target_quiz_count(payload)
-    teaching_method = _teaching_method_label(payload.teachingMethod)
-
-    if quiz_only:
-        system_prompt = """당신은 프로그래밍 문제 출제 전문가입니다.
+_GENERATE_QUIZ_SYSTEM_PROMPT = """당신은 프로그래밍 문제 출제 전문가입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록(```) 없이 반환합니다.
 
 반환 스키마:
@@ -1727,21 +2231,8 @@ def _build_generate_prompts(payload: GenerateRequest, *, retry_mode: bool = Fals
 - correct_answer는 0~3 정수
 - explanation은 오답이 왜 오개념인지까지 짚어서 1~2문장으로 작성
 - 보기 텍스트는 "1", "2", "3", "4" 같은 번호만 쓰지 말 것"""
-        if retry_mode:
-            system_prompt += "\n- 이전 시도는 품질 미달이었으므로 모든 문항에서 선택지를 더 구체적으로 작성"
-        user_prompt = (
-            "다음 조건으로 문제 세트를 생성하세요.\n"
-            f"- 주제: {payload.topic}\n"
-            f"- 언어: {payload.language}\n"
-            f"- 난이도: {payload.difficulty}\n"
-            f"- 대상: {payload.targetAudience}\n"
-            f"- 해설 스타일: {teaching_method}\n"
-            f"- 문항 수: {target_quiz_count}\n"
-            "- 최소 1문항은 개념 확인, 최소 1문항은 응용 상황 판단 문제로 구성\n"
-        )
-        return system_prompt, user_prompt
 
-    system_prompt = """당신은 개인화 학습 콘텐츠 생성기입니다.
+_GENERATE_SYSTEM_PROMPT = """당신은 개인화 학습 콘텐츠 생성기입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록(```) 없이 반환합니다.
 
 반환 스키마:
@@ -1761,8 +2252,30 @@ def _build_generate_prompts(payload: GenerateRequest, *, retry_mode: bool = Fals
 - quiz는 2~5개
 - correct_answer는 options 인덱스 범위 안 정수
 - 학습자 눈높이에 맞고 실습 중심으로 작성"""
-    if retry_mode:
-        system_prompt += "\n- 이전 시도는 품질 기준 미달이었으므로 추상 설명 대신 실행 가능한 예제/문항 근거 중심으로 작성"
+
+
+def _build_generate_prompts(payload: GenerateRequest, *, retry_mode: bool = False) -> tuple[str, str]:
+    quiz_only = _is_quiz_only_mode(payload)
+    target_quiz_count = _target_quiz_count(payload)
+    teaching_method = _teaching_method_label(payload.teachingMethod)
+
+    if quiz_only:
+        system_prompt = _GENERATE_QUIZ_SYSTEM_PROMPT
+        user_prompt = (
+            "다음 조건으로 문제 세트를 생성하세요.\n"
+            "- 최소 1문항은 개념 확인, 최소 1문항은 응용 상황 판단 문제로 구성\n"
+            f"- 주제: {payload.topic}\n"
+            f"- 언어: {payload.language}\n"
+            f"- 난이도: {payload.difficulty}\n"
+            f"- 대상: {payload.targetAudience}\n"
+            f"- 해설 스타일: {teaching_method}\n"
+            f"- 문항 수: {target_quiz_count}\n"
+        )
+        if retry_mode:
+            user_prompt += "- 이전 시도는 품질 미달이었으므로 모든 문항에서 선택지를 더 구체적으로 작성\n"
+        return system_prompt, user_prompt
+
+    system_prompt = _GENERATE_SYSTEM_PROMPT
     user_prompt = (
         "다음 조건으로 콘텐츠를 생성하세요.\n"
         f"- 주제: {payload.topic}\n"
@@ -1771,6 +2284,8 @@ def _build_generate_prompts(payload: GenerateRequest, *, retry_mode: bool = Fals
         f"- 대상: {payload.targetAudience}\n"
         f"- 설명 방식: {teaching_method}\n"
     )
+    if retry_mode:
+        user_prompt += "- 이전 시도는 품질 기준 미달이었으므로 추상 설명 대신 실행 가능한 예제/문항 근거 중심으로 작성\n"
     return system_prompt, user_prompt
 
 
@@ -1782,16 +2297,101 @@ def _generate_content_with_quality(
 ) -> StructuredAIResponse:
     system_prompt, user_prompt = _build_generate_prompts(payload, retry_mode=retry_mode)
     response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    try:
+        return _finalize_generated_content(response, payload)
+    except ItemRepairNeeded as needed:
+        return run_item_repair(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+async def _generate_content_with_quality_async(
+    *,
+    ai_service: Any,
+    payload: GenerateRequest,
+    retry_mode: bool,
+) -> StructuredAIResponse:
+    system_prompt, user_prompt = _build_generate_prompts(payload, retry_mode=retry_mode)
+    response = await _request_structured_json_async(
+        ai_service,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        item_normalizers={
+            "quiz": lambda _idx, item: _normalize_quiz(item, topic=payload.topic),
+        },
+    )
+    try:
+        return _finalize_generated_content(response, payload)
+    except ItemRepairNeeded as needed:
+        return await run_item_repair_async(ai_service, needed, system_prompt=system_prompt, user_prompt=user_prompt)
+
+
+def _finalize_generated_content(
+    response: StructuredAIResponse,
+    payload: GenerateRequest,
+) -> StructuredAIResponse:
+    normalized: dict[str, Any] | None = None
     try:
         normalized = _normalize_generated_content(response.data, payload)
         _assert_generated_content_quality(normalized, payload)
     except Exception as exc:
-        raise AIAttemptError(str(exc), meta=response.meta) from exc
+        if normalized is None:
+            raise AIAttemptError(str(exc), meta=response.meta) from exc
+        raise _generated_content_quality_error(exc, response.meta, normalized, payload) from exc
     return StructuredAIResponse(data=normalized, meta=response.meta)
 
 
+def _locate_generated_content_issue(issue: str) -> list[tuple[str, int, str]] | None:
+    match = _ITEM_ISSUE_PATTERN.match(issue)
+    if match is None or match.group(1) not in {"quiz", "code_example"}:
+        return None
+    field = "quiz" if match.group(1) == "quiz" else "code_examples"
+    return [(field, int(match.group(2)) - 1, match.group(3))]
+
+
+def _generated_content_quality_error(
+    exc: Exception,
+    meta: AIResponseMeta,
+    normalized: dict[str, Any],
+    payload: GenerateRequest,
+) -> AIAttemptError:
+    targets = _item_repair_targets(
+        _generated_content_quality_issues(normalized, payload),
+        _locate_generated_content_issue,
+    )
+    if targets is None:
+        return AIAttemptError(str(exc), meta=meta)
+    context = [
+        f"주제: {payload.topic}",
+        f"언어: {payload.language}, 난이도: {payload.difficulty}, 대상: {payload.targetAudience}",
+        f"본문 요약: {_truncate_text(str(normalized.get('content') or ''), 400)}",
+    ]
+    system_prompt, user_prompt = _item_repair_prompts(
+        _GENERATE_QUIZ_SYSTEM_PROMPT if _is_quiz_only_mode(payload) else _GENERATE_SYSTEM_PROMPT,
+        document=normalized,
+        targets=targets,
+        context=context,
+    )
+    return ItemRepairNeeded(
+        str(exc),
+        meta=meta,
+        pipeline="content_generate",
+        document=normalized,
+        targets=targets,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        finalize=lambda document: _repaired_generated_content(document, payload),
+    )
+
+
+def _repaired_generated_content(document: dict[str, Any], payload: GenerateRequest) -> dict[str, Any]:
+    normalized = _normalize_generated_content(document, payload)
+    _assert_generated_content_quality(normalized, payload)
+    return normalized
+
+
+_QUALITY_RETRYABLE_KINDS = frozenset({"rate_limited", "timeout", "schema_mismatch", "quality_failed"})
+
+
 def compat_generate(payload: GenerateRequest) -> dict[str, Any]:
-    retryable_kinds = {"rate_limited", "timeout", "schema_mismatch", "quality_failed"}
     try:
         generated, attempt_count = run_ai_with_retry(
             lambda attempt: _generate_content_with_quality(
@@ -1801,10 +2401,32 @@ def compat_generate(payload: GenerateRequest) -> dict[str, Any]:
             ),
             pipeline="content_generate",
             max_attempts=2,
-            retryable_kinds=retryable_kinds,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
         )
         return _with_response_meta(generated.data, generated.meta, attempt_count=attempt_count)
     except PipelineFailure as failure:
+        if failure.kind == "circuit_open":
+            return _circuit_fallback_response(_normalize_generated_content({}, payload), failure)
+        _raise_pipeline_http_exception(failure)
+
+
+async def compat_generate_async(payload: GenerateRequest) -> dict[str, Any]:
+    try:
+        generated, attempt_count = await run_ai_with_retry_async(
+            lambda attempt: _generate_content_with_quality_async(
+                ai_service=_require_async_ai_service(),
+                payload=payload,
+                retry_mode=attempt > 1,
+            ),
+            pipeline="content_generate",
+            max_attempts=2,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
+            speculative=True,
+        )
+        return _with_response_meta(generated.data, generated.meta, attempt_count=attempt_count)
+    except PipelineFailure as failure:
+        if failure.kind == "circuit_open":
+            return _circuit_fallback_response(_normalize_generated_content({}, payload), failure)
         _raise_pipeline_http_exception(failure)
 
 
@@ -1836,6 +2458,16 @@ def compat_recommendations(payload: RecommendRequest) -> dict[str, Any]:
     }
 
 
+def _assessment_questions_fallback_response(
+    payload: AssessmentQuestionsRequest,
+    failure: PipelineFailure,
+) -> dict[str, Any]:
+    fallback = _fallback_assessment_questions(payload.goal)
+    return _with_response_meta({
+        "questions": fallback["questions"],
+    }, failure.response_meta, attempt_count=failure.attempt_count, fallback_used=True, failure_kind=failure.kind)
+
+
 def compat_assessment_questions(payload: AssessmentQuestionsRequest) -> dict[str, Any]:
     try:
         raw, attempt_count = run_ai_with_retry(
@@ -1851,19 +2483,28 @@ def compat_assessment_questions(payload: AssessmentQuestionsRequest) -> dict[str
             "questions": raw.data["questions"],
         }, raw.meta, attempt_count=attempt_count, fallback_used=False, failure_kind=None)
     except PipelineFailure as failure:
-        fallback = _fallback_assessment_questions(payload.goal)
-        return _with_response_meta({
-            "questions": fallback["questions"],
-        }, failure.response_meta, attempt_count=failure.attempt_count, fallback_used=True, failure_kind=failure.kind)
+        return _assessment_questions_fallback_response(payload, failure)
 
 
-def compat_assessment_analyze(payload: AssessmentAnalyzeRequest) -> dict[str, Any]:
-    # 기본은 규칙 기반(빠름)이며, 필요 시 LLM 모드로 전환할 수 있다.
-    if settings.assessment_analysis_mode != "llm":
-        return _build_rule_assessment_result(payload)
+async def compat_assessment_questions_async(payload: AssessmentQuestionsRequest) -> dict[str, Any]:
+    try:
+        raw, attempt_count = await run_ai_with_retry_async(
+            lambda _attempt: _generate_assessment_questions_with_meta_async(
+                _require_async_ai_service(),
+                payload,
+            ),
+            pipeline="assessment_questions",
+            max_attempts=2,
+            retryable_kinds=set(DEFAULT_RETRYABLE_FAILURE_KINDS),
+        )
+        return _with_response_meta({
+            "questions": raw.data["questions"],
+        }, raw.meta, attempt_count=attempt_count, fallback_used=False, failure_kind=None)
+    except PipelineFailure as failure:
+        return _assessment_questions_fallback_response(payload, failure)
 
-    ai_service = _require_ai_service()
 
+def _build_assessment_analyze_prompts(payload: AssessmentAnalyzeRequest) -> tuple[str, str]:
     system_prompt = """당신은 프로그래밍 진단 분석 전문가입니다.
 반드시 JSON 객체 하나만 반환하세요. 코드블록은 금지합니다.
 스키마:
@@ -1886,32 +2527,62 @@ def compat_assessment_analyze(payload: AssessmentAnalyzeRequest) -> dict[str, An
         f"진단 결과:\n{chr(10).join(question_lines)}\n"
         "결과를 분석해 수준/강점/약점을 산출하세요."
     )
+    return system_prompt, user_prompt
 
+
+def _assessment_analysis_from_response(
+    response: StructuredAIResponse,
+    payload: AssessmentAnalyzeRequest,
+) -> dict[str, Any]:
+    raw = response.data
+    level = _as_non_empty_str(raw.get("level"), "beginner").lower()
+    if level not in {"beginner", "intermediate", "advanced"}:
+        level = "beginner"
+    summary = _as_non_empty_str(raw.get("summary"), _build_rule_assessment_result(payload)["summary"])
+    strengths = raw.get("strengths") if isinstance(raw.get("strengths"), list) else []
+    weaknesses = raw.get("weaknesses") if isinstance(raw.get("weaknesses"), list) else []
+    strengths = [str(item).strip() for item in strengths if str(item).strip()][:4]
+    weaknesses = [str(item).strip() for item in weaknesses if str(item).strip()][:4]
+    if not weaknesses:
+        weaknesses = ["실전 문제 적용력"]
+    return _with_response_meta({
+        "level": level,
+        "summary": summary,
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+    }, response.meta)
+
+
+def compat_assessment_analyze(payload: AssessmentAnalyzeRequest) -> dict[str, Any]:
+    # 기본은 규칙 기반(빠름)이며, 필요 시 LLM 모드로 전환할 수 있다.
+    if settings.assessment_analysis_mode != "llm":
+        return _build_rule_assessment_result(payload)
+
+    ai_service = _require_ai_service()
+    system_prompt, user_prompt = _build_assessment_analyze_prompts(payload)
     try:
-        response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
-        raw = response.data
-        level = _as_non_empty_str(raw.get("level"), "beginner").lower()
-        if level not in {"beginner", "intermediate", "advanced"}:
-            level = "beginner"
-        summary = _as_non_empty_str(raw.get("summary"), _build_rule_assessment_result(payload)["summary"])
-        strengths = raw.get("strengths") if isinstance(raw.get("strengths"), list) else []
-        weaknesses = raw.get("weaknesses") if isinstance(raw.get("weaknesses"), list) else []
-        strengths = [str(item).strip() for item in strengths if str(item).strip()][:4]
-        weaknesses = [str(item).strip() for item in weaknesses if str(item).strip()][:4]
-        if not weaknesses:
-            weaknesses = ["실전 문제 적용력"]
-        return _with_response_meta({
-            "level": level,
-            "summary": summary,
-            "strengths": strengths,
-            "weaknesses": weaknesses,
-        }, response.meta)
+        with ai_call_context(pipeline="assessment_analyze"):
+            response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        return _assessment_analysis_from_response(response, payload)
+    except Exception as exc:
+        _raise_direct_provider_http_exception("assessment_analyze", exc)
+
+
+async def compat_assessment_analyze_async(payload: AssessmentAnalyzeRequest) -> dict[str, Any]:
+    if settings.assessment_analysis_mode != "llm":
+        return _build_rule_assessment_result(payload)
+
+    ai_service = _require_async_ai_service()
+    system_prompt, user_prompt = _build_assessment_analyze_prompts(payload)
+    try:
+        with ai_call_context(pipeline="assessment_analyze"):
+            response = await ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        return _assessment_analysis_from_response(response, payload)
     except Exception as exc:
         _raise_direct_provider_http_exception("assessment_analyze", exc)
 
 
 def compat_curriculum_generate(payload: CurriculumGenerateRequest) -> dict[str, Any]:
-    retryable_kinds = {"rate_limited", "timeout", "schema_mismatch", "quality_failed"}
     try:
         generated, attempt_count = run_ai_with_retry(
             lambda attempt: _generate_curriculum_with_quality(
@@ -1921,16 +2592,36 @@ def compat_curriculum_generate(payload: CurriculumGenerateRequest) -> dict[str,
             ),
             pipeline="curriculum_generate",
             max_attempts=2,
-            retryable_kinds=retryable_kinds,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
         )
         return _with_response_meta(generated.data, generated.meta, attempt_count=attempt_count)
     except PipelineFailure as failure:
+        if failure.kind == "circuit_open":
+            return _circuit_fallback_response(_fallback_curriculum(payload), failure)
         _raise_pipeline_http_exception(failure)
 
 
-def compat_curriculum_refine(payload: CurriculumRefineRequest) -> dict[str, Any]:
-    ai_service = _require_ai_service()
-    request_for_fallback = CurriculumGenerateRequest(
+async def compat_curriculum_generate_async(payload: CurriculumGenerateRequest) -> dict[str, Any]:
+    try:
+        generated, attempt_count = await run_ai_with_retry_async(
+            lambda attempt: _generate_curriculum_with_quality_async(
+                ai_service=_require_async_ai_service(),
+                payload=payload,
+                retry_mode=attempt > 1,
+            ),
+            pipeline="curriculum_generate",
+            max_attempts=2,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
+        )
+        return _with_response_meta(generated.data, generated.meta, attempt_count=attempt_count)
+    except PipelineFailure as failure:
+        if failure.kind == "circuit_open":
+            return _circuit_fallback_response(_fallback_curriculum(payload), failure)
+        _raise_pipeline_http_exception(failure)
+
+
+def _refine_fallback_request(payload: CurriculumRefineRequest) -> CurriculumGenerateRequest:
+    return CurriculumGenerateRequest(
         goal=payload.currentCurriculum.title,
         level="beginner",
         strengths=[],
@@ -1941,11 +2632,44 @@ def compat_curriculum_refine(payload: CurriculumRefineRequest) -> dict[str, Any]
         learningStyle="concept_first",
     )
 
+
+def compat_curriculum_refine(payload: CurriculumRefineRequest) -> dict[str, Any]:
+    ai_service = _require_ai_service()
+    request_for_fallback = _refine_fallback_request(payload)
+
     system_prompt, user_prompt = _build_refine_prompts(payload)
     try:
-        response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        with ai_call_context(pipeline="curriculum_refine"):
+            response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
         return _with_response_meta(_normalize_curriculum(response.data, request_for_fallback), response.meta)
     except Exception as exc:
+        if _is_circuit_open_failure(exc):
+            return _with_response_meta(
+                _fallback_curriculum(request_for_fallback),
+                None,
+                fallback_used=True,
+                failure_kind="circuit_open",
+            )
+        _raise_direct_provider_http_exception("curriculum_refine", exc)
+
+
+async def compat_curriculum_refine_async(payload: CurriculumRefineRequest) -> dict[str, Any]:
+    ai_service = _require_async_ai_service()
+    request_for_fallback = _refine_fallback_request(payload)
+
+    system_prompt, user_prompt = _build_refine_prompts(payload)
+    try:
+        with ai_call_context(pipeline="curriculum_refine"):
+            response = await ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        return _with_response_meta(_normalize_curriculum(response.data, request_for_fallback), response.meta)
+    except Exception as exc:
+        if _is_circuit_open_failure(exc):
+            return _with_response_meta(
+                _fallback_curriculum(request_for_fallback),
+                None,
+                fallback_used=True,
+                failure_kind="circuit_open",
+            )
         _raise_direct_provider_http_exception("curriculum_refine", exc)
 
 
@@ -1954,14 +2678,54 @@ def compat_curriculum_reasoning(payload: ReasoningRequest) -> dict[str, Any]:
 
     system_prompt, user_prompt = _build_reasoning_prompts(payload)
     try:
-        response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        with ai_call_context(pipeline="curriculum_reasoning"):
+            response = ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
         return _with_response_meta(_normalize_reasoning(response.data, payload), response.meta)
     except Exception as exc:
+        if _is_circuit_open_failure(exc):
+            return _with_response_meta(
+                _fallback_reasoning(payload),
+                None,
+                fallback_used=True,
+                failure_kind="circuit_open",
+            )
         _raise_direct_provider_http_exception("curriculum_reasoning", exc)
 
 
+async def compat_curriculum_reasoning_async(payload: ReasoningRequest) -> dict[str, Any]:
+    ai_service = _require_async_ai_service()
+
+    system_prompt, user_prompt = _build_reasoning_prompts(payload)
+    try:
+        with ai_call_context(pipeline="curriculum_reasoning"):
+            response = await ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+        return _with_response_meta(_normalize_reasoning(response.data, payload), response.meta)
+    except Exception as exc:
+        if _is_circuit_open_failure(exc):
+            return _with_response_meta(
+                _fallback_reasoning(payload),
+                None,
+                fallback_used=True,
+                failure_kind="circuit_open",
+            )
+        _raise_direct_provider_http_exception("curriculum_reasoning", exc)
+
+
+def _sections_failure_response(payload: SectionsRequest, failure: PipelineFailure) -> dict[str, Any]:
+    if failure.kind in _QUALITY_RETRYABLE_KINDS or failure.kind == "circuit_open":
+        # 재시도 후에도 품질/지연 문제가 있거나 공급자 회로가 열려 있으면 학습 흐름 보장을 위해 폴백
+        fallback = _fallback_sections(payload.input, payload.reasoning)
+        return _with_response_meta(
+            fallback,
+            failure.response_meta,
+            attempt_count=failure.attempt_count,
+            fallback_used=True,
+            failure_kind=failure.kind,
+        )
+    _raise_pipeline_http_exception(failure)
+
+
 def compat_curriculum_sections(payload: SectionsRequest) -> dict[str, Any]:
-    retryable_kinds = {"rate_limited", "timeout", "schema_mismatch", "quality_failed"}
     try:
         generated, attempt_count = run_ai_with_retry(
             lambda attempt: _generate_sections_with_quality(
@@ -1972,7 +2736,7 @@ def compat_curriculum_sections(payload: SectionsRequest) -> dict[str, Any]:
             ),
             pipeline="curriculum_sections",
             max_attempts=2,
-            retryable_kinds=retryable_kinds,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
         )
         return _with_response_meta(
             generated.data,
@@ -1982,17 +2746,126 @@ def compat_curriculum_sections(payload: SectionsRequest) -> dict[str, Any]:
             failure_kind=None,
         )
     except PipelineFailure as failure:
-        if failure.kind in retryable_kinds:
-            # 재시도 후에도 품질/지연 문제가 있으면 학습 흐름 보장을 위해 폴백
-            fallback = _fallback_sections(payload.input, payload.reasoning)
-            return _with_response_meta(
-                fallback,
-                failure.response_meta,
-                attempt_count=failure.attempt_count,
-                fallback_used=True,
-                failure_kind=failure.kind,
+        return _sections_failure_response(payload, failure)
+
+
+async def compat_curriculum_sections_async(payload: SectionsRequest) -> dict[str, Any]:
+    try:
+        generated, attempt_count = await run_ai_with_retry_async(
+            lambda attempt: _generate_sections_with_quality_async(
+                ai_service=_require_async_ai_service(),
+                payload=payload.input,
+                reasoning=payload.reasoning,
+                retry_mode=attempt > 1,
+            ),
+            pipeline="curriculum_sections",
+            max_attempts=2,
+            retryable_kinds=set(_QUALITY_RETRYABLE_KINDS),
+            speculative=True,
+        )
+        return _with_response_meta(
+            generated.data,
+            generated.meta,
+            attempt_count=attempt_count,
+            fallback_used=False,
+            failure_kind=None,
+        )
+    except PipelineFailure as failure:
+        return _sections_failure_response(payload, failure)
+
+
+# 섹션 프롬프트(_compact_reasoning_for_sections_prompt)가 읽는 추론 필드. 모두 도착하면 추론 스트림이 끝나기 전에 섹션 생성을 시작한다.
+_LESSON_REASONING_FIELDS = frozenset({
+    "learning_objectives",
+    "prerequisite_concepts",
+    "why_this_topic",
+    "teaching_strategy",
+    "difficulty_calibration",
+    "connection_to_goal",
+})
+
+
+async def compat_curriculum_lesson_events(payload: LessonRequest) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Runs reasoning and then sections as one pipeline, yielding ``reasoning`` and then ``done``.
+
+    With a streaming provider, sections generation starts as soon as every reasoning field its
+    prompt reads has arrived, while the tail of the reasoning stream (closing brace, usage) is
+    still being read. ``done`` carries both artifacts with their own meta. Identical concurrent
+    lessons share one reasoning stream; only the first starts sections early.
+    """
+    ai_service = _require_async_ai_service()
+    system_prompt, user_prompt = _build_reasoning_prompts(payload)
+    ready: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+    finished_at: list[float] = []
+
+    def on_ready(data: dict[str, Any]) -> None:
+        if not ready.done():
+            ready.set_result(data)
+
+    with ai_call_context(pipeline="curriculum_reasoning"):
+        reasoning_task = asyncio.create_task(
+            _request_structured_json_async(
+                ai_service,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                item_normalizers={},
+                ready_fields=_LESSON_REASONING_FIELDS,
+                on_ready=on_ready,
             )
-        _raise_pipeline_http_exception(failure)
+        )
+    reasoning_task.add_done_callback(lambda _task: finished_at.append(time.monotonic()))
+    try:
+        await asyncio.wait({reasoning_task, ready}, return_when=asyncio.FIRST_COMPLETED)
+        sections_started_at = time.monotonic()
+        reasoning_meta: AIResponseMeta | None = None
+        fallback_used = False
+        if ready.done():
+            raw_reasoning = ready.result()
+        else:
+            try:
+                response = reasoning_task.result()
+                raw_reasoning, reasoning_meta = response.data, response.meta
+            except Exception as exc:
+                if not _is_circuit_open_failure(exc):
+                    _raise_direct_provider_http_exception("curriculum_reasoning", exc)
+                raw_reasoning, fallback_used = _fallback_reasoning(payload), True
+        reasoning = _normalize_reasoning(raw_reasoning, payload)
+        yield "reasoning", reasoning
+
+        sections = await compat_curriculum_sections_async(SectionsRequest(input=payload, reasoning=reasoning))
+        if not fallback_used and reasoning_meta is None:
+            try:
+                reasoning_meta = (await reasoning_task).meta
+            except Exception as exc:
+                # 섹션에 쓸 필드는 이미 받았으므로 스트림 끝부분이 실패해도 추론은 그대로 쓴다.
+                reasoning_meta = getattr(exc, "meta", None)
+    finally:
+        if not reasoning_task.done():
+            reasoning_task.cancel()
+        elif not reasoning_task.cancelled():
+            reasoning_task.exception()
+
+    if fallback_used:
+        reasoning_result = _with_response_meta(reasoning, None, fallback_used=True, failure_kind="circuit_open")
+    else:
+        reasoning_result = _with_response_meta(reasoning, reasoning_meta)
+    # 추론 스트림이 끝나기 전에 섹션 생성을 시작해 앞당긴 시간
+    early_start_ms = 0
+    if finished_at and finished_at[0] > sections_started_at:
+        early_start_ms = round((finished_at[0] - sections_started_at) * 1000)
+    yield "done", {
+        "reasoning": reasoning_result,
+        "sections": sections,
+        "meta": {"sections_early_start_ms": early_start_ms},
+    }
+
+
+async def compat_curriculum_lesson_async(payload: LessonRequest) -> dict[str, Any]:
+    async with aclosing(compat_curriculum_lesson_events(payload)) as events:
+        async for event, data in events:
+            if event == "done":
+                return data
+    raise RuntimeError("curriculum_lesson_incomplete")
 
 
 def compat_auth_callback(request: Request, code: str | None = None, next: str = "/dashboard") -> RedirectResponse:
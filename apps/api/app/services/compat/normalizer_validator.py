@@ -51,3 +51,51 @@ def extract_enumerated_options(*sources: Any, max_options: int = 4) -> list[str]
             if len(extracted) >= max_options:
                 return extracted
     return extracted
+
+
+def extract_semantic_tokens(text: str) -> set[str]:
+    raw_tokens = re.findall(r"[A-Za-z가-힣0-9_#+.-]+", text.lower())
+    skip = {
+        "핵심",
+        "토픽",
+        "주제",
+        "학습",
+        "개념",
+        "문제",
+        "설명",
+        "예제",
+        "확인",
+        "요약",
+        "정리",
+        "섹션",
+        "정답",
+        "오답",
+        "선택지",
+        "코드",
+        "기본",
+        "단계",
+        "내용",
+        "방법",
+        "사용",
+        "구현",
+        "처리",
+        "결과",
+        "and",
+        "the",
+        "for",
+        "with",
+        "from",
+        "this",
+        "that",
+    }
+    tokens: set[str] = set()
+    for token in raw_tokens:
+        normalized = token.strip("._- ")
+        if len(normalized) < 2:
+            continue
+        if normalized.isdigit():
+            continue
+        if normalized in skip:
+            continue
+        tokens.add(normalized)
+    return tokens
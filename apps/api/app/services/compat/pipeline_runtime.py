@@ -1,18 +1,397 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field, replace
+import json
+import math
+import random
+from threading import Lock
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
 
+from app.domain.ai.call_context import (
+    DeadlineExceededError,
+    ai_call_context,
+    ai_quality_gate,
+    check_deadline,
+    remaining_budget_sec,
+)
 from app.domain.ai.providers.base import (
     AIAttemptError,
     AIResponseMeta,
+    AISpeculationMeta,
+    AIStreamChunk,
     StructuredAIResponse,
     merge_ai_response_metas,
 )
+from app.domain.ai.providers.common import (
+    CircuitOpenError,
+    ProviderHTTPError,
+    exception_chain,
+    provider_http_error,
+)
+from app.domain.ai.providers.json_repair import JSONRepairError, record_json_parse, record_json_repair_outcome
+from app.domain.ai.providers.streaming import StreamingJSONItemParser
+from app.domain.ai.quota import QuotaExceededError
+from app.domain.ai.scheduler import QueueShedError, retry_after_hint
 
 
 DEFAULT_RETRYABLE_FAILURE_KINDS = {"rate_limited", "timeout", "schema_mismatch"}
 
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How a pipeline waits between attempts.
+
+    Waits use decorrelated jitter, ``min(max_delay, uniform(base_delay, previous * 3))``, so that
+    callers that failed together do not retry together. Only ``backoff_kinds`` wait; a schema or
+    quality failure is not provider overload and retries at once. A provider wait (Retry-After,
+    x-ratelimit-reset-*) is honoured as a floor; one longer than ``max_retry_after_ms`` is not
+    waited out inside the request but handed to the client as Retry-After. A response that only
+    parsed after a repair listed in ``rejected_repairs`` is regenerated like a schema mismatch.
+    Call sites that opt into speculation may send up to ``speculative_candidates`` first attempts
+    at once; how many is sized from the pipeline's recent first-attempt pass rate.
+    """
+
+    base_delay_ms: float = 200.0
+    max_delay_ms: float = 4000.0
+    max_retry_after_ms: float = 10000.0
+    # 설정하면 호출부의 max_attempts를 이 값 이하로 줄인다
+    max_attempts: int | None = None
+    backoff_kinds: frozenset[str] = field(default_factory=lambda: frozenset({"rate_limited", "timeout"}))
+    # 이 수선을 거쳐야 읽히는 응답은 받아들이지 않고 다시 생성한다(json_repair.JSON_REPAIR_KINDS)
+    rejected_repairs: frozenset[str] = frozenset()
+    # 추측 실행 후보 수 상한(1이면 끈다)과, 후보 중 하나는 통과하길 바라는 확률
+    speculative_candidates: int = 1
+    speculative_target_pass_rate: float = 0.9
+
+    def with_overrides(self, values: dict[str, Any]) -> RetryPolicy:
+        known = {
+            "base_delay_ms",
+            "max_delay_ms",
+            "max_retry_after_ms",
+            "max_attempts",
+            "speculative_candidates",
+            "speculative_target_pass_rate",
+        }
+        overrides: dict[str, Any] = {name: float(value) for name, value in values.items() if name in known}
+        if "max_attempts" in overrides:
+            overrides["max_attempts"] = max(1, int(overrides["max_attempts"]))
+        if "speculative_candidates" in overrides:
+            overrides["speculative_candidates"] = max(1, int(overrides["speculative_candidates"]))
+        if "rejected_repairs" in values:
+            overrides["rejected_repairs"] = frozenset(values["rejected_repairs"])
+        return replace(self, **overrides)
+
+    def attempts(self, requested: int) -> int:
+        attempts = max(1, int(requested))
+        return attempts if self.max_attempts is None else min(attempts, self.max_attempts)
+
+    def backoff_sec(
+        self,
+        previous_sec: float | None,
+        uniform: Callable[[float, float], float] = random.uniform,
+    ) -> float:
+        base = max(0.0, self.base_delay_ms / 1000)
+        cap = max(base, self.max_delay_ms / 1000)
+        return min(cap, uniform(base, max(base, (previous_sec or base) * 3)))
+
+
+class RetryBudget:
+    """Process-wide token bucket that keeps retries under a fraction of traffic.
+
+    Every pipeline run deposits ``ratio`` tokens and every retry spends one, so retries stay
+    below ``ratio`` of runs plus a ``min_per_sec`` floor that lets a quiet process still retry.
+    When the bucket is empty the failure goes straight to the caller's fallback.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        min_per_sec: float = 1.0,
+        capacity: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ratio = max(0.0, float(ratio))
+        self.min_per_sec = max(0.0, float(min_per_sec))
+        self.capacity = max(1.0, float(capacity))
+        self._clock = clock
+        self._balance = self.capacity
+        self._updated_at = clock()
+        self._counters = {"runs": 0, "retries": 0, "denied": 0}
+        self._lock = Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._balance = min(self.capacity, self._balance + max(0.0, now - self._updated_at) * self.min_per_sec)
+        self._updated_at = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._balance = min(self.capacity, self._balance + self.ratio)
+            self._counters["runs"] += 1
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._balance < 1.0:
+                self._counters["denied"] += 1
+                return False
+            self._balance -= 1.0
+            self._counters["retries"] += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._refill()
+            runs = self._counters["runs"]
+            return {
+                **self._counters,
+                "balance": round(self._balance, 3),
+                "ratio": self.ratio,
+                "retry_rate": round(self._counters["retries"] / runs, 4) if runs else 0.0,
+            }
+
+
+_default_retry_policy = RetryPolicy()
+_retry_policies: dict[str, RetryPolicy] = {}
+_retry_budget = RetryBudget()
+
+
+def configure_retry_policies(
+    *,
+    default: RetryPolicy,
+    overrides: dict[str, RetryPolicy] | None = None,
+    budget: RetryBudget | None = None,
+) -> None:
+    global _default_retry_policy, _retry_policies, _retry_budget
+    _default_retry_policy = default
+    _retry_policies = dict(overrides or {})
+    if budget is not None:
+        _retry_budget = budget
+
+
+def retry_policy_for(pipeline: str) -> RetryPolicy:
+    return _retry_policies.get(pipeline, _default_retry_policy)
+
+
+def retry_budget_stats() -> dict[str, Any]:
+    return _retry_budget.stats()
+
+
+class AttemptLatencies:
+    """Rolling per-pipeline durations of successful attempts, used to tell whether a retry still fits the deadline."""
+
+    def __init__(self, *, window: int = 100, min_samples: int = 5) -> None:
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self._samples: dict[str, deque[float]] = {}
+        self._skipped: dict[str, int] = {}
+        # 실패한 시도의 종류별 횟수(schema_mismatch가 응답 스키마 강제로 얼마나 줄었는지 본다)
+        self._failures: dict[str, dict[str, int]] = {}
+        self._lock = Lock()
+
+    def observe(self, pipeline: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(pipeline, deque(maxlen=self.window)).append(max(0.0, float(seconds)))
+
+    def record_failure(self, pipeline: str, kind: str) -> None:
+        with self._lock:
+            failures = self._failures.setdefault(pipeline, {})
+            failures[kind] = failures.get(kind, 0) + 1
+
+    def p50(self, pipeline: str) -> float | None:
+        with self._lock:
+            samples = self._samples.get(pipeline)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[(len(ordered) - 1) // 2]
+
+    def retry_fits(self, pipeline: str, delay_sec: float = 0.0) -> bool:
+        remaining = remaining_budget_sec()
+        if remaining is None:
+            return True
+        remaining -= delay_sec
+        # 표본이 모자라면 마감 전이기만 하면 재시도하고, 쌓이면 보통(p50) 걸리는 시간이 남았을 때만 재시도한다.
+        p50 = self.p50(pipeline)
+        fits = remaining > 0 and (p50 is None or remaining >= p50)
+        if not fits:
+            with self._lock:
+                self._skipped[pipeline] = self._skipped.get(pipeline, 0) + 1
+        return fits
+
+    def stats(self) -> dict[str, Any]:
+        pipelines = set(self._samples) | set(self._skipped) | set(self._failures)
+        snapshot: dict[str, Any] = {}
+        for pipeline in sorted(pipelines):
+            p50 = self.p50(pipeline)
+            with self._lock:
+                snapshot[pipeline] = {
+                    "samples": len(self._samples.get(pipeline, ())),
+                    "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                    "retries_skipped": self._skipped.get(pipeline, 0),
+                    "failures": dict(self._failures.get(pipeline, {})),
+                }
+        return snapshot
+
+
+_attempt_latencies = AttemptLatencies()
+
+
+_EMPTY_RACE: dict[str, Any] = {"races": 0, "candidates": 0, "failed": 0, "censored": 0, "wins": {}}
+
+
+class FirstAttemptPassRates:
+    """Rolling per-pipeline share of first attempts that passed the quality gate.
+
+    Speculation sizes its fan-out from it: the fewest candidates ``k`` with
+    ``1 - (1 - rate) ** k >= target``. Until ``min_samples`` outcomes are known it sends two.
+    Races where candidate 1 was cancelled before finishing add no outcome and count as ``censored``.
+    """
+
+    def __init__(self, *, window: int = 50, min_samples: int = 10) -> None:
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self._outcomes: dict[str, deque[bool]] = {}
+        self._races: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def record(self, pipeline: str, passed: bool) -> None:
+        with self._lock:
+            self._outcomes.setdefault(pipeline, deque(maxlen=self.window)).append(bool(passed))
+
+    def rate(self, pipeline: str) -> float | None:
+        with self._lock:
+            outcomes = self._outcomes.get(pipeline)
+            if outcomes is None or len(outcomes) < self.min_samples:
+                return None
+            return sum(outcomes) / len(outcomes)
+
+    def candidates(self, pipeline: str, *, max_candidates: int, target: float) -> int:
+        if max_candidates <= 1:
+            return 1
+        rate = self.rate(pipeline)
+        if rate is None:
+            wanted = 2
+        elif rate >= target:
+            wanted = 1
+        elif rate <= 0.0:
+            wanted = max_candidates
+        else:
+            wanted = math.ceil(math.log(1.0 - min(target, 0.999)) / math.log(1.0 - rate))
+        return max(1, min(max_candidates, wanted))
+
+    def record_race(
+        self,
+        pipeline: str,
+        *,
+        launched: int,
+        winner: int | None,
+        first_censored: bool = False,
+    ) -> None:
+        with self._lock:
+            race = self._races.setdefault(pipeline, dict(_EMPTY_RACE, wins={}))
+            race["races"] += 1
+            race["candidates"] += launched
+            race["censored"] += int(first_censored)
+            if winner is None:
+                race["failed"] += 1
+            else:
+                race["wins"][str(winner)] = race["wins"].get(str(winner), 0) + 1
+
+    def stats(self) -> dict[str, Any]:
+        snapshot: dict[str, Any] = {}
+        for pipeline in sorted(set(self._outcomes) | set(self._races)):
+            rate = self.rate(pipeline)
+            with self._lock:
+                race = self._races.get(pipeline, _EMPTY_RACE)
+                snapshot[pipeline] = {
+                    "first_attempts": len(self._outcomes.get(pipeline, ())),
+                    "pass_rate": round(rate, 4) if rate is not None else None,
+                    **race,
+                    "wins": dict(race["wins"]),
+                }
+        return snapshot
+
+
+_first_attempt_pass_rates = FirstAttemptPassRates()
+
+
+class ItemRepairStats:
+    """Per-pipeline targeted item repairs next to what regenerating the whole document costs.
+
+    ``full_tokens`` is the usage of the documents that were kept instead of regenerated and
+    ``full_p50_ms`` the p50 of successful full attempts, so the ratios read as savings per repair.
+    """
+
+    def __init__(self, *, window: int = 100) -> None:
+        self.window = max(1, int(window))
+        self._counters: dict[str, dict[str, int]] = {}
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = Lock()
+
+    def record(
+        self,
+        pipeline: str,
+        *,
+        items: int,
+        repaired: bool,
+        repair_tokens: int | None,
+        full_tokens: int | None,
+        seconds: float,
+    ) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(
+                pipeline,
+                {"repairs": 0, "repaired": 0, "failed": 0, "items": 0, "repair_tokens": 0, "full_tokens": 0},
+            )
+            counters["repairs"] += 1
+            counters["repaired" if repaired else "failed"] += 1
+            counters["items"] += items
+            counters["repair_tokens"] += repair_tokens or 0
+            counters["full_tokens"] += full_tokens or 0
+            self._latencies.setdefault(pipeline, deque(maxlen=self.window)).append(max(0.0, seconds))
+
+    def stats(self) -> dict[str, Any]:
+        snapshot: dict[str, Any] = {}
+        with self._lock:
+            entries = {
+                pipeline: (dict(counters), sorted(self._latencies.get(pipeline, ())))
+                for pipeline, counters in self._counters.items()
+            }
+        for pipeline, (counters, latencies) in sorted(entries.items()):
+            full_p50 = _attempt_latencies.p50(pipeline)
+            snapshot[pipeline] = {
+                **counters,
+                "token_ratio": (
+                    round(counters["repair_tokens"] / counters["full_tokens"], 4) if counters["full_tokens"] else None
+                ),
+                "repair_p50_ms": round(latencies[(len(latencies) - 1) // 2] * 1000, 2) if latencies else None,
+                "full_p50_ms": round(full_p50 * 1000, 2) if full_p50 is not None else None,
+            }
+        return snapshot
+
+
+_item_repair_stats = ItemRepairStats()
+
+
+def attempt_latency_stats() -> dict[str, Any]:
+    return _attempt_latencies.stats()
+
+
+def speculation_stats() -> dict[str, Any]:
+    return _first_attempt_pass_rates.stats()
+
+
+def item_repair_stats() -> dict[str, Any]:
+    return _item_repair_stats.stats()
+
+
 class PipelineFailure(RuntimeError):
     def __init__(
         self,
@@ -24,6 +403,7 @@ class PipelineFailure(RuntimeError):
         reason: str,
         attempt_count: int,
         response_meta: AIResponseMeta | None = None,
+        retry_after_sec: int | None = None,
     ) -> None:
         self.pipeline = pipeline
         self.kind = kind
@@ -32,6 +412,7 @@ class PipelineFailure(RuntimeError):
         self.reason = reason
         self.attempt_count = attempt_count
         self.response_meta = response_meta
+        self.retry_after_sec = retry_after_sec
         super().__init__(f"{pipeline}:{kind}:{reason}")
 
 
@@ -50,8 +431,15 @@ def format_pipeline_error_detail(pipeline: str, kind: str, reason: str) -> str:
     return f"{pipeline}_failed:{kind}:{normalize_error_reason(reason)}"
 
 
-def classify_ai_failure(detail: str) -> tuple[str, int, bool]:
-    text = str(detail or "").lower()
+def classify_ai_failure(failure: BaseException | str) -> tuple[str, int, bool]:
+    """Failure kind, HTTP status and retryability; typed errors decide first, the message text last."""
+    if isinstance(failure, BaseException):
+        for item in exception_chain(failure):
+            classified = _classify_typed_failure(item)
+            if classified is not None:
+                return classified
+        failure = ai_error_detail(failure)
+    text = str(failure or "").lower()
 
     rate_limit_tokens = (
         "429",
@@ -66,6 +454,7 @@ def classify_ai_failure(detail: str) -> tuple[str, int, bool]:
         "timed out",
         "timeout",
         "read operation timed out",
+        "deadline_exceeded",
     )
     schema_tokens = (
         "schema",
@@ -84,6 +473,9 @@ def classify_ai_failure(detail: str) -> tuple[str, int, bool]:
         "config_error",
     )
 
+    if "ai_circuit_open" in text:
+        # 회로가 열린 공급자는 즉시 실패시키고 같은 요청 안에서 다시 시도하지 않는다.
+        return ("circuit_open", 503, True)
     if any(token in text for token in rate_limit_tokens):
         return ("rate_limited", 429, True)
     if any(token in text for token in timeout_tokens):
@@ -97,53 +489,627 @@ def classify_ai_failure(detail: str) -> tuple[str, int, bool]:
     return ("provider_error", 502, False)
 
 
+def classify_provider_status(status: int) -> tuple[str, int, bool]:
+    """Failure kind from a provider HTTP status."""
+    if status == 429:
+        return ("rate_limited", 429, True)
+    if status in {408, 504}:
+        return ("timeout", 504, True)
+    if status in {401, 403}:
+        return ("config_error", 503, False)
+    # 본문에 "json"/"schema"가 들어 있어도 공급자가 요청을 거절한 것이지 응답 형식 문제가 아니다.
+    return ("provider_error", 502, False)
+
+
+def _classify_typed_failure(exc: BaseException) -> tuple[str, int, bool] | None:
+    if isinstance(exc, CircuitOpenError):
+        # 회로가 열린 공급자는 즉시 실패시키고 같은 요청 안에서 다시 시도하지 않는다.
+        return ("circuit_open", 503, True)
+    if isinstance(exc, (QuotaExceededError, QueueShedError)):
+        return ("rate_limited", 429, True)
+    if isinstance(exc, (DeadlineExceededError, TimeoutError)):
+        return ("timeout", 504, True)
+    if isinstance(exc, ProviderHTTPError):
+        return classify_provider_status(exc.status)
+    if isinstance(exc, AIAttemptError):
+        # 공급자는 응답했고 그 내용이 파싱/정규화/품질게이트를 넘지 못했다.
+        if isinstance(exc, ItemRepairNeeded) or str(exc).startswith("quality_validation_failed"):
+            return ("quality_failed", 422, True)
+        return ("schema_mismatch", 422, True)
+    if isinstance(exc, (json.JSONDecodeError, JSONRepairError)):
+        return ("schema_mismatch", 422, True)
+    return None
+
+
+def serialize_ai_response_meta(
+    response_meta: AIResponseMeta | None,
+    *,
+    attempt_count: int | None = None,
+    fallback_used: bool | None = None,
+    failure_kind: str | None = None,
+) -> dict[str, Any]:
+    serialized: dict[str, Any] = {}
+
+    if response_meta is not None:
+        serialized["provider"] = response_meta.provider
+        serialized["model"] = response_meta.model
+        usage_payload: dict[str, int] = {}
+        if response_meta.usage is not None:
+            if response_meta.usage.input_tokens is not None:
+                usage_payload["input_tokens"] = response_meta.usage.input_tokens
+            if response_meta.usage.output_tokens is not None:
+                usage_payload["output_tokens"] = response_meta.usage.output_tokens
+            if response_meta.usage.total_tokens is not None:
+                usage_payload["total_tokens"] = response_meta.usage.total_tokens
+            if response_meta.usage.cached_input_tokens is not None:
+                usage_payload["cached_input_tokens"] = response_meta.usage.cached_input_tokens
+        if response_meta.estimated_input_tokens is not None:
+            usage_payload["estimated_input_tokens"] = response_meta.estimated_input_tokens
+        if usage_payload:
+            serialized["usage"] = usage_payload
+        if response_meta.timing is not None:
+            serialized["timing"] = {
+                "connect_ms": response_meta.timing.connect_ms,
+                "ttfb_ms": response_meta.timing.ttfb_ms,
+                "read_ms": response_meta.timing.read_ms,
+                "connection_reused": response_meta.timing.connection_reused,
+            }
+        if response_meta.hedge is not None:
+            serialized["hedge"] = {
+                "hedged": response_meta.hedge.hedged,
+                "winner": response_meta.hedge.winner,
+                "delay_ms": response_meta.hedge.delay_ms,
+                "extra_tokens": response_meta.hedge.extra_tokens,
+                "hedge_rate": response_meta.hedge.hedge_rate,
+                "win_rate": response_meta.hedge.win_rate,
+            }
+        if response_meta.route is not None:
+            serialized["route"] = {
+                "target": response_meta.route.target,
+                "failovers": list(response_meta.route.failovers),
+                "spillover": response_meta.route.spillover,
+            }
+        if response_meta.coalesced:
+            serialized["coalesced"] = True
+        if response_meta.cache_hit:
+            serialized["cache_hit"] = True
+        if response_meta.repairs:
+            serialized["json_repairs"] = list(response_meta.repairs)
+        if response_meta.speculation is not None:
+            serialized["speculation"] = {
+                "candidates": response_meta.speculation.candidates,
+                "winner": response_meta.speculation.winner,
+            }
+
+    if attempt_count is not None:
+        serialized["attempt_count"] = attempt_count
+    if fallback_used is not None:
+        serialized["fallback_used"] = fallback_used
+        serialized["failure_kind"] = failure_kind
+    elif failure_kind is not None:
+        serialized["failure_kind"] = failure_kind
+
+    return serialized
+
+
+def _accept_repairs(result: Any, policy: RetryPolicy) -> None:
+    """Fails the attempt when its response needed a repair the pipeline does not accept."""
+    meta = getattr(result, "meta", None)
+    repairs = getattr(meta, "repairs", ())
+    if not repairs or meta.cache_hit or meta.coalesced:
+        return
+    rejected = [kind for kind in repairs if kind in policy.rejected_repairs]
+    record_json_repair_outcome(accepted=not rejected)
+    if rejected:
+        raise AIAttemptError(f"json_repair_rejected:{'|'.join(rejected)}", meta=meta)
+
+
+def _with_merged_attempt_meta(result: Any, attempt_metas: list[AIResponseMeta]) -> Any:
+    if isinstance(result, StructuredAIResponse):
+        merged_meta = merge_ai_response_metas([*attempt_metas, result.meta])
+        if merged_meta is not None:
+            return StructuredAIResponse(data=result.data, meta=merged_meta)
+    return result
+
+
+def _record_failed_attempt(
+    exc: Exception,
+    *,
+    pipeline: str,
+    attempt_metas: list[AIResponseMeta],
+) -> tuple[str, int, bool]:
+    if isinstance(exc, AIAttemptError) and exc.meta is not None:
+        attempt_metas.append(exc.meta)
+    kind, status_code, retryable = classify_ai_failure(exc)
+    _attempt_latencies.record_failure(pipeline, kind)
+    return kind, status_code, retryable
+
+
+def _handle_attempt_failure(
+    exc: Exception,
+    *,
+    pipeline: str,
+    attempt: int,
+    attempts: int,
+    retryable_kinds: set[str],
+    attempt_metas: list[AIResponseMeta],
+    policy: RetryPolicy,
+    previous_delay: float | None,
+) -> float:
+    """Records the failed attempt; returns the wait before the retry, raises PipelineFailure otherwise."""
+    reason = ai_error_detail(exc)
+    http_error = provider_http_error(exc)
+    kind, status_code, retryable = _record_failed_attempt(exc, pipeline=pipeline, attempt_metas=attempt_metas)
+    # 대기열 기한 초과나 쿼터 소진처럼 재시도 시각이 정해진 거절은 같은 요청 안에서 바로 다시 보내지 않는다.
+    retry_after_sec = retry_after_hint(exc)
+    provider_delay = http_error.retry_delay_sec if http_error is not None else None
+    should_retry = (
+        attempt < attempts
+        and retryable
+        and kind in retryable_kinds
+        and retry_after_sec is None
+    )
+    delay = policy.backoff_sec(previous_delay) if should_retry and kind in policy.backoff_kinds else 0.0
+    if provider_delay is not None:
+        # 공급자가 정해 준 시각보다 일찍 보내지 않는다. 너무 멀면 요청 안에서 기다리지 않고 클라이언트에 넘긴다.
+        should_retry = should_retry and provider_delay * 1000 <= policy.max_retry_after_ms
+        delay = max(delay, provider_delay)
+    # 남은 요청 예산으로 한 번 더 돌 수 없거나 프로세스 재시도 예산이 바닥났으면 바로 실패시켜 호출부가 폴백으로 넘어가게 한다.
+    if should_retry and _attempt_latencies.retry_fits(pipeline, delay) and _retry_budget.try_spend():
+        return delay
+    if retry_after_sec is None and provider_delay is not None:
+        retry_after_sec = max(1, math.ceil(provider_delay))
+    raise PipelineFailure(
+        pipeline=pipeline,
+        kind=kind,
+        status_code=status_code,
+        retryable=retryable,
+        reason=reason,
+        attempt_count=attempt,
+        response_meta=merge_ai_response_metas(attempt_metas),
+        retry_after_sec=retry_after_sec,
+    ) from exc
+
+
+def _retry_exhausted(pipeline: str, attempts: int, attempt_metas: list[AIResponseMeta]) -> PipelineFailure:
+    return PipelineFailure(
+        pipeline=pipeline,
+        kind="provider_error",
+        status_code=502,
+        retryable=False,
+        reason="ai_retry_exhausted",
+        attempt_count=attempts,
+        response_meta=merge_ai_response_metas(attempt_metas),
+    )
+
+
 def run_ai_with_retry(
     call: Callable[[int], Any],
     *,
     pipeline: str,
     max_attempts: int = 2,
     retryable_kinds: set[str] | None = None,
+    retry_policy: RetryPolicy | None = None,
 ) -> tuple[Any, int]:
-    attempts = max(1, int(max_attempts))
+    policy = retry_policy or retry_policy_for(pipeline)
+    attempts = policy.attempts(max_attempts)
     retryable_kinds = retryable_kinds or set(DEFAULT_RETRYABLE_FAILURE_KINDS)
     attempt_metas: list[AIResponseMeta] = []
+    delay: float | None = None
+    _retry_budget.deposit()
 
-    for attempt in range(1, attempts + 1):
+    with ai_call_context(pipeline=pipeline):
+        for attempt in range(1, attempts + 1):
+            if delay:
+                time.sleep(delay)
+            started = time.monotonic()
+            try:
+                check_deadline()
+                # 응답 캐시는 이 시도가 품질게이트까지 통과했을 때만 채운다.
+                with ai_quality_gate():
+                    result = call(attempt)
+                    _accept_repairs(result, policy)
+            except Exception as exc:
+                if attempt == 1:
+                    _first_attempt_pass_rates.record(pipeline, False)
+                delay = _handle_attempt_failure(
+                    exc,
+                    pipeline=pipeline,
+                    attempt=attempt,
+                    attempts=attempts,
+                    retryable_kinds=retryable_kinds,
+                    attempt_metas=attempt_metas,
+                    policy=policy,
+                    previous_delay=delay,
+                )
+                continue
+            # 재시도가 성공하려면 필요한 시간이므로 성공한 시도의 소요 시간만 모은다.
+            _attempt_latencies.observe(pipeline, time.monotonic() - started)
+            if attempt == 1:
+                _first_attempt_pass_rates.record(pipeline, True)
+            return _with_merged_attempt_meta(result, attempt_metas), attempt
+
+    raise _retry_exhausted(pipeline, attempts, attempt_metas)
+
+
+def _candidate_temperature(index: int) -> float | None:
+    # 1번 후보는 평소 온도 그대로, 나머지는 0.2씩 올려 같은 프롬프트라도 다른 답을 받는다.
+    return None if index <= 1 else min(1.0, 0.3 + 0.2 * (index - 1))
+
+
+def _with_speculation_meta(result: Any, *, candidates: int, winner: int) -> Any:
+    if isinstance(result, StructuredAIResponse):
+        speculation = AISpeculationMeta(candidates=candidates, winner=winner)
+        return StructuredAIResponse(data=result.data, meta=replace(result.meta, speculation=speculation))
+    return result
+
+
+async def _race_candidates(
+    call: Callable[[int], Awaitable[Any]],
+    *,
+    pipeline: str,
+    candidates: int,
+    policy: RetryPolicy,
+    attempt_metas: list[AIResponseMeta],
+) -> Any:
+    """Runs first-attempt candidates ``1..candidates`` at once and returns the first that passes.
+
+    Candidate ``i`` is ``call(i)`` at its own temperature, so ``i > 1`` also gets the retry prompt
+    variant. Each runs behind its own quality gate; the losers are cancelled once one passes.
+    A cancelled candidate 1 has no outcome, so it is counted as censored instead of sampled.
+    Returns the result with ``meta.speculation`` set. When all fail, the failures of all but the
+    last are recorded and the last one is raised.
+    """
+
+    async def run(index: int) -> Any:
+        with ai_call_context(temperature=_candidate_temperature(index)):
+            with ai_quality_gate():
+                result = await call(index)
+                _accept_repairs(result, policy)
+        return result
+
+    started = time.monotonic()
+    tasks = {asyncio.ensure_future(run(index)): index for index in range(1, candidates + 1)}
+    pending = set(tasks)
+    failures: list[Exception] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.__getitem__):
+                index = tasks[task]
+                exc = task.exception()
+                if index == 1:
+                    _first_attempt_pass_rates.record(pipeline, exc is None)
+                if exc is None:
+                    _attempt_latencies.observe(pipeline, time.monotonic() - started)
+                    # 1번 후보가 아직 돌고 있으면 결과를 모른 채 취소되므로 통과율 표본에 넣지 않는다.
+                    censored = any(tasks[other] == 1 for other in pending)
+                    _first_attempt_pass_rates.record_race(
+                        pipeline,
+                        launched=candidates,
+                        winner=index,
+                        first_censored=censored,
+                    )
+                    for failure in failures:
+                        _record_failed_attempt(failure, pipeline=pipeline, attempt_metas=attempt_metas)
+                    return _with_speculation_meta(task.result(), candidates=candidates, winner=index)
+                failures.append(exc)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    _first_attempt_pass_rates.record_race(pipeline, launched=candidates, winner=None)
+    for failure in failures[:-1]:
+        _record_failed_attempt(failure, pipeline=pipeline, attempt_metas=attempt_metas)
+    raise failures[-1]
+
+
+async def run_ai_with_retry_async(
+    call: Callable[[int], Awaitable[Any]],
+    *,
+    pipeline: str,
+    max_attempts: int = 2,
+    retryable_kinds: set[str] | None = None,
+    retry_policy: RetryPolicy | None = None,
+    speculative: bool = False,
+) -> tuple[Any, int]:
+    """Async ``run_ai_with_retry``.
+
+    With ``speculative`` and a policy allowing more than one candidate, the first attempt is a race
+    of candidates (see ``_race_candidates``). A won race is attempt 1; if every candidate fails, that
+    race counts as attempt 1 and the usual retries follow. Extra candidates are paid for from the retry budget.
+    """
+    policy = retry_policy or retry_policy_for(pipeline)
+    attempts = policy.attempts(max_attempts)
+    retryable_kinds = retryable_kinds or set(DEFAULT_RETRYABLE_FAILURE_KINDS)
+    attempt_metas: list[AIResponseMeta] = []
+    delay: float | None = None
+    _retry_budget.deposit()
+    candidates = 1
+    if speculative:
+        candidates = _first_attempt_pass_rates.candidates(
+            pipeline,
+            max_candidates=policy.speculative_candidates,
+            target=policy.speculative_target_pass_rate,
+        )
+        # 추가 후보는 미리 당겨 쓰는 재시도라 재시도 예산에서 낸다.
+        extra = 0
+        while extra < candidates - 1 and _retry_budget.try_spend():
+            extra += 1
+        candidates = 1 + extra
+
+    with ai_call_context(pipeline=pipeline):
+        for attempt in range(1, attempts + 1):
+            if delay:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                check_deadline()
+                if attempt == 1 and candidates > 1:
+                    result = await _race_candidates(
+                        call,
+                        pipeline=pipeline,
+                        candidates=candidates,
+                        policy=policy,
+                        attempt_metas=attempt_metas,
+                    )
+                    # 경주는 첫 시도 한 번이다. 몇 번 후보가 이겼는지는 meta.speculation에 남긴다.
+                    return _with_merged_attempt_meta(result, attempt_metas), 1
+                with ai_quality_gate():
+                    result = await call(attempt)
+                    _accept_repairs(result, policy)
+            except Exception as exc:
+                if attempt == 1 and candidates == 1:
+                    _first_attempt_pass_rates.record(pipeline, False)
+                delay = _handle_attempt_failure(
+                    exc,
+                    pipeline=pipeline,
+                    attempt=attempt,
+                    attempts=attempts,
+                    retryable_kinds=retryable_kinds,
+                    attempt_metas=attempt_metas,
+                    policy=policy,
+                    previous_delay=delay,
+                )
+                continue
+            # 재시도가 성공하려면 필요한 시간이므로 성공한 시도의 소요 시간만 모은다.
+            _attempt_latencies.observe(pipeline, time.monotonic() - started)
+            if attempt == 1:
+                _first_attempt_pass_rates.record(pipeline, True)
+            return _with_merged_attempt_meta(result, attempt_metas), attempt
+
+    raise _retry_exhausted(pipeline, attempts, attempt_metas)
+
+
+@dataclass(frozen=True)
+class RepairTarget:
+    """One item of a top-level array (``sections``, ``quiz``, ``topics``...) that failed the gate."""
+
+    field: str
+    index: int
+    issues: tuple[str, ...]
+
+
+class ItemRepairNeeded(AIAttemptError):
+    """A quality failure confined to a few items, which ``run_item_repair`` regenerates alone.
+
+    ``document`` is the normalized document, ``targets`` the items to replace and the prompts ask
+    for just those items in the pipeline's own response shape. ``finalize(document)`` normalizes
+    the spliced document and raises if it still fails the gate. Callers that do not repair see an
+    ordinary ``AIAttemptError`` for the whole document.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        meta: AIResponseMeta | None,
+        pipeline: str,
+        document: dict[str, Any],
+        targets: tuple[RepairTarget, ...],
+        system_prompt: str,
+        user_prompt: str,
+        finalize: Callable[[dict[str, Any]], dict[str, Any]],
+    ) -> None:
+        super().__init__(message, meta=meta)
+        self.pipeline = pipeline
+        self.document = document
+        self.targets = targets
+        self.system_prompt = system_prompt
+        self.user_prompt = user_prompt
+        self.finalize = finalize
+
+
+def splice_repaired_items(
+    document: dict[str, Any],
+    targets: tuple[RepairTarget, ...],
+    repaired: dict[str, Any],
+) -> dict[str, Any]:
+    """Puts the regenerated items back in place; ``repaired[field]`` lists them in target order."""
+    spliced = dict(document)
+    for field in dict.fromkeys(target.field for target in targets):
+        field_targets = [target for target in targets if target.field == field]
+        items = repaired.get(field)
+        if not isinstance(items, list) or len(items) < len(field_targets):
+            raise ValueError(f"item_repair_incomplete:{field}")
+        values = list(spliced.get(field) or [])
+        for target, item in zip(field_targets, items):
+            values[target.index] = item
+        spliced[field] = values
+    return spliced
+
+
+def _finish_item_repair(
+    needed: ItemRepairNeeded,
+    response: StructuredAIResponse | None,
+    started: float,
+    error: Exception | None = None,
+) -> StructuredAIResponse:
+    metas = [meta for meta in (needed.meta, response.meta if response is not None else None) if meta is not None]
+    merged_meta = merge_ai_response_metas(metas)
+    repaired: dict[str, Any] | None = None
+    if response is not None:
         try:
-            result = call(attempt)
-            if isinstance(result, StructuredAIResponse):
-                merged_meta = merge_ai_response_metas([*attempt_metas, result.meta])
-                if merged_meta is not None:
-                    result = StructuredAIResponse(data=result.data, meta=merged_meta)
-            return result, attempt
+            repaired = needed.finalize(splice_repaired_items(needed.document, needed.targets, response.data))
         except Exception as exc:
-            if isinstance(exc, AIAttemptError) and exc.meta is not None:
-                attempt_metas.append(exc.meta)
-            reason = ai_error_detail(exc)
-            kind, status_code, retryable = classify_ai_failure(reason)
-            should_retry = (
-                attempt < attempts
-                and retryable
-                and kind in retryable_kinds
+            error = exc
+    usage = response.meta.usage if response is not None else None
+    _item_repair_stats.record(
+        needed.pipeline,
+        items=len(needed.targets),
+        repaired=repaired is not None,
+        repair_tokens=usage.total_tokens if usage is not None else None,
+        full_tokens=needed.meta.usage.total_tokens if needed.meta is not None and needed.meta.usage else None,
+        seconds=time.monotonic() - started,
+    )
+    if repaired is None:
+        # 부분 수선도 실패하면 원래 품질 실패로 돌려 문서 전체를 다시 생성하게 한다.
+        raise AIAttemptError(str(needed), meta=merged_meta) from error
+    return StructuredAIResponse(data=repaired, meta=merged_meta or response.meta)
+
+
+def _remember_repaired(ai_service: Any, repaired: StructuredAIResponse, *, system_prompt: str, user_prompt: str) -> None:
+    remember_response = getattr(ai_service, "remember_response", None)
+    if callable(remember_response):
+        # 원래 프롬프트 키로 남겨 둔 게이트 실패 문서 대신 수선을 마친 문서를 캐시한다.
+        remember_response(system_prompt=system_prompt, user_prompt=user_prompt, response=repaired)
+
+
+def run_item_repair(
+    ai_service: Any,
+    needed: ItemRepairNeeded,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+) -> StructuredAIResponse:
+    """Regenerates only ``needed.targets``, splices them in and re-runs the quality gate.
+
+    Any failure, including the repair call itself, surfaces as the original quality failure so
+    the retry loop regenerates the whole document as before. ``system_prompt``/``user_prompt``
+    are the original document's; the repaired document is cached under them in place of the
+    original, and the repair response itself is not cached.
+    """
+    started = time.monotonic()
+    try:
+        with ai_call_context(cache_writes=None):
+            response = ai_service.generate_json_with_meta(
+                system_prompt=needed.system_prompt,
+                user_prompt=needed.user_prompt,
             )
-            if should_retry:
-                continue
-            raise PipelineFailure(
-                pipeline=pipeline,
-                kind=kind,
-                status_code=status_code,
-                retryable=retryable,
-                reason=reason,
-                attempt_count=attempt,
-                response_meta=merge_ai_response_metas(attempt_metas),
-            ) from exc
+    except Exception as exc:
+        return _finish_item_repair(needed, None, started, exc)
+    repaired = _finish_item_repair(needed, response, started)
+    _remember_repaired(ai_service, repaired, system_prompt=system_prompt, user_prompt=user_prompt)
+    return repaired
 
-    raise PipelineFailure(
-        pipeline=pipeline,
-        kind="provider_error",
-        status_code=502,
-        retryable=False,
-        reason="ai_retry_exhausted",
-        attempt_count=attempts,
-        response_meta=merge_ai_response_metas(attempt_metas),
-    )
+
+async def run_item_repair_async(
+    ai_service: Any,
+    needed: ItemRepairNeeded,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+) -> StructuredAIResponse:
+    started = time.monotonic()
+    try:
+        with ai_call_context(cache_writes=None):
+            response = await ai_service.generate_json_with_meta(
+                system_prompt=needed.system_prompt,
+                user_prompt=needed.user_prompt,
+            )
+    except Exception as exc:
+        return _finish_item_repair(needed, None, started, exc)
+    repaired = _finish_item_repair(needed, response, started)
+    _remember_repaired(ai_service, repaired, system_prompt=system_prompt, user_prompt=user_prompt)
+    return repaired
+
+
+async def generate_json_with_streamed_items(
+    ai_service: Any,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    item_normalizers: dict[str, Callable[[int, Any], Any]],
+    ready_fields: frozenset[str] = frozenset(),
+    on_ready: Callable[[dict[str, Any]], None] | None = None,
+) -> StructuredAIResponse:
+    """Stream the provider response and normalize each finished array item as it arrives.
+
+    ``item_normalizers`` maps a top-level array field (e.g. ``sections``) to ``fn(index, item)``.
+    The returned data holds the normalized items in place of the raw arrays, so the raw response
+    text is never held in full. Services without ``stream_json_text`` use the buffered call.
+    ``on_ready`` is called once, mid-stream, with the members that have arrived as soon as every
+    field in ``ready_fields`` is complete; it is not called for cached, buffered or coalesced
+    responses.
+    """
+    stream = getattr(ai_service, "stream_json_text", None)
+    if not callable(stream):
+        return await ai_service.generate_json_with_meta(system_prompt=system_prompt, user_prompt=user_prompt)
+    cached_response = getattr(ai_service, "cached_response", None)
+    if callable(cached_response):
+        cached = cached_response(system_prompt=system_prompt, user_prompt=user_prompt)
+        if cached is not None:
+            return cached
+
+    async def run() -> StructuredAIResponse:
+        return await _stream_items(
+            ai_service,
+            stream,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            item_normalizers=item_normalizers,
+            ready_fields=ready_fields,
+            on_ready=on_ready,
+        )
+
+    # 같은 프롬프트로 동시에 들어온 스트리밍 호출도 업스트림 스트림 하나로 합친다(대기자는 끝난 응답의 사본을 받는다).
+    coalesce = getattr(ai_service, "coalesce_streamed", None)
+    if callable(coalesce):
+        return await coalesce(system_prompt=system_prompt, user_prompt=user_prompt, call=run)
+    return await run()
+
+
+async def _stream_items(
+    ai_service: Any,
+    stream: Callable[..., AsyncIterator[AIStreamChunk]],
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    item_normalizers: dict[str, Callable[[int, Any], Any]],
+    ready_fields: frozenset[str],
+    on_ready: Callable[[dict[str, Any]], None] | None,
+) -> StructuredAIResponse:
+    parser = StreamingJSONItemParser(item_normalizers)
+    items: dict[str, list[Any]] = {field: [] for field in item_normalizers}
+    response_meta: AIResponseMeta | None = None
+    try:
+        async with aclosing(stream(system_prompt=system_prompt, user_prompt=user_prompt)) as chunks:
+            async for chunk in chunks:
+                if chunk.meta is not None:
+                    response_meta = chunk.meta
+                if not chunk.text:
+                    continue
+                for event in parser.feed(chunk.text):
+                    items[event.field].append(item_normalizers[event.field](event.index, event.value))
+                if on_ready is not None and ready_fields.issubset(parser.completed_keys):
+                    on_ready(parser.completed())
+                    on_ready = None
+        data = parser.close()
+    except ValueError as exc:
+        record_json_parse(failed=True)
+        raise AIAttemptError(str(exc), meta=response_meta) from exc
+    record_json_parse(parser.repairs)
+
+    for field in parser.seen_item_fields:
+        data[field] = items[field]
+    meta = response_meta or AIResponseMeta(provider="unknown", model="unknown")
+    if parser.repairs:
+        # 버퍼 경로처럼 수선 종류를 meta에 남겨 RetryPolicy.rejected_repairs가 그대로 적용되게 한다.
+        meta = replace(meta, repairs=parser.repairs)
+    response = StructuredAIResponse(data=data, meta=meta)
+    remember_response = getattr(ai_service, "remember_response", None)
+    if callable(remember_response):
+        # 캐시에는 항목 정규화를 마친 데이터가 들어간다. 정규화는 멱등이라 적중 시 다시 돌려도 같다.
+        remember_response(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+    return response
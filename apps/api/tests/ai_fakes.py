@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any
+
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk, AIUsageMeta, StructuredAIResponse
+
+
+class FakeClock:
+    """Clock that only moves when a test sets or advances ``now``."""
+
+    def __init__(self, now: float = 100.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedProvider:
+    """Provider that raises the scripted errors in order and then answers with ``data``.
+
+    A ``None`` entry in ``errors`` is a successful call. ``usages`` is used one per successful
+    call; its last entry repeats once the rest are used up.
+    """
+
+    model = "m"
+
+    def __init__(
+        self,
+        errors: list[str | None] | None = None,
+        *,
+        data: dict[str, Any] | None = None,
+        usages: list[AIUsageMeta] | None = None,
+    ) -> None:
+        self.errors = list(errors or [])
+        self.data = {"ok": True} if data is None else data
+        self.usages = list(usages or [])
+        self.calls = 0
+
+    def _next_response(self) -> StructuredAIResponse:
+        self.calls += 1
+        error = self.errors.pop(0) if self.errors else None
+        if error:
+            raise RuntimeError(error)
+        usage = (self.usages.pop(0) if len(self.usages) > 1 else self.usages[0]) if self.usages else None
+        return StructuredAIResponse(
+            data=copy.deepcopy(self.data),
+            meta=AIResponseMeta(provider="fake", model=self.model, usage=usage),
+        )
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        return self._next_response()
+
+
+class AsyncScriptedProvider(ScriptedProvider):
+    """Async ``ScriptedProvider``. A scripted error in a stream is raised after the first chunk."""
+
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        return self._next_response()
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        error = self.errors[0] if self.errors else None
+        if error:
+            self.calls += 1
+            self.errors.pop(0)
+            yield AIStreamChunk(text="{")
+            raise RuntimeError(error)
+        response = self._next_response()
+        yield AIStreamChunk(text=json.dumps(response.data, ensure_ascii=False))
+        yield AIStreamChunk(meta=response.meta)
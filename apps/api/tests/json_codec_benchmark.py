@@ -0,0 +1,85 @@
+"""Per-request JSON cost of the provider round trip, stdlib path vs. app.core.json_codec.
+
+One "request" is: encode the provider request, decode the provider envelope, decode the model
+text inside it (parse_json_text), and render the API response. Payloads come from the fake LLM
+so they match what the sections/curriculum pipelines really carry.
+
+    PYTHONPATH=. python -m tests.json_codec_benchmark [--scale 4] [--number 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core import json_codec
+from app.domain.ai.providers.fake_llm import fake_payload
+
+
+_PIPELINES = {
+    "curriculum_sections": ("학습 콘텐츠 작성자", "sections"),
+    "curriculum_generate": ("커리큘럼 설계 전문가", "topics"),
+}
+_USER_PROMPT = "- 학습 목표: 파이썬 반복문\n- 토픽: 반복문\n목표 12개"
+
+
+def _case(system_prompt: str, list_field: str, scale: int) -> tuple[dict[str, Any], bytes, dict[str, Any]]:
+    data = fake_payload(system_prompt, _USER_PROMPT)
+    data[list_field] = list(data[list_field]) * max(1, scale)
+    content = json.dumps(data, ensure_ascii=False)
+    request = {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "system", "content": system_prompt * 20}, {"role": "user", "content": _USER_PROMPT * 10}],
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"},
+    }
+    envelope = json.dumps(
+        {"model": "gpt-4o-mini", "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+    ).encode("utf-8")
+    return request, envelope, data
+
+
+def _stdlib_round_trip(request: dict[str, Any], envelope: bytes, data: dict[str, Any]) -> None:
+    json.dumps(request).encode("utf-8")
+    content = json.loads(envelope.decode("utf-8"))["choices"][0]["message"]["content"]
+    json.loads(content)
+    # FastAPI 기본 경로: jsonable_encoder 후 JSONResponse.render
+    json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _codec_round_trip(request: dict[str, Any], envelope: bytes, data: dict[str, Any]) -> None:
+    json_codec.dumps(request)
+    content = json_codec.loads(envelope)["choices"][0]["message"]["content"]
+    json_codec.loads(content)
+    json_codec.dumps(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="repeat the payload's item list this many times")
+    parser.add_argument("--number", type=int, default=2000, help="round trips per measurement")
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {"backend": json_codec.JSON_BACKEND, "scale": args.scale, "pipelines": {}}
+    for pipeline, (system_prompt, list_field) in _PIPELINES.items():
+        request, envelope, data = _case(system_prompt, list_field, args.scale)
+        timings = {}
+        for name, round_trip in (("stdlib", _stdlib_round_trip), ("codec", _codec_round_trip)):
+            best = min(timeit.repeat(lambda: round_trip(request, envelope, data), number=args.number, repeat=5))
+            timings[name] = best / args.number * 1_000_000
+        report["pipelines"][pipeline] = {
+            "envelope_bytes": len(envelope),
+            "stdlib_us": round(timings["stdlib"], 2),
+            "codec_us": round(timings["codec"], 2),
+            "saved_us": round(timings["stdlib"] - timings["codec"], 2),
+            "speedup": round(timings["stdlib"] / timings["codec"], 2),
+        }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from app.domain.ai.providers.batch import GeminiBatchClient, OpenAIBatchClient
+from app.domain.ai.providers.gemini import GeminiProvider
+from app.domain.ai.providers.openai import OpenAIProvider
+from app.domain.ai.providers.transport import PooledHTTPTransport
+from app.services.compat.batch_generation import read_batch_items, run_batch_generation, write_jsonl
+
+
+_QUIZ = {
+    "title": "파이썬 리스트 문제 훈련",
+    "content": "파이썬 리스트 핵심을 점검하는 문제 세트입니다. 개념 확인과 응용 판단을 함께 연습합니다.",
+    "code_examples": [],
+    "quiz": [
+        {
+            "question": f"파이썬 리스트 {name} 메서드를 사용하는 가장 알맞은 상황은?",
+            "options": [f"{name}()로 처리", "input() 호출", "replace() 호출", "split() 호출"],
+            "correct_answer": 0,
+            "explanation": f"{name}()는 리스트를 직접 다루는 메서드라 다른 보기의 문자열/입력 함수와 용도가 다릅니다.",
+        }
+        for name in ("append", "extend", "insert")
+    ],
+}
+_REASONING = {
+    "learning_objectives": ["리스트 인덱싱 이해"],
+    "prerequisite_concepts": ["변수"],
+    "why_this_topic": "데이터를 묶어 다루는 기본 구조이기 때문",
+    "teaching_strategy": "예제 중심",
+    "difficulty_calibration": "초급",
+    "connection_to_goal": "API 응답 가공에 필요",
+}
+
+
+def _answer(system_prompt: str, user_prompt: str) -> dict:
+    if "문제 출제" in system_prompt:
+        return {**_QUIZ, "content": "짧음"} if "불량" in user_prompt else _QUIZ
+    if "학습 설계" in system_prompt:
+        return _REASONING
+    return {"title": "빈 섹션", "sections": []}
+
+
+class _BatchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    files: dict[str, bytes] = {}
+    jobs: dict[str, dict] = {}
+
+    def _reply(self, payload: dict | bytes) -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        cls = type(self)
+        path = self.path.split("?", 1)[0]
+        body = self._body()
+        if path == "/v1/files":
+            # multipart 본문에서 JSONL 파트만 잘라낸다.
+            content = body.split(b"Content-Type: application/jsonl\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0]
+            file_id = f"file-{len(cls.files)}"
+            cls.files[file_id] = content
+            self._reply({"id": file_id})
+        elif path == "/v1/batches":
+            request = json.loads(body)
+            lines = []
+            for line in cls.files[request["input_file_id"]].decode("utf-8").splitlines():
+                item = json.loads(line)
+                messages = item["body"]["messages"]
+                answer = _answer(messages[0]["content"], messages[1]["content"])
+                completion = {
+                    "model": item["body"]["model"],
+                    "choices": [{"message": {"content": json.dumps(answer, ensure_ascii=False)}}],
+                    "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+                }
+                lines.append(json.dumps({
+                    "custom_id": item["custom_id"],
+                    "response": {"status_code": 200, "body": completion},
+                    "error": None,
+                }, ensure_ascii=False))
+            output_id = f"file-{len(cls.files)}"
+            cls.files[output_id] = "\n".join(lines).encode("utf-8")
+            job_id = f"batch-{len(cls.jobs)}"
+            cls.jobs[job_id] = {"id": job_id, "status": "in_progress", "output_file_id": output_id}
+            self._reply(cls.jobs[job_id])
+        elif path.endswith(":batchGenerateContent"):
+            requests = json.loads(body)["batch"]["input_config"]["requests"]["requests"]
+            responses = []
+            for entry in requests:
+                request = entry["request"]
+                answer = _answer(
+                    request["systemInstruction"]["parts"][0]["text"],
+                    request["contents"][0]["parts"][0]["text"],
+                )
+                responses.append({
+                    "metadata": entry["metadata"],
+                    "response": {
+                        "candidates": [{"content": {"parts": [{"text": json.dumps(answer, ensure_ascii=False)}]}}],
+                        "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 50},
+                    },
+                })
+            job_id = f"batches/{len(cls.jobs)}"
+            cls.jobs[job_id] = {
+                "name": job_id,
+                "metadata": {"state": "BATCH_STATE_RUNNING"},
+                "response": {"inlinedResponses": {"inlinedResponses": responses}},
+            }
+            self._reply({"name": job_id, "metadata": {"state": "BATCH_STATE_PENDING"}})
+        else:
+            self.send_error(404)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        cls = type(self)
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/v1/files/") and path.endswith("/content"):
+            self._reply(cls.files[path.split("/")[3]])
+            return
+        job_id = path.removeprefix("/v1/batches/").removeprefix("/v1beta/")
+        job = cls.jobs[job_id]
+        # 첫 조회는 진행 중, 두 번째부터 완료로 응답한다.
+        if job.get("seen"):
+            if "status" in job:
+                job["status"] = "completed"
+            else:
+                job["metadata"] = {"state": "BATCH_STATE_SUCCEEDED"}
+                job["done"] = True
+        job["seen"] = True
+        self._reply({key: value for key, value in job.items() if key != "seen"})
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+def _input_lines() -> list[str]:
+    return [
+        json.dumps({"id": "good", "kind": "generate", "payload": {
+            "language": "Python", "topic": "파이썬 리스트", "contentMode": "quiz_only", "questionCount": 3,
+        }}, ensure_ascii=False),
+        json.dumps({"id": "bad", "payload": {
+            "language": "Python", "topic": "파이썬 리스트 불량", "contentMode": "quiz_only", "questionCount": 3,
+        }}, ensure_ascii=False),
+        json.dumps({"id": "lesson", "payload": {
+            "topic": "파이썬 리스트", "curriculumGoal": "백엔드 개발", "learnerLevel": "beginner", "language": "Python",
+        }}, ensure_ascii=False),
+        "{not json",
+    ]
+
+
+class BatchGenerationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _BatchHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.transport = PooledHTTPTransport()
+        self.addCleanup(self.transport.close)
+        self.sleeps: list[float] = []
+
+    def _run(self, client) -> tuple:
+        items, rejected = read_batch_items(_input_lines())
+        report = run_batch_generation(items, client, poll_interval_sec=0.5, sleep=self.sleeps.append)
+        return report, rejected
+
+    def _assert_report(self, report, rejected) -> None:
+        self.assertEqual([record["id"] for record in report.passed], ["good"])
+        passed = report.passed[0]["result"]
+        self.assertEqual(len(passed["quiz"]), 3)
+        self.assertEqual(passed["meta"]["usage"]["input_tokens"], 100)
+
+        resubmit = {record["id"]: record for record in report.resubmit}
+        self.assertEqual(set(resubmit), {"bad", "lesson"})
+        self.assertIn("content_too_short", resubmit["bad"]["error"])
+        self.assertEqual(resubmit["bad"]["attempt"], 2)
+        # 섹션만 실패한 레슨은 추론 결과를 들고 재제출되어 다음 실행에서 추론을 건너뛴다.
+        self.assertEqual(resubmit["lesson"]["reasoning"]["teaching_strategy"], "예제 중심")
+        self.assertEqual(len(rejected), 1)
+        self.assertIn(0.5, self.sleeps)
+
+    def test_openai_batch_round_trip(self) -> None:
+        provider = OpenAIProvider(
+            api_key="test-key",
+            model="gpt-test",
+            base_url=f"{self.base_url}/v1",
+            transport=self.transport,
+        )
+        report, rejected = self._run(OpenAIBatchClient(provider))
+        self._assert_report(report, rejected)
+
+    def test_gemini_batch_round_trip(self) -> None:
+        provider = GeminiProvider(
+            api_key="test-key",
+            model="gemini-test",
+            transport=self.transport,
+            base_url=self.base_url,
+        )
+        report, rejected = self._run(GeminiBatchClient(provider))
+        self._assert_report(report, rejected)
+
+    def test_resubmission_file_feeds_back_in(self) -> None:
+        provider = GeminiProvider(api_key="k", model="gemini-test", transport=self.transport, base_url=self.base_url)
+        report, _ = self._run(GeminiBatchClient(provider))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "resubmit.jsonl")
+            write_jsonl(path, report.resubmit)
+            with open(path, encoding="utf-8") as handle:
+                items, rejected = read_batch_items(handle)
+
+        self.assertEqual(rejected, [])
+        lesson = next(item for item in items if item.id == "lesson")
+        self.assertIsNotNone(lesson.reasoning)
+        self.assertEqual(lesson.attempt, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import asyncio
+import unittest
+
+from app.domain.ai.call_context import DeadlineExceededError
+from app.domain.ai.providers.base import AIAttemptError
+from app.domain.ai.providers.circuit_breaker import (
+    AsyncCircuitBreakerProvider,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerProvider,
+)
+from app.domain.ai.providers.common import CircuitOpenError, ProviderHTTPError, is_outage_error
+from app.domain.ai.providers.transport import TransportHTTPError
+from app.domain.ai.quota import QuotaExceededError
+from app.domain.ai.service import AsyncAIService
+from app.services.compat import generation_service as gs
+from app.services.compat.pipeline_runtime import classify_ai_failure
+
+try:
+    from tests.ai_fakes import AsyncScriptedProvider, FakeClock, ScriptedProvider
+except ModuleNotFoundError:
+    from ai_fakes import AsyncScriptedProvider, FakeClock, ScriptedProvider
+
+
+def _http_error(status: int, reason: str) -> ProviderHTTPError:
+    return ProviderHTTPError("openai", TransportHTTPError(status=status, reason=reason, headers={}, body=b""))
+
+
+def _wrapped(exc: Exception) -> RuntimeError:
+    # 서비스가 1차 실패를 감싸는 모양 그대로 원인을 붙인다.
+    try:
+        raise RuntimeError(f"ai_primary_failed:{exc}") from exc
+    except RuntimeError as wrapped:
+        return wrapped
+
+
+def _breaker(clock: FakeClock, **overrides) -> CircuitBreaker:
+    config = CircuitBreakerConfig(**{
+        "window": 4,
+        "min_calls": 4,
+        "consecutive_timeouts": 2,
+        "open_sec": 10.0,
+        "half_open_probes": 2,
+        **overrides,
+    })
+    return CircuitBreaker("gemini", config, clock=clock)
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_consecutive_timeouts_open_the_circuit_and_fail_fast(self) -> None:
+        clock = FakeClock()
+        provider = ScriptedProvider(["gemini_request_failed:timed out", "gemini_request_failed:timed out"])
+        wrapped = CircuitBreakerProvider(provider, _breaker(clock))
+
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                wrapped.generate_json_with_meta(system_prompt="s", user_prompt="u")
+        with self.assertRaises(RuntimeError) as ctx:
+            wrapped.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(str(ctx.exception), "ai_circuit_open:gemini")
+        self.assertEqual(provider.calls, 2)
+        stats = wrapped.breaker.stats()
+        self.assertEqual(stats["state"], "open")
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["transitions"], {"closed->open": 1})
+
+    def test_failure_rate_ignores_schema_errors(self) -> None:
+        breaker = _breaker(FakeClock(), consecutive_timeouts=99)
+        breaker.record_failure(False, RuntimeError("gemini_request_failed:HTTP 503"))
+        breaker.record_failure(False, RuntimeError("JSONDecodeError: Expecting value"))
+        breaker.record_failure(False, RuntimeError("429 too many requests"))
+        self.assertEqual(breaker.state, "closed")
+
+        breaker.record_failure(False, RuntimeError("gemini_request_failed:HTTP 502"))
+        self.assertEqual(breaker.state, "open")
+
+    def test_half_open_limits_probes_and_closes_after_successes(self) -> None:
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(2):
+            breaker.record_failure(False, RuntimeError("timed out"))
+        clock.now += 10.0
+
+        first, second = breaker.acquire(), breaker.acquire()
+        self.assertTrue(first and second)
+        with self.assertRaises(RuntimeError):
+            breaker.acquire()
+
+        breaker.record_success(first)
+        self.assertEqual(breaker.state, "half_open")
+        breaker.record_success(second)
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(
+            breaker.stats()["transitions"],
+            {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1},
+        )
+
+    def test_failed_probe_reopens(self) -> None:
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(2):
+            breaker.record_failure(False, RuntimeError("timed out"))
+        clock.now += 10.0
+
+        probe = breaker.acquire()
+        breaker.record_failure(probe, RuntimeError("gemini_request_failed:HTTP 503"))
+
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.stats()["transitions"]["half_open->open"], 1)
+
+    def test_stream_failure_after_first_chunk_counts(self) -> None:
+        breaker = _breaker(FakeClock(), window=1, min_calls=1)
+        wrapped = AsyncCircuitBreakerProvider(AsyncScriptedProvider(["gemini_request_failed:connection reset"]), breaker)
+
+        async def run() -> None:
+            async for _chunk in wrapped.stream_json_text(system_prompt="s", user_prompt="u"):
+                pass
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+        self.assertEqual(breaker.state, "open")
+
+
+class CircuitFallbackTests(unittest.TestCase):
+    def test_open_circuit_returns_fallback_content_without_retry(self) -> None:
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        breaker.record_failure(False, RuntimeError("timed out"))
+        breaker.record_failure(False, RuntimeError("timed out"))
+        provider = AsyncScriptedProvider()
+        gs._get_async_ai_service = lambda: AsyncAIService(primary=AsyncCircuitBreakerProvider(provider, breaker))
+
+        result = asyncio.run(
+            gs.compat_generate_async(gs.GenerateRequest(language="python", topic="리스트"))
+        )
+
+        self.assertEqual(provider.calls, 0)
+        self.assertTrue(result["meta"]["fallback_used"])
+        self.assertEqual(result["meta"]["failure_kind"], "circuit_open")
+        self.assertEqual(result["meta"]["attempt_count"], 1)
+        self.assertTrue(result["quiz"])
+
+    def test_classify_ai_failure_maps_circuit_open(self) -> None:
+        self.assertEqual(
+            gs._classify_ai_failure("ai_primary_failed:ai_circuit_open:gemini"),
+            ("circuit_open", 503, True),
+        )
+
+
+class FailureClassificationTests(unittest.TestCase):
+    def test_typed_errors_decide_before_message_text(self) -> None:
+        # 본문 문구에 "json"이 있어도 HTTP 500은 공급자 오류다.
+        server_error = _http_error(500, "invalid json in upstream")
+        self.assertEqual(classify_ai_failure(_wrapped(server_error)), ("provider_error", 502, False))
+        self.assertTrue(is_outage_error(_wrapped(server_error)))
+
+        quota = _wrapped(QuotaExceededError("learner", 2000))
+        self.assertEqual(classify_ai_failure(quota), ("rate_limited", 429, True))
+        self.assertFalse(is_outage_error(quota))
+
+        self.assertEqual(classify_ai_failure(DeadlineExceededError()), ("timeout", 504, True))
+        self.assertFalse(is_outage_error(DeadlineExceededError()))
+
+        circuit = _wrapped(CircuitOpenError("gemini"))
+        self.assertEqual(classify_ai_failure(circuit), ("circuit_open", 503, True))
+        self.assertTrue(is_outage_error(circuit))
+
+    def test_attempt_errors_are_content_failures_not_outages(self) -> None:
+        empty = AIAttemptError("openai_content_missing")
+        self.assertEqual(classify_ai_failure(empty), ("schema_mismatch", 422, True))
+        self.assertFalse(is_outage_error(empty))
+
+        quality = AIAttemptError("quality_validation_failed:quiz_count")
+        self.assertEqual(classify_ai_failure(quality), ("quality_failed", 422, True))
+
+    def test_provider_status_classifies_http_errors(self) -> None:
+        self.assertEqual(classify_ai_failure(_http_error(429, "Too Many Requests")), ("rate_limited", 429, True))
+        self.assertFalse(is_outage_error(_http_error(429, "Too Many Requests")))
+        self.assertEqual(classify_ai_failure(_http_error(401, "Unauthorized")), ("config_error", 503, False))
+        self.assertFalse(is_outage_error(_http_error(401, "Unauthorized")))
+        self.assertTrue(is_outage_error(_http_error(503, "schema service unavailable")))
+
+    def test_untyped_errors_fall_back_to_message_text(self) -> None:
+        self.assertEqual(classify_ai_failure(RuntimeError("429 too many requests")), ("rate_limited", 429, True))
+        self.assertTrue(is_outage_error(RuntimeError("gemini_request_failed:request timed out")))
+        self.assertFalse(is_outage_error(RuntimeError("openai_api_key_missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.concurrency import AdaptiveLimiter, AIMDLimit, AsyncAdaptiveLimiter
+from app.domain.ai.providers.base import AIUsageMeta
+from app.domain.ai.service import AIService
+from app.services.compat import generation_service as gs
+
+try:
+    from tests.ai_fakes import FakeClock, ScriptedProvider
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock, ScriptedProvider
+
+
+class AIMDLimitTests(unittest.TestCase):
+    def test_grows_additively_only_while_utilized(self) -> None:
+        limit = AIMDLimit(initial_limit=4, max_limit=8)
+
+        for _ in range(4):
+            limit.on_success("chat_generate", 0.1, in_flight=1)
+        self.assertEqual(limit.limit, 4)
+
+        for _ in range(5):
+            limit.on_success("chat_generate", 0.1, in_flight=4)
+        self.assertEqual(limit.limit, 5)
+
+        for _ in range(200):
+            limit.on_success("chat_generate", 0.1, in_flight=8)
+        self.assertEqual(limit.limit, 8)
+
+    def test_overload_halves_once_per_cooldown_and_respects_floor(self) -> None:
+        clock = FakeClock()
+        limit = AIMDLimit(initial_limit=8, max_limit=16, min_limit=2, cooldown_sec=1.0, clock=clock)
+
+        limit.on_drop()
+        limit.on_drop()
+        self.assertEqual(limit.limit, 4)
+
+        for _ in range(3):
+            clock.now += 1.5
+            limit.on_drop()
+        self.assertEqual(limit.limit, 2)
+        self.assertEqual(limit.stats()["drops"], 5)
+
+    def test_latency_inflation_trims_instead_of_growing(self) -> None:
+        limit = AIMDLimit(initial_limit=10, max_limit=16, min_baseline_samples=5)
+        for _ in range(5):
+            limit.on_success("curriculum_generate", 1.0, in_flight=10)
+        grown = limit.limit
+
+        limit.on_success("curriculum_generate", 5.0, in_flight=10)
+        # 다른 파이프라인의 기준 지연에는 영향을 주지 않는다.
+        limit.on_success("chat_generate", 5.0, in_flight=1)
+
+        self.assertLess(limit.limit, grown)
+        self.assertEqual(limit.stats()["latency_backoffs"], 1)
+        self.assertIn("chat_generate", limit.stats()["baseline_latency_ms"])
+
+
+class AdaptiveLimiterTests(unittest.TestCase):
+    def test_shrunk_limit_blocks_new_callers_until_release(self) -> None:
+        limiter = AdaptiveLimiter(AIMDLimit(initial_limit=2, max_limit=2))
+        self.assertTrue(limiter.acquire(timeout=0.01))
+        limiter.record_failure(RuntimeError("openai_http_error:429:too many requests"))
+
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        releaser = threading.Timer(0.05, limiter.release)
+        releaser.start()
+        self.assertTrue(limiter.acquire(timeout=1.0))
+        releaser.join()
+
+        stats = limiter.stats()
+        self.assertEqual((stats["limit"], stats["in_flight"]), (1, 1))
+        self.assertEqual(stats["queue_wait"]["abandoned"], 1)
+        self.assertGreater(stats["queue_wait"]["max_ms"], 0)
+
+    def test_non_overload_errors_do_not_shrink(self) -> None:
+        limiter = AdaptiveLimiter(AIMDLimit(initial_limit=4, max_limit=4))
+        limiter.record_failure(ValueError("invalid_json"))
+        self.assertEqual(limiter.stats()["limit"], 4)
+
+
+class AsyncAdaptiveLimiterTests(unittest.TestCase):
+    def test_waiters_are_served_in_order_and_cancelled_waiter_frees_its_turn(self) -> None:
+        limiter = AsyncAdaptiveLimiter(AIMDLimit(initial_limit=1, max_limit=1))
+        order: list[str] = []
+
+        async def worker(name: str) -> None:
+            await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def run() -> None:
+            await limiter.acquire()
+            first = asyncio.create_task(worker("a"))
+            cancelled = asyncio.create_task(worker("x"))
+            second = asyncio.create_task(worker("b"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            limiter.release()
+            await asyncio.gather(first, second, return_exceptions=True)
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+
+        asyncio.run(run())
+
+        self.assertEqual(order, ["a", "b"])
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.stats()["queue_wait"]["abandoned"], 1)
+
+
+class AdaptiveConcurrencyServiceTests(unittest.TestCase):
+    def test_provider_429_cuts_limit_and_shows_in_runtime_stats(self) -> None:
+        provider = ScriptedProvider(
+            ["openai_http_error:429:rate limit exceeded"],
+            usages=[AIUsageMeta(input_tokens=1, output_tokens=1)],
+        )
+        service = AIService(
+            primary=provider,
+            max_concurrency=8,
+            concurrency_limit=AIMDLimit(initial_limit=8, max_limit=8),
+        )
+        original = gs._get_async_ai_service
+        self.addCleanup(setattr, gs, "_get_async_ai_service", original)
+        gs._get_async_ai_service = lambda: service
+
+        with ai_call_context(pipeline="content_generate"):
+            with self.assertRaises(RuntimeError):
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            started = time.perf_counter()
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u2")
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+        concurrency = gs.ai_runtime_stats()["concurrency"]
+        self.assertEqual(concurrency["limit"], 4)
+        self.assertEqual(concurrency["drops"], 1)
+        self.assertEqual(concurrency["in_flight"], 0)
+        self.assertIn("content_generate", concurrency["baseline_latency_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import unittest
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app import main
+from app.domain.ai.call_context import DeadlineExceededError, ai_call_context, current_ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, StructuredAIResponse
+from app.domain.ai.providers.common import is_outage_error, is_timeout_error, provider_request_error
+from app.domain.ai.providers.transport import PooledHTTPTransport
+from app.domain.ai.service import AIService
+from app.services.compat import pipeline_runtime
+from app.services.compat.pipeline_runtime import AttemptLatencies, PipelineFailure, run_ai_with_retry
+
+
+class _TrickleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.send_response(200)
+        self.send_header("Content-Length", "40")
+        self.end_headers()
+        try:
+            # 바이트마다 소켓 timeout보다 짧게 쉬므로 연산별 timeout으로는 끊기지 않는다.
+            for _ in range(40):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            return
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class _IdleProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        return StructuredAIResponse(data={}, meta=AIResponseMeta(provider="fake", model="m"))
+
+
+def _request(path: str, headers: list[tuple[bytes, bytes]]) -> Request:
+    return Request({"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": headers})
+
+
+class TransportDeadlineTests(unittest.TestCase):
+    def test_timeout_caps_total_read_time_of_trickling_body(self) -> None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _TrickleHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        transport = PooledHTTPTransport()
+        self.addCleanup(transport.close)
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            transport.request("POST", f"http://127.0.0.1:{server.server_address[1]}/", body=b"{}", timeout=0.3)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_budget_cut_timeout_is_not_an_outage(self) -> None:
+        with ai_call_context(deadline=time.monotonic() - 1):
+            error = provider_request_error("openai", TimeoutError("read operation timed out"))
+        plain = provider_request_error("openai", TimeoutError("read operation timed out"))
+
+        self.assertIsInstance(error, DeadlineExceededError)
+        self.assertFalse(is_outage_error(error) or is_timeout_error(error))
+        self.assertEqual(str(plain), "openai_request_failed:read operation timed out")
+
+
+class PipelineDeadlineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        original = pipeline_runtime._attempt_latencies
+        self.addCleanup(setattr, pipeline_runtime, "_attempt_latencies", original)
+        self.latencies = AttemptLatencies(min_samples=3)
+        pipeline_runtime._attempt_latencies = self.latencies
+
+    def _run(self, deadline_sec: float) -> tuple[list[int], PipelineFailure | None]:
+        calls: list[int] = []
+
+        def call(attempt: int) -> dict:
+            calls.append(attempt)
+            raise RuntimeError("read operation timed out")
+
+        failure = None
+        with ai_call_context(deadline=time.monotonic() + deadline_sec):
+            try:
+                run_ai_with_retry(call, pipeline="content_generate", max_attempts=2)
+            except PipelineFailure as exc:
+                failure = exc
+        return calls, failure
+
+    def test_retry_is_skipped_when_budget_is_below_p50(self) -> None:
+        for _ in range(3):
+            self.latencies.observe("content_generate", 2.0)
+
+        calls, failure = self._run(0.5)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual((failure.kind, failure.attempt_count), ("timeout", 1))
+        self.assertEqual(self.latencies.stats()["content_generate"]["retries_skipped"], 1)
+
+    def test_retry_runs_while_budget_covers_p50(self) -> None:
+        for _ in range(3):
+            self.latencies.observe("content_generate", 0.01)
+
+        calls, failure = self._run(5.0)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(failure.attempt_count, 2)
+
+    def test_expired_deadline_fails_before_calling(self) -> None:
+        calls, failure = self._run(-0.1)
+
+        self.assertEqual(calls, [])
+        self.assertEqual((failure.kind, failure.status_code), ("timeout", 504))
+        self.assertEqual(failure.reason, "ai_deadline_exceeded")
+
+
+class ServiceDeadlineTests(unittest.TestCase):
+    def test_queue_wait_stops_at_request_deadline(self) -> None:
+        provider = _IdleProvider()
+        service = AIService(primary=provider, max_concurrency=1, queue_deadlines_ms={"generation": 10_000})
+        self.assertTrue(service._semaphore.acquire(timeout=0.01))
+        self.addCleanup(service._semaphore.release)
+
+        started = time.monotonic()
+        with ai_call_context(pipeline="content_generate", deadline=time.monotonic() + 0.05):
+            with self.assertRaises(DeadlineExceededError):
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(provider.calls, 0)
+
+
+class DeadlineMiddlewareTests(unittest.TestCase):
+    def _deadline_for(self, request: Request) -> float:
+        seen = []
+
+        async def call_next(_request: Request) -> Response:
+            seen.append(current_ai_call_context().deadline - time.monotonic())
+            return Response()
+
+        asyncio.run(main.bind_ai_request_context(request, call_next))
+        return seen[0]
+
+    def test_header_budget_and_route_default_take_the_earlier(self) -> None:
+        header = self._deadline_for(_request("/api/generate", [(b"x-request-deadline", b"1500")]))
+        route = self._deadline_for(_request("/api/chat", [(b"x-request-deadline", b"600000")]))
+        epoch_ms = str(int(time.time() * 1000) + 4000).encode()
+        absolute = self._deadline_for(_request("/api/generate", [(b"x-request-deadline", epoch_ms)]))
+
+        self.assertAlmostEqual(header, 1.5, delta=0.2)
+        self.assertAlmostEqual(route, main.settings.ai_route_deadlines_ms["/api/chat"] / 1000, delta=0.2)
+        self.assertAlmostEqual(absolute, 4.0, delta=0.3)
+        self.assertIsNone(current_ai_call_context().deadline)
+
+    def test_lesson_route_gets_room_for_both_stages(self) -> None:
+        lesson = self._deadline_for(_request("/api/curriculum/lesson", [(b"x-request-deadline", b"125000")]))
+
+        self.assertAlmostEqual(lesson, main.settings.ai_route_deadlines_ms["/api/curriculum/lesson"] / 1000, delta=0.2)
+        self.assertGreater(lesson, main.settings.ai_request_deadline_ms / 1000)
+
+    def test_non_finite_header_is_ignored(self) -> None:
+        default_sec = main.settings.ai_request_deadline_ms / 1000
+        for raw in (b"nan", b"inf", b"-inf"):
+            self.assertAlmostEqual(
+                self._deadline_for(_request("/api/generate", [(b"x-request-deadline", raw)])),
+                default_sec,
+                delta=0.2,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.hedging import HedgePolicy
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk, AIUsageMeta, StructuredAIResponse
+from app.domain.ai.service import AIService, AsyncAIService
+
+
+def _meta(label: str) -> AIResponseMeta:
+    return AIResponseMeta(
+        provider="fake",
+        model=label,
+        usage=AIUsageMeta(input_tokens=100, output_tokens=20, total_tokens=120),
+    )
+
+
+def _primed_policy(pipeline: str, latency_sec: float = 0.02) -> HedgePolicy:
+    policy = HedgePolicy(percentile=0.9, min_samples=5, min_delay_ms=0)
+    for _ in range(5):
+        policy.observe_latency(pipeline, latency_sec)
+    return policy
+
+
+class _SlowFirstAsyncProvider:
+    """First call stalls; later calls answer quickly."""
+
+    def __init__(self, slow_sec: float = 1.0) -> None:
+        self.slow_sec = slow_sec
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        label = "slow" if self.calls == 1 else "fast"
+        try:
+            await asyncio.sleep(self.slow_sec if label == "slow" else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return StructuredAIResponse(data={"from": label}, meta=_meta(label))
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        self.calls += 1
+        label = "slow" if self.calls == 1 else "fast"
+        await asyncio.sleep(self.slow_sec if label == "slow" else 0.01)
+        yield AIStreamChunk(text=f'{{"from": "{label}"}}')
+        yield AIStreamChunk(meta=_meta(label))
+
+
+class _SlowFirstSyncProvider:
+    def __init__(self, slow_sec: float = 0.6) -> None:
+        self.slow_sec = slow_sec
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        with self._lock:
+            self.calls += 1
+            label = "slow" if self.calls == 1 else "fast"
+        time.sleep(self.slow_sec if label == "slow" else 0.01)
+        return StructuredAIResponse(data={"from": label}, meta=_meta(label))
+
+
+class HedgePolicyTests(unittest.TestCase):
+    def test_no_hedge_until_enough_samples(self) -> None:
+        policy = HedgePolicy(percentile=0.9, min_samples=3, min_delay_ms=0)
+        policy.observe_latency("chat_generate", 0.1)
+        policy.observe_latency("chat_generate", 0.2)
+        self.assertIsNone(policy.hedge_delay("chat_generate"))
+
+        policy.observe_latency("chat_generate", 0.9)
+        self.assertAlmostEqual(policy.hedge_delay("chat_generate"), 0.9)
+        self.assertIsNone(policy.hedge_delay("curriculum_sections"))
+
+    def test_rates_follow_recorded_calls(self) -> None:
+        policy = HedgePolicy()
+        policy.record_call("p", hedged=False)
+        policy.record_call("p", hedged=True, hedge_won=True, extra_tokens=40)
+        hedge_rate, win_rate = policy.record_call("p", hedged=True, hedge_won=False, extra_tokens=10)
+
+        self.assertAlmostEqual(hedge_rate, 0.6667)
+        self.assertEqual(win_rate, 0.5)
+        self.assertEqual(policy.stats()["p"]["extra_tokens"], 50)
+
+
+class AsyncHedgingTests(unittest.TestCase):
+    def test_late_call_is_hedged_and_loser_cancelled(self) -> None:
+        provider = _SlowFirstAsyncProvider()
+        service = AsyncAIService(
+            primary=provider,
+            max_concurrency=2,
+            hedge_policy=_primed_policy("curriculum_sections"),
+        )
+
+        async def run() -> tuple[StructuredAIResponse, float]:
+            started = time.perf_counter()
+            with ai_call_context(pipeline="curriculum_sections"):
+                response = await service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            await asyncio.sleep(0)
+            return response, time.perf_counter() - started
+
+        response, elapsed = asyncio.run(run())
+
+        self.assertEqual(response.data, {"from": "fast"})
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(provider.cancelled, 1)
+        self.assertTrue(response.meta.hedge.hedged)
+        self.assertEqual(response.meta.hedge.winner, "hedge")
+        self.assertEqual(response.meta.hedge.extra_tokens, 100)
+        self.assertEqual(response.meta.hedge.win_rate, 1.0)
+        self.assertEqual(service._semaphore.available, 2)
+
+    def test_hedge_is_skipped_when_no_slot_is_free(self) -> None:
+        provider = _SlowFirstAsyncProvider(slow_sec=0.1)
+        service = AsyncAIService(
+            primary=provider,
+            max_concurrency=1,
+            hedge_policy=_primed_policy("chat_generate"),
+        )
+
+        async def run() -> StructuredAIResponse:
+            with ai_call_context(pipeline="chat_generate"):
+                return await service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        response = asyncio.run(run())
+
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(response.data, {"from": "slow"})
+        self.assertFalse(response.meta.hedge.hedged)
+
+    def test_stream_is_hedged_on_late_first_chunk(self) -> None:
+        provider = _SlowFirstAsyncProvider()
+        service = AsyncAIService(
+            primary=provider,
+            max_concurrency=2,
+            hedge_policy=_primed_policy("content_generate:first_chunk"),
+        )
+
+        async def run() -> list[AIStreamChunk]:
+            with ai_call_context(pipeline="content_generate"):
+                return [chunk async for chunk in service.stream_json_text(system_prompt="s", user_prompt="u")]
+
+        chunks = asyncio.run(run())
+
+        self.assertEqual(chunks[0].text, '{"from": "fast"}')
+        self.assertEqual(chunks[-1].meta.hedge.winner, "hedge")
+        self.assertEqual(service._semaphore.available, 2)
+
+
+class SyncHedgingTests(unittest.TestCase):
+    def test_thread_hedge_returns_first_result_and_keeps_slot_until_loser_finishes(self) -> None:
+        provider = _SlowFirstSyncProvider()
+        service = AIService(
+            primary=provider,
+            max_concurrency=2,
+            acquire_timeout_ms=10,
+            hedge_policy=_primed_policy("content_generate"),
+        )
+
+        started = time.perf_counter()
+        with ai_call_context(pipeline="content_generate"):
+            response = service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.data, {"from": "fast"})
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(response.meta.hedge.winner, "hedge")
+        # 진 쪽 스레드가 아직 슬롯을 잡고 있으므로 동시 호출 한도는 그대로 지켜진다.
+        self.assertTrue(service._semaphore.acquire(timeout=0.01))
+        self.assertFalse(service._semaphore.acquire(timeout=0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
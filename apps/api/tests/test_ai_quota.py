@@ -0,0 +1,136 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+from app import main
+from app.domain.ai.call_context import ai_call_context, current_ai_call_context
+from app.domain.ai.providers.base import AIUsageMeta
+from app.domain.ai.quota import BucketSpec, QuotaExceededError, TokenQuota
+from app.domain.ai.service import AIService
+from app.services.compat import generation_service as gs
+
+try:
+    from tests.ai_fakes import FakeClock, ScriptedProvider
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock, ScriptedProvider
+
+
+def _quota(clock: FakeClock, **kwargs) -> TokenQuota:
+    return TokenQuota(user=BucketSpec(capacity=1000, refill_per_sec=100), clock=clock, **kwargs)
+
+
+class TokenQuotaTests(unittest.TestCase):
+    def test_rejects_with_exact_wait_until_bucket_refills(self) -> None:
+        clock = FakeClock()
+        quota = _quota(clock)
+        quota.reserve(user_id="u1", tenant_id=None, tokens=800)
+
+        with self.assertRaises(QuotaExceededError) as ctx:
+            quota.reserve(user_id="u1", tenant_id=None, tokens=450)
+
+        self.assertEqual(ctx.exception.scope, "user")
+        self.assertEqual(ctx.exception.retry_after_ms, 2500)
+        self.assertEqual(ctx.exception.retry_after_sec, 3)
+        self.assertIsNotNone(quota.reserve(user_id="u2", tenant_id=None, tokens=450))
+        clock.now += 2.5
+        self.assertIsNotNone(quota.reserve(user_id="u1", tenant_id=None, tokens=450))
+        self.assertIsNone(quota.reserve(user_id=None, tenant_id=None, tokens=10_000))
+
+    def test_settle_reconciles_estimate_with_reported_usage(self) -> None:
+        clock = FakeClock()
+        quota = _quota(clock)
+
+        low = quota.reserve(user_id="u1", tenant_id=None, tokens=600)
+        quota.settle(low, AIUsageMeta(input_tokens=150, output_tokens=50))
+        failed = quota.reserve(user_id="u1", tenant_id=None, tokens=700)
+        quota.settle(failed, None, failed=True)
+
+        self.assertIsNotNone(quota.reserve(user_id="u1", tenant_id=None, tokens=800))
+        stats = quota.stats()
+        self.assertEqual((stats["settled"], stats["refunded"], stats["actual_tokens"]), (1, 1, 200))
+
+    def test_tenant_bucket_limits_all_learners_of_the_tenant(self) -> None:
+        clock = FakeClock()
+        quota = TokenQuota(
+            user=BucketSpec(capacity=1000, refill_per_sec=100),
+            tenant=BucketSpec(capacity=1500, refill_per_sec=10),
+            clock=clock,
+        )
+        quota.reserve(user_id="u1", tenant_id="school", tokens=900)
+
+        with self.assertRaises(QuotaExceededError) as ctx:
+            quota.reserve(user_id="u2", tenant_id="school", tokens=900)
+
+        self.assertEqual(ctx.exception.scope, "tenant")
+        self.assertEqual(ctx.exception.retry_after_ms, 30_000)
+        # 거절된 호출은 학습자 버킷도 차감하지 않는다.
+        self.assertIsNotNone(quota.reserve(user_id="u2", tenant_id=None, tokens=1000))
+
+    def test_shared_backend_is_seen_by_every_worker(self) -> None:
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "quota", "buckets.sqlite3")
+            first = _quota(clock, path=path)
+            second = _quota(clock, path=path)
+            self.addCleanup(first.close)
+            self.addCleanup(second.close)
+
+            first.reserve(user_id="u1", tenant_id=None, tokens=900)
+            with self.assertRaises(QuotaExceededError):
+                second.reserve(user_id="u1", tenant_id=None, tokens=900)
+            self.assertEqual(second.stats()["backend"], "shared")
+
+
+class QuotaServiceTests(unittest.TestCase):
+    def test_service_charges_caller_and_pipeline_returns_retry_time(self) -> None:
+        clock = FakeClock()
+        quota = TokenQuota(user=BucketSpec(capacity=3000, refill_per_sec=50), clock=clock)
+        provider = ScriptedProvider(usages=[AIUsageMeta(total_tokens=2950)])
+        service = AIService(primary=provider, quota=quota, quota_output_tokens=100, single_flight=False)
+        original = gs._get_ai_service
+        self.addCleanup(setattr, gs, "_get_ai_service", original)
+        gs._get_ai_service = lambda: service
+
+        with ai_call_context(user_id="heavy"):
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            with self.assertRaises(HTTPException) as ctx:
+                gs.compat_generate(gs.GenerateRequest(language="python", topic="반복문", questionCount=20))
+        with ai_call_context(user_id="light"):
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.detail["error_code"], "rate_limited")
+        self.assertGreaterEqual(ctx.exception.detail["retry_after_sec"], 1)
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(quota.stats()["rejected"], 1)
+
+
+class CallerBindingTests(unittest.TestCase):
+    def test_middleware_puts_caller_headers_into_ai_context(self) -> None:
+        request = Request(
+            {
+                "type": "http",
+                "method": "POST",
+                "path": "/api/generate",
+                "headers": [(b"x-user-id", b"learner-1"), (b"x-tenant-id", b"school-7")],
+            }
+        )
+        seen = []
+
+        async def call_next(_request: Request) -> Response:
+            context = current_ai_call_context()
+            seen.append((context.user_id, context.tenant_id))
+            return Response()
+
+        asyncio.run(main.bind_ai_request_context(request, call_next))
+
+        self.assertEqual(seen, [("learner-1", "school-7")])
+        self.assertIsNone(current_ai_call_context().user_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from app.domain.ai.call_context import ai_call_context, ai_quality_gate
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport
+from app.domain.ai.providers.base import AIUsageMeta
+from app.domain.ai.providers.fake_llm import FakeLLMConfig, FakeLLMServer
+from app.domain.ai.providers.openai import AsyncOpenAIProvider
+from app.domain.ai.response_cache import ResponseCache
+from app.domain.ai.service import AIService, AsyncAIService
+from app.services.compat import generation_service as gs
+
+try:
+    from tests.ai_fakes import FakeClock, ScriptedProvider
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock, ScriptedProvider
+
+
+def _counting_provider() -> ScriptedProvider:
+    return ScriptedProvider(data={"answer": "ok"}, usages=[AIUsageMeta(input_tokens=30, output_tokens=20)])
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_lru_eviction_keeps_memory_within_byte_budget(self) -> None:
+        cache = ResponseCache(max_bytes=3 * (100 + 128), ttls={"p": 60})
+
+        for key in ("a", "b", "c"):
+            cache.put(key, "p", b"x" * 100)
+        cache.get("a", "p")
+        cache.put("d", "p", b"x" * 100)
+
+        self.assertIsNone(cache.get("b", "p"))
+        self.assertEqual(cache.get("a", "p"), b"x" * 100)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_ttl_is_per_pipeline_and_zero_disables_caching(self) -> None:
+        clock = FakeClock()
+        cache = ResponseCache(ttls={"short": 10, "long": 100}, clock=clock)
+
+        cache.put("s", "short", b"1")
+        cache.put("l", "long", b"2")
+        cache.put("n", "chat", b"3")
+        clock.now += 11
+
+        self.assertIsNone(cache.get("s", "short"))
+        self.assertEqual(cache.get("l", "long"), b"2")
+        self.assertIsNone(cache.get("n", "chat"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_disk_tier_survives_a_new_instance_and_honours_ttl(self) -> None:
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache", "responses.sqlite3")
+            first = ResponseCache(ttls={"p": 60}, path=path, clock=clock)
+            first.put("k", "p", b"payload")
+            first.put("old", "p", b"stale")
+            first.close()
+
+            second = ResponseCache(ttls={"p": 60}, path=path, clock=clock)
+            self.addCleanup(second.close)
+            self.assertEqual(second.get("k", "p"), b"payload")
+            self.assertEqual(second.stats()["disk_hits"], 1)
+            clock.now += 61
+            self.assertIsNone(second.get("old", "p"))
+            self.assertEqual(second.stats()["disk"]["entries"], 1)
+
+
+class ResponseCacheServiceTests(unittest.TestCase):
+    def _service(self, provider: ScriptedProvider, **kwargs) -> AIService:
+        return AIService(primary=provider, response_cache=ResponseCache(ttls={"content_generate": 60}), **kwargs)
+
+    def test_hit_after_quality_gate_has_zero_usage(self) -> None:
+        provider = _counting_provider()
+        service = self._service(provider)
+
+        with ai_call_context(pipeline="content_generate"):
+            with ai_quality_gate():
+                first = service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            second = service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            other = service.generate_json_with_meta(system_prompt="s", user_prompt="v")
+
+        self.assertEqual(provider.calls, 2)
+        self.assertFalse(first.meta.cache_hit)
+        self.assertTrue(second.meta.cache_hit)
+        self.assertEqual(second.data, {"answer": "ok"})
+        self.assertEqual((second.meta.usage.input_tokens, second.meta.usage.output_tokens), (0, 0))
+        self.assertFalse(other.meta.cache_hit)
+
+    def test_failed_gate_or_missing_gate_does_not_store(self) -> None:
+        provider = _counting_provider()
+        service = self._service(provider)
+
+        with ai_call_context(pipeline="content_generate"):
+            with self.assertRaises(ValueError):
+                with ai_quality_gate():
+                    service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+                    raise ValueError("quality_validation_failed:quiz_count_mismatch")
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(provider.calls, 3)
+
+    def test_prompt_version_is_part_of_the_key(self) -> None:
+        provider = _counting_provider()
+        cache = ResponseCache(ttls={"content_generate": 60})
+
+        with ai_call_context(pipeline="content_generate"):
+            for version in ("v1", "v2"):
+                service = AIService(primary=provider, response_cache=cache, prompt_version=version)
+                with ai_quality_gate():
+                    service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(provider.calls, 2)
+
+
+class ResponseCachePipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        original = gs._get_async_ai_service
+        self.addCleanup(setattr, gs, "_get_async_ai_service", original)
+        self.server = FakeLLMServer(FakeLLMConfig(latency_p50_ms=0, latency_p95_ms=0)).start()
+        self.addCleanup(self.server.close)
+
+    def test_streamed_generation_is_served_from_cache_on_repeat(self) -> None:
+        payload = gs.GenerateRequest(language="python", topic="파이썬 반복문")
+        cache = ResponseCache(ttls={"content_generate": 60})
+
+        async def run() -> list[dict]:
+            transport = AsyncPooledHTTPTransport()
+            try:
+                service = AsyncAIService(
+                    primary=AsyncOpenAIProvider(
+                        api_key="fake",
+                        model="fake-openai",
+                        base_url=f"{self.server.base_url}/v1",
+                        transport=transport,
+                    ),
+                    response_cache=cache,
+                )
+                gs._get_async_ai_service = lambda: service
+                return [await gs.compat_generate_async(payload) for _ in range(2)]
+            finally:
+                transport.close()
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual(self.server.stats()["requests"], 1)
+        self.assertNotIn("cache_hit", first["meta"])
+        self.assertTrue(second["meta"]["cache_hit"])
+        self.assertEqual(second["meta"]["usage"]["input_tokens"], 0)
+        self.assertEqual(second["quiz"], first["quiz"])
+        self.assertEqual(cache.stats()["pipelines"]["content_generate"]["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
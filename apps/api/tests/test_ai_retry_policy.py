@@ -0,0 +1,249 @@
+import asyncio
+import time
+import unittest
+
+from app.domain.ai.call_context import current_ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, StructuredAIResponse
+from app.domain.ai.providers.common import ProviderHTTPError, provider_retry_delay
+from app.domain.ai.providers.transport import TransportHTTPError
+from app.services.compat import pipeline_runtime
+from app.services.compat.pipeline_runtime import (
+    FirstAttemptPassRates,
+    PipelineFailure,
+    RetryBudget,
+    RetryPolicy,
+    run_ai_with_retry,
+    run_ai_with_retry_async,
+    serialize_ai_response_meta,
+)
+
+try:
+    from tests.ai_fakes import FakeClock
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock
+
+
+def _rate_limited(headers: dict[str, str], body: bytes = b"") -> RuntimeError:
+    provider_error = ProviderHTTPError(
+        "openai",
+        TransportHTTPError(status=429, reason="Too Many Requests", headers=headers, body=body),
+    )
+    # 서비스 계층처럼 한 번 감싸도 원인 쪽의 상태/헤더를 찾아야 한다.
+    wrapped = RuntimeError(f"ai_primary_failed:{provider_error}")
+    wrapped.__cause__ = provider_error
+    return wrapped
+
+
+class ProviderRetryDelayTests(unittest.TestCase):
+    def test_reads_provider_wait_hints_in_order(self) -> None:
+        self.assertEqual(provider_retry_delay({"retry-after-ms": "250", "retry-after": "3"}), 0.25)
+        self.assertEqual(provider_retry_delay({"retry-after": "3"}), 3.0)
+        gemini_body = b'{"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "1.5s"}]}}'
+        self.assertEqual(provider_retry_delay({}, gemini_body), 1.5)
+        reset = {"x-ratelimit-reset-requests": "6m0s", "x-ratelimit-reset-tokens": "250ms"}
+        self.assertEqual(provider_retry_delay(reset), 0.25)
+        self.assertEqual(provider_retry_delay({**reset, "x-ratelimit-remaining-requests": "0"}), 360.0)
+        self.assertIsNone(provider_retry_delay({}))
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_decorrelated_backoff_grows_from_previous_wait_up_to_cap(self) -> None:
+        policy = RetryPolicy(base_delay_ms=100, max_delay_ms=1000)
+        upper = lambda low, high: high  # noqa: E731 - 상한 쪽 난수로 고정
+
+        delays = [policy.backoff_sec(None, upper)]
+        for _ in range(3):
+            delays.append(policy.backoff_sec(delays[-1], upper))
+
+        self.assertEqual([round(delay, 3) for delay in delays], [0.3, 0.9, 1.0, 1.0])
+        self.assertEqual(policy.backoff_sec(None, lambda low, high: low), 0.1)
+        self.assertEqual(policy.with_overrides({"max_attempts": 1, "unknown": 5}).attempts(3), 1)
+
+    def test_budget_keeps_retries_under_ratio_of_runs(self) -> None:
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_per_sec=0.0, capacity=1.0, clock=clock)
+
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.deposit()
+        budget.deposit()
+
+        self.assertTrue(budget.try_spend())
+        self.assertEqual(budget.stats()["retries"], 2)
+        self.assertEqual(budget.stats()["denied"], 1)
+
+
+class PipelineRetryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        original = pipeline_runtime._retry_budget
+        self.addCleanup(setattr, pipeline_runtime, "_retry_budget", original)
+        pipeline_runtime._retry_budget = RetryBudget()
+        self.policy = RetryPolicy(base_delay_ms=0, max_delay_ms=0, max_retry_after_ms=1000)
+
+    def _flaky(self, error: Exception) -> tuple:
+        calls: list[float] = []
+
+        def call(attempt: int) -> dict:
+            calls.append(time.monotonic())
+            if attempt == 1:
+                raise error
+            return {"ok": True}
+
+        return calls, call
+
+    def test_provider_retry_after_delays_the_retry(self) -> None:
+        calls, call = self._flaky(_rate_limited({"retry-after-ms": "80"}))
+
+        result, attempt = run_ai_with_retry(call, pipeline="content_generate", retry_policy=self.policy)
+
+        self.assertEqual((result, attempt), ({"ok": True}, 2))
+        self.assertGreaterEqual(calls[1] - calls[0], 0.08)
+
+    def test_long_provider_wait_goes_to_client_instead_of_retrying(self) -> None:
+        calls, call = self._flaky(_rate_limited({"retry-after": "30"}))
+
+        with self.assertRaises(PipelineFailure) as ctx:
+            run_ai_with_retry(call, pipeline="content_generate", retry_policy=self.policy)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((ctx.exception.kind, ctx.exception.status_code), ("rate_limited", 429))
+        self.assertEqual(ctx.exception.retry_after_sec, 30)
+
+    def test_empty_retry_budget_fails_without_retrying(self) -> None:
+        pipeline_runtime._retry_budget = RetryBudget(ratio=0.0, min_per_sec=0.0, capacity=1.0)
+        pipeline_runtime._retry_budget.try_spend()
+        calls, call = self._flaky(RuntimeError("read operation timed out"))
+
+        with self.assertRaises(PipelineFailure) as ctx:
+            run_ai_with_retry(call, pipeline="content_generate", retry_policy=self.policy)
+
+        self.assertEqual((len(calls), ctx.exception.kind), (1, "timeout"))
+        self.assertEqual(pipeline_runtime.retry_budget_stats()["denied"], 1)
+
+
+class SpeculativeRetryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        for name in ("_retry_budget", "_first_attempt_pass_rates"):
+            self.addCleanup(setattr, pipeline_runtime, name, getattr(pipeline_runtime, name))
+        pipeline_runtime._retry_budget = RetryBudget()
+        pipeline_runtime._first_attempt_pass_rates = FirstAttemptPassRates(min_samples=2)
+
+    def test_candidate_count_follows_first_attempt_pass_rate(self) -> None:
+        rates = FirstAttemptPassRates(min_samples=4)
+        self.assertEqual(rates.candidates("p", max_candidates=3, target=0.9), 2)
+        self.assertEqual(rates.candidates("p", max_candidates=1, target=0.9), 1)
+        for passed in (True, True, True, True):
+            rates.record("p", passed)
+        self.assertEqual(rates.candidates("p", max_candidates=3, target=0.9), 1)
+        for passed in (False, False, False, False):
+            rates.record("p", passed)
+        # 통과율 0.5면 90%에 4개가 필요하지만 상한에서 멈춘다.
+        self.assertEqual(rates.candidates("p", max_candidates=3, target=0.9), 3)
+        self.assertEqual(rates.candidates("p", max_candidates=5, target=0.9), 4)
+
+    def test_first_passing_candidate_wins_and_the_rest_are_cancelled(self) -> None:
+        pipeline_runtime._first_attempt_pass_rates.record("curriculum_sections", False)
+        pipeline_runtime._first_attempt_pass_rates.record("curriculum_sections", False)
+        policy = RetryPolicy(speculative_candidates=3)
+        temperatures: dict[int, float | None] = {}
+        cancelled: list[int] = []
+
+        async def call(attempt: int) -> dict:
+            temperatures[attempt] = current_ai_call_context().temperature
+            if attempt == 1:
+                raise ValueError("quality_validation_failed:sections_too_few")
+            try:
+                await asyncio.sleep(0.01 if attempt == 2 else 5)
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+            return {"candidate": attempt}
+
+        started = time.monotonic()
+        result, attempt = asyncio.run(
+            run_ai_with_retry_async(call, pipeline="curriculum_sections", retry_policy=policy, speculative=True)
+        )
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        # 경주에서 이긴 응답은 첫 시도로 센다.
+        self.assertEqual((result, attempt), ({"candidate": 2}, 1))
+        self.assertEqual(temperatures, {1: None, 2: 0.5, 3: 0.7})
+        self.assertEqual(cancelled, [3])
+        stats = pipeline_runtime.speculation_stats()["curriculum_sections"]
+        self.assertEqual((stats["first_attempts"], stats["races"], stats["candidates"]), (3, 1, 3))
+        self.assertEqual(stats["wins"], {"2": 1})
+        self.assertEqual(pipeline_runtime.retry_budget_stats()["retries"], 2)
+        self.assertEqual(pipeline_runtime.attempt_latency_stats()["curriculum_sections"]["failures"]["quality_failed"], 1)
+
+    def test_cancelled_first_candidate_is_censored_not_sampled(self) -> None:
+        cancelled: list[int] = []
+
+        async def call(attempt: int) -> dict:
+            try:
+                await asyncio.sleep(0.05 if attempt == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+            return {"candidate": attempt}
+
+        result, attempt = asyncio.run(
+            run_ai_with_retry_async(
+                call,
+                pipeline="curriculum_sections",
+                retry_policy=RetryPolicy(speculative_candidates=2),
+                speculative=True,
+            )
+        )
+
+        self.assertEqual(result, {"candidate": 2})
+        # 2번이 이기면 1번도 취소돼 더 쓰지 않는다. 결과를 모르므로 통과율 표본에는 넣지 않는다.
+        self.assertEqual(cancelled, [1])
+        stats = pipeline_runtime.speculation_stats()["curriculum_sections"]
+        self.assertEqual((stats["first_attempts"], stats["censored"], stats["wins"]), (0, 1, {"2": 1}))
+
+    def test_race_winner_and_candidate_count_go_to_meta(self) -> None:
+        async def call(attempt: int) -> StructuredAIResponse:
+            await asyncio.sleep(0.05 if attempt == 1 else 0.01)
+            return StructuredAIResponse(data={"candidate": attempt}, meta=AIResponseMeta(provider="fake", model="m"))
+
+        result, attempt = asyncio.run(
+            run_ai_with_retry_async(
+                call,
+                pipeline="content_generate",
+                retry_policy=RetryPolicy(speculative_candidates=2),
+                speculative=True,
+            )
+        )
+
+        self.assertEqual(attempt, 1)
+        self.assertEqual(
+            serialize_ai_response_meta(result.meta, attempt_count=attempt),
+            {"provider": "fake", "model": "m", "speculation": {"candidates": 2, "winner": 2}, "attempt_count": 1},
+        )
+
+    def test_failed_race_counts_as_first_attempt_before_regular_retry(self) -> None:
+        calls: list[int] = []
+
+        async def call(attempt: int) -> dict:
+            calls.append(attempt)
+            if len(calls) <= 2:
+                raise ValueError("quality_validation_failed")
+            return {"candidate": attempt}
+
+        result, attempt = asyncio.run(
+            run_ai_with_retry_async(
+                call,
+                pipeline="content_generate",
+                retry_policy=RetryPolicy(speculative_candidates=2),
+                retryable_kinds={"quality_failed"},
+                speculative=True,
+            )
+        )
+
+        self.assertEqual(sorted(calls), [1, 2, 2])
+        self.assertEqual((result, attempt), ({"candidate": 2}, 2))
+        self.assertEqual(pipeline_runtime.speculation_stats()["content_generate"]["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
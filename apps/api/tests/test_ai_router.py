@@ -0,0 +1,181 @@
+import asyncio
+import time
+import unittest
+
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk, StructuredAIResponse
+from app.domain.ai.router import AsyncProviderRouter, ProviderRouter
+from app.domain.ai.service import AIService, AsyncAIService
+from app.services.compat.pipeline_runtime import serialize_ai_response_meta
+
+
+class _SyncProvider:
+    def __init__(self, name: str, *, latency_sec: float = 0.0, error: str | None = None) -> None:
+        self.name = name
+        self.latency_sec = latency_sec
+        self.error = error
+        self.calls = 0
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        time.sleep(self.latency_sec)
+        if self.error:
+            raise RuntimeError(self.error)
+        return StructuredAIResponse(data={"from": self.name}, meta=AIResponseMeta(provider="fake", model=self.name))
+
+
+class _AsyncProvider:
+    def __init__(self, name: str, *, latency_sec: float = 0.0, error: str | None = None) -> None:
+        self.name = name
+        self.latency_sec = latency_sec
+        self.error = error
+        self.calls = 0
+
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency_sec)
+        if self.error:
+            raise RuntimeError(self.error)
+        return StructuredAIResponse(data={"from": self.name}, meta=AIResponseMeta(provider="fake", model=self.name))
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        self.calls += 1
+        await asyncio.sleep(self.latency_sec)
+        if self.error:
+            raise RuntimeError(self.error)
+        yield AIStreamChunk(text=f'{{"from": "{self.name}"}}')
+        yield AIStreamChunk(meta=AIResponseMeta(provider="fake", model=self.name))
+
+
+class ProviderRouterTests(unittest.TestCase):
+    def test_fails_over_on_provider_error_and_records_route(self) -> None:
+        broken = _SyncProvider("gemini", error="gemini_request_failed:HTTP 503: unavailable")
+        healthy = _SyncProvider("openai")
+        router = ProviderRouter({"gemini": broken, "openai": healthy})
+
+        response = router.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(response.data, {"from": "openai"})
+        self.assertEqual(response.meta.route.target, "openai")
+        self.assertEqual(response.meta.route.failovers, ("gemini",))
+        self.assertEqual(
+            serialize_ai_response_meta(response.meta)["route"],
+            {"target": "openai", "failovers": ["gemini"], "spillover": False},
+        )
+        # 실패한 대상은 오류율이 올라가 다음 호출부터 뒤로 밀린다.
+        self.assertEqual(router.health.order(), ["openai", "gemini"])
+        router.generate_json_with_meta(system_prompt="s", user_prompt="u")
+        self.assertEqual(broken.calls, 1)
+
+    def test_schema_errors_are_not_failed_over(self) -> None:
+        router = ProviderRouter({
+            "gemini": _SyncProvider("gemini", error="gemini_request_failed:JSONDecodeError: Expecting value"),
+            "openai": _SyncProvider("openai"),
+        })
+
+        with self.assertRaises(RuntimeError) as ctx:
+            router.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertIn("JSONDecodeError", str(ctx.exception))
+        self.assertEqual(router.targets["openai"].calls, 0)
+
+    def test_prefers_target_with_lower_ewma_latency(self) -> None:
+        slow = _SyncProvider("slow", latency_sec=0.03)
+        fast = _SyncProvider("fast", latency_sec=0.0)
+        router = ProviderRouter({"slow": slow, "fast": fast})
+
+        for _ in range(4):
+            router.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(router.health.order()[0], "fast")
+        self.assertEqual(slow.calls, 1)
+        self.assertEqual(router.stats()["fast"]["calls"], 3)
+
+    def test_all_targets_failing_keeps_failure_kind_in_message(self) -> None:
+        router = ProviderRouter({
+            "a": _SyncProvider("a", error="boom"),
+            "b": _SyncProvider("b", error="openai_request_failed:timed out"),
+        })
+        with self.assertRaises(RuntimeError) as ctx:
+            router.generate_json_with_meta(system_prompt="s", user_prompt="u")
+        self.assertIn("ai_route_exhausted", str(ctx.exception))
+        self.assertIn("timed out", str(ctx.exception))
+
+
+class AsyncProviderRouterTests(unittest.TestCase):
+    def test_stream_fails_over_before_first_chunk(self) -> None:
+        router = AsyncProviderRouter({
+            "gemini": _AsyncProvider("gemini", error="gemini_request_failed:connection reset"),
+            "openai": _AsyncProvider("openai"),
+        })
+
+        async def run() -> list[AIStreamChunk]:
+            return [chunk async for chunk in router.stream_json_text(system_prompt="s", user_prompt="u")]
+
+        chunks = asyncio.run(run())
+
+        self.assertEqual(chunks[0].text, '{"from": "openai"}')
+        self.assertEqual(chunks[-1].meta.route.target, "openai")
+        self.assertEqual(chunks[-1].meta.route.failovers, ("gemini",))
+
+
+class SpilloverTests(unittest.TestCase):
+    def test_async_service_spills_to_secondary_model_when_saturated(self) -> None:
+        service = AsyncAIService(
+            primary=_AsyncProvider("primary", latency_sec=0.2),
+            max_concurrency=1,
+            acquire_timeout_ms=10,
+            spillover=_AsyncProvider("secondary"),
+            spillover_max_concurrency=1,
+        )
+
+        async def run() -> list[StructuredAIResponse | BaseException]:
+            return await asyncio.gather(
+                # 프롬프트가 같으면 single-flight로 합쳐지므로 서로 다른 요청으로 포화시킨다.
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u1"),
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u2"),
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u3"),
+                return_exceptions=True,
+            )
+
+        first, second, third = asyncio.run(run())
+
+        self.assertEqual(first.data, {"from": "primary"})
+        self.assertIsNone(first.meta.route)
+        self.assertEqual(second.data, {"from": "secondary"})
+        self.assertTrue(second.meta.route.spillover)
+        self.assertEqual(second.meta.model, "secondary")
+        self.assertIn("ai_backpressure_busy", str(third))
+        self.assertEqual(service.route_stats()["spillovers"], 1)
+
+    def test_async_stream_spills_over(self) -> None:
+        service = AsyncAIService(
+            primary=_AsyncProvider("primary", latency_sec=0.2),
+            max_concurrency=1,
+            acquire_timeout_ms=10,
+            spillover=_AsyncProvider("secondary"),
+        )
+
+        async def run() -> list[AIStreamChunk]:
+            holder = asyncio.create_task(service.generate_json_with_meta(system_prompt="s", user_prompt="u"))
+            await asyncio.sleep(0.01)
+            chunks = [chunk async for chunk in service.stream_json_text(system_prompt="s", user_prompt="u")]
+            await holder
+            return chunks
+
+        chunks = asyncio.run(run())
+
+        self.assertEqual(chunks[0].text, '{"from": "secondary"}')
+        self.assertTrue(chunks[-1].meta.route.spillover)
+
+    def test_sync_service_without_spillover_stays_busy(self) -> None:
+        service = AIService(primary=_SyncProvider("primary"), max_concurrency=1, acquire_timeout_ms=10)
+        self.assertTrue(service._semaphore.acquire(timeout=0.01))
+
+        with self.assertRaises(RuntimeError) as ctx:
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(str(ctx.exception), "ai_backpressure_busy")
+
+
+if __name__ == "__main__":
+    unittest.main()
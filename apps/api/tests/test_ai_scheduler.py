@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.concurrency import AIMDLimit, AsyncAdaptiveLimiter
+from app.domain.ai.providers.base import AIResponseMeta, StructuredAIResponse
+from app.domain.ai.scheduler import QueueShedError, ServiceTimeEstimator, WeightedFairQueue, priority_class_for
+from app.domain.ai.service import AIService, AsyncAIService
+from app.services.compat import generation_service as gs
+from app.services.compat.error_policy import build_error_headers, build_http_error_payload
+
+
+class _CountingProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        return StructuredAIResponse(data={}, meta=AIResponseMeta(provider="fake", model="m"))
+
+
+class _SlowAsyncProvider:
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        await asyncio.sleep(0.15)
+        return StructuredAIResponse(data={"prompt": user_prompt}, meta=AIResponseMeta(provider="fake", model="m"))
+
+
+class WeightedFairQueueTests(unittest.TestCase):
+    def test_shares_follow_weights_without_starving_batch(self) -> None:
+        queue: WeightedFairQueue[str] = WeightedFairQueue()
+        for name in ("batch", "generation", "sections", "chat"):
+            for idx in range(20):
+                queue.push(name, f"{name}-{idx}")
+
+        served = [queue.pop().split("-")[0] for _ in range(15)]
+
+        self.assertEqual(served[0], "chat")
+        self.assertEqual(
+            {name: served.count(name) for name in ("chat", "sections", "generation", "batch")},
+            {"chat": 8, "sections": 4, "generation": 2, "batch": 1},
+        )
+
+    def test_idle_class_does_not_bank_credit(self) -> None:
+        queue: WeightedFairQueue[str] = WeightedFairQueue()
+        for idx in range(10):
+            queue.push("generation", f"generation-{idx}")
+        for _ in range(6):
+            queue.pop()
+        for idx in range(10):
+            queue.push("batch", f"batch-{idx}")
+
+        served = [queue.pop().split("-")[0] for _ in range(3)]
+
+        # 대기열이 비어 있던 동안의 몫을 몰아서 받지 않는다.
+        self.assertEqual(served.count("batch"), 1)
+
+    def test_pipeline_mapping_and_override(self) -> None:
+        self.assertEqual(priority_class_for("chat_generate"), "chat")
+        self.assertEqual(priority_class_for("curriculum_sections:first_chunk"), "sections")
+        self.assertEqual(priority_class_for("content_generate"), "generation")
+        self.assertEqual(priority_class_for("content_generate", "batch"), "batch")
+        self.assertEqual(priority_class_for("default", "unknown"), "generation")
+
+    def test_retry_after_grows_with_queue_depth(self) -> None:
+        estimator = ServiceTimeEstimator()
+        estimator.observe(2.0)
+
+        self.assertEqual(estimator.retry_after(ahead=0, limit=4), 1)
+        self.assertEqual(estimator.retry_after(ahead=7, limit=4), 4)
+        self.assertEqual(estimator.retry_after(ahead=10_000, limit=1), 120)
+
+
+class PriorityLimiterTests(unittest.TestCase):
+    def test_chat_waiter_overtakes_queued_generation(self) -> None:
+        limiter = AsyncAdaptiveLimiter(AIMDLimit(initial_limit=1, max_limit=1))
+        order: list[str] = []
+
+        async def worker(name: str, priority: str) -> None:
+            await limiter.acquire(priority=priority)
+            order.append(name)
+            limiter.release()
+
+        async def run() -> None:
+            await limiter.acquire()
+            tasks = [
+                asyncio.create_task(worker("gen-1", "generation")),
+                asyncio.create_task(worker("gen-2", "generation")),
+                asyncio.create_task(worker("chat", "chat")),
+            ]
+            await asyncio.sleep(0)
+            limiter.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+        self.assertEqual(order, ["chat", "gen-1", "gen-2"])
+        classes = limiter.stats()["classes"]
+        self.assertEqual((classes["chat"]["served"], classes["generation"]["served"]), (1, 3))
+
+    def test_generation_is_shed_at_its_deadline_while_chat_waits_longer(self) -> None:
+        service = AsyncAIService(
+            primary=_SlowAsyncProvider(),
+            max_concurrency=1,
+            queue_deadlines_ms={"chat": 1000, "generation": 20},
+        )
+
+        async def call(pipeline: str, prompt: str) -> StructuredAIResponse:
+            with ai_call_context(pipeline=pipeline):
+                return await service.generate_json_with_meta(system_prompt="s", user_prompt=prompt)
+
+        async def run() -> list:
+            first = asyncio.create_task(call("content_generate", "a"))
+            await asyncio.sleep(0.01)
+            return await asyncio.gather(
+                first,
+                call("content_generate", "b"),
+                call("chat_generate", "c"),
+                return_exceptions=True,
+            )
+
+        first, shed, chat = asyncio.run(run())
+
+        self.assertEqual(first.data, {"prompt": "a"})
+        self.assertIsInstance(shed, QueueShedError)
+        self.assertEqual(str(shed), "ai_backpressure_busy")
+        self.assertGreaterEqual(shed.retry_after_sec, 1)
+        self.assertEqual(chat.data, {"prompt": "c"})
+        self.assertEqual(service.concurrency_stats()["classes"]["generation"]["shed"], 1)
+
+
+class ShedResponseTests(unittest.TestCase):
+    def test_shed_pipeline_returns_rate_limited_with_retry_after(self) -> None:
+        provider = _CountingProvider()
+        service = AIService(primary=provider, max_concurrency=1, queue_deadlines_ms={"generation": 10})
+        original = gs._get_ai_service
+        self.addCleanup(setattr, gs, "_get_ai_service", original)
+        gs._get_ai_service = lambda: service
+        self.assertTrue(service._semaphore.acquire(timeout=0.01))
+        self.addCleanup(service._semaphore.release)
+
+        with self.assertRaises(HTTPException) as ctx:
+            gs.compat_generate(gs.GenerateRequest(language="python", topic="반복문"))
+
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(provider.calls, 0)
+        payload = build_http_error_payload(ctx.exception, trace_id="trace-1")
+        self.assertEqual(payload["error_code"], "rate_limited")
+        self.assertGreaterEqual(payload["retry_after_sec"], 1)
+        self.assertEqual(build_error_headers(payload), {"Retry-After": str(payload["retry_after_sec"])})
+        self.assertEqual(service.concurrency_stats()["classes"]["generation"]["shed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
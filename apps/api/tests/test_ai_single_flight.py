@@ -0,0 +1,181 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, AIUsageMeta, StructuredAIResponse
+from app.domain.ai.service import AIService, AsyncAIService
+from app.domain.ai.single_flight import SingleFlight
+from app.services.compat.pipeline_runtime import serialize_ai_response_meta
+
+
+def _response(user_prompt: str) -> StructuredAIResponse:
+    return StructuredAIResponse(
+        data={"echo": user_prompt, "items": [1, 2]},
+        meta=AIResponseMeta(provider="fake", model="m", usage=AIUsageMeta(input_tokens=10, output_tokens=5)),
+    )
+
+
+class _BlockingProvider:
+    model = "m"
+
+    def __init__(self, *, error: str | None = None) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+        self.error = error
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        self.release.wait(timeout=5)
+        if self.error:
+            raise RuntimeError(self.error)
+        return _response(user_prompt)
+
+
+class _AsyncProvider:
+    model = "m"
+
+    def __init__(self, *, error: str | None = None, latency_sec: float = 0.05) -> None:
+        self.calls = 0
+        self.error = error
+        self.latency_sec = latency_sec
+
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency_sec)
+        if self.error:
+            raise RuntimeError(self.error)
+        return _response(user_prompt)
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.005)
+
+
+class SingleFlightServiceTests(unittest.TestCase):
+    def test_concurrent_identical_calls_share_one_upstream_request(self) -> None:
+        provider = _BlockingProvider()
+        service = AIService(primary=provider, max_concurrency=8)
+        key = service._flight_key("s", "u")
+
+        def call() -> StructuredAIResponse:
+            with ai_call_context(pipeline="curriculum_reasoning"):
+                return service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(call) for _ in range(5)]
+            _wait_for(lambda: service._single_flight.waiters(key) == 5)
+            stats = service.single_flight_stats()
+            provider.release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(stats["in_flight"], 1)
+        self.assertEqual(list(stats["waiters"].values()), [5])
+        self.assertTrue(next(iter(stats["waiters"])).startswith("curriculum_reasoning:"))
+        self.assertEqual([result.meta.coalesced for result in results].count(True), 4)
+        self.assertTrue(all(result.data == {"echo": "u", "items": [1, 2]} for result in results))
+        # 대기자마다 데이터는 별도 사본이다.
+        self.assertEqual(len({id(result.data) for result in results}), 5)
+        self.assertEqual(service.single_flight_stats()["coalesced"], 4)
+        self.assertEqual(service._single_flight.waiters(key), 0)
+
+    def test_failure_propagates_to_every_waiter(self) -> None:
+        provider = _BlockingProvider(error="openai_request_failed:HTTP Error 503")
+        service = AIService(primary=provider, max_concurrency=8)
+        key = service._flight_key("s", "u")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(service.generate_json_with_meta, system_prompt="s", user_prompt="u")
+                for _ in range(3)
+            ]
+            _wait_for(lambda: service._single_flight.waiters(key) == 3)
+            provider.release.set()
+            errors = [future.exception() for future in futures]
+
+        self.assertEqual(provider.calls, 1)
+        self.assertTrue(all("ai_primary_failed:openai_request_failed" in str(error) for error in errors))
+
+    def test_completed_key_starts_a_fresh_call(self) -> None:
+        provider = _BlockingProvider()
+        provider.release.set()
+        service = AIService(primary=provider)
+
+        first = service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+        second = service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(provider.calls, 2)
+        self.assertFalse(first.meta.coalesced or second.meta.coalesced)
+
+    def test_disabled_single_flight_calls_upstream_each_time(self) -> None:
+        provider = _AsyncProvider()
+        service = AsyncAIService(primary=provider, max_concurrency=4, single_flight=False)
+
+        async def run() -> None:
+            await asyncio.gather(*[
+                service.generate_json_with_meta(system_prompt="s", user_prompt="u") for _ in range(3)
+            ])
+
+        asyncio.run(run())
+
+        self.assertEqual(provider.calls, 3)
+        self.assertEqual(service.single_flight_stats(), {})
+
+
+class AsyncSingleFlightServiceTests(unittest.TestCase):
+    def test_async_calls_coalesce_per_prompt(self) -> None:
+        provider = _AsyncProvider()
+        service = AsyncAIService(primary=provider, max_concurrency=1, acquire_timeout_ms=1000)
+
+        async def run() -> list[StructuredAIResponse]:
+            return await asyncio.gather(
+                *[service.generate_json_with_meta(system_prompt="s", user_prompt="u") for _ in range(4)],
+                service.generate_json_with_meta(system_prompt="s", user_prompt="other"),
+            )
+
+        results = asyncio.run(run())
+
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual([result.meta.coalesced for result in results], [False, True, True, True, False])
+        self.assertEqual(serialize_ai_response_meta(results[1].meta)["coalesced"], True)
+        self.assertNotIn("coalesced", serialize_ai_response_meta(results[0].meta))
+
+    def test_async_failure_propagates_and_cancelled_waiter_does_not_cancel_call(self) -> None:
+        provider = _AsyncProvider(error="gemini_request_failed:429 Too Many Requests", latency_sec=0.1)
+        service = AsyncAIService(primary=provider)
+
+        async def run() -> list[BaseException | StructuredAIResponse]:
+            leader = asyncio.create_task(service.generate_json_with_meta(system_prompt="s", user_prompt="u"))
+            await asyncio.sleep(0)
+            waiters = [
+                asyncio.create_task(service.generate_json_with_meta(system_prompt="s", user_prompt="u"))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(*waiters, return_exceptions=True)
+
+        errors = asyncio.run(run())
+
+        self.assertEqual(provider.calls, 1)
+        self.assertTrue(all("429" in str(error) for error in errors))
+
+
+class SingleFlightPrimitiveTests(unittest.TestCase):
+    def test_leader_flag_and_counters(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+
+        self.assertEqual(flight.do("k", lambda: 7), (7, True))
+        self.assertEqual(flight.stats()["leaders"], 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
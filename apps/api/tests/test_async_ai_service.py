@@ -0,0 +1,143 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import unittest
+
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport
+from app.domain.ai.providers.base import AIResponseMeta, StructuredAIResponse
+from app.domain.ai.providers.openai import AsyncOpenAIProvider
+from app.domain.ai.service import AsyncAIService
+from app.services.compat.pipeline_runtime import PipelineFailure, run_ai_with_retry_async
+
+
+class _SlowAsyncProvider:
+    def __init__(self, delay_sec: float) -> None:
+        self.delay_sec = delay_sec
+        self.calls = 0
+
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay_sec)
+        return StructuredAIResponse(
+            data={"echo": user_prompt},
+            meta=AIResponseMeta(provider="fake", model="fake-model"),
+        )
+
+
+class _OpenAICompatibleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length))
+        body = json.dumps({
+            "model": request["model"],
+            "choices": [{"message": {"content": json.dumps({"assistant": "안녕하세요"})}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class AsyncAIServiceTests(unittest.TestCase):
+    def test_many_slow_calls_overlap_without_threads(self) -> None:
+        provider = _SlowAsyncProvider(delay_sec=0.05)
+        service = AsyncAIService(primary=provider, max_concurrency=500, acquire_timeout_ms=200)
+
+        async def run() -> list[StructuredAIResponse]:
+            return await asyncio.gather(*(
+                service.generate_json_with_meta(system_prompt="s", user_prompt=str(idx))
+                for idx in range(500)
+            ))
+
+        started = time.perf_counter()
+        responses = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(responses), 500)
+        self.assertEqual(responses[42].data["echo"], "42")
+        self.assertLess(elapsed, 2.0)
+
+    def test_backpressure_rejects_when_slots_are_exhausted(self) -> None:
+        service = AsyncAIService(primary=_SlowAsyncProvider(delay_sec=0.2), max_concurrency=1, acquire_timeout_ms=20)
+
+        async def run() -> list[object]:
+            return await asyncio.gather(
+                service.generate_json_with_meta(system_prompt="s", user_prompt="first"),
+                service.generate_json_with_meta(system_prompt="s", user_prompt="second"),
+                return_exceptions=True,
+            )
+
+        first, second = asyncio.run(run())
+        self.assertIsInstance(first, StructuredAIResponse)
+        self.assertIsInstance(second, RuntimeError)
+        self.assertEqual(str(second), "ai_backpressure_busy")
+
+    def test_run_ai_with_retry_async_raises_pipeline_failure(self) -> None:
+        async def call(_attempt: int) -> StructuredAIResponse:
+            raise RuntimeError("request timed out")
+
+        with self.assertRaises(PipelineFailure) as ctx:
+            asyncio.run(run_ai_with_retry_async(call, pipeline="curriculum_sections", max_attempts=2))
+
+        self.assertEqual(ctx.exception.kind, "timeout")
+        self.assertEqual(ctx.exception.attempt_count, 2)
+
+
+class AsyncProviderTransportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAICompatibleHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_async_openai_provider_reuses_pooled_connection(self) -> None:
+        transport = AsyncPooledHTTPTransport()
+        provider = AsyncOpenAIProvider(
+            api_key="test-key",
+            model="gpt-4o-mini",
+            base_url=self.base_url,
+            transport=transport,
+        )
+
+        async def run() -> tuple[StructuredAIResponse, StructuredAIResponse]:
+            first = await provider.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            second = await provider.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            transport.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual(first.data, {"assistant": "안녕하세요"})
+        self.assertEqual(first.meta.usage.total_tokens, 14)
+        self.assertFalse(first.meta.timing.connection_reused)
+        self.assertTrue(second.meta.timing.connection_reused)
+        self.assertEqual(transport.stats()["created"], 1)
+
+    def test_malformed_status_line_is_a_connection_reset(self) -> None:
+        async def read_head() -> None:
+            reader = asyncio.StreamReader()
+            reader.feed_data(b"HTTP/1.1 abc OK\r\n\r\n")
+            reader.feed_eof()
+            await AsyncPooledHTTPTransport._read_head(reader)
+
+        with self.assertRaisesRegex(ConnectionResetError, "bad status line"):
+            asyncio.run(read_head())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import unittest
+
+from app.api.public import chat
+from app.domain.ai.similarity_cache import SimilarityCache
+from app.services.compat.normalizer_validator import extract_semantic_tokens
+
+try:
+    from tests.ai_fakes import FakeClock
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock
+
+
+class _CountingChatService:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
+        self.calls += 1
+        return {"assistant": f"답변 {self.calls}"}
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        raise AssertionError("cached answers must not open a provider stream")
+        yield  # pragma: no cover
+
+
+def _tokens(text: str) -> set[str]:
+    return extract_semantic_tokens(text)
+
+
+class SimilarityCacheTests(unittest.TestCase):
+    def test_near_duplicate_hits_only_inside_its_bucket(self) -> None:
+        cache = SimilarityCache(threshold=0.8)
+        cache.put("manager:coach:ctx", _tokens("진도 어디까지 했죠?"), "3주차까지 하셨어요.")
+
+        answer, similarity = cache.get("manager:coach:ctx", _tokens("진도는 어디까지 했죠??"))
+
+        self.assertEqual(answer, "3주차까지 하셨어요.")
+        self.assertGreaterEqual(similarity, 0.8)
+        self.assertIsNone(cache.get("manager:mate:ctx", _tokens("진도 어디까지 했죠?")))
+        self.assertIsNone(cache.get("manager:coach:ctx", _tokens("오늘 복습 해야 해요?")))
+
+    def test_ttl_and_entry_limit_evict(self) -> None:
+        clock = FakeClock()
+        cache = SimilarityCache(ttl_sec=60, max_entries=2, clock=clock)
+        cache.put("b", _tokens("이번 주 목표 알려주세요"), "a1")
+        cache.put("b", _tokens("진도 어디까지 했죠"), "a2")
+        cache.put("b", _tokens("오늘 복습 해야 해요"), "a3")
+
+        self.assertIsNone(cache.get("b", _tokens("이번 주 목표 알려주세요")))
+        clock.now += 61
+        self.assertIsNone(cache.get("b", _tokens("진도 어디까지 했죠")))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (0, 1))
+        self.assertEqual(stats["expirations"], 2)
+
+    def test_stats_report_per_entry_hits(self) -> None:
+        cache = SimilarityCache()
+        cache.put("manager:coach:ctx", _tokens("이번 주 목표 알려주세요"), "목표는 반복문 완주입니다.")
+        for _ in range(3):
+            cache.get("manager:coach:ctx", _tokens("이번 주 목표를 알려주세요"))
+
+        stats = cache.stats()
+
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["top_entries"][0]["hits"], 3)
+        self.assertEqual(stats["top_entries"][0]["bucket"], "manager:coach")
+
+
+class ChatSimilarityCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = SimilarityCache(threshold=0.8)
+        self.service = _CountingChatService()
+        self.addCleanup(setattr, chat, "_get_similarity_cache", chat._get_similarity_cache)
+        self.addCleanup(setattr, chat, "_require_ai_service", chat._require_ai_service)
+        chat._get_similarity_cache = lambda: self.cache
+        chat._require_ai_service = lambda: self.service
+
+    def _request(
+        self,
+        text: str,
+        *,
+        chat_type: str = "manager",
+        context: dict | None = None,
+        stream: bool = False,
+        history: list[dict] | None = None,
+    ):
+        return chat.ChatRequest(
+            messages=[*(history or []), {"role": "user", "content": text}],
+            chatType=chat_type,
+            contextId="curriculum-1",
+            context=context or {"assistantPersona": "coach", "progress": "3/10"},
+            stream=stream,
+        )
+
+    def test_manager_repeat_question_is_served_from_cache(self) -> None:
+        first = asyncio.run(chat.compat_chat(self._request("진도 어디까지 했죠?")))
+        second = asyncio.run(chat.compat_chat(self._request("진도는 어디까지 했죠??")))
+
+        self.assertEqual(self.service.calls, 1)
+        self.assertNotIn("meta", first)
+        self.assertEqual(second["assistant"], first["assistant"])
+        self.assertTrue(second["meta"]["cache_hit"])
+
+    def test_other_context_and_tutor_mode_call_the_model(self) -> None:
+        asyncio.run(chat.compat_chat(self._request("진도 어디까지 했죠?")))
+        asyncio.run(chat.compat_chat(self._request("진도 어디까지 했죠?", context={"progress": "4/10"})))
+        asyncio.run(chat.compat_chat(self._request("진도 어디까지 했죠?", chat_type="tutor")))
+        asyncio.run(chat.compat_chat(self._request("진도 어디까지 했죠?", chat_type="tutor")))
+
+        self.assertEqual(self.service.calls, 4)
+
+    def test_follow_up_question_reuses_answer_only_after_same_turns(self) -> None:
+        quiz_turns = [
+            {"role": "user", "content": "오늘 퀴즈 점수 알려주세요"},
+            {"role": "assistant", "content": "오늘 퀴즈는 8점입니다."},
+        ]
+        lesson_turns = [
+            {"role": "user", "content": "다음 레슨이 뭐예요?"},
+            {"role": "assistant", "content": "다음 레슨은 반복문입니다."},
+        ]
+        asyncio.run(chat.compat_chat(self._request("그건 언제 하면 좋을까요?", history=quiz_turns)))
+        asyncio.run(chat.compat_chat(self._request("그건 언제 하면 좋을까요?", history=lesson_turns)))
+        self.assertEqual(self.service.calls, 2)
+
+        repeat = asyncio.run(chat.compat_chat(self._request("그건 언제 하면 좋을까요??", history=lesson_turns)))
+        self.assertEqual(self.service.calls, 2)
+        self.assertTrue(repeat["meta"]["cache_hit"])
+
+    def test_stream_hit_sends_delta_and_done(self) -> None:
+        asyncio.run(chat.compat_chat(self._request("이번 주 목표 알려주세요")))
+
+        async def collect() -> str:
+            response = await chat.compat_chat(self._request("이번 주 목표를 알려주세요", stream=True))
+            return b"".join([chunk async for chunk in response.body_iterator]).decode("utf-8")
+
+        blocks = asyncio.run(collect()).strip().split("\n\n")
+
+        self.assertEqual([block.split("\n")[0] for block in blocks], ["event: delta", "event: done"])
+        done = json.loads(blocks[1].split("\n")[1].removeprefix("data: "))
+        self.assertEqual(done["assistant"], "답변 1")
+        self.assertTrue(done["meta"]["cache_hit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,40 +1,82 @@
+import asyncio
+import json
 import unittest
 
 from fastapi import HTTPException
 
 from app.api.public import chat
+from app.domain.ai.call_context import current_ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk, AIUsageMeta
 
 
 class _RateLimitedAIService:
-    def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
+    async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
         raise RuntimeError("429 too many requests")
 
 
 class _EmptyAIService:
-    def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
+    async def generate_json(self, *, system_prompt: str, user_prompt: str) -> dict:
         return {"assistant": "   "}
 
 
+class _StreamingAIService:
+    def __init__(self, pieces: list[str], *, fail_after: int | None = None) -> None:
+        self.pieces = pieces
+        self.fail_after = fail_after
+        self.pipelines: list[str] = []
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        for idx, piece in enumerate(self.pieces):
+            if self.fail_after is not None and idx == self.fail_after:
+                raise RuntimeError("ai_primary_failed:openai_request_failed:read operation timed out")
+            self.pipelines.append(current_ai_call_context().pipeline)
+            yield AIStreamChunk(text=piece)
+        self.pipelines.append(current_ai_call_context().pipeline)
+        yield AIStreamChunk(meta=AIResponseMeta(
+            provider="fake",
+            model="fake-model",
+            usage=AIUsageMeta(input_tokens=9, output_tokens=3, total_tokens=12),
+        ))
+
+
+def _stream_chat_events(payload: chat.ChatRequest) -> tuple[object, list[tuple[str, dict]]]:
+    # 스트림 제너레이터는 응답을 만든 이벤트 루프 안에서 끝까지 소비해야 한다.
+    async def collect() -> tuple[object, bytes]:
+        response = await chat.compat_chat(payload)
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+
+    response, body = asyncio.run(collect())
+    events: list[tuple[str, dict]] = []
+    for block in body.decode("utf-8").strip().split("\n\n"):
+        name_line, data_line = block.split("\n")
+        events.append((name_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return response, events
+
+
 class CompatChatTests(unittest.TestCase):
     def setUp(self) -> None:
         self._original_require_ai_service = chat._require_ai_service
+        # 유사 질문 캐시는 프로세스 전역이라 테스트끼리 답이 섞이지 않게 끈다.
+        self.addCleanup(setattr, chat, "_get_similarity_cache", chat._get_similarity_cache)
+        chat._get_similarity_cache = lambda: None
 
     def tearDown(self) -> None:
         chat._require_ai_service = self._original_require_ai_service
 
-    def _request(self) -> chat.ChatRequest:
+    def _request(self, *, stream: bool = False) -> chat.ChatRequest:
         return chat.ChatRequest(
             messages=[{"role": "user", "content": "안녕"}],
             chatType="manager",
             contextId=None,
             context={},
+            stream=stream,
         )
 
     def test_chat_error_is_structured_with_error_code(self) -> None:
         chat._require_ai_service = lambda: _RateLimitedAIService()
 
         with self.assertRaises(HTTPException) as ctx:
-            chat.compat_chat(self._request())
+            asyncio.run(chat.compat_chat(self._request()))
 
         detail = ctx.exception.detail
         self.assertIsInstance(detail, dict)
@@ -46,7 +88,7 @@ class CompatChatTests(unittest.TestCase):
         chat._require_ai_service = lambda: _EmptyAIService()
 
         with self.assertRaises(HTTPException) as ctx:
-            chat.compat_chat(self._request())
+            asyncio.run(chat.compat_chat(self._request()))
 
         detail = ctx.exception.detail
         self.assertIsInstance(detail, dict)
@@ -54,6 +96,44 @@ class CompatChatTests(unittest.TestCase):
         self.assertFalse(detail["retryable"])
         self.assertEqual(detail["detail"], "chat_empty_assistant")
 
+    def test_chat_stream_emits_assistant_deltas_and_usage_on_done(self) -> None:
+        service = _StreamingAIService(['{"assis', 'tant": "오늘', '은 복습\\n', '부터"}'])
+        chat._require_ai_service = lambda: service
+
+        response, events = _stream_chat_events(self._request(stream=True))
+
+        self.assertEqual(response.media_type, "text/event-stream")
+        deltas = [data["text"] for name, data in events if name == "delta"]
+        self.assertEqual("".join(deltas), "오늘은 복습\n부터")
+        self.assertGreaterEqual(len(deltas), 2)
+        name, done = events[-1]
+        self.assertEqual(name, "done")
+        self.assertEqual(done["assistant"], "오늘은 복습\n부터")
+        self.assertTrue(done["streaming"])
+        self.assertEqual(done["meta"]["usage"]["total_tokens"], 12)
+        # 첫 청크 뒤로도 스트림 전체가 chat_generate 파이프라인으로 돈다.
+        self.assertEqual(set(service.pipelines), {"chat_generate"})
+
+    def test_chat_stream_failure_before_first_chunk_is_http_error(self) -> None:
+        chat._require_ai_service = lambda: _StreamingAIService(["{}"], fail_after=0)
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(chat.compat_chat(self._request(stream=True)))
+
+        self.assertEqual(ctx.exception.status_code, 504)
+        self.assertEqual(ctx.exception.detail["error_code"], "timeout")
+
+    def test_chat_stream_failure_mid_stream_emits_error_event(self) -> None:
+        chat._require_ai_service = lambda: _StreamingAIService(['{"assistant": "반', '갑'], fail_after=1)
+
+        response, events = _stream_chat_events(self._request(stream=True))
+
+        self.assertEqual(events[0], ("delta", {"text": "반"}))
+        name, detail = events[-1]
+        self.assertEqual(name, "error")
+        self.assertEqual(detail["error_code"], "timeout")
+        self.assertTrue(detail["retryable"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,16 @@
+import asyncio
+import json
 import unittest
 
 from fastapi import HTTPException
 from pydantic import ValidationError
 
-from app.domain.ai.providers.base import AIResponseMeta, StructuredAIResponse
+from app.domain.ai.call_context import current_ai_call_context
+from app.domain.ai.providers.base import AIResponseMeta, AIStreamChunk, AIUsageMeta, StructuredAIResponse
+from app.domain.ai.response_cache import ResponseCache
+from app.domain.ai.service import AIService, AsyncAIService
 from app.services.compat import generation_service as gs
+from app.services.compat import pipeline_runtime
 from app.services.compat.error_policy import build_http_error_payload
 
 
@@ -28,12 +34,130 @@ class _FakeAIService:
         ).data
 
 
+class _FakeAsyncAIService(_FakeAIService):
+    async def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return StructuredAIResponse(data=self.response, meta=self.response_meta)
+
+
+_QUIZ_ONLY_RESPONSE = {
+    "title": "파이썬 리스트 문제 훈련",
+    "content": "파이썬 리스트 핵심을 점검하는 문제 세트입니다. 개념 확인과 응용 판단을 함께 연습합니다.",
+    "code_examples": [],
+    "quiz": [
+        {
+            "question": "파이썬 리스트에서 항목을 끝에 추가할 때 가장 직접적인 방법은?",
+            "options": [
+                "1) append()로 원소 추가",
+                "2) pop()으로 원소 삭제",
+                "3) clear()로 전체 제거",
+                "4) sort()로 정렬 수행",
+            ],
+            "correct_answer": 0,
+            "explanation": "append()는 리스트의 마지막에 새 항목을 추가하는 기본 메서드라 문제 의도와 정확히 맞습니다.",
+        },
+        {
+            "question": "파이썬 리스트 슬라이싱의 기본 목적을 가장 잘 설명한 것은?",
+            "options": [
+                "부분 구간 복사/추출",
+                "원본 즉시 삭제",
+                "정수형 강제 변환",
+                "랜덤 값 생성",
+            ],
+            "correct_answer": 0,
+            "explanation": "슬라이싱은 시작/끝/간격 조건으로 원하는 구간을 선택해 새로운 리스트를 만들 때 주로 사용합니다.",
+        },
+        {
+            "question": "파이썬 리스트를 반복문에서 순회할 때 인덱스와 값을 함께 얻는 표준 방식은?",
+            "options": [
+                "enumerate() 사용",
+                "input() 호출",
+                "replace() 호출",
+                "split() 호출",
+            ],
+            "correct_answer": 0,
+            "explanation": "enumerate()는 인덱스와 값을 동시에 제공해 상태 추적이 필요한 반복 로직을 명확하게 작성할 수 있습니다.",
+        },
+    ],
+}
+
+
+class _FakeStreamingAIService(_FakeAsyncAIService):
+    def __init__(self, response: dict, *, chunk_size: int = 7):
+        super().__init__(response, response_meta=AIResponseMeta(
+            provider="openai",
+            model="gpt-4o-mini",
+            usage=AIUsageMeta(input_tokens=40, output_tokens=90, total_tokens=130),
+        ))
+        self.chunk_size = chunk_size
+        self.stream_calls = 0
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        self.stream_calls += 1
+        raw = json.dumps(self.response, ensure_ascii=False)
+        for idx in range(0, len(raw), self.chunk_size):
+            await asyncio.sleep(0)
+            yield AIStreamChunk(text=raw[idx:idx + self.chunk_size])
+        yield AIStreamChunk(meta=self.response_meta)
+
+
+_REASONING_RESPONSE = {
+    "learning_objectives": ["리스트 컴프리헨션으로 반복문을 줄일 수 있다"],
+    "prerequisite_concepts": ["for 반복문"],
+    "why_this_topic": "데이터 가공 코드를 짧고 읽기 쉽게 만든다.",
+    "teaching_strategy": "반복문과 컴프리헨션을 나란히 비교한다.",
+    "difficulty_calibration": "조건식 없는 형태부터 시작한다.",
+    "connection_to_goal": "백엔드 응답 가공 코드에 바로 쓰인다.",
+}
+
+
+class _FakeLessonAIService(_FakeStreamingAIService):
+    def __init__(self) -> None:
+        super().__init__(_REASONING_RESPONSE)
+        self.sections_started = asyncio.Event()
+        self.pipelines: list[str] = []
+
+    async def stream_json_text(self, *, system_prompt: str, user_prompt: str):
+        pipeline = current_ai_call_context().pipeline
+        self.pipelines.append(pipeline)
+        if pipeline == "curriculum_sections":
+            self.sections_started.set()
+            yield AIStreamChunk(text=json.dumps({"title": "컴프리헨션", "sections": []}))
+            yield AIStreamChunk(meta=self.response_meta)
+            return
+        raw = json.dumps(self.response, ensure_ascii=False)
+        yield AIStreamChunk(text=raw[:-1])
+        # 섹션 생성이 추론 스트림이 끝나기 전에 시작돼야 이 대기가 풀린다.
+        await asyncio.wait_for(self.sections_started.wait(), timeout=1)
+        yield AIStreamChunk(text=raw[-1:])
+        yield AIStreamChunk(meta=self.response_meta)
+
+
+class _ScriptedAIService:
+    """Returns the scripted responses in order and keeps the prompts it was sent."""
+
+    def __init__(self, *responses: tuple[dict, int]):
+        self.responses = list(responses)
+        self.prompts: list[tuple[str, str]] = []
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        self.prompts.append((system_prompt, user_prompt))
+        data, total_tokens = self.responses.pop(0)
+        return StructuredAIResponse(
+            data=json.loads(json.dumps(data)),
+            meta=AIResponseMeta(provider="openai", model="m", usage=AIUsageMeta(total_tokens=total_tokens)),
+        )
+
+
 class CompatGenerateServiceTests(unittest.TestCase):
     def setUp(self) -> None:
         self._original_get_ai_service = gs._get_ai_service
+        self._original_get_async_ai_service = gs._get_async_ai_service
 
     def tearDown(self) -> None:
         gs._get_ai_service = self._original_get_ai_service
+        gs._get_async_ai_service = self._original_get_async_ai_service
 
     def _payload(self, question_count: int = 3) -> gs.GenerateRequest:
         return gs.GenerateRequest(
@@ -45,6 +169,78 @@ class CompatGenerateServiceTests(unittest.TestCase):
             questionCount=question_count,
         )
 
+    def test_failing_quiz_item_is_repaired_without_regenerating_document(self) -> None:
+        self.addCleanup(setattr, pipeline_runtime, "_item_repair_stats", pipeline_runtime._item_repair_stats)
+        pipeline_runtime._item_repair_stats = pipeline_runtime.ItemRepairStats()
+        broken = json.loads(json.dumps(_QUIZ_ONLY_RESPONSE))
+        broken["quiz"][2]["explanation"] = "짧은 해설"
+        fixed_item = {
+            **_QUIZ_ONLY_RESPONSE["quiz"][2],
+            "explanation": "enumerate()는 인덱스와 값을 함께 돌려주므로 별도 카운터 변수 없이 위치를 추적할 수 있습니다.",
+        }
+        fake = _ScriptedAIService(
+            (broken, 900),
+            ({"title": "", "content": "", "code_examples": [], "quiz": [fixed_item]}, 150),
+        )
+        gs._get_ai_service = lambda: fake
+
+        result = gs.compat_generate(self._payload(question_count=3))
+
+        self.assertEqual(len(fake.prompts), 2)
+        self.assertEqual(result["quiz"][2]["explanation"], fixed_item["explanation"])
+        self.assertEqual(result["quiz"][0]["options"][0], "append()로 원소 추가")
+        self.assertEqual(result["meta"]["usage"]["total_tokens"], 1050)
+        self.assertEqual(result["meta"]["attempt_count"], 1)
+        repair_system, repair_user = fake.prompts[1]
+        # 시스템 프롬프트는 원래 것 그대로라 스키마와 프롬프트 캐시를 함께 쓴다.
+        self.assertEqual(repair_system, fake.prompts[0][0])
+        self.assertIn("quiz의 3번째 항목", repair_user)
+        self.assertIn("짧은 해설", repair_user)
+        self.assertNotIn("1) append()로 원소 추가", repair_user)
+        stats = gs.ai_runtime_stats()["item_repair"]["content_generate"]
+        self.assertEqual((stats["repairs"], stats["repaired"], stats["items"]), (1, 1, 1))
+        self.assertEqual((stats["repair_tokens"], stats["full_tokens"], stats["token_ratio"]), (150, 900, 0.1667))
+
+    def test_repaired_document_replaces_the_original_in_the_response_cache(self) -> None:
+        broken = json.loads(json.dumps(_QUIZ_ONLY_RESPONSE))
+        broken["quiz"][2]["explanation"] = "짧은 해설"
+        fixed_item = {
+            **_QUIZ_ONLY_RESPONSE["quiz"][2],
+            "explanation": "enumerate()는 인덱스와 값을 함께 돌려주므로 별도 카운터 변수 없이 위치를 추적할 수 있습니다.",
+        }
+        provider = _ScriptedAIService(
+            (broken, 900),
+            ({"title": "", "content": "", "code_examples": [], "quiz": [fixed_item]}, 150),
+        )
+        cache = ResponseCache(ttls={"content_generate": 60})
+        service = AIService(primary=provider, response_cache=cache)
+        gs._get_ai_service = lambda: service
+
+        first = gs.compat_generate(self._payload(question_count=3))
+        second = gs.compat_generate(self._payload(question_count=3))
+
+        self.assertEqual(len(provider.prompts), 2)
+        # 게이트에 떨어진 원본과 수선 응답은 캐시하지 않고, 원래 프롬프트 키에 수선된 문서 하나만 남는다.
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertTrue(second["meta"]["cache_hit"])
+        self.assertEqual(second["quiz"], first["quiz"])
+        self.assertEqual(second["quiz"][2]["explanation"], fixed_item["explanation"])
+
+    def test_document_level_issues_still_regenerate_whole_document(self) -> None:
+        sections = [
+            {"type": "check", "question": "q"},
+            {"type": "concept", "body": "b"},
+            {"type": "check", "question": "q"},
+        ]
+        self.assertEqual(gs._locate_section_issue("check2_options_invalid", sections), [("sections", 2, "options_invalid")])
+        self.assertEqual(gs._locate_section_issue("concept_body_too_short", sections), [("sections", 1, "body_too_short")])
+        self.assertIsNone(gs._locate_section_issue("summary_missing", sections))
+        self.assertIsNone(
+            gs._item_repair_targets(["quiz1_options_invalid", "topic_keyword_missing"], gs._locate_generated_content_issue)
+        )
+        many = [f"quiz{idx}_explanation_too_short" for idx in range(1, gs.settings.ai_item_repair_max_items + 2)]
+        self.assertIsNone(gs._item_repair_targets(many, gs._locate_generated_content_issue))
+
     def test_generate_request_question_count_bounds(self) -> None:
         valid_payload = self._payload(question_count=3)
         self.assertEqual(valid_payload.questionCount, 3)
@@ -77,48 +273,7 @@ class CompatGenerateServiceTests(unittest.TestCase):
         self.assertTrue(str(payload["detail"]).startswith("content_generate_failed:quality_failed:"))
 
     def test_generate_quiz_only_normalizes_options(self) -> None:
-        fake = _FakeAIService(
-            {
-                "title": "파이썬 리스트 문제 훈련",
-                "content": "파이썬 리스트 핵심을 점검하는 문제 세트입니다. 개념 확인과 응용 판단을 함께 연습합니다.",
-                "code_examples": [],
-                "quiz": [
-                    {
-                        "question": "파이썬 리스트에서 항목을 끝에 추가할 때 가장 직접적인 방법은?",
-                        "options": [
-                            "1) append()로 원소 추가",
-                            "2) pop()으로 원소 삭제",
-                            "3) clear()로 전체 제거",
-                            "4) sort()로 정렬 수행",
-                        ],
-                        "correct_answer": 0,
-                        "explanation": "append()는 리스트의 마지막에 새 항목을 추가하는 기본 메서드라 문제 의도와 정확히 맞습니다.",
-                    },
-                    {
-                        "question": "파이썬 리스트 슬라이싱의 기본 목적을 가장 잘 설명한 것은?",
-                        "options": [
-                            "부분 구간 복사/추출",
-                            "원본 즉시 삭제",
-                            "정수형 강제 변환",
-                            "랜덤 값 생성",
-                        ],
-                        "correct_answer": 0,
-                        "explanation": "슬라이싱은 시작/끝/간격 조건으로 원하는 구간을 선택해 새로운 리스트를 만들 때 주로 사용합니다.",
-                    },
-                    {
-                        "question": "파이썬 리스트를 반복문에서 순회할 때 인덱스와 값을 함께 얻는 표준 방식은?",
-                        "options": [
-                            "enumerate() 사용",
-                            "input() 호출",
-                            "replace() 호출",
-                            "split() 호출",
-                        ],
-                        "correct_answer": 0,
-                        "explanation": "enumerate()는 인덱스와 값을 동시에 제공해 상태 추적이 필요한 반복 로직을 명확하게 작성할 수 있습니다.",
-                    },
-                ],
-            }
-        )
+        fake = _FakeAIService(_QUIZ_ONLY_RESPONSE)
         gs._get_ai_service = lambda: fake
 
         result = gs.compat_generate(self._payload(question_count=3))
@@ -128,6 +283,126 @@ class CompatGenerateServiceTests(unittest.TestCase):
         self.assertEqual(result["code_examples"], [])
         self.assertEqual(result["quiz"][0]["options"][0], "append()로 원소 추가")
 
+    def test_generate_async_streams_and_normalizes_quiz_items(self) -> None:
+        fake = _FakeStreamingAIService(_QUIZ_ONLY_RESPONSE)
+        gs._get_async_ai_service = lambda: fake
+        gs._get_ai_service = lambda: _FakeAIService(_QUIZ_ONLY_RESPONSE)
+
+        streamed = asyncio.run(gs.compat_generate_async(self._payload(question_count=3)))
+        buffered = gs.compat_generate(self._payload(question_count=3))
+
+        self.assertEqual(fake.stream_calls, 1)
+        self.assertEqual(fake.calls, 0)
+        self.assertEqual(streamed["quiz"], buffered["quiz"])
+        self.assertEqual(streamed["quiz"][0]["options"][0], "append()로 원소 추가")
+        self.assertEqual(streamed["meta"]["usage"]["total_tokens"], 130)
+
+    def test_generate_async_coalesces_identical_streamed_requests(self) -> None:
+        fake = _FakeStreamingAIService(_QUIZ_ONLY_RESPONSE)
+        service = AsyncAIService(primary=fake)
+        gs._get_async_ai_service = lambda: service
+
+        async def run() -> list[dict]:
+            return await asyncio.gather(*[
+                gs.compat_generate_async(self._payload(question_count=3)) for _ in range(5)
+            ])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(fake.stream_calls, 1)
+        self.assertEqual(fake.calls, 0)
+        self.assertEqual([bool(result["meta"].get("coalesced")) for result in results].count(True), 4)
+        self.assertTrue(all(result["quiz"] == results[0]["quiz"] for result in results))
+        self.assertEqual(service.single_flight_stats()["coalesced"], 4)
+
+    def test_generate_async_truncated_stream_is_schema_mismatch(self) -> None:
+        fake = _FakeStreamingAIService(_QUIZ_ONLY_RESPONSE)
+        # 첫 멤버도 끝나기 전에 끊기면 살릴 것이 없다.
+        truncated = json.dumps(_QUIZ_ONLY_RESPONSE, ensure_ascii=False)[:12]
+
+        async def stream_json_text(*, system_prompt: str, user_prompt: str):
+            fake.stream_calls += 1
+            yield AIStreamChunk(text=truncated)
+            yield AIStreamChunk(meta=fake.response_meta)
+
+        fake.stream_json_text = stream_json_text
+        gs._get_async_ai_service = lambda: fake
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(gs.compat_generate_async(self._payload(question_count=3)))
+
+        self.assertEqual(ctx.exception.status_code, 422)
+        self.assertEqual(fake.stream_calls, 2)
+        self.assertIn("streaming_json_incomplete", str(ctx.exception.detail))
+
+    def test_generate_async_stream_cut_after_last_item_is_repaired(self) -> None:
+        fake = _FakeStreamingAIService(_QUIZ_ONLY_RESPONSE)
+        truncated = json.dumps(_QUIZ_ONLY_RESPONSE, ensure_ascii=False).removesuffix("]}")
+
+        async def stream_json_text(*, system_prompt: str, user_prompt: str):
+            fake.stream_calls += 1
+            yield AIStreamChunk(text=truncated)
+            yield AIStreamChunk(meta=fake.response_meta)
+
+        fake.stream_json_text = stream_json_text
+        gs._get_async_ai_service = lambda: fake
+
+        result = asyncio.run(gs.compat_generate_async(self._payload(question_count=3)))
+
+        self.assertEqual(fake.stream_calls, 1)
+        self.assertEqual(len(result["quiz"]), 3)
+        self.assertEqual(result["meta"]["json_repairs"], ["truncated"])
+
+    def test_lesson_starts_sections_before_reasoning_stream_ends(self) -> None:
+        fake = _FakeLessonAIService()
+        gs._get_async_ai_service = lambda: fake
+        payload = gs.LessonRequest(
+            topic="리스트 컴프리헨션",
+            curriculumGoal="백엔드 개발",
+            learnerLevel="beginner",
+            language="Python",
+        )
+
+        async def collect() -> list[tuple[str, dict]]:
+            return [event async for event in gs.compat_curriculum_lesson_events(payload)]
+
+        events = asyncio.run(collect())
+
+        self.assertEqual([name for name, _ in events], ["reasoning", "done"])
+        self.assertEqual(events[0][1]["teaching_strategy"], _REASONING_RESPONSE["teaching_strategy"])
+        result = events[1][1]
+        self.assertEqual(result["reasoning"]["learning_objectives"], _REASONING_RESPONSE["learning_objectives"])
+        self.assertEqual(result["reasoning"]["meta"]["usage"]["input_tokens"], 40)
+        self.assertTrue(result["sections"]["meta"]["fallback_used"])
+        self.assertGreaterEqual(result["meta"]["sections_early_start_ms"], 0)
+        self.assertEqual(fake.pipelines[:2], ["curriculum_reasoning", "curriculum_sections"])
+
+    def test_concurrent_identical_lessons_share_one_reasoning_stream(self) -> None:
+        fake = _FakeLessonAIService()
+        service = AsyncAIService(primary=fake)
+        gs._get_async_ai_service = lambda: service
+        payload = gs.LessonRequest(
+            topic="리스트 컴프리헨션",
+            curriculumGoal="백엔드 개발",
+            learnerLevel="beginner",
+            language="Python",
+        )
+
+        async def collect() -> list[tuple[str, dict]]:
+            return [event async for event in gs.compat_curriculum_lesson_events(payload)]
+
+        async def run() -> list[list[tuple[str, dict]]]:
+            return await asyncio.gather(*[collect() for _ in range(3)])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(fake.pipelines.count("curriculum_reasoning"), 1)
+        reasonings = [events[-1][1]["reasoning"] for events in results]
+        self.assertEqual([bool(reasoning["meta"].get("coalesced")) for reasoning in reasonings].count(True), 2)
+        self.assertTrue(all(
+            reasoning["learning_objectives"] == _REASONING_RESPONSE["learning_objectives"] for reasoning in reasonings
+        ))
+
     def test_target_quiz_count_clamps_unsafe_values(self) -> None:
         low_payload = gs.GenerateRequest.model_construct(
             language="Python",
@@ -243,6 +518,30 @@ class CompatGenerateServiceTests(unittest.TestCase):
         self.assertTrue(result["meta"]["fallback_used"])
         self.assertEqual(result["meta"]["failure_kind"], "schema_mismatch")
 
+    def test_assessment_questions_async_retries_and_marks_fallback(self) -> None:
+        fake = _FakeAsyncAIService({"unexpected": "shape"})
+        gs._get_async_ai_service = lambda: fake
+
+        result = asyncio.run(
+            gs.compat_assessment_questions_async(gs.AssessmentQuestionsRequest(goal="파이썬 리스트"))
+        )
+
+        self.assertEqual(fake.calls, 2)
+        self.assertEqual(len(result["questions"]), 5)
+        self.assertTrue(result["meta"]["fallback_used"])
+        self.assertEqual(result["meta"]["failure_kind"], "schema_mismatch")
+
+    def test_generate_async_returns_quality_failed_error_payload(self) -> None:
+        gs._get_async_ai_service = lambda: _FakeAsyncAIService(
+            {"title": "짧음", "content": "너무 짧다", "code_examples": [], "quiz": []}
+        )
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(gs.compat_generate_async(self._payload(question_count=3)))
+
+        self.assertEqual(ctx.exception.status_code, 422)
+        self.assertEqual(ctx.exception.detail["error_code"], "quality_failed")
+
     def test_sections_quality_issues_detects_check_grounding_low(self) -> None:
         payload = gs.ReasoningRequest(
             topic="파이썬 리스트",
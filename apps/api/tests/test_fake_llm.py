@@ -0,0 +1,208 @@
+import asyncio
+import json
+import unittest
+
+from app.api.public import chat
+from app.core.config import Settings
+from app.domain.ai import factory
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport
+from app.domain.ai.providers.base import AIAttemptError
+from app.domain.ai.providers.fake_llm import FakeLLMConfig, FakeLLMServer, fake_payload
+from app.domain.ai.providers.gemini import AsyncGeminiProvider, GeminiProvider
+from app.domain.ai.providers.openai import AsyncOpenAIProvider, OpenAIProvider
+from app.domain.ai.providers.transport import PooledHTTPTransport
+from app.domain.ai.service import AIService, AsyncAIService
+from app.services.compat import generation_service as gs
+from app.services.compat.pipeline_runtime import classify_ai_failure
+
+
+_FAST = FakeLLMConfig(latency_p50_ms=0, latency_p95_ms=0)
+
+_REASONING_REQUEST = gs.ReasoningRequest(
+    topic="파이썬 리스트",
+    curriculumGoal="웹 서비스 백엔드 개발",
+    learnerLevel="beginner",
+    language="Python",
+)
+
+
+class FakeLLMPipelineTests(unittest.TestCase):
+    """Every pipeline passes its quality gate against the fake server on both wire formats."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeLLMServer(_FAST).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.close()
+
+    def setUp(self) -> None:
+        self._original_get_ai_service = gs._get_ai_service
+        self.addCleanup(setattr, gs, "_get_ai_service", self._original_get_ai_service)
+        self.transport = PooledHTTPTransport()
+        self.addCleanup(self.transport.close)
+
+    def _use(self, provider) -> None:
+        gs._get_ai_service = lambda: AIService(primary=provider)
+
+    def _run_pipelines(self) -> None:
+        lesson = gs.compat_generate(gs.GenerateRequest(language="python", topic="파이썬 반복문"))
+        quiz = gs.compat_generate(gs.GenerateRequest(
+            language="python", topic="파이썬 반복문", contentMode="quiz_only", questionCount=4,
+        ))
+        curriculum = gs.compat_curriculum_generate(gs.CurriculumGenerateRequest(goal="백엔드 개발", level="beginner"))
+        questions = gs.compat_assessment_questions(gs.AssessmentQuestionsRequest(goal="백엔드 개발"))
+        reasoning = gs.compat_curriculum_reasoning(_REASONING_REQUEST)
+        sections = gs.compat_curriculum_sections(gs.SectionsRequest(input=_REASONING_REQUEST, reasoning=reasoning))
+
+        for result in (lesson, quiz, curriculum, questions, sections):
+            self.assertFalse(result["meta"].get("fallback_used"), result["meta"])
+            self.assertEqual(result["meta"]["attempt_count"], 1)
+        self.assertEqual(len(quiz["quiz"]), 4)
+        self.assertEqual(len(questions["questions"]), 5)
+        self.assertGreater(lesson["meta"]["usage"]["input_tokens"], 0)
+
+    def test_openai_wire_pipelines_pass_quality(self) -> None:
+        self._use(OpenAIProvider(
+            api_key="fake", model="fake-openai", base_url=f"{self.server.base_url}/v1", transport=self.transport,
+        ))
+        self._run_pipelines()
+
+    def test_gemini_wire_pipelines_pass_quality(self) -> None:
+        self._use(GeminiProvider(
+            api_key="fake", model="fake-gemini", base_url=self.server.base_url, transport=self.transport,
+        ))
+        self._run_pipelines()
+        self.assertGreaterEqual(self.server.stats()["pipelines"]["curriculum_sections"], 1)
+
+    def test_chat_streams_over_both_wires(self) -> None:
+        original = chat._require_ai_service
+        self.addCleanup(setattr, chat, "_require_ai_service", original)
+        # 두 형식에 같은 질문을 보내므로 유사 질문 캐시는 끈다.
+        self.addCleanup(setattr, chat, "_get_similarity_cache", chat._get_similarity_cache)
+        chat._get_similarity_cache = lambda: None
+        payload = chat.ChatRequest(
+            messages=[{"role": "user", "content": "오늘 뭐 하면 좋을까요?"}],
+            chatType="manager",
+            contextId=None,
+            context={},
+            stream=True,
+        )
+
+        async def collect(provider) -> list[str]:
+            chat._require_ai_service = lambda: AsyncAIService(primary=provider)
+            response = await chat.compat_chat(payload)
+            return [chunk async for chunk in response.body_iterator]
+
+        for build in (
+            lambda transport: AsyncOpenAIProvider(
+                api_key="fake", model="fake-openai", base_url=f"{self.server.base_url}/v1", transport=transport,
+            ),
+            lambda transport: AsyncGeminiProvider(
+                api_key="fake", model="fake-gemini", base_url=self.server.base_url, transport=transport,
+            ),
+        ):
+            # 스트림은 만든 이벤트 루프 안에서 끝까지 소비한다.
+            async def run() -> list[str]:
+                transport = AsyncPooledHTTPTransport()
+                try:
+                    return await collect(build(transport))
+                finally:
+                    transport.close()
+
+            body = "".join(chunk if isinstance(chunk, str) else chunk.decode("utf-8") for chunk in asyncio.run(run()))
+            done = [block for block in body.strip().split("\n\n") if block.startswith("event: done")]
+            self.assertEqual(len(done), 1)
+            event = json.loads(done[0].split("\n", 1)[1].removeprefix("data: "))
+            self.assertIn("오늘 뭐 하면 좋을까요", event["assistant"])
+            self.assertGreater(event["meta"]["usage"]["output_tokens"], 0)
+
+
+class FakeLLMFaultTests(unittest.TestCase):
+    def _provider(self, config: FakeLLMConfig, *, timeout_sec: int = 30) -> OpenAIProvider:
+        server = FakeLLMServer(config).start()
+        self.addCleanup(server.close)
+        self.server = server
+        transport = PooledHTTPTransport()
+        self.addCleanup(transport.close)
+        return OpenAIProvider(
+            api_key="fake",
+            model="fake-openai",
+            base_url=f"{server.base_url}/v1",
+            timeout_sec=timeout_sec,
+            transport=transport,
+        )
+
+    def test_rate_limit_injection_returns_429_with_retry_after(self) -> None:
+        provider = self._provider(FakeLLMConfig(latency_p50_ms=0, rate_limit_rate=1.0, retry_after_sec=3))
+
+        with self.assertRaises(Exception) as ctx:
+            provider.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(classify_ai_failure(str(ctx.exception))[0], "rate_limited")
+        headers = {key.lower(): value for key, value in ctx.exception.__cause__.headers.items()}
+        self.assertEqual(headers["retry-after"], "3")
+        self.assertEqual(self.server.stats()["rate_limited"], 1)
+
+    def test_malformed_injection_truncates_json(self) -> None:
+        provider = self._provider(FakeLLMConfig(latency_p50_ms=0, malformed_rate=1.0))
+
+        with self.assertRaises(AIAttemptError) as ctx:
+            provider.generate_json_with_meta(system_prompt="AI+ 학습 어시스턴트", user_prompt="user_message=안녕")
+
+        self.assertGreater(ctx.exception.meta.usage.output_tokens, 0)
+        self.assertEqual(self.server.stats()["malformed"], 1)
+
+    def test_timeout_injection_holds_the_response(self) -> None:
+        provider = self._provider(FakeLLMConfig(latency_p50_ms=0, timeout_rate=1.0, hang_sec=1.5), timeout_sec=1)
+
+        with self.assertRaises(Exception) as ctx:
+            provider.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(classify_ai_failure(str(ctx.exception))[0], "timeout")
+
+    def test_faults_and_latency_are_deterministic_per_seed(self) -> None:
+        config = FakeLLMConfig(latency_p50_ms=200, latency_p95_ms=800, rate_limit_rate=0.3, seed=7)
+        bodies = [json.dumps({"n": idx}).encode() for idx in range(40)] * 2
+        first = FakeLLMServer(config)
+        second = FakeLLMServer(config)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+
+        outcomes = [first._outcome(body) for body in bodies]
+        self.assertEqual(outcomes, [second._outcome(body) for body in bodies])
+        # 같은 본문의 재시도는 다른 결과를 뽑는다.
+        self.assertNotEqual(outcomes[:40], outcomes[40:])
+        latencies = sorted(outcome.latency_sec for outcome in outcomes)
+        self.assertLess(abs(latencies[len(latencies) // 2] - 0.2), 0.12)
+
+    def test_usage_follows_chars_per_token_and_cached_ratio(self) -> None:
+        server = FakeLLMServer(FakeLLMConfig(chars_per_token=4.0, cached_input_ratio=0.5))
+        self.addCleanup(server.close)
+
+        self.assertEqual(server._usage("s" * 40, "u" * 40, "o" * 8), (20, 2, 5))
+
+
+class FakeProviderFactoryTests(unittest.TestCase):
+    def test_fake_provider_targets_explicit_base_url(self) -> None:
+        settings = Settings(ai_provider="fake", ai_fake_wire="gemini", ai_circuit_breaker_enabled=False)
+
+        provider = factory._build_provider(settings, "fake@http://127.0.0.1:9")
+        self.assertIsInstance(provider, GeminiProvider)
+        self.assertEqual(provider.base_url, "http://127.0.0.1:9")
+
+        openai = factory._build_provider(Settings(ai_fake_base_url="http://127.0.0.1:9/"), "fake")
+        self.assertIsInstance(openai, OpenAIProvider)
+        self.assertEqual(openai.base_url, "http://127.0.0.1:9/v1")
+
+    def test_fake_payload_covers_reasoning(self) -> None:
+        system_prompt, user_prompt = gs._build_reasoning_prompts(_REASONING_REQUEST)
+
+        payload = fake_payload(system_prompt, user_prompt)
+
+        self.assertIn("파이썬 리스트", payload["why_this_topic"])
+
+
+if __name__ == "__main__":
+    unittest.main()
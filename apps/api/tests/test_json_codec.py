@@ -0,0 +1,41 @@
+from datetime import date
+import json
+import unittest
+
+from app.core import json_codec
+from app.core.json_codec import FastJSONResponse
+from app.domain.ai.providers.common import parse_json_text
+from app.services.compat.pipeline_runtime import classify_ai_failure
+
+
+class JsonCodecTests(unittest.TestCase):
+    def test_encodes_compact_utf8_same_as_stdlib(self) -> None:
+        value = {"title": "반복문", "items": [1, 2.5, None, True], "nested": {"k": "v"}}
+
+        encoded = json_codec.dumps(value)
+
+        self.assertEqual(encoded, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        self.assertEqual(json_codec.loads(encoded), value)
+        self.assertEqual(json_codec.dumps({1: "a"}), b'{"1":"a"}')
+        self.assertEqual(json_codec.loads(json_codec.dumps(2**70)), 2**70)
+
+    def test_decode_error_is_stdlib_error_and_classified_as_schema(self) -> None:
+        with self.assertRaises(json.JSONDecodeError) as ctx:
+            json_codec.loads(b'{"topics": [')
+
+        self.assertIn("json", str(ctx.exception).lower())
+        with self.assertRaises(ValueError):
+            parse_json_text('topics: none')
+        self.assertEqual(classify_ai_failure(str(ctx.exception))[0], "schema_mismatch")
+
+    def test_response_renders_with_codec_and_falls_back_to_fastapi_encoder(self) -> None:
+        plain = FastJSONResponse({"ok": True, "name": "파이썬"})
+        fallback = FastJSONResponse({"tags": {"loop"}, "at": date(2026, 3, 1)})
+
+        self.assertEqual(plain.body, '{"ok":true,"name":"파이썬"}'.encode("utf-8"))
+        self.assertEqual(plain.headers["content-type"], "application/json")
+        self.assertEqual(json.loads(fallback.body), {"tags": ["loop"], "at": "2026-03-01"})
+
+
+if __name__ == "__main__":
+    unittest.main()
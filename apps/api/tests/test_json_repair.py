@@ -0,0 +1,104 @@
+import json
+import unittest
+
+from app.domain.ai.providers import json_repair
+from app.domain.ai.providers.base import AIResponseMeta, AITransportTiming, StructuredAIResponse
+from app.domain.ai.providers.common import parse_json_text
+from app.domain.ai.providers.json_repair import JSONRepairStats
+from app.domain.ai.providers.openai import OpenAIProvider
+from app.domain.ai.providers.transport import TransportResponse
+from app.services.compat.pipeline_runtime import RetryPolicy, run_ai_with_retry, serialize_ai_response_meta
+
+
+class _FakeTransport:
+    def __init__(self, content: str) -> None:
+        self._body = json.dumps({"model": "gpt-4o-mini", "choices": [{"message": {"content": content}}]}).encode()
+
+    def request(self, method: str, url: str, **_kwargs) -> TransportResponse:
+        return TransportResponse(status=200, reason="OK", headers={}, body=self._body, timing=AITransportTiming())
+
+
+def _response(repairs: tuple[str, ...] = ()) -> StructuredAIResponse:
+    return StructuredAIResponse(data={"ok": True}, meta=AIResponseMeta(provider="fake", model="m", repairs=repairs))
+
+
+class _StatsIsolation(unittest.TestCase):
+    def setUp(self) -> None:
+        original = json_repair._repair_stats
+        self.addCleanup(setattr, json_repair, "_repair_stats", original)
+        json_repair._repair_stats = JSONRepairStats()
+
+
+class ParseJsonRepairTests(_StatsIsolation):
+    def _parse(self, text: str) -> tuple[dict, list[str]]:
+        repairs: list[str] = []
+        return parse_json_text(text, repairs=repairs), repairs
+
+    def test_extracts_object_and_fixes_commas_and_control_characters(self) -> None:
+        data, repairs = self._parse('결과입니다:\n```json\n{"tags": ["a", "b",], "body": "첫 줄\n둘째 줄"}\n```\n참고하세요.')
+
+        self.assertEqual(data, {"tags": ["a", "b"], "body": "첫 줄\n둘째 줄"})
+        self.assertEqual(repairs, ["surrounding_text", "trailing_comma", "control_char"])
+
+    def test_truncated_object_keeps_only_whole_items(self) -> None:
+        data, repairs = self._parse('{"title": "반복문", "sections": [{"t": 1, "o": ["x"]}, {"t": 2, "o": ["x", "y')
+
+        self.assertEqual(data, {"title": "반복문", "sections": [{"t": 1, "o": ["x"]}]})
+        self.assertEqual(repairs, ["truncated"])
+
+    def test_unrecoverable_text_raises_original_decode_error(self) -> None:
+        for text in ('{"assistant": "답변이 잘', "JSON을 만들 수 없습니다."):
+            with self.assertRaises(json.JSONDecodeError):
+                parse_json_text(text)
+
+        _, repairs = self._parse('{"a": "x,}"}')
+        stats = json_repair.json_repair_stats()
+        self.assertEqual(repairs, [])
+        self.assertEqual((stats["parsed"], stats["repaired"], stats["unrecoverable"]), (3, 0, 2))
+
+    def test_provider_reports_repairs_in_response_meta(self) -> None:
+        provider = OpenAIProvider(
+            api_key="test-key",
+            model="gpt-4o-mini",
+            base_url="https://example.com/v1",
+            transport=_FakeTransport('다음과 같습니다 {"answer": "ok"}'),
+        )
+
+        response = provider.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(response.data, {"answer": "ok"})
+        self.assertEqual(serialize_ai_response_meta(response.meta)["json_repairs"], ["surrounding_text"])
+
+
+class RepairPolicyTests(_StatsIsolation):
+    def test_accepted_repair_counts_as_saved_retry(self) -> None:
+        calls: list[int] = []
+
+        def call(attempt: int) -> StructuredAIResponse:
+            calls.append(attempt)
+            return _response(("truncated",))
+
+        result, attempt_count = run_ai_with_retry(call, pipeline="content_generate", retry_policy=RetryPolicy())
+
+        self.assertEqual((calls, attempt_count), ([1], 1))
+        self.assertEqual(result.meta.repairs, ("truncated",))
+        self.assertEqual(json_repair.json_repair_stats()["retries_saved"], 1)
+
+    def test_rejected_repair_regenerates_as_schema_mismatch(self) -> None:
+        policy = RetryPolicy().with_overrides({"rejected_repairs": ["truncated"]})
+        calls: list[int] = []
+
+        def call(attempt: int) -> StructuredAIResponse:
+            calls.append(attempt)
+            return _response(("truncated",) if attempt == 1 else ("trailing_comma",))
+
+        result, attempt_count = run_ai_with_retry(call, pipeline="content_generate", retry_policy=policy)
+
+        self.assertEqual((calls, attempt_count), ([1, 2], 2))
+        self.assertEqual(result.meta.repairs, ("trailing_comma",))
+        stats = json_repair.json_repair_stats()
+        self.assertEqual((stats["rejected"], stats["retries_saved"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
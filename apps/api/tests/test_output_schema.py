@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.output_schema import OutputSpec, strict_json_schema
+from app.domain.ai.providers.gemini import GeminiProvider
+from app.domain.ai.providers.openai import OpenAIProvider
+from app.services.compat import generation_service as gs
+from app.services.compat import pipeline_runtime
+from app.services.compat.pipeline_runtime import AttemptLatencies, PipelineFailure, run_ai_with_retry
+
+
+class OutputSchemaTests(unittest.TestCase):
+    def test_strict_schema_inlines_models_and_requires_every_field(self) -> None:
+        schema = strict_json_schema(gs.CurriculumOutput)
+        topic = schema["properties"]["topics"]["items"]
+
+        self.assertNotIn("$defs", json.dumps(schema))
+        self.assertEqual(schema["required"], ["title", "topics", "total_estimated_hours", "summary"])
+        self.assertFalse(topic["additionalProperties"])
+        self.assertEqual(topic["properties"]["estimated_minutes"], {"type": "integer"})
+
+        spec = OutputSpec.from_model("curriculum_generate", gs.CurriculumOutput, max_output_tokens=0)
+        self.assertEqual(spec.gemini_schema["properties"]["topics"]["items"]["type"], "OBJECT")
+        self.assertEqual(spec.gemini_schema["propertyOrdering"], ["title", "topics", "total_estimated_hours", "summary"])
+        self.assertNotIn("additionalProperties", json.dumps(spec.gemini_schema))
+        self.assertIsNone(spec.max_output_tokens)
+
+    def test_providers_send_pipeline_schema_and_output_cap(self) -> None:
+        openai = OpenAIProvider(api_key="k", model="gpt-4o-mini", base_url="https://example.com/v1")
+        gemini = GeminiProvider(api_key="k", model="gemini-2.0-flash")
+
+        with ai_call_context(pipeline="curriculum_sections"):
+            openai_payload = json.loads(openai._encode_payload(system_prompt="s", user_prompt="u"))
+            gemini_config = json.loads(gemini._encode_payload(system_prompt="s", user_prompt="u"))["generationConfig"]
+        plain_payload = json.loads(openai._encode_payload(system_prompt="s", user_prompt="u"))
+
+        response_format = openai_payload["response_format"]
+        self.assertEqual((response_format["type"], response_format["json_schema"]["strict"]), ("json_schema", True))
+        self.assertEqual(
+            response_format["json_schema"]["schema"]["properties"]["sections"]["items"]["properties"]["type"]["enum"],
+            ["concept", "example", "check", "summary"],
+        )
+        self.assertEqual(openai_payload["max_completion_tokens"], gs.settings.ai_max_output_tokens["curriculum_sections"])
+        self.assertEqual(gemini_config["responseSchema"]["properties"]["sections"]["type"], "ARRAY")
+        self.assertEqual(gemini_config["maxOutputTokens"], gs.settings.ai_max_output_tokens["curriculum_sections"])
+        self.assertEqual(plain_payload["response_format"], {"type": "json_object"})
+        self.assertNotIn("max_completion_tokens", plain_payload)
+
+    def test_failed_attempts_are_counted_by_kind(self) -> None:
+        original = pipeline_runtime._attempt_latencies
+        self.addCleanup(setattr, pipeline_runtime, "_attempt_latencies", original)
+        pipeline_runtime._attempt_latencies = AttemptLatencies()
+
+        def call(_attempt: int) -> dict:
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+        with self.assertRaises(PipelineFailure):
+            run_ai_with_retry(call, pipeline="curriculum_sections", max_attempts=2)
+
+        stats = pipeline_runtime.attempt_latency_stats()["curriculum_sections"]
+        self.assertEqual(stats["failures"], {"schema_mismatch": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import unittest
+
+from app.domain.ai.call_context import ai_call_context
+from app.domain.ai.prompt_cache import PromptCacheStats, prompt_cache_stats, reset_prompt_cache_stats
+from app.domain.ai.providers.base import AIUsageMeta
+from app.domain.ai.providers.gemini import GeminiProvider, _GeminiProviderBase
+from app.domain.ai.providers.gemini_cache import GeminiContextCache
+from app.domain.ai.providers.transport import PooledHTTPTransport
+from app.domain.ai.service import AIService
+from app.services.compat import generation_service as gs
+
+try:
+    from tests.ai_fakes import FakeClock, ScriptedProvider
+except ModuleNotFoundError:
+    from ai_fakes import FakeClock, ScriptedProvider
+
+
+class _GeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[tuple[str, str, dict]] = []
+    missing_handles: set[str] = set()
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?", 1)[0]
+        type(self).requests.append((self.command, path, payload))
+        if path == "/v1beta/cachedContents":
+            self._reply(200, {"name": f"cachedContents/c{len(self.requests)}"})
+        elif self.command == "PATCH":
+            self._reply(200, {"name": path.removeprefix("/v1beta/")})
+        elif payload.get("cachedContent") in type(self).missing_handles:
+            self._reply(404, {"error": {"message": "CachedContent not found"}})
+        else:
+            cached = 900 if "cachedContent" in payload else 0
+            self._reply(200, {
+                "candidates": [{"content": {"parts": [{"text": '{"ok": true}'}]}}],
+                "usageMetadata": {"promptTokenCount": 1000, "cachedContentTokenCount": cached},
+            })
+
+    do_POST = _handle  # noqa: N815 - http.server naming
+    do_PATCH = _handle  # noqa: N815 - http.server naming
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class GeminiPayloadTests(unittest.TestCase):
+    def test_system_prompt_goes_to_system_instruction(self) -> None:
+        payload = json.loads(_GeminiProviderBase._encode_payload(system_prompt="규칙", user_prompt="질문"))
+
+        self.assertEqual(payload["systemInstruction"], {"parts": [{"text": "규칙"}]})
+        self.assertEqual(payload["contents"][0]["parts"], [{"text": "질문"}])
+
+    def test_cached_content_replaces_system_instruction(self) -> None:
+        payload = json.loads(_GeminiProviderBase._encode_payload(
+            system_prompt="규칙",
+            user_prompt="질문",
+            cached_content="cachedContents/abc",
+        ))
+
+        self.assertEqual(payload["cachedContent"], "cachedContents/abc")
+        self.assertNotIn("systemInstruction", payload)
+
+
+class StablePromptPrefixTests(unittest.TestCase):
+    def test_system_prompts_do_not_depend_on_request_or_retry(self) -> None:
+        first = gs.GenerateRequest(language="python", topic="리스트")
+        second = gs.GenerateRequest(language="java", topic="스트림", difficulty="advanced")
+        self.assertEqual(
+            gs._build_generate_prompts(first)[0],
+            gs._build_generate_prompts(second, retry_mode=True)[0],
+        )
+
+        curriculum = gs.CurriculumGenerateRequest(goal="백엔드 개발", level="beginner")
+        system_prompt, user_prompt = gs._build_curriculum_prompts(curriculum, retry_mode=True)
+        self.assertEqual(system_prompt, gs._CURRICULUM_SYSTEM_PROMPT)
+        self.assertIn("이전 시도는", user_prompt)
+
+        reasoning_payload = gs.ReasoningRequest(
+            topic="파이썬 리스트",
+            curriculumGoal="웹 서비스 백엔드 개발",
+            learnerLevel="beginner",
+            language="Python",
+        )
+        system_prompt, user_prompt = gs._build_sections_prompts(reasoning_payload, {}, retry_mode=True)
+        self.assertEqual(system_prompt, gs._SECTIONS_SYSTEM_PROMPT)
+        self.assertTrue(user_prompt.startswith("해석 규칙:"))
+
+
+class GeminiContextCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _GeminiHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        _GeminiHandler.requests = []
+        _GeminiHandler.missing_handles = set()
+        self.clock = FakeClock(now=0.0)
+        self.cache = GeminiContextCache(ttl_sec=600, min_chars=10, refresh_margin_sec=60, clock=self.clock)
+        transport = PooledHTTPTransport()
+        self.addCleanup(transport.close)
+        self.provider = GeminiProvider(
+            api_key="test-key",
+            model="gemini-test",
+            transport=transport,
+            base_url=self.base_url,
+            context_cache=self.cache,
+        )
+
+    def test_creates_handle_once_then_reuses_it(self) -> None:
+        system_prompt = "긴 시스템 프롬프트" * 4
+        first = self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="a")
+        second = self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="b")
+
+        methods = [(method, path) for method, path, _ in _GeminiHandler.requests]
+        self.assertEqual(methods[0], ("POST", "/v1beta/cachedContents"))
+        self.assertEqual(methods.count(("POST", "/v1beta/cachedContents")), 1)
+        create_payload = _GeminiHandler.requests[0][2]
+        self.assertEqual(create_payload["model"], "models/gemini-test")
+        self.assertEqual(create_payload["ttl"], "600s")
+        self.assertEqual(_GeminiHandler.requests[-1][2]["cachedContent"], "cachedContents/c1")
+        self.assertEqual(first.meta.usage.cached_input_tokens, 900)
+        self.assertEqual(second.meta.usage.cached_input_tokens, 900)
+        self.assertEqual(self.cache.stats()["creates"], 1)
+
+    def test_refreshes_ttl_near_expiry(self) -> None:
+        system_prompt = "긴 시스템 프롬프트" * 4
+        self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="a")
+        self.clock.now = 550.0
+
+        self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="b")
+
+        self.assertIn(("PATCH", "/v1beta/cachedContents/c1", {"ttl": "600s"}), _GeminiHandler.requests)
+        self.assertEqual(self.cache.stats()["refreshes"], 1)
+        self.assertEqual(self.cache.plan("gemini-test", system_prompt).action, "use")
+
+    def test_missing_handle_falls_back_inline_and_is_dropped(self) -> None:
+        system_prompt = "긴 시스템 프롬프트" * 4
+        self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="a")
+        _GeminiHandler.missing_handles = {"cachedContents/c1"}
+
+        response = self.provider.generate_json_with_meta(system_prompt=system_prompt, user_prompt="b")
+
+        self.assertEqual(response.data, {"ok": True})
+        self.assertEqual(_GeminiHandler.requests[-1][2]["systemInstruction"], {"parts": [{"text": system_prompt}]})
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_short_prompts_stay_inline(self) -> None:
+        self.provider.generate_json_with_meta(system_prompt="짧음", user_prompt="a")
+
+        self.assertEqual(len(_GeminiHandler.requests), 1)
+        self.assertIn("systemInstruction", _GeminiHandler.requests[0][2])
+
+
+class PromptCacheStatsTests(unittest.TestCase):
+    def test_hit_ratios_per_pipeline(self) -> None:
+        stats = PromptCacheStats()
+        stats.record("sections", AIUsageMeta(input_tokens=1000, cached_input_tokens=800))
+        stats.record("sections", AIUsageMeta(input_tokens=1000, cached_input_tokens=0))
+        stats.record("sections", None)
+
+        self.assertEqual(stats.stats()["sections"], {
+            "calls": 2,
+            "hit_calls": 1,
+            "input_tokens": 2000,
+            "cached_input_tokens": 800,
+            "token_hit_ratio": 0.4,
+            "call_hit_ratio": 0.5,
+        })
+
+    def test_service_records_usage_under_current_pipeline(self) -> None:
+        reset_prompt_cache_stats()
+        self.addCleanup(reset_prompt_cache_stats)
+        service = AIService(primary=ScriptedProvider(
+            data={},
+            usages=[AIUsageMeta(input_tokens=1000, cached_input_tokens=tokens) for tokens in (0, 500)],
+        ))
+
+        with ai_call_context(pipeline="content_generate"):
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+            service.generate_json_with_meta(system_prompt="s", user_prompt="u")
+
+        self.assertEqual(prompt_cache_stats()["content_generate"]["token_hit_ratio"], 0.25)
+        self.assertIn("prompt_cache", gs.ai_runtime_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import unittest
+
+from app.domain.ai.providers.async_transport import AsyncPooledHTTPTransport
+from app.domain.ai.providers.openai import AsyncOpenAIProvider
+from app.domain.ai.providers.streaming import (
+    JSONStringFieldExtractor,
+    StreamingJSONItemParser,
+    iter_sse_data,
+)
+
+
+def _feed_in_pieces(extractor: JSONStringFieldExtractor, text: str, size: int) -> str:
+    return "".join(extractor.feed(text[idx:idx + size]) for idx in range(0, len(text), size))
+
+
+class JSONStringFieldExtractorTests(unittest.TestCase):
+    def test_extracts_field_across_arbitrary_chunk_boundaries(self) -> None:
+        raw = json.dumps({"note": {"assistant": "nested"}, "assistant": 'say "hi"\n탭\t😀 끝'})
+        for size in (1, 2, 3, 7):
+            extractor = JSONStringFieldExtractor("assistant")
+            self.assertEqual(_feed_in_pieces(extractor, raw, size), 'say "hi"\n탭\t😀 끝')
+            self.assertTrue(extractor.complete)
+
+    def test_decodes_unicode_escapes_including_surrogate_pairs(self) -> None:
+        raw = json.dumps({"assistant": "안녕 😀"}, ensure_ascii=True)
+        extractor = JSONStringFieldExtractor("assistant")
+        self.assertEqual(_feed_in_pieces(extractor, raw, 1), "안녕 😀")
+
+    def test_ignores_code_fence_and_non_string_values(self) -> None:
+        extractor = JSONStringFieldExtractor("assistant")
+        emitted = extractor.feed('```json\n{"assistant": ["x"], "other": "y"}\n```')
+        self.assertEqual(emitted, "")
+        self.assertFalse(extractor.complete)
+
+    def test_iter_sse_data_joins_multiline_events(self) -> None:
+        async def lines():
+            for line in [": ping", "data: a", "data: b", "", "event: x", "data:c", ""]:
+                yield line
+
+        async def collect() -> list[str]:
+            return [item async for item in iter_sse_data(lines())]
+
+        self.assertEqual(asyncio.run(collect()), ["a\nb", "c"])
+
+
+class StreamingJSONItemParserTests(unittest.TestCase):
+    def test_emits_each_finished_item_across_chunk_boundaries(self) -> None:
+        document = {
+            "title": "리스트 [기초]",
+            "sections": [
+                {"type": "concept", "body": "괄호 } ] 와 \\\" 이스케이프", "options": ["a", "b"]},
+                {"type": "check", "nested": {"sections": [1, 2]}},
+            ],
+            "quiz": ["q1", 2, None],
+            "meta": {"topics": [{"x": 1}]},
+        }
+        raw = "```json\n" + json.dumps(document, ensure_ascii=False, indent=2) + "\n```"
+        for size in (1, 5, 64):
+            parser = StreamingJSONItemParser(["sections", "quiz", "topics"])
+            events = []
+            for idx in range(0, len(raw), size):
+                events.extend(parser.feed(raw[idx:idx + size]))
+
+            self.assertEqual(
+                [(event.field, event.index, event.value) for event in events],
+                [
+                    ("sections", 0, document["sections"][0]),
+                    ("sections", 1, document["sections"][1]),
+                    ("quiz", 0, "q1"),
+                    ("quiz", 1, 2),
+                    ("quiz", 2, None),
+                ],
+            )
+            skeleton = parser.close()
+            self.assertEqual(skeleton["sections"], [])
+            self.assertEqual(skeleton["title"], "리스트 [기초]")
+            self.assertEqual(skeleton["meta"], {"topics": [{"x": 1}]})
+            self.assertEqual(parser.seen_item_fields, {"sections", "quiz"})
+
+    def test_truncated_stream_keeps_finished_items(self) -> None:
+        parser = StreamingJSONItemParser(["topics"])
+        events = parser.feed('{"goal": "기초", "topics": [{"title": "변수"}, {"title": "조')
+        self.assertEqual([event.value for event in events], [{"title": "변수"}])
+        # 끝나지 않은 항목만 버리고 skeleton을 닫는다.
+        self.assertEqual(parser.close(), {"goal": "기초", "topics": []})
+        self.assertEqual(parser.repairs, ("truncated",))
+
+        empty = StreamingJSONItemParser(["topics"])
+        empty.feed('{"go')
+        with self.assertRaises(ValueError) as ctx:
+            empty.close()
+        self.assertIn("streaming_json_incomplete", str(ctx.exception))
+
+    def test_trailing_commas_are_repaired_in_items_and_skeleton(self) -> None:
+        parser = StreamingJSONItemParser(["topics"])
+        events = parser.feed('{"topics": [{"title": "변수",}, {"title": "조건"},], "goal": "기초",}')
+        self.assertEqual([event.value for event in events], [{"title": "변수"}, {"title": "조건"}])
+        self.assertEqual(parser.close(), {"topics": [], "goal": "기초"})
+        self.assertEqual(parser.repairs, ("trailing_comma",))
+
+    def test_completed_members_are_readable_mid_stream(self) -> None:
+        parser = StreamingJSONItemParser(["tags"])
+        parser.feed('{"tags": ["a"], "goal": "반복문 {,}", "hours": 3')
+        self.assertEqual(parser.completed_keys, ["tags", "goal"])
+        self.assertEqual(parser.completed(), {"tags": [], "goal": "반복문 {,}"})
+
+        parser.feed(', "meta": {"k": 1}}')
+        self.assertEqual(parser.completed_keys, ["tags", "goal", "hours", "meta"])
+        self.assertEqual(parser.completed(), parser.close())
+
+    def test_oversized_item_is_rejected(self) -> None:
+        parser = StreamingJSONItemParser(["sections"], max_item_chars=16)
+        with self.assertRaises(ValueError) as ctx:
+            parser.feed('{"sections": [{"body": "' + "x" * 40 + '"}]}')
+        self.assertIn("streaming_json_item_too_large", str(ctx.exception))
+
+
+class _OpenAIStreamingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length))
+        content = json.dumps({"assistant": "오늘은 복습부터 해요."}, ensure_ascii=False)
+        events = [
+            {"model": request["model"], "choices": [{"delta": {"content": content[idx:idx + 5]}}]}
+            for idx in range(0, len(content), 5)
+        ]
+        events.append({
+            "model": request["model"],
+            "choices": [],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 6, "total_tokens": 17},
+        })
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        frames = [f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events]
+        frames.append("data: [DONE]\n\n")
+        for frame in frames:
+            encoded = frame.encode("utf-8")
+            self.wfile.write(f"{len(encoded):x}\r\n".encode("ascii") + encoded + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.server.last_request = request
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class OpenAIStreamingProviderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIStreamingHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_stream_yields_deltas_and_final_usage_meta(self) -> None:
+        transport = AsyncPooledHTTPTransport()
+        provider = AsyncOpenAIProvider(
+            api_key="test-key",
+            model="gpt-4o-mini",
+            base_url=self.base_url,
+            transport=transport,
+        )
+
+        async def run():
+            chunks = [
+                chunk
+                async for chunk in provider.stream_json_text(system_prompt="s", user_prompt="u")
+            ]
+            idle = transport.stats()["idle_connections"]
+            transport.close()
+            return chunks, idle
+
+        chunks, idle = asyncio.run(run())
+
+        text = "".join(chunk.text for chunk in chunks)
+        self.assertEqual(json.loads(text), {"assistant": "오늘은 복습부터 해요."})
+        self.assertGreater(len(chunks), 3)
+        self.assertIsNone(chunks[0].meta)
+        final_meta = chunks[-1].meta
+        self.assertIsNotNone(final_meta)
+        self.assertEqual(final_meta.usage.total_tokens, 17)
+        self.assertIsNotNone(final_meta.timing.read_ms)
+        self.assertTrue(self.server.last_request["stream"])
+        self.assertEqual(self.server.last_request["stream_options"], {"include_usage": True})
+        self.assertEqual(sum(idle.values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
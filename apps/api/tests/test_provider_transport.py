@@ -0,0 +1,93 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import unittest
+
+from app.domain.ai.providers.transport import PooledHTTPTransport, TransportHTTPError
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.path.startswith("/limited"):
+            body = b'{"error":"rate limited"}'
+            self.send_response(429, "Too Many Requests")
+            self.send_header("Retry-After", "3")
+        else:
+            body = b'{"ok":true}'
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class PooledHTTPTransportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_second_request_reuses_keep_alive_connection(self) -> None:
+        transport = PooledHTTPTransport(max_connections_per_host=2)
+        self.addCleanup(transport.close)
+
+        first = transport.request("POST", f"{self.base_url}/ok", body=b"{}", timeout=5)
+        second = transport.request("POST", f"{self.base_url}/ok", body=b"{}", timeout=5)
+
+        self.assertEqual(first.body, b'{"ok":true}')
+        self.assertFalse(first.timing.connection_reused)
+        self.assertTrue(second.timing.connection_reused)
+        self.assertEqual(second.timing.connect_ms, 0.0)
+        self.assertIsNotNone(second.timing.ttfb_ms)
+        self.assertEqual(transport.stats()["created"], 1)
+
+    def test_idle_connections_are_evicted(self) -> None:
+        transport = PooledHTTPTransport(idle_timeout_sec=0.01)
+        self.addCleanup(transport.close)
+
+        transport.request("POST", f"{self.base_url}/ok", body=b"{}", timeout=5)
+        time.sleep(0.05)
+        response = transport.request("POST", f"{self.base_url}/ok", body=b"{}", timeout=5)
+
+        self.assertFalse(response.timing.connection_reused)
+        self.assertEqual(transport.stats()["evicted"], 1)
+
+    def test_prewarm_opens_pooled_connections(self) -> None:
+        transport = PooledHTTPTransport(max_connections_per_host=2)
+        self.addCleanup(transport.close)
+
+        opened = transport.prewarm(self.base_url, connections=3)
+        response = transport.request("POST", f"{self.base_url}/ok", body=b"{}", timeout=5)
+
+        self.assertEqual(opened, 2)
+        self.assertTrue(response.timing.connection_reused)
+
+    def test_error_status_raises_with_headers(self) -> None:
+        transport = PooledHTTPTransport()
+        self.addCleanup(transport.close)
+
+        with self.assertRaises(TransportHTTPError) as ctx:
+            transport.request("POST", f"{self.base_url}/limited", body=b"{}", timeout=5)
+
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertEqual(ctx.exception.headers.get("retry-after"), "3")
+        self.assertIn("429", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,30 +2,32 @@ import json
 import unittest
 from unittest.mock import patch
 
-from app.domain.ai.providers.base import AIAttemptError
+from app.domain.ai.providers.base import AIAttemptError, AITransportTiming
 from app.domain.ai.providers.gemini import GeminiProvider
 from app.domain.ai.providers.openai import OpenAIProvider
+from app.domain.ai.providers.transport import TransportResponse
 
 
-class _FakeHTTPResponse:
+class _FakeTransport:
     def __init__(self, body: str) -> None:
         self._body = body.encode("utf-8")
+        self.calls: list[str] = []
 
-    def read(self) -> bytes:
-        return self._body
-
-    def __enter__(self) -> "_FakeHTTPResponse":
-        return self
-
-    def __exit__(self, exc_type, exc, tb) -> bool:
-        return False
+    def request(self, method: str, url: str, **_kwargs) -> TransportResponse:
+        self.calls.append(url)
+        return TransportResponse(
+            status=200,
+            reason="OK",
+            headers={},
+            body=self._body,
+            timing=AITransportTiming(connect_ms=0.0, ttfb_ms=12.5, read_ms=1.5, connection_reused=True),
+        )
 
 
 class ProviderUsageMetaTests(unittest.TestCase):
     @patch("app.domain.ai.providers.openai.parse_json_text", side_effect=ValueError("expecting value"))
-    @patch("app.domain.ai.providers.openai.request.urlopen")
-    def test_openai_preserves_usage_meta_when_json_parse_fails(self, mock_urlopen, _mock_parse_json) -> None:
-        mock_urlopen.return_value = _FakeHTTPResponse(json.dumps({
+    def test_openai_preserves_usage_meta_when_json_parse_fails(self, _mock_parse_json) -> None:
+        transport = _FakeTransport(json.dumps({
             "model": "gpt-4o-mini",
             "choices": [
                 {
@@ -47,6 +49,7 @@ class ProviderUsageMetaTests(unittest.TestCase):
             api_key="test-key",
             model="gpt-4o-mini",
             base_url="https://example.com/v1",
+            transport=transport,
         )
 
         with self.assertRaises(AIAttemptError) as context:
@@ -64,9 +67,8 @@ class ProviderUsageMetaTests(unittest.TestCase):
         self.assertEqual(context.exception.meta.usage.cached_input_tokens, 20)
 
     @patch("app.domain.ai.providers.gemini.parse_json_text", side_effect=ValueError("expecting value"))
-    @patch("app.domain.ai.providers.gemini.request.urlopen")
-    def test_gemini_preserves_usage_meta_when_json_parse_fails(self, mock_urlopen, _mock_parse_json) -> None:
-        mock_urlopen.return_value = _FakeHTTPResponse(json.dumps({
+    def test_gemini_preserves_usage_meta_when_json_parse_fails(self, _mock_parse_json) -> None:
+        transport = _FakeTransport(json.dumps({
             "candidates": [
                 {
                     "content": {
@@ -86,6 +88,7 @@ class ProviderUsageMetaTests(unittest.TestCase):
         provider = GeminiProvider(
             api_key="test-key",
             model="gemini-2.0-flash",
+            transport=transport,
         )
 
         with self.assertRaises(AIAttemptError) as context:
@@ -101,6 +104,7 @@ class ProviderUsageMetaTests(unittest.TestCase):
         self.assertEqual(context.exception.meta.usage.output_tokens, 50)
         self.assertEqual(context.exception.meta.usage.total_tokens, 250)
         self.assertEqual(context.exception.meta.usage.cached_input_tokens, 40)
+        self.assertEqual(context.exception.meta.timing.ttfb_ms, 12.5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+import unittest
+
+from app.api.public import chat
+from app.domain.ai import token_estimator
+from app.domain.ai.providers.base import AIResponseMeta, AIUsageMeta, StructuredAIResponse
+from app.domain.ai.service import AIService
+from app.domain.ai.token_estimator import PromptBudgets, TokenEstimator, token_features
+from app.services.compat.pipeline_runtime import serialize_ai_response_meta
+
+
+class _UsageProvider:
+    model = "m"
+
+    def __init__(self, input_tokens: int) -> None:
+        self.input_tokens = input_tokens
+
+    def generate_json_with_meta(self, *, system_prompt: str, user_prompt: str) -> StructuredAIResponse:
+        return StructuredAIResponse(
+            data={"ok": True},
+            meta=AIResponseMeta(provider="openai", model="m", usage=AIUsageMeta(input_tokens=self.input_tokens)),
+        )
+
+
+class _EstimatorIsolation(unittest.TestCase):
+    def setUp(self) -> None:
+        for name in ("_shared_estimator", "_prompt_budgets"):
+            self.addCleanup(setattr, token_estimator, name, getattr(token_estimator, name))
+        token_estimator._shared_estimator = TokenEstimator(default_provider="openai")
+        token_estimator._prompt_budgets = PromptBudgets()
+
+
+class TokenEstimatorTests(_EstimatorIsolation):
+    def test_calibration_learns_provider_weights_for_korean_and_ascii(self) -> None:
+        estimator = TokenEstimator(default_provider="openai")
+        prompts = [("규칙을 지키세요." * repeat, "for i in range(10): print(i)\n" * (12 - repeat)) for repeat in range(1, 11)]
+
+        def actual(system: str, user: str) -> int:
+            ascii_pieces, non_ascii = estimator.estimate_prompt(system, user).features
+            return round(ascii_pieces * 0.8 + non_ascii * 0.6)
+
+        before = estimator.estimate_prompt(*prompts[0]).tokens
+        for _ in range(3):
+            for system, user in prompts:
+                estimator.observe("openai", estimator.estimate_prompt(system, user), actual(system, user))
+
+        after = estimator.estimate_prompt(*prompts[0]).tokens
+        target = actual(*prompts[0])
+        self.assertGreater(abs(before - target) / target, 0.2)
+        self.assertLess(abs(after - target) / target, 0.05)
+        stats = estimator.stats()["openai"]
+        self.assertEqual(stats["samples"], 30)
+        self.assertLess(stats["non_ascii_weight"], 0.8)
+        # 보정하지 않은 공급자는 기본 가중치를 그대로 쓴다.
+        self.assertEqual(estimator.estimate("가나다", provider="gemini"), 3)
+        self.assertEqual(token_features("for x in 값들:\n"), (5, 2))
+
+    def test_chat_prompt_drops_history_and_context_to_fit_budget(self) -> None:
+        token_estimator._prompt_budgets = PromptBudgets({"chat_generate": 900})
+        payload = chat.ChatRequest(
+            chatType="tutor",
+            messages=[{"role": "user", "content": f"{idx}번째 질문입니다. " * 20} for idx in range(6)],
+            context={"contentBody": "반복문 본문 설명 " * 300, "codeExamples": "print(i)\n" * 200},
+        )
+
+        system_prompt, user_prompt = chat._build_chat_prompts(payload, "반복문이 뭐예요?")
+
+        self.assertLessEqual(token_estimator.get_shared_token_estimator().estimate_prompt(system_prompt, user_prompt).tokens, 900)
+        self.assertNotIn("0번째 질문", user_prompt)
+        self.assertIn("user_message=반복문이 뭐예요?", user_prompt)
+        self.assertEqual(
+            token_estimator.token_estimator_stats()["budgets"]["chat_generate"],
+            {"budget": 900, "prompts": 1, "shrunk": 1, "over_budget": 0},
+        )
+
+    def test_response_meta_carries_estimate_next_to_actual_usage(self) -> None:
+        service = AIService(primary=_UsageProvider(input_tokens=40))
+
+        response = service.generate_json_with_meta(system_prompt="JSON만 반환하세요.", user_prompt="반복문 설명")
+
+        usage = serialize_ai_response_meta(response.meta)["usage"]
+        self.assertEqual(usage, {"input_tokens": 40, "estimated_input_tokens": 21})
+        self.assertEqual(token_estimator.token_estimator_stats()["providers"]["openai"]["samples"], 1)
+        # 실제보다 적게 잡은 만큼 다음 추정이 올라간다.
+        estimate = token_estimator.get_shared_token_estimator().estimate_prompt("JSON만 반환하세요.", "반복문 설명")
+        self.assertGreater(estimate.tokens, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
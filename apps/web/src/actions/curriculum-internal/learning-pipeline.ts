@@ -1,13 +1,15 @@
 'use server';
 
 import { createClient } from '@/lib/supabase/server';
-import { generateReasoning, generateSections } from '@/lib/ai/client';
+import { generateLesson, generateSections } from '@/lib/ai/client';
 import { createAIGenerationTraceId } from '@/lib/ai/trace-id';
 import { classifyAIGenerationError, getUserFacingGenerationErrorMessage } from '@/lib/ai/errors';
 import { DEFAULT_TEACHING_METHOD, normalizeTeachingMethod } from '@/lib/ai/teaching-methods';
 import {
   PedagogicalReasoningSchema,
+  type AIResult,
   type PedagogicalReasoningOutput,
+  type SectionedContentOutput,
 } from '@/lib/ai/schemas';
 import { inferLanguageFromGoalAndInterests } from '@/lib/curriculum/language';
 import { logger } from '@/lib/observability/logger';
@@ -83,6 +85,7 @@ export async function generateCurriculumLearningContentPipeline(params: {
   let reasoning: PedagogicalReasoningOutput | null = cachedReasoning.success
     ? cachedReasoning.data
     : null;
+  let lessonSections: AIResult<SectionedContentOutput> | null = null;
 
   if (item.cached_reasoning && !cachedReasoning.success) {
     logger.warn('[generateContent] cached_reasoning schema mismatch; regenerating reasoning');
@@ -108,7 +111,10 @@ export async function generateCurriculumLearningContentPipeline(params: {
       metadata: { itemId: params.itemId },
     });
 
-    const reasoningResult = await generateReasoning(aiInput);
+    // 추론 캐시가 없으면 추론과 섹션을 /api/curriculum/lesson 한 번으로 받고, 추론은 아래에서 캐시한다.
+    const lesson = await generateLesson(aiInput);
+    const reasoningResult = lesson.reasoning;
+    lessonSections = lesson.sections;
     if (!reasoningResult.success || !reasoningResult.data) {
       const errorCode = classifyAIGenerationError({
         errorCode: reasoningResult.meta?.errorCode,
@@ -160,7 +166,7 @@ export async function generateCurriculumLearningContentPipeline(params: {
     return { error: '추론 데이터가 비어 있습니다. 잠시 후 다시 시도해주세요.' };
   }
 
-  const sectionsResult = await generateSections(aiInput, reasoning);
+  const sectionsResult = lessonSections ?? await generateSections(aiInput, reasoning);
   if (!sectionsResult.success || !sectionsResult.data) {
     logger.error('[generateContent] phase2 sections failed', sectionsResult.error);
     const errorCode = classifyAIGenerationError({
@@ -34,6 +34,8 @@ import {
   remoteRefineCurriculum,
   remoteGenerateReasoning,
   remoteGenerateSections,
+  remoteGenerateLesson,
+  type RemoteLessonResult,
 } from './impl/remote';
 
 export async function generateContent(
@@ -106,3 +108,10 @@ export async function generateSections(
 ): Promise<AIResult<SectionedContentOutput>> {
   return remoteGenerateSections(params, reasoning);
 }
+
+/** Phase 1+2: 추론과 섹션을 서버에서 한 번에 생성 (추론 캐시가 없을 때) */
+export async function generateLesson(
+  params: GenerateCurriculumContentInput
+): Promise<RemoteLessonResult> {
+  return remoteGenerateLesson(params);
+}
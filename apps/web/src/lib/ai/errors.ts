@@ -10,6 +10,7 @@ const KNOWN_ERROR_CODES: Set<AIGenerationErrorCode> = new Set([
   'config_error',
   'empty_output',
   'provider_error',
+  'circuit_open',
   'db_error',
   'unknown',
 ]);
@@ -55,6 +56,8 @@ export function getUserFacingGenerationErrorMessage(
       return '생성 결과가 비어 있어 다시 시도해 주세요.';
     case 'provider_error':
       return fallback?.trim() || 'AI 생성 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.';
+    case 'circuit_open':
+      return 'AI 공급자 장애로 잠시 생성을 멈췄습니다. 잠시 후 다시 시도해주세요.';
     case 'db_error':
       return '생성은 되었지만 저장 중 문제가 발생했습니다. 다시 시도해주세요.';
     case 'unknown':
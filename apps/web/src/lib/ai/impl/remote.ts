@@ -24,6 +24,8 @@ const FASTAPI_URL = process.env.FASTAPI_URL || 'http://localhost:8000';
 const FASTAPI_MAX_RETRIES = Number(process.env.FASTAPI_MAX_RETRIES || 0);
 const FASTAPI_RETRY_BASE_MS = Number(process.env.FASTAPI_RETRY_BASE_MS || 250);
 const FASTAPI_TIMEOUT_MS = Number(process.env.FASTAPI_TIMEOUT_MS || 70000);
+// 레슨은 추론과 섹션 두 단계를 한 요청에서 받으므로 FastAPI의 /api/curriculum/lesson 마감(120초)보다 조금 길게 기다린다.
+const FASTAPI_LESSON_TIMEOUT_MS = Number(process.env.FASTAPI_LESSON_TIMEOUT_MS || 125000);
 const AI_PROVIDER = String(process.env.AI_PROVIDER || 'gemini').trim().toLowerCase();
 const AI_MODEL = AI_PROVIDER === 'openai'
   ? (process.env.OPENAI_MODEL || 'gpt-4o-mini')
@@ -184,11 +186,15 @@ function parseErrorBody(raw: unknown): { detail: string; errorCode: ApiErrorCode
   return { detail, errorCode, retryable };
 }
 
-async function postJson<T>(path: string, body: unknown): Promise<PostJsonResult<T>> {
+async function postJson<T>(
+  path: string,
+  body: unknown,
+  timeoutMs: number = FASTAPI_TIMEOUT_MS
+): Promise<PostJsonResult<T>> {
   const maxRetries = Number.isFinite(FASTAPI_MAX_RETRIES) ? Math.max(0, FASTAPI_MAX_RETRIES) : 1;
   const retryBaseMs = Number.isFinite(FASTAPI_RETRY_BASE_MS) ? Math.max(50, FASTAPI_RETRY_BASE_MS) : 250;
-  const requestTimeoutMs = Number.isFinite(FASTAPI_TIMEOUT_MS)
-    ? Math.max(1_000, Math.round(FASTAPI_TIMEOUT_MS))
+  const requestTimeoutMs = Number.isFinite(timeoutMs)
+    ? Math.max(1_000, Math.round(timeoutMs))
     : 70_000;
 
   for (let attempt = 0; attempt <= maxRetries; attempt++) {
@@ -198,7 +204,8 @@ async function postJson<T>(path: string, body: unknown): Promise<PostJsonResult<
     try {
       const res = await fetch(`${FASTAPI_URL}${path}`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        // FastAPI가 대기열/재시도/공급자 호출을 이 시간 안에서 끝내도록 남은 예산(ms)을 알려 준다.
+        headers: { 'Content-Type': 'application/json', 'x-request-deadline': String(requestTimeoutMs) },
         body: JSON.stringify(body),
         signal: controller.signal,
       });
@@ -367,3 +374,32 @@ export async function remoteGenerateSections(
     return buildErrorResult<SectionedContentOutput>(path, error);
   }
 }
+
+export interface RemoteLessonResult {
+  reasoning: AIResult<PedagogicalReasoningOutput>;
+  sections: AIResult<SectionedContentOutput>;
+}
+
+export async function remoteGenerateLesson(
+  params: GenerateCurriculumContentInput
+): Promise<RemoteLessonResult> {
+  const path = '/api/curriculum/lesson';
+  try {
+    const { data, meta } = await postJson<{
+      reasoning: PedagogicalReasoningOutput;
+      sections: SectionedContentOutput;
+    }>(path, params, FASTAPI_LESSON_TIMEOUT_MS);
+    // 추론/섹션에 각자의 서버 meta가 붙어 오므로 단계별로 떼어 AICallMeta에 합친다.
+    const reasoning = extractAIResponsePayload(data.reasoning);
+    const sections = extractAIResponsePayload(data.sections);
+    return {
+      reasoning: { success: true, data: reasoning.data, meta: mergeServerAIMeta(meta, reasoning.serverMeta) },
+      sections: { success: true, data: sections.data, meta: mergeServerAIMeta(meta, sections.serverMeta) },
+    };
+  } catch (error) {
+    return {
+      reasoning: buildErrorResult<PedagogicalReasoningOutput>(path, error),
+      sections: buildErrorResult<SectionedContentOutput>(path, error),
+    };
+  }
+}
@@ -7,6 +7,7 @@ export type ApiErrorCode =
   | 'config_error'
   | 'empty_output'
   | 'provider_error'
+  | 'circuit_open'
   | 'db_error'
   | 'unknown';
 
@@ -1,7 +1,7 @@
 // 자동 생성 파일입니다. 수동으로 수정하지 마세요.
 // 오픈API 스펙 파일을 기준으로 생성됨
 
-export type ApiErrorCode = 'schema_mismatch' | 'rate_limited' | 'timeout' | 'quality_failed' | 'config_error' | 'empty_output' | 'provider_error' | 'db_error' | 'unknown';
+export type ApiErrorCode = 'schema_mismatch' | 'rate_limited' | 'timeout' | 'quality_failed' | 'config_error' | 'empty_output' | 'provider_error' | 'circuit_open' | 'db_error' | 'unknown';
 
 export interface ApiErrorResponse {
   error_code: ApiErrorCode;